@@ -5,7 +5,7 @@ from ru.ihna.kozhukhov.core_application.views import View404, UserViewSet, Group
     ProfileView, AccessLevelView, \
     PermissionViewSet, SynchronizationView, LogViewSet, LogRecordViewSet, WidgetsView, \
     ModuleSettingsViewSet, EntryPointListView, AuthorizationMethodSetupView, SystemInformationView, \
-    OperatingSystemLogs, HealthCheck
+    OperatingSystemLogs, OperatingSystemLogsFollow, HealthCheck, LogStatisticsView
 from ru.ihna.kozhukhov.core_application.views import ProfileAvatarView
 from ru.ihna.kozhukhov.core_application.views.process_information import ProcessInformation
 
@@ -33,7 +33,9 @@ urlpatterns = [
     path(r'sysinfo/', SystemInformationView.as_view(), name='system-information'),
     path(r'procinfo/', ProcessInformation.as_view(), name="process-information"),
     path(r'health-check/<slug:category>/', HealthCheck.as_view(), name="health-check"),
-    path(r'os-logs/', OperatingSystemLogs.as_view(), name="os-logs")
+    path(r'os-logs/', OperatingSystemLogs.as_view(), name="os-logs"),
+    path(r'os-logs/follow/', OperatingSystemLogsFollow.as_view(), name="os-logs-follow"),
+    path(r'log-statistics/', LogStatisticsView.as_view(), name="log-statistics"),
 
               ] + router.urls + [
 
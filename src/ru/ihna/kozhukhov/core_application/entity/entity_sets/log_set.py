@@ -3,6 +3,8 @@ from datetime import datetime
 from .entity_set import EntitySet
 from ...exceptions.entity_exceptions import EntityNotFoundException
 from ..readers.log_reader import LogReader
+from ..readers.log_operation_reader import LogOperationReader
+from ..readers.log_export_reader import LogExportReader
 
 
 class LogSet(EntitySet):
@@ -24,6 +26,10 @@ class LogSet(EntitySet):
         "is_anonymous": [bool, None],
         "is_success": [bool, None],
         "is_fail": [bool, None],
+        "response_time_from": [float, None],
+        "query_count_from": [int, None],
+        "query_time_from": [float, None],
+        "order_by": [str, lambda order_by: order_by.lstrip("-") in LogReader.ORDER_COLUMNS],
     }
 
     def get(self, lookup):
@@ -43,6 +49,32 @@ class LogSet(EntitySet):
         else:
             return super().get(lookup)
 
+    def slowest_operations(self, limit: int) -> list:
+        """
+        Groups all logs satisfying the log set filters by the operation and the request method and returns
+        the operations with the greatest mean request processing time.
+
+        :param limit: maximum number of operations to return
+        :return: list of external objects, each external object contains the following fields: operation_description,
+            request_method, request_count, mean_response_time, max_response_time, mean_query_count, mean_query_time
+        """
+        filters = {name: value for name, value in self._entity_filters.items() if name != "order_by"}
+        reader = LogOperationReader(**filters)
+        return list(reader[:limit])
+
+    def export(self, include_records: bool = False):
+        """
+        Reads all logs satisfying the log set filters in the order of their creation. The logs are read by
+        the server-side cursor, so the memory consumption doesn't depend on the number of logs.
+
+        :param include_records: True to attach the log records to each log, False otherwise
+        :return: a generator of external objects. Each external object contains the same fields as the Log entity
+            plus the 'user' field containing id, login, name and surname of the authorized user (or None) and
+            the 'records' field containing list of log records (if include_records is True)
+        """
+        filters = {name: value for name, value in self._entity_filters.items() if name != "order_by"}
+        return iter(LogExportReader(include_records=include_records, **filters))
+
     def rotate(self, up_to: datetime) -> str:
         """
         Rotates all logs earlier than this particular time. Rotation means:
@@ -1,8 +1,13 @@
+from datetime import datetime
+
+from django.utils.timezone import make_aware
+
 from ..exceptions import entity_exceptions as e
 from .entity import Entity
 from .log_record import LogRecord, LogRecordSet
 from ru.ihna.kozhukhov.core_application.entity.entity_sets.log_set import LogSet
 from .fields import EntityField, RelatedEntityField, ManagedEntityField, IpAddressField
+from .fields.float_field import FloatField
 from .field_managers.current_time_manager import CurrentTimeManager
 from .providers.model_providers.log_provider import LogProvider
 
@@ -41,10 +46,20 @@ class Log(Entity):
                                        description="HTTP response status"),
         "response_body": EntityField(str, max_length=TEXT_MAX_LENGTH, description="Response body"),
         "output_data": EntityField(str, max_length=TEXT_MAX_LENGTH, description="Response output data"),
+        "response_time": FloatField(min_value=0.0, min_value_included=True,
+                                    description="Request processing time, in seconds"),
+        "query_count": EntityField(int, min_value=0, description="Number of database queries"),
+        "query_time": FloatField(min_value=0.0, min_value_included=True,
+                                 description="Total time of database queries, in seconds"),
+        "sampling_rate": FloatField(min_value=0.0, max_value=1.0, max_value_included=True,
+                                    description="Fraction of similar requests that were logged"),
     }
 
     _current = None
 
+    _pending_records = None
+    """ Records added to the log before the log was saved """
+
     @classmethod
     def current(cls):
         """
@@ -65,6 +80,10 @@ class Log(Entity):
         """
         super().create()
         Log._current = self
+        if self._pending_records is not None:
+            for level, message, record_time in self._pending_records:
+                self._create_record(level, message, record_time)
+            self._pending_records = None
 
     def update(self):
         """
@@ -88,14 +107,35 @@ class Log(Entity):
     def add_record(self, level, message):
         """
         Adds specific record to the log. The record time will be the same as time when this function calls.
-        The adding record will be saved to the database immediately.
+        The adding record will be saved to the database immediately or, if the log itself has not been saved yet,
+        together with the log.
 
         :param level: the log level
         :param message: the log message
         :return:
         """
+        if self.state == "creating":
+            if self._pending_records is None:
+                self._pending_records = []
+            self._pending_records.append((level, message, make_aware(datetime.now())))
+        else:
+            self._create_record(level, message)
+
+    def _create_record(self, level, message, record_time=None):
+        """
+        Saves the log record to the database
+
+        :param level: the log level
+        :param message: the log message
+        :param record_time: the record time or None if the record time is the current time
+        :return: nothing
+        """
         log_record = LogRecord(level=level, message=message, log=self)
-        log_record.record_time.mark()
+        if record_time is None:
+            log_record.record_time.mark()
+        else:
+            log_record._record_time = record_time
+            log_record.notify_field_changed("record_time")
         log_record.create()
 
     @property
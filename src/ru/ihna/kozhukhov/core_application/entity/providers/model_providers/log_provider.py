@@ -29,7 +29,11 @@ class LogProvider(ModelProvider):
         'geolocation',
         'response_status',
         'response_body',
-        'output_data'
+        'output_data',
+        'response_time',
+        'query_count',
+        'query_time',
+        'sampling_rate',
     ]
 
     def wrap_entity(self, external_object):
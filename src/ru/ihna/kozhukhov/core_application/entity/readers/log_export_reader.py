@@ -0,0 +1,73 @@
+from .log_reader import LogReader
+from .log_record_reader import LogRecordReader
+
+
+class LogExportReader(LogReader):
+    """
+    Reads all logs satisfying given filters in chronological order for the log export.
+
+    The reader uses the server-side cursor and doesn't keep more than one chunk of logs in memory. When the
+    'include_records' filter is True, all log records are attached to each log using one additional query per chunk.
+    """
+
+    _server_side_cursor = True
+
+    _include_records = False
+
+    def initialize_query_builder(self):
+        super().initialize_query_builder()
+        self._include_records = False
+        self.items_builder\
+            .clear_order_terms()\
+            .add_order_term("core_application_log.id", direction=self.items_builder.ASC)
+
+    def apply_order_by_filter(self, order_by):
+        """
+        The logs are always exported in the order of their creation
+
+        :param order_by: useless
+        :return: nothing
+        """
+        pass
+
+    def apply_include_records_filter(self, include_records):
+        """
+        Defines whether log records shall be attached to each log
+
+        :param include_records: True to attach the log records to each log, False otherwise
+        :return: nothing
+        """
+        self._include_records = include_records
+
+    def pick_many_items(self):
+        """
+        Executes the query containing in the items builder and returns all logs
+
+        :return: a generator that returns logs one by one
+        """
+        if not self._include_records:
+            yield from super().pick_many_items()
+            return
+        log_chunk = []
+        for log in super().pick_many_items():
+            log_chunk.append(log)
+            if len(log_chunk) >= self._fetch_size:
+                yield from self._attach_records(log_chunk)
+                log_chunk = []
+        yield from self._attach_records(log_chunk)
+
+    def _attach_records(self, log_chunk):
+        """
+        Attaches log records to each log within the chunk
+
+        :param log_chunk: list of logs
+        :return: a generator that returns logs with the 'records' field set
+        """
+        if len(log_chunk) == 0:
+            return
+        records = {log.id: [] for log in log_chunk}
+        for record in LogRecordReader(log_ids=list(records.keys())):
+            records[record.log_id].append(record)
+        for log in log_chunk:
+            log.records = records[log.id]
+            yield log
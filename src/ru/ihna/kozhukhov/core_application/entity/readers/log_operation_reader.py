@@ -0,0 +1,52 @@
+from .log_reader import LogReader
+from .model_emulators import ModelEmulator
+
+
+class LogOperationReader(LogReader):
+    """
+    Groups the logs by the operation and the request method and calculates the request processing statistics
+    for each group. All LogReader filters are applied before the grouping.
+
+    Since safe requests may be logged selectively, each log is counted as 1/sampling_rate requests.
+    """
+
+    def initialize_query_builder(self):
+        self.items_builder\
+            .add_select_expression("core_application_log.operation_description")\
+            .add_select_expression("core_application_log.request_method")\
+            .add_select_expression(self.items_builder.agg_sum("1.0 / core_application_log.sampling_rate"))\
+            .add_select_expression("AVG(core_application_log.response_time)", "mean_response_time")\
+            .add_select_expression("MAX(core_application_log.response_time)")\
+            .add_select_expression("AVG(core_application_log.query_count)")\
+            .add_select_expression("AVG(core_application_log.query_time)")\
+            .add_data_source("core_application_log")\
+            .add_group_term("core_application_log.operation_description")\
+            .add_group_term("core_application_log.request_method")\
+            .add_order_term("mean_response_time", direction=self.items_builder.DESC,
+                            null_direction=self.items_builder.NULLS_LAST)
+
+        # The count builder counts all logs that were grouped rather than number of groups
+        self.count_builder\
+            .add_select_expression(self.count_builder.select_total_count())\
+            .add_data_source("core_application_log")
+
+    def apply_order_by_filter(self, order_by):
+        """
+        The operations are always ordered by the mean request processing time
+
+        :param order_by: useless
+        :return: nothing
+        """
+        pass
+
+    def create_external_object(self, operation_description, request_method, request_count, mean_response_time,
+                               max_response_time, mean_query_count, mean_query_time):
+        return ModelEmulator(
+            operation_description=operation_description,
+            request_method=request_method,
+            request_count=round(request_count),
+            mean_response_time=mean_response_time,
+            max_response_time=max_response_time,
+            mean_query_count=mean_query_count,
+            mean_query_time=mean_query_time,
+        )
@@ -19,6 +19,17 @@ class LogReader(RawSqlQueryReader):
 
     _count_join = False
 
+    ORDER_COLUMNS = {
+        "request_date": "core_application_log.request_date",
+        "response_time": "core_application_log.response_time",
+        "query_count": "core_application_log.query_count",
+        "query_time": "core_application_log.query_time",
+    }
+    """
+    Columns the log list can be sorted by. Use the column name to sort the list in ascending order and
+    the column name prefixed by '-' to sort the list in descending order.
+    """
+
     def initialize_query_builder(self):
         self.items_builder\
             .add_select_expression("core_application_log.id")\
@@ -33,6 +44,10 @@ class LogReader(RawSqlQueryReader):
             .add_select_expression("core_application_log.response_status")\
             .add_select_expression("core_application_log.response_body")\
             .add_select_expression("core_application_log.output_data")\
+            .add_select_expression("core_application_log.response_time")\
+            .add_select_expression("core_application_log.query_count")\
+            .add_select_expression("core_application_log.query_time")\
+            .add_select_expression("core_application_log.sampling_rate")\
             .add_select_expression("core_application_user.id")\
             .add_select_expression("core_application_user.login")\
             .add_select_expression("core_application_user.name")\
@@ -131,9 +146,60 @@ class LogReader(RawSqlQueryReader):
                 builder.main_filter &= StringQueryFilter("core_application_log.response_status >= 400") & \
                     StringQueryFilter("core_application_log.response_status < 599")
 
+    def apply_response_time_from_filter(self, response_time):
+        """
+        Selects logs related to requests which processing took not less than a given time
+
+        :param response_time: the minimum request processing time, in seconds
+        :return: nothing
+        """
+        for builder in [self.items_builder, self.count_builder]:
+            builder.main_filter &= StringQueryFilter("core_application_log.response_time >= %s", response_time)
+
+    def apply_query_count_from_filter(self, query_count):
+        """
+        Selects logs related to requests that made not less than a given number of database queries
+
+        :param query_count: the minimum number of database queries
+        :return: nothing
+        """
+        for builder in [self.items_builder, self.count_builder]:
+            builder.main_filter &= StringQueryFilter("core_application_log.query_count >= %s", query_count)
+
+    def apply_query_time_from_filter(self, query_time):
+        """
+        Selects logs related to requests which database queries took not less than a given time
+
+        :param query_time: the minimum total time of all database queries, in seconds
+        :return: nothing
+        """
+        for builder in [self.items_builder, self.count_builder]:
+            builder.main_filter &= StringQueryFilter("core_application_log.query_time >= %s", query_time)
+
+    def apply_order_by_filter(self, order_by):
+        """
+        Changes the log ordering. Logs with equal values of the ordering column are ordered by the request date.
+        Logs where the ordering column is not filled are put to the end of the list.
+
+        :param order_by: one of the ORDER_COLUMNS keys, prefixed by '-' for descending order
+        :return: nothing
+        """
+        if order_by.startswith("-"):
+            direction = self.items_builder.DESC
+            column = self.ORDER_COLUMNS[order_by[1:]]
+        else:
+            direction = self.items_builder.ASC
+            column = self.ORDER_COLUMNS[order_by]
+        self.items_builder\
+            .clear_order_terms()\
+            .add_order_term(column, direction=direction, null_direction=self.items_builder.NULLS_LAST)
+        if column != self.ORDER_COLUMNS["request_date"]:
+            self.items_builder.add_order_term("core_application_log.request_date", direction=self.items_builder.DESC)
+
     def create_external_object(self, log_id, request_date, log_address, request_method, operation_description,
                                request_body, input_data, ip_address, geolocation, response_status, response_body,
-                               output_data,
+                               output_data, response_time, query_count, query_time,
+                               sampling_rate,
                                user_id, user_login, user_name, user_surname, user_avatar):
         if user_id is None:
             user = None
@@ -159,4 +225,8 @@ class LogReader(RawSqlQueryReader):
             response_status=response_status,
             response_body=response_body,
             output_data=output_data,
+            response_time=response_time,
+            query_count=query_count,
+            query_time=query_time,
+            sampling_rate=sampling_rate,
         )
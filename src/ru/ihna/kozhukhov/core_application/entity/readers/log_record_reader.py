@@ -38,6 +38,17 @@ class LogRecordReader(RawSqlQueryReader):
         for builder in [self.items_builder, self.count_builder]:
             builder.main_filter &= StringQueryFilter("log_id=%s", log.id)
 
+    def apply_log_ids_filter(self, log_ids):
+        """
+        Tells the DB engine to send only records attached to one of given logs
+
+        :param log_ids: list of log IDs
+        :return: nothing
+        """
+        condition = "log_id IN (%s)" % ", ".join(["%s"] * len(log_ids))
+        for builder in [self.items_builder, self.count_builder]:
+            builder.main_filter &= StringQueryFilter(condition, *log_ids)
+
     def create_external_object(self, record_id, record_time, level, message, log_id):
         return ModelEmulator(
             id=record_id,
@@ -346,6 +346,16 @@ class QueryBuilder:
         self._order_terms.append((col_name, direction, null_direction))
         return self
 
+    def clear_order_terms(self):
+        """
+        Removes all ordering conditions added by means of add_order_term. Use this function when the default
+        ordering shall be replaced by another one.
+
+        :return: self
+        """
+        self._order_terms = []
+        return self
+
     def limit(self, offset, limit):
         """
         Restricts the number of result rows in the query.
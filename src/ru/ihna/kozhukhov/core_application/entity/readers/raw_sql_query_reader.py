@@ -11,6 +11,16 @@ class RawSqlQueryReader(SqlQueryReader):
     both during the construction and sending SQL queries and during interpretation of SQL results.
     """
 
+    _server_side_cursor = False
+    """
+    Set this class property to True if the reader is designed to read huge amount of rows. In this case the rows
+    will be kept by the database server and sent to the client by small chunks (PostgreSQL only, other database
+    engines ignore this property).
+    """
+
+    _fetch_size = 1000
+    """ Number of rows sent by the database server at once when the server-side cursor is used """
+
     def create_external_object(self, *args):
         """
         Transforms the query result row into any external object that is able to read by the entity reader
@@ -32,13 +42,23 @@ class RawSqlQueryReader(SqlQueryReader):
         if self._query_debug:
             print(self.items_builder)
         query = self.items_builder.build()
-        with connection.cursor() as cursor:
-            self.__execute_query(cursor, query)
-            while True:
-                result_row = cursor.fetchone()
-                if result_row is None:
-                    break
-                yield self.create_external_object(*result_row)
+        if self._server_side_cursor:
+            with connection.chunked_cursor() as cursor:
+                self.__execute_query(cursor, query)
+                while True:
+                    result_rows = cursor.fetchmany(self._fetch_size)
+                    if len(result_rows) == 0:
+                        break
+                    for result_row in result_rows:
+                        yield self.create_external_object(*result_row)
+        else:
+            with connection.cursor() as cursor:
+                self.__execute_query(cursor, query)
+                while True:
+                    result_row = cursor.fetchone()
+                    if result_row is None:
+                        break
+                    yield self.create_external_object(*result_row)
 
     def pick_one_item(self):
         """
@@ -134,6 +134,51 @@ class EntityViewMixin(SetCookieMixin):
             return value
         return filter_function
 
+    @classmethod
+    def number_filter_function(cls, filter_param, number_type):
+        """
+        Builds a filter function that accepts non-negative numbers only
+        :param filter_param: the query parameter used for the filter
+        :param number_type: either int or float
+        :return: the filter function
+        """
+        base_filter_function = cls.standard_filter_function(filter_param, str)
+
+        def filter_function(query_params):
+            value = base_filter_function(query_params)
+            if value == "":
+                value = None
+            if value is not None:
+                try:
+                    value = number_type(value)
+                except ValueError:
+                    value = -1
+                if value < 0:
+                    raise ValidationError({filter_param: "The value should be a non-negative number"},
+                                          code="invalid")
+            return value
+        return filter_function
+
+    @classmethod
+    def choice_filter_function(cls, filter_param, choices):
+        """
+        Builds a filter function that accepts one of the given values only
+        :param filter_param: the query parameter used for the filter
+        :param choices: all values that can be accepted
+        :return: the filter function
+        """
+        base_filter_function = cls.standard_filter_function(filter_param, str)
+
+        def filter_function(query_params):
+            value = base_filter_function(query_params)
+            if value == "":
+                value = None
+            if value is not None and value not in choices:
+                raise ValidationError({filter_param: "The value should be one of the following: " +
+                                                     ", ".join(choices)}, code="invalid")
+            return value
+        return filter_function
+
     @classmethod
     def user_function(cls, filter_param):
         """
@@ -0,0 +1,166 @@
+import csv
+import json
+
+
+class LogExporter:
+    """
+    Transforms the logs returned by the LogSet.export method into text lines of a certain file format.
+
+    The exporter never keeps more than one log in memory: each log is transformed into text immediately after
+    it has been read from the database.
+    """
+
+    FIELDS = ["id", "request_date", "log_address", "request_method", "operation_description", "request_body",
+              "input_data", "user_id", "user_login", "ip_address", "geolocation", "response_status", "response_body",
+              "output_data", "response_time", "query_count", "query_time", "sampling_rate"]
+    """ The exported log fields """
+
+    content_type = None
+    """ MIME type of the exported file """
+
+    file_extension = None
+    """ Extension of the exported file """
+
+    def __init__(self, include_records=False):
+        """
+        Initializes the exporter
+
+        :param include_records: True if each log contains the 'records' field that must be exported
+        """
+        self.include_records = include_records
+
+    @staticmethod
+    def get_exporter_class(file_format):
+        """
+        Returns the exporter class for a given file format
+
+        :param file_format: one of the FORMATS keys
+        :return: subclass of the LogExporter
+        """
+        return FORMATS[file_format]
+
+    def export(self, logs):
+        """
+        Transforms the logs into text
+
+        :param logs: an iterable of logs returned by the LogSet.export method
+        :return: a generator of strings. Concatenation of all strings gives the exported file
+        """
+        header = self.get_header()
+        if header is not None:
+            yield header
+        for log in logs:
+            yield self.export_log(self.get_log_values(log), log.records if self.include_records else None)
+
+    def get_log_values(self, log):
+        """
+        Transforms the log into the dictionary of values that can be written to the file
+
+        :param log: a single log returned by the LogSet.export method
+        :return: a dictionary which keys are FIELDS
+        """
+        return {
+            "id": log.id,
+            "request_date": log.request_date.isoformat() if log.request_date is not None else None,
+            "log_address": log.log_address,
+            "request_method": log.request_method,
+            "operation_description": log.operation_description,
+            "request_body": log.request_body,
+            "input_data": log.input_data,
+            "user_id": log.user.id if log.user is not None else None,
+            "user_login": log.user.login if log.user is not None else None,
+            "ip_address": log.ip_address,
+            "geolocation": log.geolocation,
+            "response_status": log.response_status,
+            "response_body": log.response_body,
+            "output_data": log.output_data,
+            "response_time": log.response_time,
+            "query_count": log.query_count,
+            "query_time": log.query_time,
+            "sampling_rate": log.sampling_rate,
+        }
+
+    def get_header(self):
+        """
+        Returns the file header
+
+        :return: a string containing the file header or None if the format doesn't require any header
+        """
+        return None
+
+    def export_log(self, log_values, records):
+        """
+        Transforms a single log into text
+
+        :param log_values: the log values returned by the get_log_values method
+        :param records: list of log records or None if the records shall not be exported
+        :return: a string containing the exported log
+        """
+        raise NotImplementedError("LogExporter.export_log")
+
+
+class CsvLogExporter(LogExporter):
+    """
+    Exports the logs into comma-separated values. When the log records are exported they are put into the
+    'records' column, one record per line.
+    """
+
+    content_type = "text/csv"
+
+    file_extension = "csv"
+
+    class LineBuffer:
+        """
+        A file-like object that keeps the last written line only
+        """
+
+        line = None
+
+        def write(self, line):
+            self.line = line
+
+    def __init__(self, include_records=False):
+        super().__init__(include_records)
+        self._buffer = self.LineBuffer()
+        self._writer = csv.writer(self._buffer)
+
+    def get_header(self):
+        columns = self.FIELDS + ["records"] if self.include_records else self.FIELDS
+        self._writer.writerow(columns)
+        return self._buffer.line
+
+    def export_log(self, log_values, records):
+        row = [log_values[field] for field in self.FIELDS]
+        if records is not None:
+            row.append("\n".join(
+                "%s [%s] %s" % (record.record_time.isoformat(), record.level, record.message)
+                for record in records
+            ))
+        self._writer.writerow(row)
+        return self._buffer.line
+
+
+class JsonLinesLogExporter(LogExporter):
+    """
+    Exports the logs into JSON Lines: each log is a single JSON object written on a separate line.
+    """
+
+    content_type = "application/jsonl"
+
+    file_extension = "jsonl"
+
+    def export_log(self, log_values, records):
+        if records is not None:
+            log_values["records"] = [{
+                "record_time": record.record_time.isoformat(),
+                "level": record.level,
+                "message": record.message,
+            } for record in records]
+        return json.dumps(log_values, ensure_ascii=False) + "\n"
+
+
+FORMATS = {
+    "csv": CsvLogExporter,
+    "jsonl": JsonLinesLogExporter,
+}
+""" All supported export formats """
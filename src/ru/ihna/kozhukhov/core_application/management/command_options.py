@@ -0,0 +1,39 @@
+from argparse import ArgumentTypeError
+
+from dateutil.parser import parse, ParserError
+from django.core.management import CommandError
+from django.utils.timezone import make_aware, is_naive
+
+
+def parse_date_option(value, option_name):
+    """
+    Transforms the command line option value to the date
+
+    :param value: the option value
+    :param option_name: name of the option, for error reporting
+    :return: the timezone-aware datetime object
+    """
+    try:
+        date = parse(value)
+    except ParserError:
+        raise CommandError("Bad date/time format of the %s option" % option_name)
+    if is_naive(date):
+        date = make_aware(date)
+    return date
+
+
+def positive_integer(value):
+    """
+    Transforms the command line option value to the positive integer. Use this function as a 'type' argument of the
+    add_argument method
+
+    :param value: the option value
+    :return: the integer value
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise ArgumentTypeError("'%s' is not an integer" % value)
+    if number <= 0:
+        raise ArgumentTypeError("The value shall be a positive integer")
+    return number
@@ -1,6 +1,7 @@
 import signal
-import time
 import logging
+import threading
+import uuid
 from argparse import ArgumentParser
 from datetime import timedelta
 from importlib import import_module
@@ -8,6 +9,8 @@ from importlib import import_module
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Min, Q
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
@@ -18,7 +21,9 @@ from ru.ihna.kozhukhov.core_application.models import PosixRequest
 from ru.ihna.kozhukhov.core_application.models.enums import PosixRequestStatus, LogLevel
 from ru.ihna.kozhukhov.core_application.utils import mail
 from .auto_admin_object import AutoAdminObject
+from .request_scheduler import RequestScheduler
 from .utils import deserialize_all_args, check_allowed_ip
+from .wakeup_channel import get_wakeup_channel, notify_autoadmin
 
 
 class Command(BaseCommand):
@@ -48,7 +53,10 @@ class Command(BaseCommand):
     }
 
     sleep_interval = 60.0
-    """ Defines the sleep between two consecutive iterations """
+    """
+    Defines the maximum sleep between two consecutive iterations. The daemon wakes up earlier when some confirmed
+    request becomes ready for execution or when it is notified about a new request
+    """
 
     default_execution_interval = timedelta(minutes=10)
     """ Default value of the execution interval given that we have FullServerConfiguration """
@@ -70,8 +78,20 @@ class Command(BaseCommand):
     logger = None
     """ Standard corefacility logger """
 
-    _log = None
-    """ The log associated with a given security check issue. """
+    default_workers = 4
+    """ Used when the CORE_AUTOADMIN_WORKERS setting is absent """
+
+    default_claim_timeout = 3600
+    """ Used when the CORE_AUTOADMIN_CLAIM_TIMEOUT setting is absent """
+
+    claim_batch_size = 100
+    """ Maximum number of requests claimed by a single iteration """
+
+    _thread_state = None
+    """ The log and buffered messages related to the request processed by the current thread """
+
+    _wakeup_channel = None
+    """ Notifies the daemon about new requests """
 
     def __init__(self, stdout=None, stderr=None, no_color=False, force_color=False):
         """
@@ -96,6 +116,19 @@ class Command(BaseCommand):
         for signal_number in (signal.SIGINT, signal.SIGHUP, signal.SIGTERM, signal.SIGQUIT):
             signal.signal(signal_number, self.interrupt)
         self.logger = logging.getLogger("django.corefacility.log")
+        self._thread_state = threading.local()
+
+    @property
+    def _log(self):
+        """
+        The log associated with a given security check issue. Each thread processes its own request, so each thread
+        has its own log.
+        """
+        return getattr(self._thread_state, "log", None)
+
+    @_log.setter
+    def _log(self, value):
+        self._thread_state.log = value
 
     def interrupt(self, signal_number, execution_frame):
         """
@@ -224,6 +257,7 @@ class Command(BaseCommand):
             posix_model = PosixRequest.objects.get(status=PosixRequestStatus.ANALYZED, id=request_id)
             posix_model.status = PosixRequestStatus.CONFIRMED
             posix_model.save()
+            notify_autoadmin()
             self.stdout.write("Request number %d has been confirmed." % request_id)
         except PosixRequest.DoesNotExist:
             raise CommandError("There is no request with ID=%d that waits for the confirmation" % request_id)
@@ -233,37 +267,203 @@ class Command(BaseCommand):
         Turns the autadmin command into the infinite loop. The loop can be terminated by the SIGTERM only.
         """
         self._is_terminated = False
+        self._wakeup_channel = get_wakeup_channel()
+        self._wakeup_channel.open()
         try:
             while True:
                 self._is_terminable = False
-                initialized_requests = list(
-                    PosixRequest.objects
-                    .filter(status=PosixRequestStatus.INITIALIZED)
-                    .order_by('initialization_date')
-                )
-                for request_model in initialized_requests:
-                    self._analyze_posix_request(request_model)
-                    if self._is_terminated:
-                        break
+                claimed_requests = self._claim_posix_requests(PosixRequestStatus.INITIALIZED)
+                try:
+                    initialized_requests = self._coalesce_posix_requests(claimed_requests)
+                    for request_model in initialized_requests:
+                        self._analyze_posix_request(request_model)
+                        if self._is_terminated:
+                            break
+                finally:
+                    is_backlog = self._release_posix_requests(claimed_requests, PosixRequestStatus.INITIALIZED)
                 filter_time = timezone.now() - self.execution_interval
-                confirmed_requests = list(
-                    PosixRequest.objects
-                    .filter(
-                        status=PosixRequestStatus.CONFIRMED,
-                        initialization_date__lt=filter_time,
-                    )
-                    .order_by('initialization_date')
+                claimed_requests = self._claim_posix_requests(
+                    PosixRequestStatus.CONFIRMED,
+                    initialization_date__lt=filter_time,
                 )
-                for request_model in confirmed_requests:
-                    self._execute_posix_request(request_model)
-                    if self._is_terminated:
-                        break
+                try:
+                    confirmed_requests = self._coalesce_posix_requests(claimed_requests)
+                    self._execute_posix_requests(confirmed_requests)
+                finally:
+                    if self._release_posix_requests(claimed_requests, PosixRequestStatus.CONFIRMED):
+                        is_backlog = True
                 if self._is_terminated:
                     break
+                sleep_time = 0.0 if is_backlog else self._get_sleep_time()
                 self._is_terminable = True
-                time.sleep(self.sleep_interval)
+                self._wakeup_channel.wait(sleep_time)
         except KeyboardInterrupt:
             pass
+        finally:
+            self._wakeup_channel.close()
+
+    def _claim_posix_requests(self, status, **filters):
+        """
+        Claims requests with a given status for the current iteration of the daemon.
+
+        Several autoadmin daemons may process the same request queue, so each request shall be claimed before
+        processing. On databases supporting SELECT ... FOR UPDATE SKIP LOCKED (e.g., PostgreSQL) the requests being
+        claimed by another daemon are skipped without waiting. On all other databases the claim is an atomic
+        UPDATE which condition is checked once again by the database, so the same request is never claimed twice.
+        Claims of the daemon that was killed during the request processing expire after CORE_AUTOADMIN_CLAIM_TIMEOUT
+        seconds.
+
+        :param status: status of requests to claim
+        :param filters: additional filters for the requests
+        :return: list of claimed requests in order of their initialization. At most claim_batch_size requests are
+            claimed at once
+        """
+        claim_token = uuid.uuid4().hex
+        claim_date = timezone.now()
+        claim_timeout = timedelta(seconds=getattr(settings, "CORE_AUTOADMIN_CLAIM_TIMEOUT", self.default_claim_timeout))
+        is_available = Q(claim_token__isnull=True) | Q(claim_date__lt=claim_date - claim_timeout)
+        with transaction.atomic():
+            available_requests = PosixRequest.objects\
+                .filter(is_available, status=status, **filters)\
+                .order_by('initialization_date')
+            if connection.features.has_select_for_update_skip_locked:
+                available_requests = available_requests.select_for_update(skip_locked=True)
+            request_ids = list(available_requests.values_list('id', flat=True)[:self.claim_batch_size])
+            if len(request_ids) > 0:
+                PosixRequest.objects\
+                    .filter(is_available, id__in=request_ids, status=status)\
+                    .update(claim_token=claim_token, claim_date=claim_date)
+        if len(request_ids) == 0:
+            return list()
+        return list(PosixRequest.objects
+                    .filter(claim_token=claim_token)
+                    .select_related('log')
+                    .order_by('initialization_date'))
+
+    def _release_posix_requests(self, request_models, status):
+        """
+        Releases claimed requests that were not removed during the processing, so they can be processed by the next
+        iteration of any daemon
+
+        :param request_models: all requests claimed by the _claim_posix_requests method
+        :param status: status of the claimed requests
+        :return: True if the next batch of requests shall be claimed immediately. This is the case when the batch
+            was full and at least some requests were processed (i.e., they were removed or their status was changed)
+        """
+        claim_tokens = {request_model.claim_token for request_model in request_models}
+        if len(claim_tokens) == 0:
+            return False
+        released_requests = PosixRequest.objects.filter(claim_token__in=claim_tokens)
+        unprocessed_request_number = released_requests.filter(status=status).count()
+        released_requests.update(claim_token=None, claim_date=None)
+        return len(request_models) == self.claim_batch_size and unprocessed_request_number < len(request_models)
+
+    def _coalesce_posix_requests(self, request_models):
+        """
+        Merges redundant requests. Requests can be merged when they belong to the same action class and the class
+        tells that they have equal coalescing keys (e.g., several update_alias requests for the same project or
+        several update_connections requests) and were made by the same user from the same IP address. Anonymous
+        requests are never merged. The earliest request remains while its method arguments are combined
+        with arguments of all other requests. The remaining request refers to logs of all merged requests while
+        the merged requests are removed and their logs are provided by the corresponding records.
+
+        :param request_models: list of requests with the same status in order of their initialization
+        :return: list of the remaining requests in the same order
+        """
+        request_groups = dict()
+        remaining_requests = list()
+        for request_model in request_models:
+            try:
+                action_class = self._get_action_class(request_model)
+                coalescing_key = action_class.get_coalescing_key(
+                    request_model.action_arguments,
+                    request_model.method_name,
+                    request_model.method_arguments,
+                )
+            except Exception:
+                coalescing_key = None  # The security check will reveal the reason during the request processing
+            # The security check is made for the remaining request only, so the merged requests shall pass or fail it
+            # in the same way: they shall be made by the same user from the same IP address
+            if coalescing_key is None or request_model.log.user_id is None:
+                remaining_requests.append(request_model)
+                continue
+            coalescing_key = (
+                request_model.action_class,
+                request_model.log.user_id,
+                request_model.log.ip_address,
+                coalescing_key,
+            )
+            if coalescing_key not in request_groups:
+                request_groups[coalescing_key] = list()
+                remaining_requests.append(request_model)
+            request_groups[coalescing_key].append(request_model)
+
+        for request_group in request_groups.values():
+            if len(request_group) > 1:
+                self._merge_posix_requests(request_group)
+        return remaining_requests
+
+    def _merge_posix_requests(self, request_group):
+        """
+        Merges several requests into the first one
+
+        :param request_group: list of requests with equal coalescing keys in order of their initialization
+        """
+        remaining_request, *merged_requests = request_group
+        merged_request_ids = ", ".join(str(request_model.id) for request_model in merged_requests)
+        action_class = self._get_action_class(remaining_request)
+        with transaction.atomic():
+            remaining_request.method_arguments = action_class.coalesce_arguments(
+                remaining_request.method_name,
+                [request_model.method_arguments for request_model in request_group],
+            )
+            remaining_request.save()
+            for merged_request in merged_requests:
+                merged_log_ids = {merged_request.log_id}
+                merged_log_ids.update(merged_request.coalesced_logs.values_list('id', flat=True))
+                merged_log_ids.discard(remaining_request.log_id)
+                remaining_request.coalesced_logs.add(*merged_log_ids)
+                LogSet().get(merged_request.log_id).add_record(
+                    LogLevel.INFO,
+                    _("The request has been merged with the request {0}").format(remaining_request.id)
+                )
+                merged_request.delete()
+        self.logger.info("POSIX requests %s have been merged into the request %d" %
+                         (merged_request_ids, remaining_request.id))
+
+    def _add_coalesced_log_records(self, request_model, level, message):
+        """
+        Adds the record to logs of all requests merged into a given one
+
+        :param request_model: the remaining request
+        :param level: the log level
+        :param message: the log message
+        """
+        for log_id in request_model.coalesced_logs.values_list('id', flat=True):
+            try:
+                LogSet().get(log_id).add_record(level, message)
+            except EntityNotFoundException:
+                pass
+
+    def _get_sleep_time(self):
+        """
+        Calculates how long the daemon may sleep until the earliest confirmed request becomes ready for execution.
+        Requests that are already ready but were not executed during the current iteration are retried after the
+        regular sleep interval
+
+        :return: the sleep time in seconds
+        """
+        current_time = timezone.now()
+        next_request_date = PosixRequest.objects\
+            .filter(
+                status=PosixRequestStatus.CONFIRMED,
+                initialization_date__gte=current_time - self.execution_interval,
+            )\
+            .aggregate(next_request_date=Min('initialization_date'))['next_request_date']
+        if next_request_date is None:
+            return self.sleep_interval
+        sleep_time = (next_request_date + self.execution_interval - current_time).total_seconds()
+        return min(max(sleep_time, 0.0), self.sleep_interval)
 
     def _get_posix_request_info(self):
         """
@@ -416,6 +616,82 @@ class Command(BaseCommand):
         except Exception as error:
             self._process_request_failure(request_model, error)
 
+    def _execute_posix_requests(self, request_models):
+        """
+        Executes all requests marked as CONFIRMED.
+
+        Requests touching the same POSIX users or groups are executed in order of their initialization while other
+        requests are executed concurrently by at most CORE_AUTOADMIN_WORKERS threads. Messages are written to the
+        log in order of request initialization whatever order the requests were finished.
+
+        :param request_models: requests in order of their initialization
+        """
+        workers = getattr(settings, "CORE_AUTOADMIN_WORKERS", self.default_workers)
+        if workers <= 1 or len(request_models) <= 1:
+            for request_model in request_models:
+                self._execute_posix_request(request_model)
+                if self._is_terminated:
+                    break
+            return
+        resource_list = [self._get_request_resources(request_model) for request_model in request_models]
+        scheduler = RequestScheduler(workers)
+        message_lists = scheduler.run(
+            request_models,
+            resource_list,
+            self._execute_posix_request_in_thread,
+            lambda: self._is_terminated,
+        )
+        for message_list in message_lists:
+            for level, message in message_list or []:
+                self.logger.log(level, message)
+
+    def _execute_posix_request_in_thread(self, request_model):
+        """
+        Executes the request marked as CONFIRMED in the worker thread
+
+        :param request_model: a request itself
+        :return: list of (level, message) tuples that shall be written to the logger
+        """
+        self._thread_state.messages = list()
+        try:
+            self._execute_posix_request(request_model)
+            return self._thread_state.messages
+        finally:
+            self._thread_state.messages = None
+            self._thread_state.log = None
+            connection.close()
+
+    def _get_request_resources(self, request_model):
+        """
+        Reveals POSIX users and groups touched by the request
+
+        :param request_model: the request
+        :return: set of resources as defined by the AutoAdminObject.get_resources or None if the request may touch
+            anything
+        """
+        try:
+            action_class = self._get_action_class(request_model)
+            return action_class.get_resources(
+                request_model.action_arguments,
+                request_model.method_name,
+                request_model.method_arguments,
+            )
+        except Exception:
+            return None  # The security check will reveal the reason during the request processing
+
+    def _write_message(self, level, message):
+        """
+        Writes the message to the logger. Messages from worker threads are buffered until all requests are executed
+
+        :param level: the logging level
+        :param message: the message to write
+        """
+        messages = getattr(self._thread_state, "messages", None)
+        if messages is None:
+            self.logger.log(level, message)
+        else:
+            messages.append((level, message))
+
     def _execute_posix_request(self, request_model):
         """
         Executes the request marked as CONFIRMED.
@@ -427,10 +703,13 @@ class Command(BaseCommand):
             action = self._security_check(request_model)
             action.command_emulation = False
             output = action.call(request_model)
+            self._add_coalesced_log_records(
+                request_model, LogLevel.INFO, _("The action has been successfully accomplished.")
+            )
             request_model.delete()
             self._log.add_record(LogLevel.INFO, _("The action has been successfully accomplished."))
             if output != "" and output is not None:
-                self.logger.info(output)
+                self._write_message(logging.INFO, output)
         except Exception as error:
             self._process_request_failure(request_model, error)
 
@@ -522,9 +801,10 @@ class Command(BaseCommand):
         :param error: an exception thrown during the request initialization or execution
         """
         from ru.ihna.kozhukhov.core_application.exceptions.entity_exceptions import PosixCommandFailedException
-        self.logger.error(str(error))
+        self._write_message(logging.ERROR, str(error))
         if self._log is not None and not isinstance(error, PosixCommandFailedException):
             self._log.add_record(LogLevel.ERROR, str(error))
+        self._add_coalesced_log_records(request_model, LogLevel.ERROR, str(error))
         if isinstance(error, SecurityCheckFailedException):
             self._log.add_record(
                 LogLevel.INFO,
@@ -1,3 +1,4 @@
+import json
 import re
 import subprocess
 
@@ -27,6 +28,91 @@ class AutoAdminObject:
 
     _quote_needed_pattern = re.compile(r"\s")
 
+    IDEMPOTENT_METHODS = set()
+    """
+    Methods that bring the POSIX object to the state defined by the corefacility database at the moment of
+    execution. Several pending requests for the same object, the same method and the same arguments can be
+    replaced by a single request.
+    """
+
+    RESOURCE_TYPE = None
+    """ Type of POSIX objects this class deals with ('user' or 'group') or None if the class deals with no object """
+
+    @classmethod
+    def get_resources(cls, action_arguments, method_name, method_arguments):
+        """
+        Reveals POSIX objects touched by the POSIX request. Requests touching the same objects are never executed
+        at the same time.
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :param method_name: name of the method to call
+        :param method_arguments: serialized arguments of the method
+        :return: set of strings '<type>:<id>' or '<type>:*' (all objects of a given type) or None if the request
+            may touch anything
+        """
+        return None
+
+    @classmethod
+    def _get_entity_resource(cls, action_arguments):
+        """
+        Reveals the POSIX object the AutoAdminObject is attached to
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :return: the resource string '<type>:<id>' or None if the object can't be revealed
+        """
+        entity_id = cls._get_entity_id(action_arguments)
+        if entity_id is None:
+            return None
+        return "%s:%d" % (cls.RESOURCE_TYPE, entity_id)
+
+    @classmethod
+    def _get_entity_id(cls, action_arguments):
+        """
+        Reveals ID of the entity the AutoAdminObject is attached to
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :return: the entity ID or None if the entity can't be revealed
+        """
+        args = action_arguments.get('args', [])
+        kwargs = action_arguments.get('kwargs', {})
+        entity = args[0] if len(args) > 0 else kwargs.get('entity')
+        if isinstance(entity, dict) and 'entity_id' in entity:
+            entity = entity['entity_id']
+        if isinstance(entity, int):
+            return entity
+        return None
+
+    @classmethod
+    def get_coalescing_key(cls, action_arguments, method_name, method_arguments):
+        """
+        Reveals whether the POSIX request can be merged with other POSIX requests
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :param method_name: name of the method to call
+        :param method_arguments: serialized arguments of the method
+        :return: None if the request can't be merged with any other request. Otherwise, some hashable value. Requests
+            with equal keys can be merged together
+        """
+        if method_name not in cls.IDEMPOTENT_METHODS:
+            return None
+        return (
+            json.dumps(action_arguments, sort_keys=True),
+            method_name,
+            json.dumps(method_arguments, sort_keys=True),
+        )
+
+    @classmethod
+    def coalesce_arguments(cls, method_name, method_arguments_list):
+        """
+        Combines arguments of several requests with equal coalescing keys
+
+        :param method_name: name of the method to call
+        :param method_arguments_list: serialized method arguments for all merged requests in order of their
+            initialization
+        :return: serialized method arguments for the merged request
+        """
+        return method_arguments_list[0]
+
     @classmethod
     def update_static_objects(cls):
         """
@@ -2,6 +2,7 @@ from ....exceptions.entity_exceptions import NoLogException
 from ....models import PosixRequest
 from .auto_admin_object import AutoAdminObject
 from .utils import serialize_all_args
+from .wakeup_channel import notify_autoadmin
 
 
 class AutoAdminWrapperObject(AutoAdminObject):
@@ -69,5 +70,6 @@ class AutoAdminWrapperObject(AutoAdminObject):
                 log_id=self._wrapped.log.id,
             )
             posix_request.save()
+            notify_autoadmin()
 
         return auto_admin_wrapper_method
@@ -1,5 +1,6 @@
 from ru.ihna.kozhukhov.core_application.entity.entity_sets.log_set import LogSet
 from .auto_admin_object import AutoAdminObject
+from .posix_group import PosixGroup
 from .posix_user import PosixUser
 
 
@@ -13,6 +14,61 @@ class PosixConnector(AutoAdminObject):
     log = None
     """ The log attached """
 
+    IDEMPOTENT_METHODS = {"update_connections"}
+
+    @classmethod
+    def get_coalescing_key(cls, action_arguments, method_name, method_arguments):
+        """
+        All pending update_connections requests can be merged together whatever log they are attached to
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :param method_name: name of the method to call
+        :param method_arguments: serialized arguments of the method
+        :return: the coalescing key or None if the request can't be merged
+        """
+        if method_name not in cls.IDEMPOTENT_METHODS:
+            return None
+        return method_name
+
+    @classmethod
+    def get_resources(cls, action_arguments, method_name, method_arguments):
+        """
+        Reveals POSIX objects touched by the POSIX request.
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :param method_name: name of the method to call
+        :param method_arguments: serialized arguments of the method
+        :return: all given users and all groups
+        """
+        if method_name != "update_connections":
+            return None
+        if len(method_arguments['args']) > 0:
+            ids = method_arguments['args'][0]
+        else:
+            ids = method_arguments['kwargs']['ids']
+        return {"user:%d" % entity_id for entity_id in ids} | {"group:*"}
+
+    @classmethod
+    def coalesce_arguments(cls, method_name, method_arguments_list):
+        """
+        Combines user IDs from all merged update_connections requests
+
+        :param method_name: name of the method to call
+        :param method_arguments_list: serialized method arguments for all merged requests in order of their
+            initialization
+        :return: serialized method arguments for the merged request
+        """
+        ids = list()
+        for method_arguments in method_arguments_list:
+            if len(method_arguments['args']) > 0:
+                request_ids = method_arguments['args'][0]
+            else:
+                request_ids = method_arguments['kwargs']['ids']
+            for entity_id in request_ids:
+                if entity_id not in ids:
+                    ids.append(entity_id)
+        return {"args": [ids], "kwargs": {}}
+
     def __init__(self, log_id=None):
         """
         :param log_id: ID of the attached corefacility log or None if no log was attached
@@ -23,12 +79,24 @@ class PosixConnector(AutoAdminObject):
 
     def update_connections(self, ids):
         """
-        Updates connections between particular POSIX users and POSIX groups
+        Updates connections between particular POSIX users and POSIX groups.
+
+        The desired supplementary groups are calculated for all users at once and compared to the /etc/group
+        snapshot. Only commands that change anything are emitted.
+
         :param ids: IDs for the related corefacility users.
         """
+        desired_groups = dict()
         for entity_id in ids:
             posix_user = PosixUser(entity_id)
             posix_user.command_emulation = self.command_emulation
             posix_user.log = self.log
-            posix_user.update_supplementary_groups()
+            if posix_user.check_user_for_update() is None:
+                posix_user.create()
+            project_dictionary = posix_user.get_supplementary_groups()
+            posix_user.update_project_links(project_dictionary)
             posix_user.copy_command_list(self)
+            desired_groups[posix_user.login] = set(project_dictionary)
+        group_database = PosixGroup.get_posix_group_database()
+        for command in group_database.get_membership_commands(desired_groups):
+            self.run(command)
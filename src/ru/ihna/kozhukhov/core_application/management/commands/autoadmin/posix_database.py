@@ -0,0 +1,346 @@
+import os
+import threading
+from collections import namedtuple
+
+
+PasswdEntry = namedtuple("PasswdEntry", ["login", "uid", "gid", "comment", "home_dir", "shell"])
+""" A single line of the /etc/passwd file """
+
+GroupEntry = namedtuple("GroupEntry", ["name", "gid", "members"])
+""" A single line of the /etc/group file """
+
+ShadowEntry = namedtuple("ShadowEntry", ["login", "password"])
+""" A single line of the /etc/shadow file. Password aging fields are not used by the autoadmin and hence omitted """
+
+PosixSnapshot = namedtuple("PosixSnapshot", ["entries", "available", "indices"])
+""" The loaded file: list of entries, whether the file was readable and a dictionary index name => index """
+
+
+class PosixDatabase:
+    """
+    An in-memory snapshot of a colon-separated POSIX database file (/etc/passwd, /etc/group etc.)
+
+    The file is parsed once and indexed. The snapshot is reloaded only when the file has been changed, i.e., when its
+    inode, modification time or size differ from the ones observed during the last loading. Since useradd, groupadd
+    and other shadow utilities replace the whole file, changes made by the autoadmin itself are noticed immediately.
+
+    All snapshots are shared: use the get_instance() method to access the snapshot for a given file.
+    """
+
+    FIELD_NUMBER = None
+    """ Minimum number of fields in a valid line """
+
+    _instances = dict()
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, path):
+        """
+        Returns the shared snapshot for a given file
+
+        :param path: path to the database file
+        :return: the snapshot which is up to date
+        """
+        with cls._instances_lock:
+            instance = cls._instances.get((cls, path))
+            if instance is None:
+                instance = cls(path)
+                cls._instances[(cls, path)] = instance
+        instance.refresh()
+        return instance
+
+    @classmethod
+    def clear_instances(cls):
+        """
+        Forgets all shared snapshots
+        """
+        with cls._instances_lock:
+            cls._instances.clear()
+
+    def __init__(self, path):
+        """
+        Initializes the snapshot. The file will be loaded during the first refresh
+
+        :param path: path to the database file
+        """
+        self.path = path
+        self.version = 0
+        self._snapshot = PosixSnapshot(entries=list(), available=False, indices=self._build_indices(list()))
+        self._file_key = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        """
+        List of all valid entries in order of their appearance in the file
+        """
+        return self._snapshot.entries
+
+    @property
+    def available(self):
+        """
+        False if the file doesn't exist or can't be read
+        """
+        return self._snapshot.available
+
+    def refresh(self):
+        """
+        Reloads the file when it has been changed since the last loading.
+
+        When the file doesn't exist or can't be read (e.g., /etc/shadow for the non-privileged user) the snapshot
+        contains no entries and its 'available' attribute is False.
+
+        :return: True if the file has been reloaded, False otherwise
+        """
+        with self._lock:
+            try:
+                file_stat = os.stat(self.path)
+                file_key = (file_stat.st_dev, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+            except OSError:
+                file_key = None
+            if self.version > 0 and file_key == self._file_key:
+                return False
+            entries = list()
+            available = False
+            if file_key is not None:
+                try:
+                    with open(self.path, 'r') as database_file:
+                        for line in database_file:
+                            line = line.rstrip("\n")
+                            if line == "" or line.startswith("#"):
+                                continue
+                            fields = line.split(":")
+                            if len(fields) < self.FIELD_NUMBER:
+                                continue
+                            entry = self._parse_entry(fields)
+                            if entry is not None:
+                                entries.append(entry)
+                    available = True
+                except OSError:
+                    entries = list()
+            # Other threads read the snapshot without the lock, so it is published by a single assignment
+            self._snapshot = PosixSnapshot(entries=entries, available=available,
+                                           indices=self._build_indices(entries))
+            self._file_key = file_key
+            self.version += 1
+            return True
+
+    def _parse_entry(self, fields):
+        """
+        Transforms a single line of the file to the entry
+
+        :param fields: list of colon-separated fields
+        :return: the entry or None if the line is not valid
+        """
+        raise NotImplementedError("PosixDatabase._parse_entry")
+
+    def _build_indices(self, entries):
+        """
+        Builds all indices for the loaded entries
+
+        :param entries: list of all loaded entries
+        :return: a dictionary index name => index
+        """
+        raise NotImplementedError("PosixDatabase._build_indices")
+
+    @staticmethod
+    def _parse_id(value):
+        """
+        Parses UID or GID
+
+        :param value: the string value
+        :return: the integer value or None if the value is not valid
+        """
+        try:
+            return int(value)
+        except ValueError:
+            return None
+
+
+class PasswdDatabase(PosixDatabase):
+    """
+    An indexed snapshot of the /etc/passwd file
+    """
+
+    FIELD_NUMBER = 7
+
+    @property
+    def by_login(self):
+        """
+        login => PasswdEntry
+        """
+        return self._snapshot.indices['by_login']
+
+    @property
+    def by_uid(self):
+        """
+        UID => PasswdEntry. The first entry is used when several logins share the same UID
+        """
+        return self._snapshot.indices['by_uid']
+
+    @property
+    def by_gid(self):
+        """
+        primary GID => list of PasswdEntry
+        """
+        return self._snapshot.indices['by_gid']
+
+    def _parse_entry(self, fields):
+        uid = self._parse_id(fields[2])
+        gid = self._parse_id(fields[3])
+        if uid is None or gid is None:
+            return None
+        return PasswdEntry(login=fields[0], uid=uid, gid=gid, comment=fields[4], home_dir=fields[5], shell=fields[6])
+
+    def _build_indices(self, entries):
+        by_login = dict()
+        by_uid = dict()
+        by_gid = dict()
+        for entry in entries:
+            by_login.setdefault(entry.login, entry)
+            by_uid.setdefault(entry.uid, entry)
+            by_gid.setdefault(entry.gid, list()).append(entry)
+        return {'by_login': by_login, 'by_uid': by_uid, 'by_gid': by_gid}
+
+
+class GroupDatabase(PosixDatabase):
+    """
+    An indexed snapshot of the /etc/group file
+    """
+
+    FIELD_NUMBER = 4
+
+    @property
+    def by_name(self):
+        """
+        group name => GroupEntry
+        """
+        return self._snapshot.indices['by_name']
+
+    @property
+    def by_gid(self):
+        """
+        GID => GroupEntry. The first entry is used when several groups share the same GID
+        """
+        return self._snapshot.indices['by_gid']
+
+    @property
+    def by_member(self):
+        """
+        login => set of names of all groups where the user is listed as a supplementary member
+        """
+        return self._snapshot.indices['by_member']
+
+    def get_membership_commands(self, desired_groups):
+        """
+        Calculates the minimum set of commands that bring supplementary groups of given users to the desired state.
+
+        Groups where several users shall be added or removed receive a new member list by a single 'gpasswd -M'
+        command. Users that still require several changes receive a full group list by a single 'usermod -G' command.
+        The rest of changes are applied by 'gpasswd -a' and 'gpasswd -d'. Nothing is emitted for users which
+        supplementary groups are already in the desired state.
+
+        :param desired_groups: a dictionary login => set of names of all supplementary groups the user shall belong to.
+            Users not mentioned in the dictionary are not touched.
+        :return: list of commands to run. The list is the same for the same database and the same desired groups.
+        """
+        indices = self._snapshot.indices
+        changes = dict()
+        for login in sorted(desired_groups):
+            desired = set(desired_groups[login])
+            actual = indices['by_member'].get(login, set())
+            for group_name in sorted(desired - actual):
+                changes.setdefault(group_name, dict())[login] = True
+            for group_name in sorted(actual - desired):
+                changes.setdefault(group_name, dict())[login] = False
+
+        commands = list()
+        user_changes = dict()
+        for group_name in sorted(changes):
+            group_changes = changes[group_name]
+            if len(group_changes) > 1:
+                entry = indices['by_name'].get(group_name)
+                members = list(entry.members) if entry is not None else list()
+                members = [member for member in members if group_changes.get(member, True)]
+                members += [login for login, is_added in group_changes.items()
+                            if is_added and login not in members]
+                commands.append(("gpasswd", "-M", ",".join(members), group_name))
+            else:
+                for login, is_added in group_changes.items():
+                    user_changes.setdefault(login, list()).append((group_name, is_added))
+
+        for login in sorted(user_changes):
+            if len(user_changes[login]) > 1:
+                commands.append(("usermod", "-G", ",".join(sorted(desired_groups[login])), login))
+            else:
+                group_name, is_added = user_changes[login][0]
+                commands.append(("gpasswd", "-a" if is_added else "-d", login, group_name))
+
+        return commands
+
+    def _parse_entry(self, fields):
+        gid = self._parse_id(fields[2])
+        if gid is None:
+            return None
+        members = [member for member in fields[3].split(",") if member != ""]
+        return GroupEntry(name=fields[0], gid=gid, members=members)
+
+    def _build_indices(self, entries):
+        by_name = dict()
+        by_gid = dict()
+        by_member = dict()
+        for entry in entries:
+            by_name.setdefault(entry.name, entry)
+            by_gid.setdefault(entry.gid, entry)
+            for member in entry.members:
+                by_member.setdefault(member, set()).add(entry.name)
+        return {'by_name': by_name, 'by_gid': by_gid, 'by_member': by_member}
+
+
+class ShadowDatabase(PosixDatabase):
+    """
+    An indexed snapshot of the /etc/shadow file. The file is readable by the superuser only
+    """
+
+    FIELD_NUMBER = 2
+
+    LOCKED = "L"
+    """ The password is set but the account is locked """
+
+    NO_PASSWORD = "NP"
+    """ The password is not set """
+
+    PASSWORD = "P"
+    """ The password is set and the account is not locked """
+
+    @property
+    def by_login(self):
+        """
+        login => ShadowEntry
+        """
+        return self._snapshot.indices['by_login']
+
+    def get_lock_status(self, login):
+        """
+        Reveals the account status in the same way as the 'passwd -S' command does
+
+        :param login: the user login
+        :return: one of LOCKED, NO_PASSWORD or PASSWORD or None if the user is not listed in the file
+        """
+        entry = self.by_login.get(login)
+        if entry is None:
+            return None
+        if entry.password.startswith("!"):
+            return self.LOCKED
+        if entry.password == "":
+            return self.NO_PASSWORD
+        return self.PASSWORD
+
+    def _parse_entry(self, fields):
+        return ShadowEntry(login=fields[0], password=fields[1])
+
+    def _build_indices(self, entries):
+        by_login = dict()
+        for entry in entries:
+            by_login.setdefault(entry.login, entry)
+        return {'by_login': by_login}
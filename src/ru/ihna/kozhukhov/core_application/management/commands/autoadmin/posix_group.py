@@ -1,15 +1,17 @@
-import csv
 import os
 import re
 
 from django.conf import settings
+from django.db.models import Q
 
 from ru.ihna.kozhukhov.core_application.entity.entity_sets.project_set import ProjectSet
 from ru.ihna.kozhukhov.core_application.entity.entity_sets.user_set import UserSet
 from ru.ihna.kozhukhov.core_application.exceptions.entity_exceptions import ConfigurationProfileException, \
     RetryCommandAfterException
 from ru.ihna.kozhukhov.core_application.entity.providers.model_providers.project_provider import ProjectProvider
+from ru.ihna.kozhukhov.core_application.models import GroupUser
 from .auto_admin_object import AutoAdminObject
+from .posix_database import GroupDatabase
 from .posix_user import PosixUser
 
 
@@ -47,6 +49,10 @@ class PosixGroup(AutoAdminObject):
     PROJECT_DIR_PERMISSIONS = "02770"
     """ Permissions for the newly created project directory """
 
+    IDEMPOTENT_METHODS = {"update_alias"}
+
+    RESOURCE_TYPE = "group"
+
     name = None
     """ Name of the POSIX group """
 
@@ -62,24 +68,73 @@ class PosixGroup(AutoAdminObject):
     project_dir = None
     """ Directory where common project files are located """
 
+    _static_objects_source = None
+    """ The database snapshot and its version from which the static objects were built """
+
+    @classmethod
+    def get_posix_group_database(cls):
+        """
+        Returns the indexed snapshot of the /etc/group file shared among all auto admin objects
+
+        :return: the GroupDatabase instance which is up to date
+        """
+        return GroupDatabase.get_instance(cls.POSIX_GROUP_FILE)
+
     @classmethod
     def get_posix_groups(cls):
         """
-        Lists all available POSIX groups
+        Lists all available POSIX groups. The list is rebuilt only when the /etc/group file has been changed
+
         :return: list of all POSIX groups
         """
-        cls._static_objects = []
-        with open(cls.POSIX_GROUP_FILE, 'r') as posix_group_file:
-            posix_group_reader = csv.reader(posix_group_file, delimiter=':')
-            for posix_group_info in posix_group_reader:
-                posix_group = cls(
-                    name=posix_group_info[cls.NAME_POSITION],
-                    gid=posix_group_info[cls.GID_POSITION],
-                    user_list=posix_group_info[cls.USER_LIST_POSITION].split(',')
-                )
-                cls._static_objects.append(posix_group)
+        database = cls.get_posix_group_database()
+        if cls._static_objects is None or cls._static_objects_source != (database, database.version):
+            cls._static_objects = [cls._create_from_entry(entry) for entry in database.entries]
+            cls._static_objects_source = (database, database.version)
         return cls._static_objects
 
+    @classmethod
+    def get_resources(cls, action_arguments, method_name, method_arguments):
+        """
+        Reveals POSIX objects touched by the POSIX request.
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :param method_name: name of the method to call
+        :param method_arguments: serialized arguments of the method
+        :return: the group itself and users which memberships or home directories are changed by the method. All
+            users are declared when the method is not known to touch the project users only
+        """
+        project_id = cls._get_entity_id(action_arguments)
+        if project_id is None:
+            return None
+        group_resource = "%s:%d" % (cls.RESOURCE_TYPE, project_id)
+        root_group_users = Q(group__project=project_id)
+        if method_name == "create":
+            user_filter = root_group_users
+        elif method_name in ("update_alias", "exclude_all_users", "delete"):
+            user_filter = root_group_users | Q(group__permissions__project=project_id)
+        elif method_name == "update_root_group":
+            # The group is created from scratch when it is absent, so all users of the new root group are touched
+            if len(method_arguments['args']) > 0:
+                old_root_group_id = method_arguments['args'][0]
+            else:
+                old_root_group_id = method_arguments['kwargs'].get('old_root_group_id')
+            user_filter = root_group_users | Q(group=old_root_group_id)
+        else:
+            return {group_resource, "user:*"}
+        user_ids = GroupUser.objects.filter(user_filter).values_list("user_id", flat=True).distinct()
+        return {group_resource} | {"user:%d" % user_id for user_id in user_ids}
+
+    @classmethod
+    def _create_from_entry(cls, entry):
+        """
+        Creates the PosixGroup object from the /etc/group entry
+
+        :param entry: the GroupEntry instance
+        :return: the PosixGroup instance
+        """
+        return cls(name=entry.name, gid=str(entry.gid), user_list=list(entry.members))
+
     def __init__(self, entity=None, name=None, gid=None, user_list=None):
         """
         Initializes the object.
@@ -174,10 +229,10 @@ class PosixGroup(AutoAdminObject):
         """
         if self.name is None or self.project_dir is None:
             raise RetryCommandAfterException()
-        available_posix_groups = filter(lambda group: group.name == self.name, self.get_posix_groups())
-        for posix_group in available_posix_groups:
-            return posix_group
-        return None
+        entry = self.get_posix_group_database().by_name.get(self.name)
+        if entry is None:
+            return None
+        return self._create_from_entry(entry)
 
     def _find_all_users(self):
         """
@@ -301,7 +356,7 @@ class PosixGroup(AutoAdminObject):
         Generates the UNIX group name
         """
         desired_group_name = self.entity.alias[:self.POSIX_GROUP_NAME_MAXSIZE]
-        group_list = [group.name for group in self.get_posix_groups()]
+        group_list = self.get_posix_group_database().by_name
         while desired_group_name in group_list:
             enumerated_group_matches = self.ENUMERATED_GROUP_TEMPLATE.match(desired_group_name)
             numbered_group_matches = self.NUMBERED_GROUP_TEMPLATE.match(desired_group_name)
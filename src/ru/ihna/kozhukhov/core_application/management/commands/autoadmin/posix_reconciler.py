@@ -0,0 +1,367 @@
+import os
+from collections import namedtuple
+
+from ....exceptions.entity_exceptions import PosixCommandFailedException, RetryCommandAfterException
+from ....models import User, Project, GroupUser, Permission
+from ....models.enums import LogLevel
+from .auto_admin_object import AutoAdminObject
+from .posix_database import ShadowDatabase
+from .posix_group import PosixGroup
+from .posix_user import PosixUser
+
+
+UserState = namedtuple("UserState", ["id", "unix_group", "home_dir", "is_locked"])
+""" A corefacility user as it shall be reflected in the operating system """
+
+ProjectState = namedtuple("ProjectState", ["id", "unix_group", "project_dir"])
+""" A corefacility project as it shall be reflected in the operating system """
+
+DesiredState = namedtuple("DesiredState", ["users", "projects", "memberships"])
+"""
+    The state defined by the corefacility database: list of UserState, list of ProjectState and a dictionary
+    user ID => set of IDs of projects which POSIX groups the user shall belong to
+"""
+
+ActualState = namedtuple("ActualState", ["passwd", "group", "shadow", "links"])
+"""
+    The state of the operating system: snapshots of /etc/passwd, /etc/group and /etc/shadow and a dictionary
+    home directory => dictionary of symbolic link path => link target, for all existent home directories
+"""
+
+PlanStep = namedtuple("PlanStep", ["phase", "target", "commands", "action"])
+"""
+    A single step of the reconciliation plan.
+
+    phase - one of the PosixReconciler.PHASES
+    target - a string describing the POSIX object the step deals with
+    commands - list of commands to run or None if the commands can be revealed only after the previous steps
+    action - None if the commands shall be run as they are, or a function that performs the step and updates the
+        corefacility database (e.g., assigns the POSIX login to the newly created user)
+"""
+
+
+class ReconcilePlan:
+    """
+    An ordered list of steps that bring the operating system to the state defined by the corefacility database
+    """
+
+    def __init__(self):
+        """
+        Creates an empty plan
+        """
+        self.steps = list()
+
+    def add(self, phase, target, commands, action=None):
+        """
+        Appends a step to the plan
+
+        :param phase: one of the PosixReconciler.PHASES
+        :param target: a string describing the POSIX object the step deals with
+        :param commands: list of commands to run or None if they are revealed during the execution only
+        :param action: a function that performs the step or None if the commands shall be run as they are
+        """
+        self.steps.append(PlanStep(phase=phase, target=target, commands=commands, action=action))
+
+    @property
+    def size(self):
+        """
+        Total number of commands known at the planning stage
+        """
+        return sum(len(step.commands) for step in self.steps if step.commands is not None)
+
+    @property
+    def requires_next_pass(self):
+        """
+        True if the plan creates POSIX users or groups. Objects created by the plan are not taken into account
+        during the planning, so one more pass is required to finish their setup
+        """
+        return any(step.action is not None for step in self.steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+
+class PosixReconciler(AutoAdminObject):
+    """
+    Brings all POSIX users and groups to the state defined by the corefacility database.
+
+    The reconciliation consists of four stages. At first, the desired state is loaded by a few set-based database
+    queries. Next, the actual state is taken from a single snapshot of /etc/passwd, /etc/group and /etc/shadow.
+    Then, both states are compared and the plan is built. The plan contains only commands that change anything;
+    supplementary groups of all users are updated by the minimum number of commands. At last, the plan is applied.
+
+    Use the command_emulation attribute to build the plan without applying it.
+    """
+
+    USER_PHASE = "users"
+    LOCK_PHASE = "locks"
+    GROUP_PHASE = "groups"
+    LINK_PHASE = "links"
+    MEMBERSHIP_PHASE = "memberships"
+
+    PHASES = [USER_PHASE, LOCK_PHASE, GROUP_PHASE, LINK_PHASE, MEMBERSHIP_PHASE]
+    """ All phases in order of their execution """
+
+    MAX_PASSES = 2
+    """ Objects created during the first pass are completely set up during the second one """
+
+    def load_desired_state(self):
+        """
+        Loads the state defined by the corefacility database
+
+        :return: the DesiredState instance
+        """
+        users = [UserState(*user_info) for user_info in User.objects
+                 .filter(is_support=False)
+                 .order_by("id")
+                 .values_list("id", "unix_group", "home_dir", "is_locked")]
+        user_ids = {user.id for user in users}
+        group_users = dict()
+        for group_id, user_id in GroupUser.objects.values_list("group_id", "user_id"):
+            if user_id in user_ids:
+                group_users.setdefault(group_id, set()).add(user_id)
+        projects = list()
+        project_users = dict()
+        for project_id, unix_group, project_dir, root_group_id in Project.objects\
+                .order_by("id")\
+                .values_list("id", "unix_group", "project_dir", "root_group_id"):
+            projects.append(ProjectState(id=project_id, unix_group=unix_group, project_dir=project_dir))
+            project_users[project_id] = set(group_users.get(root_group_id, set()))
+        for project_id, group_id in Permission.objects\
+                .filter(access_level__alias__in=PosixUser.SUPPORTED_ACCESS_LEVELS)\
+                .values_list("project_id", "group_id"):
+            # The permission without a group is given to all users
+            project_users[project_id] |= user_ids if group_id is None else group_users.get(group_id, set())
+        memberships = {user.id: set() for user in users}
+        for project_id, project_user_ids in project_users.items():
+            for user_id in project_user_ids:
+                memberships[user_id].add(project_id)
+        return DesiredState(users=users, projects=projects, memberships=memberships)
+
+    def load_actual_state(self, desired_state):
+        """
+        Loads the state of the operating system
+
+        :param desired_state: the DesiredState instance. Symbolic links are read from home directories of the
+            corefacility users only
+        :return: the ActualState instance
+        """
+        links = dict()
+        for user in desired_state.users:
+            if not user.home_dir or not os.path.isdir(user.home_dir):
+                continue
+            user_links = dict()
+            with os.scandir(user.home_dir) as home_dir_entries:
+                for entry in home_dir_entries:
+                    if entry.is_symlink():
+                        user_links[entry.path] = os.readlink(entry.path)
+            links[user.home_dir] = user_links
+        return ActualState(
+            passwd=PosixUser.get_posix_user_database(),
+            group=PosixGroup.get_posix_group_database(),
+            shadow=PosixUser.get_posix_shadow_database(),
+            links=links,
+        )
+
+    def get_plan(self, desired_state=None, actual_state=None):
+        """
+        Compares the desired state and the actual state and builds the plan
+
+        :param desired_state: the DesiredState instance or None to load it from the database
+        :param actual_state: the ActualState instance or None to load it from the operating system
+        :return: the ReconcilePlan instance
+        """
+        if desired_state is None:
+            desired_state = self.load_desired_state()
+        if actual_state is None:
+            actual_state = self.load_actual_state(desired_state)
+        plan = ReconcilePlan()
+        created_users = self._plan_users(plan, desired_state, actual_state)
+        users = [user for user in desired_state.users if user.id not in created_users]
+        self._plan_locks(plan, users, actual_state)
+        created_groups = self._plan_groups(plan, desired_state, actual_state)
+        projects = {project.id: project for project in desired_state.projects
+                    if project.unix_group is not None and project.project_dir is not None}
+        self._plan_links(plan, users, projects, desired_state, actual_state)
+        self._plan_memberships(plan, users, projects, created_groups, desired_state, actual_state)
+        return plan
+
+    def apply(self, plan):
+        """
+        Applies the plan. A step that failed is reported to the log and the rest of steps are still applied
+
+        :param plan: the ReconcilePlan instance
+        :return: number of failed steps
+        """
+        failed_steps = 0
+        for step in plan:
+            try:
+                if step.action is not None:
+                    step.action()
+                else:
+                    for command in step.commands:
+                        self.run(command)
+            except (PosixCommandFailedException, RetryCommandAfterException) as error:
+                failed_steps += 1
+                self.log.add_record(LogLevel.WARNING, "Failed to reconcile %s: %s" % (step.target, error))
+        return failed_steps
+
+    def synchronize(self):
+        """
+        Builds the plan and applies it. The plan is built once again when the previous one has created new POSIX
+        users or groups
+
+        :return: total number of failed steps
+        """
+        failed_steps = 0
+        for _ in range(self.MAX_PASSES):
+            plan = self.get_plan()
+            failed_steps += self.apply(plan)
+            if not plan.requires_next_pass:
+                break
+        return failed_steps
+
+    def _plan_users(self, plan, desired_state, actual_state):
+        """
+        Plans creation of POSIX users that are absent or which home directories were lost
+
+        :param plan: the ReconcilePlan to fill in
+        :param desired_state: the DesiredState instance
+        :param actual_state: the ActualState instance
+        :return: set of IDs of all users to be created
+        """
+        created_users = set()
+        for user in desired_state.users:
+            if user.unix_group is not None and user.unix_group in actual_state.passwd.by_login:
+                if user.home_dir in actual_state.links:
+                    continue
+                removed_login = user.unix_group
+            else:
+                removed_login = None
+            created_users.add(user.id)
+            self._add_creation_step(plan, self.USER_PHASE, PosixUser, user.id, user.unix_group,
+                                    None if removed_login is None else ("userdel", "-rf", removed_login))
+        return created_users
+
+    def _plan_locks(self, plan, users, actual_state):
+        """
+        Plans locking and unlocking of POSIX users
+
+        :param plan: the ReconcilePlan to fill in
+        :param users: list of UserState for all users that already exist
+        :param actual_state: the ActualState instance
+        """
+        for user in users:
+            if actual_state.shadow.available:
+                lock_status = actual_state.shadow.get_lock_status(user.unix_group)
+            else:
+                lock_status = PosixUser(None, login=user.unix_group, home_dir=user.home_dir).get_lock_status()
+            # The account without password is locked by the operating system whatever its corefacility status is
+            if lock_status == ShadowDatabase.PASSWORD and user.is_locked:
+                plan.add(self.LOCK_PHASE, user.unix_group, [("passwd", "-l", user.unix_group)])
+            if lock_status == ShadowDatabase.LOCKED and not user.is_locked:
+                plan.add(self.LOCK_PHASE, user.unix_group, [("passwd", "-u", user.unix_group)])
+
+    def _plan_groups(self, plan, desired_state, actual_state):
+        """
+        Plans creation of POSIX groups that are absent or which project directories were lost
+
+        :param plan: the ReconcilePlan to fill in
+        :param desired_state: the DesiredState instance
+        :param actual_state: the ActualState instance
+        :return: set of names of existent POSIX groups that will be removed and created again
+        """
+        recreated_groups = set()
+        for project in desired_state.projects:
+            if project.unix_group is not None and project.unix_group in actual_state.group.by_name:
+                if project.project_dir is not None and os.path.isdir(project.project_dir):
+                    continue
+                recreated_groups.add(project.unix_group)
+                removed_group = ("groupdel", project.unix_group)
+            else:
+                removed_group = None
+            self._add_creation_step(plan, self.GROUP_PHASE, PosixGroup, project.id, project.unix_group,
+                                    removed_group)
+        return recreated_groups
+
+    def _plan_links(self, plan, users, projects, desired_state, actual_state):
+        """
+        Plans removal of all wrong links from home directories and creation of links to all project directories
+        the user has access to
+
+        :param plan: the ReconcilePlan to fill in
+        :param users: list of UserState for all users that already exist
+        :param projects: project ID => ProjectState for all projects which POSIX groups are known
+        :param desired_state: the DesiredState instance
+        :param actual_state: the ActualState instance
+        """
+        for user in users:
+            desired_links = {projects[project_id].project_dir: projects[project_id].unix_group
+                             for project_id in desired_state.memberships[user.id] if project_id in projects}
+            removed_links = list()
+            for link, target in sorted(actual_state.links[user.home_dir].items()):
+                if target in desired_links:
+                    del desired_links[target]
+                else:
+                    removed_links.append(link)
+            commands = list()
+            if len(removed_links) > 0:
+                commands.append(("rm",) + tuple(removed_links))
+            for project_dir, unix_group in sorted(desired_links.items(), key=lambda item: item[1]):
+                commands.append(("ln", "-s", project_dir, os.path.join(user.home_dir, unix_group)))
+            if len(commands) > 0:
+                plan.add(self.LINK_PHASE, user.unix_group, commands)
+
+    def _plan_memberships(self, plan, users, projects, recreated_groups, desired_state, actual_state):
+        """
+        Plans changes of supplementary groups for all users at once
+
+        :param plan: the ReconcilePlan to fill in
+        :param users: list of UserState for all users that already exist
+        :param projects: project ID => ProjectState for all projects which POSIX groups are known
+        :param recreated_groups: names of POSIX groups that will be removed and created again. Their members are
+            set up during the group creation, so such groups are not touched
+        :param desired_state: the DesiredState instance
+        :param actual_state: the ActualState instance
+        """
+        existent_groups = set(actual_state.group.by_name) - recreated_groups
+        desired_groups = dict()
+        for user in users:
+            desired = {projects[project_id].unix_group
+                       for project_id in desired_state.memberships[user.id] if project_id in projects}
+            actual = actual_state.group.by_member.get(user.unix_group, set())
+            desired_groups[user.unix_group] = (desired & existent_groups) | (actual & recreated_groups)
+        for command in actual_state.group.get_membership_commands(desired_groups):
+            plan.add(self.MEMBERSHIP_PHASE, command[-1], [command])
+
+    def _add_creation_step(self, plan, phase, posix_class, entity_id, name, removal_command):
+        """
+        Adds a step that creates the POSIX user or the POSIX group. The creation also assigns the POSIX name to the
+        corefacility entity, so it is delegated to the PosixUser or PosixGroup object.
+
+        :param plan: the ReconcilePlan to fill in
+        :param phase: the phase of the step
+        :param posix_class: either PosixUser or PosixGroup
+        :param entity_id: ID of the corefacility user or project
+        :param name: the POSIX name assigned to the entity or None if no name was assigned
+        :param removal_command: the command that removes the broken POSIX object before creation or None
+        """
+        def create(command_emulation):
+            posix_object = posix_class(entity_id)
+            posix_object.command_emulation = command_emulation
+            posix_object.log = self.log
+            if removal_command is not None:
+                posix_object.run(removal_command)
+            posix_object.create()
+            return posix_object
+
+        target = name if name is not None else "%s %d" % (posix_class.RESOURCE_TYPE, entity_id)
+        try:
+            commands = list(create(True)._command_buffer)
+        except RetryCommandAfterException:
+            # The object depends on POSIX objects created during the previous steps
+            commands = None
+        plan.add(phase, target, commands, lambda: create(self.command_emulation))
@@ -1,4 +1,3 @@
-import csv
 import os
 import re
 import subprocess
@@ -10,6 +9,7 @@ from ....entity.entity_sets.user_set import UserSet
 from ....entity.providers.model_providers.user_provider import UserProvider
 from ....exceptions.entity_exceptions import ConfigurationProfileException, RetryCommandAfterException
 from .auto_admin_object import AutoAdminObject
+from .posix_database import PasswdDatabase, ShadowDatabase
 
 
 class PosixUser(AutoAdminObject):
@@ -29,6 +29,9 @@ class PosixUser(AutoAdminObject):
     POSIX_USER_FILE = "/etc/passwd"
     """ Location of the file with POSIX users """
 
+    POSIX_SHADOW_FILE = "/etc/shadow"
+    """ Location of the file with POSIX user passwords """
+
     HOME_DIR_POSITION = 5
     """ Position of the home directory within the /etc/passwd """
 
@@ -44,6 +47,13 @@ class PosixUser(AutoAdminObject):
         project directory.
     """
 
+    IDEMPOTENT_METHODS = {"update_login", "update_lock", "update_supplementary_groups"}
+
+    RESOURCE_TYPE = "user"
+
+    USER_ONLY_METHODS = {"create", "update_login", "set_password", "update_lock"}
+    """ Methods that don't change project groups """
+
     login = None
     """ The POSIX login for the user """
 
@@ -56,6 +66,27 @@ class PosixUser(AutoAdminObject):
     entity = None
     """ The User entity associated with a given POSIX user or None if no idea or no user is associated """
 
+    _static_objects_source = None
+    """ The database snapshot and its version from which the static objects were built """
+
+    @classmethod
+    def get_posix_user_database(cls):
+        """
+        Returns the indexed snapshot of the /etc/passwd file shared among all auto admin objects
+
+        :return: the PasswdDatabase instance which is up to date
+        """
+        return PasswdDatabase.get_instance(cls.POSIX_USER_FILE)
+
+    @classmethod
+    def get_posix_shadow_database(cls):
+        """
+        Returns the indexed snapshot of the /etc/shadow file shared among all auto admin objects
+
+        :return: the ShadowDatabase instance which is up to date
+        """
+        return ShadowDatabase.get_instance(cls.POSIX_SHADOW_FILE)
+
     @classmethod
     def get_posix_users(cls):
         """
@@ -63,20 +94,43 @@ class PosixUser(AutoAdminObject):
         operating system).
 
         Use this method to update the object list. Primarily, the method should be run at the beginning of the
-        auto admin cycle
-        """
-        cls._static_objects = []
-        with open(cls.POSIX_USER_FILE, 'r') as posix_users_file:
-            posix_users_reader = csv.reader(posix_users_file, delimiter=':')
-            for posix_user_info in posix_users_reader:
-                posix_user = cls(None,
-                                 login=posix_user_info[cls.LOGIN_POSITION],
-                                 home_dir=posix_user_info[cls.HOME_DIR_POSITION]
-                                 )
-                posix_user.gid = posix_user_info[cls.GID_POSITION]
-                cls._static_objects.append(posix_user)
+        auto admin cycle. The list is rebuilt only when the /etc/passwd file has been changed
+        """
+        database = cls.get_posix_user_database()
+        if cls._static_objects is None or cls._static_objects_source != (database, database.version):
+            cls._static_objects = [cls._create_from_entry(entry) for entry in database.entries]
+            cls._static_objects_source = (database, database.version)
         return cls._static_objects
 
+    @classmethod
+    def get_resources(cls, action_arguments, method_name, method_arguments):
+        """
+        Reveals POSIX objects touched by the POSIX request.
+
+        :param action_arguments: serialized arguments of the AutoAdminObject constructor
+        :param method_name: name of the method to call
+        :param method_arguments: serialized arguments of the method
+        :return: the user itself and all groups when the method changes supplementary groups
+        """
+        user_resource = cls._get_entity_resource(action_arguments)
+        if user_resource is None:
+            return None
+        if method_name in cls.USER_ONLY_METHODS:
+            return {user_resource}
+        return {user_resource, "group:*"}
+
+    @classmethod
+    def _create_from_entry(cls, entry):
+        """
+        Creates the PosixUser object from the /etc/passwd entry
+
+        :param entry: the PasswdEntry instance
+        :return: the PosixUser instance
+        """
+        posix_user = cls(None, login=entry.login, home_dir=entry.home_dir)
+        posix_user.gid = str(entry.gid)
+        return posix_user
+
     def __init__(self, entity, login=None, home_dir=None):
         """
         Creates new PosixUser object
@@ -141,12 +195,10 @@ class PosixUser(AutoAdminObject):
         """
         if self.login is None or self.home_dir is None:
             raise RetryCommandAfterException()
-        available_posix_user = None
-        available_posix_users = filter(lambda user: user.login == self.login, self.get_posix_users())
-        for user in available_posix_users:
-            available_posix_user = user
-            break
-        return available_posix_user
+        entry = self.get_posix_user_database().by_login.get(self.login)
+        if entry is None:
+            return None
+        return self._create_from_entry(entry)
 
     def update_login(self):
         """
@@ -207,15 +259,7 @@ class PosixUser(AutoAdminObject):
         if not available_posix_user:
             self.create()
         desired_lock_status = self.entity.is_locked
-        actual_lock_status = subprocess.run(
-            ("passwd", "-S", self.login),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-        )
-        actual_lock_status = actual_lock_status \
-            .stdout \
-            .decode('utf-8') \
-            .split()[1]
+        actual_lock_status = self.get_lock_status()
         if actual_lock_status.upper() == 'NP':  # When the password is not set, the POSIX accounts can't
                                         # be distinguished by
                                         # 'locked' and 'non-locked', i.e.: all accounts are locked on the level of the
@@ -233,56 +277,97 @@ class PosixUser(AutoAdminObject):
             output = self.run(('passwd', '-u', self.login))
         return output
 
+    def get_lock_status(self):
+        """
+        Reveals whether the user account is locked.
+
+        The status is taken from the /etc/shadow snapshot. The 'passwd -S' command is used only when the snapshot
+        is not available (e.g., the process has no rights to read /etc/shadow) or the user is not listed there.
+
+        :return: the status in the same form as given by the 'passwd -S' command: 'L', 'NP' or 'P'
+        """
+        shadow_database = self.get_posix_shadow_database()
+        lock_status = None
+        if shadow_database.available:
+            lock_status = shadow_database.get_lock_status(self.login)
+        if lock_status is None:
+            lock_status = subprocess.run(
+                ("passwd", "-S", self.login),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+            lock_status = lock_status \
+                .stdout \
+                .decode('utf-8') \
+                .split()[1]
+        return lock_status
+
     def update_supplementary_groups(self, exclude=None):
         """
         Updates all supplementary groups for the user, according to what project it belongs to.
 
         :param exclude: name of the POSIX group to exclude from the group list or None, if don't do this.
         """
+        from .posix_group import PosixGroup
         output = ""
         available_posix_user = self.check_user_for_update()
         if not available_posix_user:
             self.create()
+        project_dictionary = self.get_supplementary_groups(exclude)
+        output += self.update_project_links(project_dictionary)
+        group_database = PosixGroup.get_posix_group_database()
+        for command in group_database.get_membership_commands({self.login: set(project_dictionary)}):
+            output += self.run(command)
+        return output
+
+    def get_supplementary_groups(self, exclude=None):
+        """
+        Calculates all supplementary groups the user shall belong to, according to what project it belongs to.
 
+        :param exclude: name of the POSIX group to exclude from the group list or None, if don't do this.
+        :return: a dictionary POSIX group name => the related project
+        """
         from ru.ihna.kozhukhov.core_application.entity.project import ProjectSet
-        posix_group_list = set()
         project_set = ProjectSet()
         project_set.user = self.entity
         project_dictionary = dict()
         for project in project_set:
             if project.unix_group and \
                     project.get_proper_access_level(project.user_access_level) in self.SUPPORTED_ACCESS_LEVELS:
-                posix_group_list.add(project.unix_group)
                 project_dictionary[project.unix_group] = project
-        if exclude is not None and exclude in posix_group_list:
-            posix_group_list.remove(exclude)
+        if exclude is not None and exclude in project_dictionary:
             del project_dictionary[exclude]
+        return project_dictionary
 
-        if self.home_dir:
-            for filename in os.listdir(self.home_dir):
-                filename = os.path.join(self.home_dir, filename)
-                if not os.path.islink(filename):
-                    continue
-                target = os.readlink(filename)
-                related_unix_group = None
-                for unix_group, project in project_dictionary.items():
-                    if project.project_dir == target:
-                        related_unix_group = unix_group
-                        break
-                else:
-                    output += self.run(("rm", filename))
-                if related_unix_group:
-                    del project_dictionary[related_unix_group]
-            for project in project_dictionary.values():
-                project_dir_link = os.path.join(self.home_dir, project.unix_group)
-                output += self.run(("ln", "-s", project.project_dir, project_dir_link))
-
-        output += self.run(
-            (
-                "usermod", "-G", ",".join(posix_group_list), self.login,
-            )
-        )
+    def update_project_links(self, project_dictionary):
+        """
+        Creates links to all project directories the user has access to and removes all other links from the user's
+        home directory
 
+        :param project_dictionary: a dictionary POSIX group name => project, as returned by get_supplementary_groups
+        :return: the command output
+        """
+        output = ""
+        if not self.home_dir:
+            return output
+        project_dictionary = dict(project_dictionary)
+        for filename in os.listdir(self.home_dir):
+            filename = os.path.join(self.home_dir, filename)
+            if not os.path.islink(filename):
+                continue
+            target = os.readlink(filename)
+            related_unix_group = None
+            for unix_group, project in project_dictionary.items():
+                if project.project_dir == target:
+                    related_unix_group = unix_group
+                    break
+            else:
+                output += self.run(("rm", filename))
+            if related_unix_group:
+                del project_dictionary[related_unix_group]
+        for project in project_dictionary.values():
+            project_dir_link = os.path.join(self.home_dir, project.unix_group)
+            output += self.run(("ln", "-s", project.project_dir, project_dir_link))
         return output
 
     def delete(self):
@@ -297,9 +382,9 @@ class PosixUser(AutoAdminObject):
             if available_user is not None:
                 primary_gid = available_user.gid
                 self.run(('userdel', '-rf', available_user.login))
-                posix_groups = filter(lambda group: group.gid == primary_gid, PosixGroup.get_posix_groups())
-                for group in posix_groups:
-                    self.run(('groupdel', group.name))
+                primary_group = PosixGroup.get_posix_group_database().by_gid.get(int(primary_gid))
+                if primary_group is not None:
+                    self.run(('groupdel', primary_group.name))
         self._delete_user_from_database()
 
     def __str__(self):
@@ -318,7 +403,7 @@ class PosixUser(AutoAdminObject):
         """
         if len(login) > self.MAX_LOGIN_SIZE:
             login = login[:self.MAX_LOGIN_SIZE]
-        available_logins = [posix_user.login for posix_user in self.get_posix_users()]
+        available_logins = self.get_posix_user_database().by_login
         trials = 0
         while login in available_logins:
             enumerated_login_parts = self.ENUMERATED_USER_TEMPLATE.match(login)
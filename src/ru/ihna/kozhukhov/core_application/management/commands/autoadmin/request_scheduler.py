@@ -0,0 +1,116 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class RequestScheduler:
+    """
+    Executes POSIX requests concurrently keeping the order of requests that touch the same POSIX objects.
+
+    Each request is provided by a set of resources it touches. A resource is a string '<type>:<id>' (e.g., 'user:12'
+    or 'group:3') or a wildcard '<type>:*' that touches all resources of a given type. Requests which resource sets
+    intersect are executed in order of their appearance while all other requests are executed on a bounded thread
+    pool. A request with unknown resources (None) is a barrier: it waits for all previous requests and all next
+    requests wait for it.
+    """
+
+    WILDCARD = "*"
+
+    def __init__(self, max_workers):
+        """
+        Initializes the scheduler
+
+        :param max_workers: maximum number of requests executed at the same time
+        """
+        self.max_workers = max_workers
+
+    @classmethod
+    def get_dependencies(cls, resource_list):
+        """
+        Builds the dependency graph
+
+        :param resource_list: list of resource sets, one set (or None) per request
+        :return: list of dependencies: indices of previous requests that shall be finished before a given request
+            starts. Only direct dependencies are given, the rest are implied by transitivity
+        """
+        dependencies = list()
+        last_barrier = None
+        since_barrier = list()
+        last_resource = dict()
+        last_wildcard = dict()
+        since_wildcard = dict()
+        for index, resources in enumerate(resource_list):
+            request_dependencies = set()
+            if resources is None:
+                request_dependencies.update(since_barrier)
+                if last_barrier is not None:
+                    request_dependencies.add(last_barrier)
+                last_barrier = index
+                since_barrier = list()
+                last_resource = dict()
+                last_wildcard = dict()
+                since_wildcard = dict()
+                dependencies.append(request_dependencies)
+                continue
+            if last_barrier is not None:
+                request_dependencies.add(last_barrier)
+            for resource in sorted(resources):
+                resource_type, resource_id = resource.split(":", 1)
+                if resource_id == cls.WILDCARD:
+                    request_dependencies.update(since_wildcard.get(resource_type, []))
+                    if resource_type in last_wildcard:
+                        request_dependencies.add(last_wildcard[resource_type])
+                else:
+                    if resource in last_resource:
+                        request_dependencies.add(last_resource[resource])
+                    if resource_type in last_wildcard:
+                        request_dependencies.add(last_wildcard[resource_type])
+            for resource in resources:
+                resource_type, resource_id = resource.split(":", 1)
+                if resource_id == cls.WILDCARD:
+                    last_wildcard[resource_type] = index
+                    since_wildcard[resource_type] = list()
+                else:
+                    last_resource[resource] = index
+                    since_wildcard.setdefault(resource_type, list()).append(index)
+            since_barrier.append(index)
+            dependencies.append(request_dependencies)
+        return dependencies
+
+    def run(self, requests, resource_list, execute, is_terminated=None):
+        """
+        Executes all requests
+
+        :param requests: list of requests in order of their initialization
+        :param resource_list: list of resource sets, one set (or None) per request
+        :param execute: a function that executes a single request. The function is called from the worker thread
+        :param is_terminated: a function that returns True when no new request shall be started or None if the
+            execution can't be terminated
+        :return: list of values returned by the execute function in the same order as requests. The value is None
+            for requests that were not executed due to termination
+        """
+        dependencies = self.get_dependencies(resource_list)
+        dependents = [list() for _ in requests]
+        for index, request_dependencies in enumerate(dependencies):
+            for dependency in request_dependencies:
+                dependents[dependency].append(index)
+        remaining_dependencies = [len(request_dependencies) for request_dependencies in dependencies]
+        ready = [index for index, count in enumerate(remaining_dependencies) if count == 0]
+        heapq.heapify(ready)
+        results = [None] * len(requests)
+        running = dict()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="autoadmin") as executor:
+            while ready or running:
+                while ready and len(running) < self.max_workers and not (is_terminated and is_terminated()):
+                    index = heapq.heappop(ready)
+                    running[executor.submit(execute, requests[index])] = index
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    results[index] = future.result()
+                    for dependent in dependents[index]:
+                        remaining_dependencies[dependent] -= 1
+                        if remaining_dependencies[dependent] == 0:
+                            heapq.heappush(ready, dependent)
+        return results
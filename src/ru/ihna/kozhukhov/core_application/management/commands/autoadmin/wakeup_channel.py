@@ -0,0 +1,198 @@
+import logging
+import os
+import select
+import socket
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+
+class WakeupChannel:
+    """
+    Wakes the autoadmin daemon up when a new POSIX request has been added.
+
+    The base class doesn't notify anybody: the daemon just sleeps for the given time and next polls the database.
+    Use the get_wakeup_channel() function to select the channel that is suitable for the current configuration.
+    """
+
+    def open(self):
+        """
+        Starts listening to the notifications. Called by the autoadmin daemon once before the loop
+        """
+        pass
+
+    def wait(self, timeout):
+        """
+        Waits until the notification arrives or the timeout expires
+
+        :param timeout: maximum waiting time, in seconds
+        :return: True if the notification has been arrived, False if the timeout has been expired
+        """
+        if timeout > 0:
+            time.sleep(timeout)
+        return False
+
+    def close(self):
+        """
+        Stops listening to the notifications
+        """
+        pass
+
+    def notify(self):
+        """
+        Notifies the autoadmin daemon that the new POSIX request has been added. Called by the Web server process
+        """
+        pass
+
+
+class PostgresWakeupChannel(WakeupChannel):
+    """
+    Uses the PostgreSQL LISTEN/NOTIFY mechanism. The notification is delivered to the daemon when the transaction
+    that added the POSIX request is committed.
+    """
+
+    CHANNEL_NAME = "corefacility_autoadmin"
+
+    _listening_connection = None
+    """ The DB-API connection which LISTEN command was sent to """
+
+    def open(self):
+        self._listen()
+
+    def wait(self, timeout):
+        raw_connection = self._listen()
+        if raw_connection is None or not hasattr(raw_connection, "poll"):
+            return super().wait(timeout)
+        raw_connection.poll()
+        if not raw_connection.notifies:
+            ready, _, _ = select.select([raw_connection], [], [], max(timeout, 0.0))
+            if not ready:
+                return False
+            raw_connection.poll()
+        is_notified = len(raw_connection.notifies) > 0
+        raw_connection.notifies.clear()
+        return is_notified
+
+    def close(self):
+        self._listening_connection = None
+
+    def notify(self):
+        with connection.cursor() as cursor:
+            cursor.execute("NOTIFY %s" % self.CHANNEL_NAME)
+
+    def _listen(self):
+        """
+        Sends the LISTEN command unless it has already been sent to the current database connection. Django may
+        reconnect to the database, so the command shall be repeated for each new connection.
+
+        :return: the DB-API connection
+        """
+        connection.ensure_connection()
+        raw_connection = connection.connection
+        if raw_connection is not self._listening_connection:
+            with connection.cursor() as cursor:
+                cursor.execute("LISTEN %s" % self.CHANNEL_NAME)
+            self._listening_connection = raw_connection
+        return raw_connection
+
+
+class SocketWakeupChannel(WakeupChannel):
+    """
+    Uses the UNIX datagram socket. The daemon binds the socket while the Web server sends an empty datagram to it
+    after the transaction that added the POSIX request is committed. Any local process may write to the socket:
+    this is safe because a spurious notification causes the daemon to look at the database one more time.
+    """
+
+    SOCKET_PERMISSIONS = 0o666
+
+    MAX_DATAGRAMS = 1024
+    """ Maximum number of notifications read at once """
+
+    logger = logging.getLogger("django.corefacility.log")
+
+    _socket = None
+
+    def __init__(self, socket_path):
+        """
+        Initializes the channel
+
+        :param socket_path: path to the UNIX socket file
+        """
+        self.socket_path = socket_path
+
+    def open(self):
+        self.close()
+        try:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.bind(self.socket_path)
+            os.chmod(self.socket_path, self.SOCKET_PERMISSIONS)
+            self._socket.setblocking(False)
+        except OSError as error:
+            self.logger.warning("Failed to open the autoadmin wakeup socket %s: %s. The database will be polled." %
+                                (self.socket_path, error))
+            self.close()
+
+    def wait(self, timeout):
+        if self._socket is None:
+            return super().wait(timeout)
+        ready, _, _ = select.select([self._socket], [], [], max(timeout, 0.0))
+        if not ready:
+            return False
+        for _ in range(self.MAX_DATAGRAMS):
+            try:
+                self._socket.recv(1)
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def notify(self):
+        transaction.on_commit(self._send)
+
+    def _send(self):
+        """
+        Sends the notification datagram. Nothing happens when the daemon is not running
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as client_socket:
+                client_socket.setblocking(False)
+                client_socket.sendto(b"\0", self.socket_path)
+        except OSError:
+            pass
+
+
+def get_wakeup_channel():
+    """
+    Selects the wakeup channel suitable for the current configuration: LISTEN/NOTIFY for PostgreSQL, the UNIX socket
+    given by the CORE_AUTOADMIN_WAKEUP_SOCKET setting for all other databases, polling when the setting is empty.
+
+    :return: the WakeupChannel instance
+    """
+    if connection.vendor == "postgresql":
+        return PostgresWakeupChannel()
+    socket_path = getattr(settings, "CORE_AUTOADMIN_WAKEUP_SOCKET", "")
+    if socket_path and hasattr(socket, "AF_UNIX"):
+        return SocketWakeupChannel(socket_path)
+    return WakeupChannel()
+
+
+def notify_autoadmin():
+    """
+    Wakes the autoadmin daemon up. Failures are ignored since the daemon will find the request during the next
+    poll anyway
+    """
+    try:
+        get_wakeup_channel().notify()
+    except Exception as error:
+        logging.getLogger("django.corefacility.log").warning("Failed to wake the autoadmin up: %s" % error)
@@ -1,19 +1,20 @@
-import json
 import re
-import subprocess
+import signal
 import sys
 from datetime import datetime, timedelta
-from time import sleep
+from time import sleep, monotonic
 from logging import getLogger, ERROR
 
 import psutil
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandParser
 from django.utils.timezone import make_aware
 from django.utils.translation import gettext_lazy as _
 
-from ru.ihna.kozhukhov.core_application.models import HealthCheck
+from ru.ihna.kozhukhov.core_application.models import HealthCheck, HealthCheckRollup
+from ru.ihna.kozhukhov.core_application.sensors import get_sensor_reader, ProcessTracker
 from ru.ihna.kozhukhov.core_application.utils import mail, human_readable_memory, MEGABYTE, GIGABYTE
+from ru.ihna.kozhukhov.core_application.management.command_options import positive_integer
 
 
 class Command(BaseCommand):
@@ -22,11 +23,28 @@ class Command(BaseCommand):
     """
 
     MONITORING_INTERVAL = 60
-    """ The timestamp in seconds """
+    """ The timestamp in seconds. Used when the CORE_HEALTH_CHECK_INTERVAL setting is absent """
 
-    HEALTH_REMOVE_PERIOD = 60
+    BATCH_SIZE = 1
     """
-    Maximum number of timestamps required to be elapsed before the system starts recycling of deprecated timestamps 
+    Number of timestamps accumulated in memory before they are saved to the database. Used when the
+    CORE_HEALTH_CHECK_BATCH_SIZE setting is absent
+    """
+
+    RECYCLE_PERIOD = timedelta(hours=1)
+    """
+    Minimum amount of time between two consecutive recyclings of deprecated timestamps
+    """
+
+    RECYCLE_CHUNK = 1000
+    """
+    Maximum number of timestamps removed by a single query. Used when the CORE_HEALTH_CHECK_RECYCLE_CHUNK setting is
+    absent
+    """
+
+    RECYCLE_TIME = 5.0
+    """
+    Maximum duration of a single recycling in seconds. Used when the CORE_HEALTH_CHECK_RECYCLE_TIME setting is absent
     """
 
     VIEW_INTERVAL = timedelta(weeks=1)
@@ -40,7 +58,7 @@ class Command(BaseCommand):
         re.compile(r'^(?P<filesystem>[^#\s]+)\s+(?P<mount_point>[^#\s]+)\s+(?P<type>[^#\s]+)\s+(?P<options>[^#\s]+)\s+'
                    r'(?P<dump>[^#\s]+)\s+(?P<pass>[^#\s]+)(?:\s*#.*)?$')
 
-    TEMPERATURE_KEY = re.compile(r'^temp\d_input$')
+    TEMPERATURE_KEY = re.compile(r'^temp\d+_input$')
     """
     Required for interactions between lm-sensors and corefacility
     """
@@ -66,8 +84,11 @@ class Command(BaseCommand):
     __mount_points = None
     __total_swap = None
     __engaged_swap = None
+    __sensor_reader = None
+    __process_tracker = None
 
     __last_email_date = None
+    __rollup_late_period = timedelta(0)
     __logger = getLogger("django.corefacility.log")
 
     @classmethod
@@ -92,19 +113,75 @@ class Command(BaseCommand):
 
         return mount_points
 
-    def handle(self, *args, **kwargs):
+    @classmethod
+    def get_monitoring_interval(cls):
+        """
+        Reveals the configured interval between two consecutive timestamps
+
+        :return: the interval in seconds
+        """
+        return getattr(settings, "CORE_HEALTH_CHECK_INTERVAL", cls.MONITORING_INTERVAL)
+
+    @classmethod
+    def get_batch_size(cls):
+        """
+        Reveals the configured number of timestamps saved to the database at once
+
+        :return: number of timestamps
+        """
+        return getattr(settings, "CORE_HEALTH_CHECK_BATCH_SIZE", cls.BATCH_SIZE)
+
+    @classmethod
+    def create_process_tracker(cls):
+        """
+        Creates the tracker for resources used by the corefacility processes
+
+        :return: the ProcessTracker instance
+        """
+        return ProcessTracker(getattr(settings, "CORE_PROCESS_PID_FILES", {}))
+
+    def add_arguments(self, parser: CommandParser):
+        """
+        Adds arguments to the command line parser
+
+        :param parser: a command line parser to which the argument shall be added
+        """
+        parser.add_argument("--interval", type=positive_integer,
+                            help="Number of seconds between two consecutive timestamps (default: "
+                                 "CORE_HEALTH_CHECK_INTERVAL setting)")
+        parser.add_argument("--batch-size", type=positive_integer,
+                            help="Number of timestamps saved to the database at once (default: "
+                                 "CORE_HEALTH_CHECK_BATCH_SIZE setting)")
+
+    def handle(self, *args, interval=None, batch_size=None, **kwargs):
         """
         The infinite loop for the health status monitoring.
 
         :param args: command-line arguments
+        :param interval: number of seconds between two consecutive timestamps or None to use the settings
+        :param batch_size: number of timestamps saved to the database at once or None to use the settings
         :param kwargs: command-line options
         """
+        if interval is None:
+            interval = self.get_monitoring_interval()
+        if batch_size is None:
+            batch_size = self.get_batch_size()
+        pending_health_checks = list()
+        # The timestamp may be saved to the database after its rollup interval has been rolled up
+        self.__rollup_late_period = timedelta(seconds=interval * batch_size)
+        # The corefacility daemon stops, reloads and restarts the command by SIGTERM
+        previous_handler = signal.signal(signal.SIGTERM, self.interrupt)
         try:
             self.__mount_points = self.read_mount_points()
-            iteration_number = 0
+            self.__sensor_reader = get_sensor_reader()
+            self.__process_tracker = self.create_process_tracker()
+            last_recycle_time = None
+            next_iteration_time = monotonic()
             while True:
                 health_check = self._detect_health_check()
-                health_check.save()
+                pending_health_checks.append(health_check)
+                if len(pending_health_checks) >= batch_size:
+                    self._save_health_checks(pending_health_checks)
                 criticals = self._detect_criticals(health_check)
                 is_critical = False
                 for key, values in criticals.items():
@@ -125,14 +202,43 @@ class Command(BaseCommand):
                     self.__last_email_date = health_check.date
                 del health_check
                 del criticals
-                if iteration_number % self.HEALTH_REMOVE_PERIOD == 0:
+                if last_recycle_time is None or \
+                        monotonic() - last_recycle_time >= self.RECYCLE_PERIOD.total_seconds():
                     self._recycle_old_timestamps()
-                sleep(self.MONITORING_INTERVAL)
-                iteration_number += 1
+                    last_recycle_time = monotonic()
+                next_iteration_time += interval
+                sleep(max(next_iteration_time - monotonic(), 0.0))
         except KeyboardInterrupt:
             print("The termination signal received.")
         except Exception as error:
             self.__logger.log(ERROR, "corefacility health check error: " + str(error), exc_info=sys.exc_info())
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            try:
+                self._save_health_checks(pending_health_checks)
+            except Exception as error:
+                self.__logger.log(ERROR, "corefacility health check error: " + str(error), exc_info=sys.exc_info())
+
+    def interrupt(self, signal_number, execution_frame):
+        """
+        Interrupts the monitoring loop when the termination signal is received
+
+        :param signal_number: number of the received signal
+        :param execution_frame: the frame that was executed when the signal was received
+        """
+        raise KeyboardInterrupt()
+
+    def _save_health_checks(self, health_checks):
+        """
+        Saves all accumulated timestamps to the database by a single query and updates the rollups
+
+        :param health_checks: list of the timestamps. The list will be cleared after the timestamps are saved
+        """
+        if len(health_checks) == 0:
+            return
+        HealthCheck.objects.bulk_create(health_checks)
+        health_checks.clear()
+        self._update_rollups()
 
     def _detect_health_check(self):
         """
@@ -153,8 +259,12 @@ class Command(BaseCommand):
         net_io_counters = psutil.net_io_counters(pernic=False, nowrap=True)
         health_check.bytes_sent = net_io_counters.bytes_sent
         health_check.bytes_received = net_io_counters.bytes_recv
-        sensors_info = subprocess.run(('sensors', '-j'), stderr=subprocess.STDOUT, stdout=subprocess.PIPE)
-        health_check.temperature = json.loads(sensors_info.stdout)
+        if self.__sensor_reader is None:
+            self.__sensor_reader = get_sensor_reader()
+        health_check.temperature = self.__sensor_reader.read()
+        if self.__process_tracker is None:
+            self.__process_tracker = self.create_process_tracker()
+        health_check.processes = self.__process_tracker.read()
         return health_check
 
     def _detect_criticals(self, health_check):
@@ -212,10 +322,14 @@ class Command(BaseCommand):
                     continue
                 for child_key, child_value in parent_value.items():
                     if self.TEMPERATURE_KEY.match(child_key) is not None:
+                        critical_value = self.CRITICAL_VALUES['temperature']
+                        sensor_critical_value = parent_value.get(child_key.replace("_input", "_crit"))
+                        if isinstance(sensor_critical_value, (int, float)) and sensor_critical_value > 0:
+                            critical_value = min(critical_value, sensor_critical_value)
                         criticals["%s %s" % (_("Temperature for"), parent_key)] = {
                             'actual_value': "%1.1f \u00b0C" % child_value,
-                            'critical_value': "%1.1f \u00b0C" % self.CRITICAL_VALUES['temperature'],
-                            'is_critical': child_value > self.CRITICAL_VALUES['temperature'],
+                            'critical_value': "%1.1f \u00b0C" % critical_value,
+                            'is_critical': child_value > critical_value,
                         }
                         dictionary_processed = True
 
@@ -225,9 +339,37 @@ class Command(BaseCommand):
 
         return criticals
 
+    def _update_rollups(self):
+        """
+        Calculates the health check rollups for all finished rollup intervals
+        """
+        try:
+            HealthCheckRollup.update(late_period=self.__rollup_late_period)
+        except Exception as error:
+            # The rollups will be calculated at the next iteration
+            self.__logger.log(ERROR, "corefacility health check rollup error: " + str(error), exc_info=sys.exc_info())
+
     def _recycle_old_timestamps(self):
         """
-        Recycles the timestamps which lifetime exceed some critical value
+        Recycles the timestamps which lifetime exceed some critical value.
+
+        The timestamps are removed by small chunks in order not to lock the health check table for a long time.
+        The recycling stops when the time given by the CORE_HEALTH_CHECK_RECYCLE_TIME setting is exceeded; the
+        remaining timestamps will be removed during the next recycling.
+
+        :return: number of removed timestamps
         """
+        chunk_size = getattr(settings, "CORE_HEALTH_CHECK_RECYCLE_CHUNK", self.RECYCLE_CHUNK)
+        deadline = monotonic() + getattr(settings, "CORE_HEALTH_CHECK_RECYCLE_TIME", self.RECYCLE_TIME)
         timestamp_birth_threshold = make_aware(datetime.now() - self.VIEW_INTERVAL)
-        HealthCheck.objects.filter(date__lte=timestamp_birth_threshold).delete()
+        dead_timestamps = HealthCheck.objects.filter(date__lte=timestamp_birth_threshold).order_by("date")
+        removed_number = 0
+        while True:
+            chunk = list(dead_timestamps.values_list("id", flat=True)[:chunk_size])
+            if len(chunk) > 0:
+                HealthCheck.objects.filter(id__in=chunk).delete()
+                removed_number += len(chunk)
+            if len(chunk) < chunk_size or monotonic() >= deadline:
+                break
+        HealthCheckRollup.recycle()
+        return removed_number
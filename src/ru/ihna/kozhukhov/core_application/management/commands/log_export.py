@@ -0,0 +1,73 @@
+from django.core.management import BaseCommand, CommandParser
+
+from ...entity.log import LogSet
+from ...log_export import LogExporter, FORMATS
+from ..command_options import parse_date_option
+
+
+class Command(BaseCommand):
+    """
+    Exports request logs to the CSV or JSON Lines file.
+
+    The logs are read by the server-side cursor and written to the file one by one, so the command is able to export
+    any number of logs using constant amount of memory.
+    """
+
+    help = "Exports request logs to the CSV or JSON Lines file"
+
+    def add_arguments(self, parser: CommandParser):
+        """
+        Adds arguments to the command line parser
+
+        :param parser: a command line parser to which the argument shall be added
+        :return: None
+        """
+        parser.add_argument("-f", "--format", dest="file_format", choices=list(FORMATS.keys()), default="csv",
+                            help="Format of the output file")
+        parser.add_argument("-o", "--output",
+                            help="The output file. The logs will be written to the standard output if omitted")
+        parser.add_argument("--records", action="store_true",
+                            help="Export log records attached to each log")
+        parser.add_argument("--from", dest="date_from",
+                            help="Export logs that were made not earlier than a given date and time")
+        parser.add_argument("--to", dest="date_to",
+                            help="Export logs that were made not later than a given date and time")
+        parser.add_argument("--ip-address",
+                            help="Export only logs received from a given IP address")
+        parser.add_argument("--fails", action="store_true",
+                            help="Export only logs related to failed requests")
+
+    def handle(self, *args, file_format="csv", output=None, records=False, date_from=None, date_to=None,
+               ip_address=None, fails=False, **options):
+        """
+        Exports the logs
+
+        :param args: useless
+        :param file_format: format of the output file
+        :param output: the output file or None for the standard output
+        :param records: True to export log records, False otherwise
+        :param date_from: the minimum request date
+        :param date_to: the maximum request date
+        :param ip_address: the IP address from which logs were received
+        :param fails: True to export logs related to failed requests only
+        :param options: useless
+        :return: nothing
+        """
+        log_set = LogSet()
+        if date_from is not None:
+            log_set.request_date_from = parse_date_option(date_from, "--from")
+        if date_to is not None:
+            log_set.request_date_to = parse_date_option(date_to, "--to")
+        if ip_address is not None:
+            log_set.ip_address = ip_address
+        if fails:
+            log_set.is_fail = True
+        exporter = LogExporter.get_exporter_class(file_format)(records)
+        chunks = exporter.export(log_set.export(records))
+        if output is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+        else:
+            with open(output, "w", encoding="utf-8", newline="") as output_file:
+                for chunk in chunks:
+                    output_file.write(chunk)
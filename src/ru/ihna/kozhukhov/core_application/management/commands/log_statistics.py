@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from django.core.management import BaseCommand, CommandError, CommandParser
+from django.utils.timezone import make_aware
+
+from ...models import LogStatistics
+from ..command_options import parse_date_option
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the hourly request statistics from the raw request logs.
+
+    The log middleware updates the statistics each time the request is logged. However, the statistics may become
+    inconsistent with the logs when the logs were written by the older corefacility version or removed manually.
+    Run this command periodically (e.g., from cron) to fix such inconsistencies. The statistics for the current hour
+    is never rebuilt because it is still updated by the log middleware.
+    """
+
+    help = "Rebuilds the hourly request statistics from the request logs"
+
+    DEFAULT_HOUR_NUMBER = 2
+    """ Number of the last hours to rebuild when neither --from nor --to option is given """
+
+    def add_arguments(self, parser: CommandParser):
+        """
+        Adds arguments to the command line parser
+
+        :param parser: a command line parser to which the argument shall be added
+        :return: None
+        """
+        parser.add_argument("--hours", type=int, default=self.DEFAULT_HOUR_NUMBER,
+                            help="Number of the last hours which statistics shall be rebuilt")
+        parser.add_argument("--from", dest="date_from",
+                            help="Rebuild the statistics starting from a given date and time")
+        parser.add_argument("--to", dest="date_to",
+                            help="Rebuild the statistics up to a given date and time (default: now). "
+                                 "The current hour is never rebuilt")
+
+    def handle(self, *args, hours=DEFAULT_HOUR_NUMBER, date_from=None, date_to=None, **options):
+        """
+        Rebuilds the statistics
+
+        :param args: useless
+        :param hours: number of the last hours to rebuild. Useless when the date_from is given
+        :param date_from: the first date of the statistics to rebuild
+        :param date_to: the last date of the statistics to rebuild
+        :param options: useless
+        :return: nothing
+        """
+        date_to = parse_date_option(date_to, "--to") if date_to is not None else make_aware(datetime.now())
+        if date_from is not None:
+            date_from = parse_date_option(date_from, "--from")
+        elif hours > 0:
+            date_from = date_to - timedelta(hours=hours)
+        else:
+            raise CommandError("The --hours option shall be a positive integer")
+        if date_from > date_to:
+            raise CommandError("The --from date shall not be later than the --to date")
+        row_number = LogStatistics.rebuild(date_from, date_to)
+        self.stdout.write("%d statistics rows were rebuilt" % row_number)
@@ -1,13 +1,6 @@
-import os
-import subprocess
-
 from django.core.management import BaseCommand
 
-from .autoadmin.posix_group import PosixGroup
-from ...entity.user import UserSet
-from ...entity.project import ProjectSet
-from .autoadmin.posix_user import PosixUser
-from ...exceptions.entity_exceptions import PosixCommandFailedException
+from .autoadmin.posix_reconciler import PosixReconciler
 
 
 class Command(BaseCommand):
@@ -15,8 +8,16 @@ class Command(BaseCommand):
     Provides synchronization between POSIX accounts and corefacility accounts
     """
 
-    _corefacility_users = None
-    _corefacilility_projects = None
+    help = "Brings POSIX users and groups to the state defined by corefacility users and projects"
+
+    def add_arguments(self, parser):
+        """
+        Adds arguments to the command
+
+        :param parser: the argument parser
+        """
+        parser.add_argument("--dry-run", action="store_true", dest="dry_run",
+                            help="Print the synchronization plan without applying it")
 
     def handle(self, *args, **options):
         """
@@ -26,11 +27,31 @@ class Command(BaseCommand):
         :param args: position arguments for this command
         :param options: optional arguments for this command
         """
-        self._initialize_users_and_projects()
-        self._update_user_list()
-        self._clear_bad_links()
-        self._update_project_list()
-        self._update_connections()
+        reconciler = PosixReconciler()
+        reconciler.log = self
+        if options['dry_run']:
+            self.print_plan(reconciler, reconciler.get_plan())
+        else:
+            reconciler.command_emulation = False
+            reconciler.synchronize()
+
+    def print_plan(self, reconciler, plan):
+        """
+        Prints the synchronization plan on the screen
+
+        :param reconciler: the PosixReconciler that built the plan
+        :param plan: the ReconcilePlan instance
+        """
+        for step in plan:
+            if step.commands is None:
+                self.stdout.write("[%s] %s: the commands will be revealed after the previous steps" %
+                                  (step.phase, step.target))
+                continue
+            for command in step.commands:
+                self.stdout.write("[%s] %s: %s" % (step.phase, step.target, reconciler._get_command_string(command)))
+        self.stdout.write("The plan contains %d command(s) in %d step(s)" % (plan.size, len(plan)))
+        if plan.requires_next_pass:
+            self.stdout.write("New POSIX users or groups will be set up by the next pass")
 
     def add_record(self, severity, message):
         """
@@ -40,71 +61,3 @@ class Command(BaseCommand):
         :param message: the message to print
         """
         print("[%s] %s" % (severity, message))
-
-    def _initialize_users_and_projects(self):
-        """
-        Initialize all protected fields within the command
-        """
-        self._corefacility_users = UserSet()
-        self._corefacility_users.is_support = False
-        self._corefacility_projects = ProjectSet()
-
-    def _clear_bad_links(self):
-        """
-        Clears all invalid links in home directories of all users
-        """
-        for corefacility_user in self._corefacility_users:
-            posix_user = PosixUser(corefacility_user)
-            posix_user.command_emulation = False
-            posix_user.log = self
-            for filename_short in os.listdir(corefacility_user.home_dir):
-                filename = os.path.join(corefacility_user.home_dir, filename_short)
-                if not os.path.islink(filename):
-                    continue
-                target = os.readlink(filename)
-                if not os.path.exists(target):
-                    posix_user.run(('rm', '-rf', filename))
-
-    def _update_user_list(self):
-        """
-        Establishes consistency between corefacility users and POSIX users
-        """
-        for corefacility_user in self._corefacility_users:
-            posix_user = PosixUser(corefacility_user)
-            posix_user.command_emulation = False
-            posix_user.log = self
-            available_posix_user = posix_user.check_user_for_update()
-            if available_posix_user is None:
-                posix_user.create()
-            elif not os.path.isdir(posix_user.home_dir):
-                    posix_user.run(('userdel', '-rf', posix_user.login))
-                    posix_user.create()
-            try:
-                posix_user.update_lock()
-            except PosixCommandFailedException:
-                print("[WARN] The user has been created but it still locked.")
-
-    def _update_project_list(self):
-        """
-        Establishes consistency between corefacility projects and POSIX groups
-        """
-        for corefacility_project in self._corefacility_projects:
-            posix_group = PosixGroup(corefacility_project)
-            posix_group.command_emulation = False
-            posix_group.log = self
-            available_posix_group = posix_group.check_group_for_update()
-            if available_posix_group is None:
-                posix_group.create()
-            elif not os.path.isdir(posix_group.project_dir):
-                posix_group.run(('groupdel', posix_group.name))
-                posix_group.create()
-
-    def _update_connections(self):
-        """
-        Updates connections between POSIX users and POSIX groups
-        """
-        for corefacility_user in self._corefacility_users:
-            posix_user = PosixUser(corefacility_user)
-            posix_user.command_emulation = False
-            posix_user.log = self
-            posix_user.update_supplementary_groups()
@@ -1,11 +1,49 @@
+from random import random
+from time import perf_counter
+
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 
 from ..utils import get_ip
 from ..entity.log import Log
+from ..models import LogStatistics
 
 import logging
 
 
+class QueryMetrics:
+    """
+    Counts the database queries made by the current request and measures the total time of their execution.
+    The object shall be installed as database execution wrapper (see django.db.connection.execute_wrapper)
+    """
+
+    def __init__(self):
+        """
+        Initializes the query metrics
+        """
+        self.query_count = 0
+        self.query_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Executes a single database query and updates the query metrics
+
+        :param execute: the function that executes the query
+        :param sql: the SQL query to execute
+        :param params: the query parameters
+        :param many: True for executemany() call, False for execute() call
+        :param context: some execution context
+        :return: the value returned by the execute function
+        """
+        start_time = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_time += perf_counter() - start_time
+
+
 class LogMiddleware:
     """
     Provides an appropriate logging for responses
@@ -13,6 +51,9 @@ class LogMiddleware:
 
     NON_LOGGING_METHOD = ['GET', 'HEAD', 'CONNECT', 'TRACE', 'OPTIONS']
 
+    MIN_ERROR_STATUS = 400
+    """ Safe requests with response status not less than this value are always logged when sampling is on """
+
     _get_response = None
 
     def __init__(self, get_response):
@@ -22,6 +63,7 @@ class LogMiddleware:
         :param get_response: the response processing function
         """
         self._get_response = get_response
+        self._sampling_rates = self.parse_sampling_rates(settings.CORE_LOG_SAMPLING_RATES)
 
     def __call__(self, request):
         """
@@ -29,43 +71,110 @@ class LogMiddleware:
         :param request: the request to be filled
         :return: nothing
         """
-        self.process_request(request)
-        response = self._get_response(request)
+        start_time = perf_counter()
+        sampling_rate = self.get_sampling_rate(request)
+        if sampling_rate is None:
+            return self._get_response(request)
+        # The log of the request that has not been sampled is saved only when the request fails.
+        # Failed requests are always logged, so their sampling rate is 1.0
+        if random() < sampling_rate:
+            self.process_request(request, sampling_rate)
+        else:
+            self.process_request(request, save=False)
+        query_metrics = QueryMetrics()
+        with connection.execute_wrapper(query_metrics):
+            response = self._get_response(request)
+        if hasattr(request, "corefacility_log") and request.corefacility_log.state == "creating" and \
+                response.status_code < self.MIN_ERROR_STATUS:
+            del request.corefacility_log
         if hasattr(request, "corefacility_log"):
+            request.corefacility_log.response_time = perf_counter() - start_time
+            request.corefacility_log.query_count = query_metrics.query_count
+            request.corefacility_log.query_time = query_metrics.query_time
             self.process_response(request.corefacility_log, response)
+            self.update_statistics(request)
         return response
 
-    def process_request(self, request):
+    def get_sampling_rate(self, request):
+        """
+        Defines whether the request shall be logged.
+
+        State-changing requests are always logged. Safe requests are logged when the debug mode is on or
+        CORE_LOG_SAFE_REQUESTS setting is True. In this case only a certain fraction of safe requests defined by the
+        CORE_LOG_SAMPLING_RATES setting is logged while failed safe requests are always logged.
+
+        :param request: the request to be processed
+        :return: None if the request shall not be logged, the probability for the request to be logged otherwise
+        """
+        if request.method not in self.NON_LOGGING_METHOD or \
+                (request.method == 'GET' and 'activation_code' in request.GET):
+            return 1.0
+        if not settings.DEBUG and not settings.CORE_LOG_SAFE_REQUESTS:
+            return None
+        sampling_rate = 1.0
+        matched_length = -1
+        for method, path_prefix, rate in self._sampling_rates:
+            if method == request.method and request.path.startswith(path_prefix) and \
+                    len(path_prefix) > matched_length:
+                sampling_rate = rate
+                matched_length = len(path_prefix)
+        return sampling_rate
+
+    @staticmethod
+    def parse_sampling_rates(sampling_rates):
+        """
+        Checks the value of the CORE_LOG_SAMPLING_RATES setting and transforms it to the form suitable for lookup
+
+        :param sampling_rates: value of the CORE_LOG_SAMPLING_RATES setting
+        :return: list of (method, path_prefix, rate) tuples
+        """
+        parsed_rates = []
+        for sampling_key, rate in sampling_rates.items():
+            method, _, path_prefix = sampling_key.strip().partition(" ")
+            try:
+                rate = float(rate)
+            except (TypeError, ValueError):
+                rate = None
+            if rate is None or not 0.0 <= rate <= 1.0:
+                raise ImproperlyConfigured("CORE_LOG_SAMPLING_RATES: the sampling rate for '%s' shall be a number "
+                                           "between 0 and 1" % sampling_key)
+            parsed_rates.append((method.upper(), path_prefix.strip(), rate))
+        return parsed_rates
+
+    def process_request(self, request, sampling_rate=1.0, save=True):
         """
         Initializes the request log and fills request details to it
 
         :param request: the request which log shall be created
+        :param sampling_rate: fraction of similar requests that are logged
+        :param save: True to save the log immediately, False to postpone saving the log until the response is
+            processed. Log records added to the postponed log are saved together with the log.
         :return: nothing
         """
-        if settings.DEBUG or request.method not in self.NON_LOGGING_METHOD or \
-                (request.method == 'GET' and 'activation_code' in request.GET):
-            try:
-                ip_address = get_ip(request)
-                log = Log(log_address=request.path, request_method=request.method, ip_address=ip_address)
-                """
-                if len(request.FILES) == 0:
-                    try:
-                        log.request_body = request.body.decode(encoding='utf-8')[:Log.TEXT_MAX_LENGTH]
-                    except RawPostDataException:
-                        log.request_body = request.data.decode(encoding='utf-8')[:Log.TEXT_MAX_LENGTH]
-                """
-                log.request_date.mark()
+        try:
+            ip_address = get_ip(request)
+            log = Log(log_address=request.path, request_method=request.method, ip_address=ip_address,
+                      sampling_rate=sampling_rate)
+            """
+            if len(request.FILES) == 0:
                 try:
-                    log.request_body = request.body.decode("utf-8")
-                except Exception as e:
-                    log.request_body = "<i>Not available</i>"
-                log.create()
-                request.corefacility_log = log
-                request.corefacility_log_middleware = self
+                    log.request_body = request.body.decode(encoding='utf-8')[:Log.TEXT_MAX_LENGTH]
+                except RawPostDataException:
+                    log.request_body = request.data.decode(encoding='utf-8')[:Log.TEXT_MAX_LENGTH]
+            """
+            log.request_date.mark()
+            try:
+                log.request_body = request.body.decode("utf-8")
             except Exception as e:
-                logging.getLogger('django.corefacility.log').error(
-                    "Unable to insert the log to the database due to the following error: " + str(e)
-                )
+                log.request_body = "<i>Not available</i>"
+            if save:
+                log.create()
+            request.corefacility_log = log
+            request.corefacility_log_middleware = self
+        except Exception as e:
+            logging.getLogger('django.corefacility.log').error(
+                "Unable to insert the log to the database due to the following error: " + str(e)
+            )
 
     def process_view(self, request, callback, callback_args, callback_kwargs):
         """
@@ -79,10 +188,12 @@ class LogMiddleware:
         """
         try:
             callback_doc = callback.__doc__
-            if hasattr(request, "corefacility_log") and callback_doc is not None:
-                operation_description = callback.__doc__.strip().split("\n")[0].strip()
-                request.corefacility_log.operation_description = operation_description
-                request.corefacility_log.update()
+            if callback_doc is not None:
+                if hasattr(request, "corefacility_log"):
+                    request.corefacility_log.operation_description = \
+                        callback.__doc__.strip().split("\n")[0].strip()
+                    if request.corefacility_log.state != "creating":
+                        request.corefacility_log.update()
         except Exception as e:
             logging.getLogger('django.corefacility.log').error(
                 "Unable to insert the log to the database due to the following error: " + str(e)
@@ -108,10 +219,30 @@ class LogMiddleware:
         """
         try:
             log.response_status = response.status_code
+            if response.status_code >= self.MIN_ERROR_STATUS:
+                # failed requests are always logged
+                log.sampling_rate = 1.0
             if not response.streaming and log.response_body != "***":
                 log.response_body = response.content.decode(encoding="utf-8")[:Log.TEXT_MAX_LENGTH]
-            log.update()
+            if log.state == "creating":
+                log.create()
+            else:
+                log.update()
         except Exception as e:
             logging.getLogger('django.corefacility.log').error(
                 "Unable to insert the log to the database due to the following error: " + str(e)
             )
+
+    def update_statistics(self, request):
+        """
+        Adds the finished request log to the hourly request statistics
+
+        :param request: the request which log has been finished
+        :return: nothing
+        """
+        try:
+            LogStatistics.add_log(request.corefacility_log, getattr(request, "resolver_match", None))
+        except Exception as e:
+            logging.getLogger('django.corefacility.log').error(
+                "Unable to update the request statistics due to the following error: " + str(e)
+            )
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0002_install'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['ip_address', '-request_date'], name='log_ip_address_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['user', '-request_date'], name='log_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(condition=models.Q(('response_status__gte', 200), ('response_status__lt', 299)), fields=['-request_date'], name='log_success_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(condition=models.Q(('response_status__gte', 400), ('response_status__lt', 599)), fields=['-request_date'], name='log_fail_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logrecord',
+            index=models.Index(fields=['log', 'record_time'], name='log_record_log_time_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0003_log_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='log',
+            name='query_count',
+            field=models.PositiveIntegerField(db_index=True, editable=False, help_text='Number of database queries made during the request processing', null=True),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='query_time',
+            field=models.FloatField(db_index=True, editable=False, help_text='Total time spent on database queries, in seconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='response_time',
+            field=models.FloatField(db_index=True, editable=False, help_text='Wall time spent on the request processing, in seconds', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0004_log_request_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='log',
+            name='sampling_rate',
+            field=models.FloatField(default=1.0, editable=False, help_text='Fraction of similar requests that were logged'),
+        ),
+    ]
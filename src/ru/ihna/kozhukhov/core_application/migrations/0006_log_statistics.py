@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0005_log_sampling_rate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(db_index=True, editable=False, help_text='Beginning of the hour when the requests have been received')),
+                ('path_template', models.CharField(editable=False, max_length=255)),
+                ('request_method', models.CharField(editable=False, max_length=7)),
+                ('status_class', models.PositiveSmallIntegerField(editable=False, help_text='The first digit of the HTTP response status')),
+                ('request_count', models.FloatField(default=0.0, editable=False, help_text='Total number of requests, including requests that were not logged')),
+                ('timed_request_count', models.FloatField(default=0.0, editable=False, help_text='Number of requests whose processing time was measured')),
+                ('total_response_time', models.FloatField(default=0.0, editable=False, help_text='Total time spent on the request processing, in seconds')),
+                ('max_response_time', models.FloatField(editable=False, help_text='Maximum request processing time, in seconds', null=True)),
+            ],
+            options={
+                'ordering': ['hour'],
+                'unique_together': {('hour', 'path_template', 'request_method', 'status_class')},
+            },
+        ),
+    ]
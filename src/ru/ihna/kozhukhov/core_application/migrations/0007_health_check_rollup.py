@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0006_log_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthCheckRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField(help_text='Duration of the rollup interval in seconds')),
+                ('date', models.DateTimeField(help_text='Beginning of the rollup interval')),
+                ('sample_count', models.PositiveIntegerField(help_text='Number of health check timestamps within the rollup interval')),
+                ('channels', models.JSONField(help_text='A dictionary category => channel key => [minimum, mean, maximum]')),
+            ],
+            options={
+                'ordering': ['resolution', 'date'],
+                'unique_together': {('resolution', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0007_health_check_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='healthcheck',
+            name='processes',
+            field=models.JSONField(default=dict, help_text='A dictionary process group => resources used by all processes in the group'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0008_health_check_processes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posixrequest',
+            name='coalesced_logs',
+            field=models.ManyToManyField(editable=False, help_text='Logs of all requests that were merged into this request', related_name='coalesced_posix_requests', to='core_application.log'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_application', '0009_posix_request_coalesced_logs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posixrequest',
+            name='claim_date',
+            field=models.DateTimeField(editable=False, help_text='When the request was claimed by the autoadmin daemon', null=True),
+        ),
+        migrations.AddField(
+            model_name='posixrequest',
+            name='claim_token',
+            field=models.CharField(editable=False, help_text='Identifies the autoadmin iteration that processes the request', max_length=32, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='posixrequest',
+            index=models.Index(fields=['status', 'initialization_date'], name='posix_request_status_date_idx'),
+        ),
+    ]
@@ -9,6 +9,8 @@ from .entry_point import EntryPoint
 from .module import Module
 from .log import Log
 from .log_record import LogRecord
+from .log_statistics import LogStatistics
 from .failed_authorizations import FailedAuthorizations
 from .posix_request import PosixRequest
 from .health_check import HealthCheck
+from .health_check_rollup import HealthCheckRollup
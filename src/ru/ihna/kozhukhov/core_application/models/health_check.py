@@ -1,3 +1,5 @@
+import re
+
 from django.db import models
 
 
@@ -17,11 +19,134 @@ class HealthCheck(models.Model):
     bytes_sent = models.PositiveBigIntegerField()
     bytes_received = models.PositiveBigIntegerField()
     temperature = models.JSONField()
+    processes = models.JSONField(default=dict,
+                                 help_text="A dictionary process group => resources used by all processes in the group")
+
+    PROCESS_METRICS = ["rss", "cpu", "fds", "threads"]
+    """
+    Channels revealed for each process group: resident memory in bytes, CPU usage in percents, number of open file
+    descriptors and number of threads
+    """
+
+    TEMPERATURE_MATCHER = re.compile(r'^temp\d+_input$')
+    """
+    Name of the field in lm-sensors output that contains actual temperature value
+    """
+
+    def get_channel_values(self, previous=None):
+        """
+        Reveals values of all health check channels
+
+        :param previous: the previous health check. Required to calculate the network traffic which is not revealed
+            when the previous health check is not given
+        :return: a dictionary which keys are health check categories and values are dictionaries channel key => value
+        """
+        channel_values = {
+            'cpu': {str(index): load_value for index, load_value in enumerate(self.cpu_load)},
+            'memory': {'ram_free': self.ram_free, 'swap_free': self.swap_free},
+            'disk': dict(self.hdd_free),
+            'network': {},
+            'temperature': self.get_temperature_values(),
+            'processes': self.get_process_values(self.processes),
+        }
+        if previous is not None:
+            time_period = (self.date - previous.date).total_seconds()
+            channel_values['processes'] = self.get_process_values(self.processes, previous.processes, time_period)
+            bytes_sent = self.bytes_sent - previous.bytes_sent
+            bytes_received = self.bytes_received - previous.bytes_received
+            # The network counters are reset after reboot
+            if time_period > 0 and bytes_sent >= 0 and bytes_received >= 0:
+                channel_values['network'] = {
+                    'bytes_sent': bytes_sent / time_period,
+                    'bytes_received': bytes_received / time_period,
+                }
+        return channel_values
+
+    @classmethod
+    def get_process_values(cls, processes, previous_processes=None, time_period=None):
+        """
+        Reveals the process group channels
+
+        :param processes: value of the processes field
+        :param previous_processes: value of the processes field for the previous health check. The CPU usage is
+            not revealed when this value is not given
+        :param time_period: number of seconds elapsed since the previous health check
+        :return: a dictionary 'process group:metric' => value
+        """
+        process_values = dict()
+        for group, resources in (processes or {}).items():
+            previous_resources = (previous_processes or {}).get(group)
+            for metric in cls.PROCESS_METRICS:
+                if metric == 'cpu':
+                    if previous_resources is None or not time_period or time_period <= 0:
+                        continue
+                    cpu_time = resources.get('cpu_time', 0.0) - previous_resources.get('cpu_time', 0.0)
+                    # The CPU time is reset when the process has been restarted
+                    if cpu_time < 0:
+                        continue
+                    value = 100.0 * cpu_time / time_period
+                else:
+                    value = resources.get(metric)
+                    if value is None:
+                        continue
+                process_values["%s:%s" % (group, metric)] = value
+        return process_values
+
+    @classmethod
+    def sort_process_keys(cls, keys):
+        """
+        Sorts the process group channels by the process group name and next by the metric
+
+        :param keys: iterable over the 'process group:metric' strings
+        :return: the sorted list
+        """
+        def sort_key(key):
+            group, _, metric = key.rpartition(":")
+            if metric in cls.PROCESS_METRICS:
+                return group, cls.PROCESS_METRICS.index(metric)
+            return group, len(cls.PROCESS_METRICS)
+        return sorted(keys, key=sort_key)
+
+    def get_temperature_values(self):
+        """
+        Reveals all temperature values from the lm-sensors output
+
+        :return: a dictionary sensor name => temperature value
+        """
+        return self.parse_temperature(self.temperature)
+
+    @classmethod
+    def parse_temperature(cls, temperature):
+        """
+        Reveals all temperature values from the lm-sensors output
+
+        :param temperature: value of the temperature field
+        :return: a dictionary sensor name => temperature value
+        """
+        temperature_values = dict()
+        cls._reduce_temperature_info(temperature, temperature_values)
+        return temperature_values
+
+    @classmethod
+    def _reduce_temperature_info(cls, temperature, temperature_values):
+        if not isinstance(temperature, dict):
+            return
+        processed = False
+        for parent_key, parent_value in temperature.items():
+            if not isinstance(parent_value, dict):
+                continue
+            for child_key, child_value in parent_value.items():
+                if cls.TEMPERATURE_MATCHER.match(child_key):
+                    temperature_values.setdefault(parent_key, child_value)
+                    processed = True
+        if not processed:
+            for value in temperature.values():
+                cls._reduce_temperature_info(value, temperature_values)
 
     def __str__(self):
         return ("HealthCheck(date={date}, cpu_load={cpu_load}, ram_free={ram_free}, swap_free={swap_free}," +
                 "hdd_free={hdd_free}, bytes_sent={bytes_sent}, bytes_received={bytes_received}, " +
-                "temperature={temperature})") \
+                "temperature={temperature}, processes={processes})") \
             .format(date=self.date, cpu_load=self.cpu_load, ram_free=self.ram_free, swap_free=self.swap_free,
                     hdd_free=self.hdd_free, bytes_sent=self.bytes_sent, bytes_received=self.bytes_received,
-                    temperature=self.temperature)
+                    temperature=self.temperature, processes=self.processes)
@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import models, transaction
+from django.db.models import Max
+from django.utils.timezone import now
+
+from .health_check import HealthCheck
+
+
+class HealthCheckRollup(models.Model):
+    """
+    Stores minimum, mean and maximum values of all health check channels over a fixed time interval.
+
+    The rollups are maintained at several resolutions. The finest rollups are calculated from the health check
+    timestamps while each coarser rollup is calculated from rollups of the previous resolution. Hence, long time
+    intervals may be shown without reading all health check timestamps.
+    """
+
+    RESOLUTIONS = [60, 600, 3600]
+    """ All rollup resolutions in seconds, from the finest one to the coarsest one """
+
+    RETENTION = {
+        60: timedelta(weeks=1),
+        600: timedelta(weeks=5),
+        3600: timedelta(days=366),
+    }
+    """ Rollups older than this value will be removed by the recycling process """
+
+    resolution = models.PositiveIntegerField(
+        help_text="Duration of the rollup interval in seconds")
+    date = models.DateTimeField(
+        help_text="Beginning of the rollup interval")
+    sample_count = models.PositiveIntegerField(
+        help_text="Number of health check timestamps within the rollup interval")
+    channels = models.JSONField(
+        help_text="A dictionary category => channel key => [minimum, mean, maximum]")
+
+    class Meta:
+        unique_together = [("resolution", "date")]
+        ordering = ["resolution", "date"]
+
+    @classmethod
+    def get_interval_start(cls, date, resolution):
+        """
+        Reveals beginning of the rollup interval containing a given date
+
+        :param date: the date
+        :param resolution: the rollup resolution in seconds
+        :return: the aware datetime
+        """
+        timestamp = int(date.timestamp()) // resolution * resolution
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+    @classmethod
+    def update(cls, current_date=None, late_period=timedelta(0)):
+        """
+        Calculates rollups for all complete intervals that have not been calculated yet. Rollups for the intervals
+        that finished within the late period are calculated again, so the health check timestamps saved to the
+        database after their interval was rolled up are also aggregated.
+
+        :param current_date: the current date. Rollups are calculated for all intervals that finish before this date
+        :param late_period: maximum delay between the health check timestamp and the moment when it is saved to
+            the database
+        :return: number of created or recalculated rollups
+        """
+        if current_date is None:
+            current_date = now()
+        rollup_number = 0
+        previous_resolution = None
+        for resolution in cls.RESOLUTIONS:
+            end = cls.get_interval_start(current_date, resolution)
+            last_date = cls.objects.filter(resolution=resolution).aggregate(last_date=Max("date"))["last_date"]
+            start = None
+            if last_date is not None:
+                start = min(last_date + timedelta(seconds=resolution),
+                            cls.get_interval_start(current_date - late_period, resolution))
+            # Coarser rollups shall be recalculated from all finer rollups that have been recalculated
+            late_period += timedelta(seconds=resolution)
+            if previous_resolution is None:
+                samples = cls._get_health_check_samples(start, end)
+            else:
+                samples = cls._get_rollup_samples(previous_resolution, start, end)
+            rollups = []
+            interval_start = None
+            interval_samples = []
+            for date, sample_count, channels in samples:
+                sample_interval = cls.get_interval_start(date, resolution)
+                if sample_interval != interval_start and len(interval_samples) > 0:
+                    rollups.append(cls._create_rollup(resolution, interval_start, interval_samples))
+                    interval_samples = []
+                interval_start = sample_interval
+                interval_samples.append((sample_count, channels))
+            if len(interval_samples) > 0:
+                rollups.append(cls._create_rollup(resolution, interval_start, interval_samples))
+            with transaction.atomic():
+                cls.objects.bulk_create(rollups, update_conflicts=True, unique_fields=["resolution", "date"],
+                                        update_fields=["sample_count", "channels"])
+            rollup_number += len(rollups)
+            previous_resolution = resolution
+        return rollup_number
+
+    @classmethod
+    def recycle(cls, current_date=None):
+        """
+        Removes all rollups which lifetime exceeds the retention period
+
+        :param current_date: the current date
+        :return: nothing
+        """
+        if current_date is None:
+            current_date = now()
+        for resolution, retention in cls.RETENTION.items():
+            cls.objects.filter(resolution=resolution, date__lte=current_date - retention).delete()
+
+    @classmethod
+    def _get_health_check_samples(cls, start, end):
+        """
+        Reads the health check timestamps within a given interval
+
+        :param start: the interval start or None if the interval has no lower bound
+        :param end: the interval end
+        :return: generator of (date, sample_count, channels) tuples
+        """
+        health_checks = HealthCheck.objects.filter(date__lt=end).order_by("date")
+        previous = None
+        if start is not None:
+            health_checks = health_checks.filter(date__gte=start)
+            previous = HealthCheck.objects.filter(date__lt=start).order_by("-date").first()
+        for health_check in health_checks.iterator():
+            channels = {
+                category: {key: [value, value, value] for key, value in values.items()}
+                for category, values in health_check.get_channel_values(previous).items()
+            }
+            yield health_check.date, 1, channels
+            previous = health_check
+
+    @classmethod
+    def _get_rollup_samples(cls, resolution, start, end):
+        """
+        Reads the rollups within a given interval
+
+        :param resolution: the rollup resolution
+        :param start: the interval start or None if the interval has no lower bound
+        :param end: the interval end
+        :return: generator of (date, sample_count, channels) tuples
+        """
+        rollups = cls.objects.filter(resolution=resolution, date__lt=end).order_by("date")
+        if start is not None:
+            rollups = rollups.filter(date__gte=start)
+        for date, sample_count, channels in rollups.values_list("date", "sample_count", "channels").iterator():
+            yield date, sample_count, channels
+
+    @classmethod
+    def _create_rollup(cls, resolution, date, samples):
+        """
+        Aggregates several samples into a single rollup
+
+        :param resolution: the rollup resolution
+        :param date: beginning of the rollup interval
+        :param samples: list of (sample_count, channels) tuples
+        :return: the HealthCheckRollup instance which is not saved yet
+        """
+        total_count = 0
+        accumulators = dict()
+        for sample_count, channels in samples:
+            total_count += sample_count
+            for category, values in channels.items():
+                category_accumulators = accumulators.setdefault(category, dict())
+                for key, (minimum, mean, maximum) in values.items():
+                    if mean is None:
+                        continue
+                    if key not in category_accumulators:
+                        category_accumulators[key] = [minimum, mean * sample_count, maximum, sample_count]
+                    else:
+                        accumulator = category_accumulators[key]
+                        accumulator[0] = min(accumulator[0], minimum)
+                        accumulator[1] += mean * sample_count
+                        accumulator[2] = max(accumulator[2], maximum)
+                        accumulator[3] += sample_count
+        return cls(
+            resolution=resolution,
+            date=date,
+            sample_count=total_count,
+            channels={
+                category: {
+                    key: [minimum, total / count, maximum]
+                    for key, (minimum, total, maximum, count) in category_accumulators.items()
+                }
+                for category, category_accumulators in accumulators.items()
+            }
+        )
@@ -20,6 +20,24 @@ class Log(models.Model):
     response_body = models.TextField(editable=False, null=True,
                                      help_text="defines the response body")
     output_data = models.TextField(editable=False, null=True)
+    response_time = models.FloatField(editable=False, null=True,
+                                      help_text="Wall time spent on the request processing, in seconds")
+    query_count = models.PositiveIntegerField(editable=False, null=True,
+                                              help_text="Number of database queries made during the request processing")
+    query_time = models.FloatField(editable=False, null=True,
+                                   help_text="Total time spent on database queries, in seconds")
+    sampling_rate = models.FloatField(editable=False, default=1.0,
+                                      help_text="Fraction of similar requests that were logged")
 
     class Meta:
         ordering = ["-request_date"]
+        indexes = [
+            # Each index below corresponds to a single LogReader filter. All of them end with request_date in order
+            # to give the log list in the LogReader's order without additional sorting.
+            models.Index(fields=["ip_address", "-request_date"], name="log_ip_address_date_idx"),
+            models.Index(fields=["user", "-request_date"], name="log_user_date_idx"),
+            models.Index(fields=["-request_date"], name="log_success_date_idx",
+                         condition=models.Q(response_status__gte=200) & models.Q(response_status__lt=299)),
+            models.Index(fields=["-request_date"], name="log_fail_date_idx",
+                         condition=models.Q(response_status__gte=400) & models.Q(response_status__lt=599)),
+        ]
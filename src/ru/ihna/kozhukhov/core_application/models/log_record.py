@@ -17,3 +17,7 @@ class LogRecord(models.Model):
 
     class Meta:
         ordering = ["record_time"]
+        indexes = [
+            # LogRecordReader looks for records belonging to a given log and sorts them by their time
+            models.Index(fields=["log", "record_time"], name="log_record_log_time_idx"),
+        ]
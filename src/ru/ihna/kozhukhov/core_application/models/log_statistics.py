@@ -0,0 +1,266 @@
+from datetime import timedelta
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.urls import resolve, Resolver404
+from django.utils.timezone import localtime, now
+
+from .log import Log
+
+
+class LogStatistics(models.Model):
+    """
+    Stores the hourly request statistics.
+
+    Each row contains the summary of all requests that have been received during a given hour, have the same path
+    template (i.e., the request path where all values of the path parameters were replaced by the parameter names)
+    and the same request method and whose response statuses belong to the same class (1xx, 2xx, 3xx, 4xx or 5xx).
+
+    The statistics is updated by the log middleware each time the request is logged. Also, it may be rebuilt
+    from the raw logs by the 'log_statistics' command.
+    """
+
+    UNKNOWN_STATUS_CLASS = 0
+    """ The status class for requests that have not been finished properly """
+
+    PATH_TEMPLATE_MAX_LENGTH = 255
+    """ Longer path templates are truncated in order to keep the unique index within the database key size limit """
+
+    UNRESOLVED_PATH = ""
+    """ The path template for requests whose path doesn't correspond to any view """
+
+    hour = models.DateTimeField(editable=False, db_index=True,
+                                help_text="Beginning of the hour when the requests have been received")
+    path_template = models.CharField(max_length=PATH_TEMPLATE_MAX_LENGTH, editable=False)
+    request_method = models.CharField(max_length=7, editable=False)
+    status_class = models.PositiveSmallIntegerField(editable=False,
+                                                    help_text="The first digit of the HTTP response status")
+    request_count = models.FloatField(editable=False, default=0.0,
+                                      help_text="Total number of requests, including requests that were not logged")
+    timed_request_count = models.FloatField(editable=False, default=0.0,
+                                            help_text="Number of requests whose processing time was measured")
+    total_response_time = models.FloatField(editable=False, default=0.0,
+                                            help_text="Total time spent on the request processing, in seconds")
+    max_response_time = models.FloatField(editable=False, null=True,
+                                          help_text="Maximum request processing time, in seconds")
+
+    class Meta:
+        ordering = ["hour"]
+        unique_together = [["hour", "path_template", "request_method", "status_class"]]
+
+    @staticmethod
+    def get_hour(request_date):
+        """
+        Returns beginning of the hour when the request has been received
+
+        :param request_date: the request receiving date
+        :return: the beginning of the hour in the current time zone
+        """
+        return localtime(request_date).replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def get_status_class(cls, response_status):
+        """
+        Returns the response status class
+
+        :param response_status: the HTTP response status or None if the request has not been finished
+        :return: 2 for 2xx statuses, 4 for 4xx statuses etc.
+        """
+        if response_status is None:
+            return cls.UNKNOWN_STATUS_CLASS
+        return response_status // 100
+
+    @classmethod
+    def get_path_template(cls, path, resolver_match=None):
+        """
+        Transforms the request path to the path template by substituting values of the path parameters with
+        parameter names (e.g., /api/v1/users/12/ will be transformed to /api/v1/users/{lookup}/).
+
+        The template is built from the route of the matched URL pattern, so the parameters are substituted by their
+        positions rather than by their values. The API version and the parameters that span several path segments
+        are left as they are.
+
+        :param path: the request path
+        :param resolver_match: the result of the request path resolution or None if the path has not been resolved
+        :return: the path template
+        """
+        if resolver_match is None:
+            try:
+                resolver_match = resolve(path)
+            except Resolver404:
+                return cls.UNRESOLVED_PATH
+        route = resolver_match.route
+        path_template = "/"
+        position = 0
+        while position < len(route):
+            if route.startswith("(?P<", position):
+                name = route[position + 4:route.index(">", position)]
+                position = cls._skip_regex_group(route, position)
+                path_template += cls._get_parameter_template(name, resolver_match.kwargs)
+            elif route[position] == "<":
+                parameter_end = route.index(">", position)
+                name = route[position + 1:parameter_end].split(":")[-1]
+                position = parameter_end + 1
+                path_template += cls._get_parameter_template(name, resolver_match.kwargs)
+            elif route[position] == "\\":
+                path_template += route[position + 1:position + 2]
+                position += 2
+            else:
+                if route[position] not in "^$":
+                    path_template += route[position]
+                position += 1
+        return path_template[:cls.PATH_TEMPLATE_MAX_LENGTH]
+
+    @staticmethod
+    def _skip_regex_group(route, position):
+        """
+        Finds the end of the regular expression group
+
+        :param route: the route of the URL pattern
+        :param position: position of the opening parenthesis of the group
+        :return: position of the first character after the closing parenthesis of the group
+        """
+        depth = 0
+        in_character_class = False
+        while position < len(route):
+            character = route[position]
+            if character == "\\":
+                position += 1
+            elif in_character_class:
+                in_character_class = character != "]"
+            elif character == "[":
+                in_character_class = True
+            elif character == "(":
+                depth += 1
+            elif character == ")":
+                depth -= 1
+                if depth == 0:
+                    return position + 1
+            position += 1
+        return position
+
+    @staticmethod
+    def _get_parameter_template(name, kwargs):
+        """
+        Returns the path template for a single path parameter
+
+        :param name: name of the path parameter
+        :param kwargs: values of all path parameters
+        :return: the path template for the path parameter
+        """
+        value = kwargs.get(name)
+        value = str(value) if value is not None else ""
+        if name == "version" or "/" in value:
+            return value
+        return "{%s}" % name
+
+    @classmethod
+    def add_request(cls, hour, path_template, request_method, status_class, request_count, response_time):
+        """
+        Adds a single logged request to the statistics
+
+        :param hour: beginning of the hour when the request has been received
+        :param path_template: the request path template
+        :param request_method: the request method
+        :param status_class: class of the response status
+        :param request_count: number of requests represented by the logged one (i.e., inverse of the sampling rate)
+        :param response_time: the request processing time in seconds or None if it has not been measured
+        :return: nothing
+        """
+        updates = {"request_count": F("request_count") + request_count}
+        if response_time is not None:
+            updates["timed_request_count"] = F("timed_request_count") + request_count
+            updates["total_response_time"] = F("total_response_time") + response_time * request_count
+            updates["max_response_time"] = Greatest(Coalesce(F("max_response_time"), Value(response_time)),
+                                                    Value(response_time))
+        statistics = cls.objects.filter(hour=hour, path_template=path_template, request_method=request_method,
+                                        status_class=status_class)
+        if statistics.update(**updates) > 0:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    hour=hour, path_template=path_template, request_method=request_method, status_class=status_class,
+                    request_count=request_count,
+                    timed_request_count=request_count if response_time is not None else 0.0,
+                    total_response_time=response_time * request_count if response_time is not None else 0.0,
+                    max_response_time=response_time,
+                )
+        except IntegrityError:
+            # The same row has just been created by a concurrent request
+            statistics.update(**updates)
+
+    @classmethod
+    def add_log(cls, log, resolver_match=None):
+        """
+        Adds a single log to the statistics
+
+        :param log: the log entity or the log model
+        :param resolver_match: the result of the request path resolution or None if it shall be resolved again
+        :return: nothing
+        """
+        request_date = log.request_date
+        if hasattr(request_date, "get"):
+            request_date = request_date.get()
+        cls.add_request(
+            cls.get_hour(request_date),
+            cls.get_path_template(log.log_address, resolver_match),
+            log.request_method,
+            cls.get_status_class(log.response_status),
+            1.0 / log.sampling_rate,
+            log.response_time,
+        )
+
+    @classmethod
+    def rebuild(cls, date_from, date_to):
+        """
+        Rebuilds the statistics from the raw logs.
+
+        The current hour is never rebuilt because its statistics is still updated by the log middleware and such
+        updates would be lost when the rebuilt rows replace the existent ones.
+
+        :param date_from: the statistics will be rebuilt for all hours starting from the hour containing this date
+        :param date_to: the statistics will be rebuilt for all hours up to the hour containing this date
+        :return: number of the statistics rows
+        """
+        hour_from = cls.get_hour(date_from)
+        hour_to = cls.get_hour(date_to)
+        if hour_to < date_to:
+            hour_to += timedelta(hours=1)
+        hour_to = min(hour_to, cls.get_hour(now()))
+        if hour_from >= hour_to:
+            return 0
+        log_list = Log.objects\
+            .filter(request_date__gte=hour_from, request_date__lt=hour_to)\
+            .values_list("request_date", "log_address", "request_method", "response_status", "sampling_rate",
+                         "response_time")\
+            .order_by()
+        rows = dict()
+        path_templates = dict()
+        for request_date, log_address, request_method, response_status, sampling_rate, response_time \
+                in log_list.iterator():
+            if log_address not in path_templates:
+                path_templates[log_address] = cls.get_path_template(log_address)
+            key = (cls.get_hour(request_date), path_templates[log_address], request_method,
+                   cls.get_status_class(response_status))
+            if key not in rows:
+                rows[key] = cls(hour=key[0], path_template=key[1], request_method=key[2], status_class=key[3])
+            row = rows[key]
+            request_count = 1.0 / sampling_rate
+            row.request_count += request_count
+            if response_time is not None:
+                row.timed_request_count += request_count
+                row.total_response_time += response_time * request_count
+                if row.max_response_time is None or response_time > row.max_response_time:
+                    row.max_response_time = response_time
+        with transaction.atomic():
+            cls.objects.filter(hour__gte=hour_from, hour__lt=hour_to).delete()
+            cls.objects.bulk_create(rows.values())
+        return len(rows)
+
+    def __str__(self):
+        return "LogStatistics(hour={hour}, path_template={path_template}, request_method={request_method}, " \
+               "status_class={status_class}, request_count={request_count})"\
+            .format(hour=self.hour, path_template=self.path_template, request_method=self.request_method,
+                    status_class=self.status_class, request_count=self.request_count)
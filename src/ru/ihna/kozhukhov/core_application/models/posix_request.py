@@ -22,6 +22,18 @@ class PosixRequest(models.Model):
     method_arguments = models.JSONField(editable=False)
     log = models.ForeignKey(Log, on_delete=models.CASCADE)
     status = models.CharField(max_length=1, choices=PosixRequestStatus.choices, default=PosixRequestStatus.INITIALIZED)
+    coalesced_logs = models.ManyToManyField(Log, related_name="coalesced_posix_requests", editable=False,
+                                            help_text="Logs of all requests that were merged into this request")
+    claim_token = models.CharField(max_length=32, null=True, editable=False,
+                                   help_text="Identifies the autoadmin iteration that processes the request")
+    claim_date = models.DateTimeField(null=True, editable=False,
+                                      help_text="When the request was claimed by the autoadmin daemon")
+
+    class Meta:
+        indexes = [
+            # The autoadmin daemon looks for requests with a given status in order of their initialization
+            models.Index(fields=["status", "initialization_date"], name="posix_request_status_date_idx"),
+        ]
 
     def print_initialization_date(self):
         """
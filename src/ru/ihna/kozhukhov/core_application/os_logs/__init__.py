@@ -0,0 +1,6 @@
+from .timestamp_parser import TimestampParser
+from .log_file import is_compressed, open_log_file, get_rotated_files
+from .log_line import parse_log_line, parse_log_line_slowly
+from .log_index import LogIndex
+from .log_reader import LogReader, LogSeriesReader, merge_logs
+from .log_follower import LogFollower, InotifyWatcher
@@ -0,0 +1,55 @@
+import gzip
+import os
+import re
+
+
+COMPRESSED_SUFFIX = ".gz"
+
+
+def is_compressed(log_path):
+    """
+    Checks whether the log file was compressed by the logrotate
+
+    :param log_path: full path to the log file
+    :return: True if the log file is compressed, False otherwise
+    """
+    return log_path.endswith(COMPRESSED_SUFFIX)
+
+
+def open_log_file(log_path):
+    """
+    Opens the log file for reading in binary mode. Compressed log files are decompressed on the fly
+
+    :param log_path: full path to the log file
+    :return: the file object
+    """
+    if is_compressed(log_path):
+        return gzip.open(log_path, 'rb')
+    else:
+        return open(log_path, 'rb')
+
+
+def get_rotated_files(log_path):
+    """
+    Looks for all files that belong to the same rotated series as a given log file. The logrotate moves the 'syslog'
+    file to 'syslog.1', the 'syslog.1' file to 'syslog.2' or 'syslog.2.gz' and so on. Hence, the higher the rotation
+    number is, the older the log lines are.
+
+    :param log_path: full path to the current log file
+    :return: list of full paths to all existent log files of the series starting from the oldest one
+    """
+    log_directory, log_name = os.path.split(log_path)
+    template = re.compile(r'^%s(?:\.(\d+))?(?:%s)?$' % (re.escape(log_name), re.escape(COMPRESSED_SUFFIX)))
+    rotated_files = []
+    try:
+        filenames = os.listdir(log_directory)
+    except OSError:
+        return []
+    for filename in filenames:
+        match = template.match(filename)
+        full_path = os.path.join(log_directory, filename)
+        if match is not None and os.path.isfile(full_path):
+            rotation_number = int(match.group(1)) if match.group(1) is not None else 0
+            rotated_files.append((rotation_number, full_path))
+    rotated_files.sort(reverse=True)
+    return [full_path for rotation_number, full_path in rotated_files]
@@ -0,0 +1,275 @@
+import ctypes
+import os
+import select
+import sys
+import time
+from logging import getLogger
+
+from .log_file import get_rotated_files, is_compressed
+from .log_line import parse_log_line
+from .log_reader import merge_logs
+from .timestamp_parser import TimestampParser
+
+
+class InotifyWatcher:
+    """
+    Waits for changes within the log directory using the Linux inotify API.
+    The watcher is available on Linux only, use the LogFollower.create_watcher to create it.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+
+    EVENT_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    """ Writing to the log file, its truncation, rotation and creation will wake the watcher up """
+
+    EVENT_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, directory):
+        """
+        Starts watching the directory
+
+        :param directory: the directory to watch
+        """
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._descriptor < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+        if libc.inotify_add_watch(self._descriptor, os.fsencode(directory), self.EVENT_MASK) < 0:
+            error_number = ctypes.get_errno()
+            self.close()
+            raise OSError(error_number, os.strerror(error_number))
+
+    def wait(self, timeout):
+        """
+        Waits until something is changed in the directory
+
+        :param timeout: maximum waiting time, in seconds
+        :return: True if the directory was changed, False if the timeout has expired
+        """
+        readable, writable, exceptional = select.select([self._descriptor], [], [], timeout)
+        if len(readable) == 0:
+            return False
+        try:
+            while os.read(self._descriptor, self.EVENT_BUFFER_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        """
+        Stops watching the directory
+
+        :return: nothing
+        """
+        os.close(self._descriptor)
+
+
+class LogFollower:
+    """
+    Reads log lines that have been written to the log files since the previous reading.
+
+    The follower remembers a position (device, inode, offset) for each log file, so the log files are never read
+    from the beginning. When the log file is truncated, it is read from the beginning. When the log file is rotated,
+    the rest of the rotated copy is read before the new log file.
+    """
+
+    MAX_READ_SIZE = 1024 * 1024
+    """ Maximum number of bytes to read during a single call, the rest will be read during the next call """
+
+    POLL_INTERVAL = 0.5
+    """ Interval between two subsequent checks of the log files when the inotify is not available, in seconds """
+
+    __logger = getLogger("django.corefacility.log")
+
+    def __init__(self, log_paths, positions=None):
+        """
+        Initializes the follower
+
+        :param log_paths: list of full paths to the log files
+        :param positions: the positions returned by the previous follower or None to follow the log files from their
+            current ends
+        """
+        self.log_paths = log_paths
+        self.positions = {}
+        self._sizes = {}
+        positions = positions or {}
+        for log_path in log_paths:
+            try:
+                log_stat = os.stat(log_path)
+            except OSError:
+                log_stat = None
+            if log_path in positions:
+                self.positions[log_path] = tuple(positions[log_path])
+            elif log_stat is not None:
+                self.positions[log_path] = (log_stat.st_dev, log_stat.st_ino, log_stat.st_size)
+            else:
+                self.positions[log_path] = (None, None, 0)
+            # All lines that have been written after the position are treated as new ones
+            self._sizes[log_path] = self.positions[log_path][2]
+
+    def read(self, timestamp_parser=None):
+        """
+        Reads all new log lines
+
+        :param timestamp_parser: the TimestampParser instance or None to create the new one
+        :return: list of (time, hostname, message) tuples ordered by time
+        """
+        if timestamp_parser is None:
+            timestamp_parser = TimestampParser()
+        budget = self.MAX_READ_SIZE
+        log_lines = []
+        for log_path in self.log_paths:
+            lines, budget = self._read_file(log_path, budget)
+            log_lines.append([
+                log_info for log_info in
+                (parse_log_line(line.decode('utf-8', errors='replace'), timestamp_parser) for line in lines)
+                if log_info is not None
+            ])
+        return list(merge_logs(log_lines))
+
+    def is_changed(self):
+        """
+        Checks whether some of the log files have been changed since the last reading
+
+        :return: True if at least one log file was changed, False otherwise
+        """
+        for log_path in self.log_paths:
+            device, inode, offset = self.positions[log_path]
+            try:
+                log_stat = os.stat(log_path)
+            except OSError:
+                continue
+            if log_stat.st_dev != device or log_stat.st_ino != inode or \
+                    log_stat.st_size != self._sizes[log_path]:
+                return True
+        return False
+
+    def wait(self, timeout):
+        """
+        Waits until some of the log files are changed. The inotify is used when available,
+        the log files are polled otherwise.
+
+        :param timeout: maximum waiting time, in seconds
+        :return: True if some of the log files were changed, False if the timeout has expired
+        """
+        watcher = self.create_watcher({os.path.dirname(log_path) for log_path in self.log_paths})
+        try:
+            # The log files may be changed before the watcher has been created
+            if self.is_changed():
+                return True
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if watcher is not None:
+                    watcher.wait(remaining)
+                else:
+                    time.sleep(min(self.POLL_INTERVAL, remaining))
+                if self.is_changed():
+                    return True
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    @classmethod
+    def create_watcher(cls, directories):
+        """
+        Creates the inotify watcher for the log directory
+
+        :param directories: set of directories containing the log files
+        :return: the InotifyWatcher instance or None if the inotify is not available and the log files shall be polled
+        """
+        if not sys.platform.startswith("linux") or len(directories) != 1:
+            return None
+        try:
+            return InotifyWatcher(next(iter(directories)))
+        except (OSError, AttributeError) as error:
+            cls.__logger.debug("The inotify is not available, the log files will be polled: %s" % error)
+            return None
+
+    def _read_file(self, log_path, budget):
+        """
+        Reads new lines from a single log file and moves its position
+
+        :param log_path: full path to the log file
+        :param budget: maximum number of bytes to read
+        :return: a tuple (lines, budget) where lines is a list of raw log lines and budget is the rest of the budget
+        """
+        device, inode, offset = self.positions[log_path]
+        try:
+            log_stat = os.stat(log_path)
+        except OSError:
+            return [], budget  # the log file has been rotated but not created yet
+        lines = []
+        if device != log_stat.st_dev or inode != log_stat.st_ino:
+            rotated_path = self._find_rotated_file(log_path, device, inode)
+            if rotated_path is not None:
+                rotated_lines, rotated_offset, budget = self._read_lines(rotated_path, offset, budget, True)
+                lines.extend(rotated_lines)
+                if budget <= 0:
+                    self.positions[log_path] = (device, inode, rotated_offset)
+                    return lines, budget
+            offset = 0
+        elif log_stat.st_size < offset:
+            offset = 0  # the log file has been truncated
+        new_lines, offset, budget = self._read_lines(log_path, offset, budget, False)
+        lines.extend(new_lines)
+        self.positions[log_path] = (log_stat.st_dev, log_stat.st_ino, offset)
+        # When the budget is exhausted the log file shall be treated as changed since it contains unread lines
+        self._sizes[log_path] = log_stat.st_size if budget > 0 else offset
+        return lines, budget
+
+    @staticmethod
+    def _find_rotated_file(log_path, device, inode):
+        """
+        Looks for the rotated copy of the log file that has not been compressed yet
+
+        :param log_path: full path to the log file
+        :param device: device of the log file before rotation
+        :param inode: inode of the log file before rotation
+        :return: full path to the rotated copy or None if the rotated copy was not found
+        """
+        if inode is None:
+            return None
+        for rotated_path in get_rotated_files(log_path):
+            if rotated_path == log_path or is_compressed(rotated_path):
+                continue
+            try:
+                rotated_stat = os.stat(rotated_path)
+            except OSError:
+                continue
+            if rotated_stat.st_dev == device and rotated_stat.st_ino == inode:
+                return rotated_path
+        return None
+
+    @staticmethod
+    def _read_lines(log_path, offset, budget, complete):
+        """
+        Reads lines from the log file starting from a given offset
+
+        :param log_path: full path to the log file
+        :param offset: the offset to start from
+        :param budget: maximum number of bytes to read
+        :param complete: True if nothing will be written to the log file, so its last line may be read even when
+            it is not terminated by the newline character
+        :return: a tuple (lines, offset, budget) where offset is the position right after the last read line
+        """
+        lines = []
+        with open(log_path, 'rb') as log_file:
+            log_file.seek(offset)
+            for line in log_file:
+                if budget <= 0 or (not complete and not line.endswith(b"\n")):
+                    break
+                lines.append(line)
+                offset += len(line)
+                budget -= len(line)
+        return lines, offset, budget
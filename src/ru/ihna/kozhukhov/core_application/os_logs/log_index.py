@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from datetime import datetime
+from logging import getLogger
+
+from django.conf import settings
+
+from .log_file import is_compressed, open_log_file
+from .log_line import parse_log_line
+from .timestamp_parser import TimestampParser
+
+
+class LogIndex:
+    """
+    A persistent sparse index that maps the log time to byte offsets within a single log file.
+
+    The log file is divided into chunks of about CHUNK_SIZE bytes, each chunk starts at the beginning of some line
+    and finishes at the end of some line. For each chunk the index stores its byte offset, the minimum and maximum
+    time of all log lines within the chunk and all hostnames mentioned in the chunk. Hence, the log reader may skip
+    all chunks that are definitely out of the requested time range. Hostnames mentioned in the unindexed tail of the
+    file are also stored, so the index knows all hosts of the log file without reading it.
+
+    The index is updated incrementally: when the log file grows, only new lines are parsed. The index is discarded
+    when the log file is rotated (i.e., its inode is changed) or truncated.
+
+    Log files compressed by the logrotate are never changed. Such files are indexed entirely at once, the offsets
+    refer to the decompressed content and the index is attached to the file itself rather than to its path,
+    so the index survives further rotations.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    """ Approximate size of a single chunk, in bytes """
+
+    INDEX_VERSION = 3
+    """ Increase this value every time when the format of the index file is changed """
+
+    DEFAULT_INDEX_DIRECTORY = os.path.join(".cache", "corefacility", "os_log_index")
+    """
+    The index files are saved to this directory inside the home directory of the user running the application given
+    that the CORE_OS_LOG_INDEX_DIR setting is empty
+    """
+
+    INDEX_DIRECTORY_MODE = 0o700
+    """
+    The index directory shall be accessible to the application user only, otherwise another user could plant
+    the index that points the log reader to arbitrary offsets
+    """
+
+    __logger = getLogger("django.corefacility.log")
+
+    def __init__(self, log_path):
+        """
+        Loads the index for a given log file and brings it in line with the current state of the file.
+
+        :param log_path: full path to the log file
+        """
+        self.log_path = log_path
+        self.compressed = is_compressed(log_path)
+        self.device = None
+        self.inode = None
+        self.file_size = None
+        self.indexed_size = 0
+        self.chunks = []
+        self.tail_hosts = set()
+        self._log_stat = os.stat(log_path)
+        self._load()
+        self.update()
+
+    @classmethod
+    def get_index_directory(cls):
+        """
+        Returns the directory where all index files are located
+
+        :return: full path to the directory
+        """
+        index_directory = getattr(settings, "CORE_OS_LOG_INDEX_DIR", "")
+        if not index_directory:
+            index_directory = os.path.join(os.path.expanduser("~"), cls.DEFAULT_INDEX_DIRECTORY)
+        return index_directory
+
+    @classmethod
+    def check_index_directory(cls):
+        """
+        Checks that the index directory belongs to the current user and is not accessible to other users
+
+        :return: nothing
+        :raise PermissionError: if the index directory can't be trusted
+        """
+        index_directory = cls.get_index_directory()
+        directory_stat = os.lstat(index_directory)
+        if not stat.S_ISDIR(directory_stat.st_mode) or directory_stat.st_uid != os.getuid() or \
+                stat.S_IMODE(directory_stat.st_mode) != cls.INDEX_DIRECTORY_MODE:
+            raise PermissionError("The index directory %s shall be owned by the current user and have %o mode" %
+                                  (index_directory, cls.INDEX_DIRECTORY_MODE))
+
+    @property
+    def index_path(self):
+        """
+        Full path to the index file
+        """
+        if self.compressed:
+            index_key = "%d:%d:%d" % (self._log_stat.st_dev, self._log_stat.st_ino, self._log_stat.st_size)
+        else:
+            index_key = os.path.abspath(self.log_path)
+        index_name = hashlib.sha1(index_key.encode("utf-8")).hexdigest() + ".json"
+        return os.path.join(self.get_index_directory(), index_name)
+
+    def update(self):
+        """
+        Indexes all log lines that have been written to the log file since the last update.
+        The index is discarded when the log file is rotated or truncated.
+
+        :return: nothing
+        """
+        log_stat = self._log_stat = os.stat(self.log_path)
+        if log_stat.st_dev != self.device or log_stat.st_ino != self.inode or \
+                (self.compressed and log_stat.st_size != self.file_size) or \
+                (not self.compressed and log_stat.st_size < self.indexed_size):
+            self.device = log_stat.st_dev
+            self.inode = log_stat.st_ino
+            self.file_size = None
+            self.indexed_size = 0
+            self.chunks = []
+            self.tail_hosts = set()
+        if self.compressed:
+            if self.file_size is not None:
+                return  # the compressed file has already been indexed entirely
+        elif log_stat.st_size == self.file_size:
+            return  # nothing has been written since the last update
+        chunk_number = len(self.chunks)
+        tail_hosts = self.tail_hosts
+        timestamp_parser = TimestampParser()
+        with open_log_file(self.log_path) as log_file:
+            log_file.seek(self.indexed_size)
+            chunk_offset = self.indexed_size
+            chunk_min = None
+            chunk_max = None
+            chunk_hosts = set()
+            position = chunk_offset
+            for line in log_file:
+                if not line.endswith(b"\n") and not self.compressed:
+                    break  # the line is still being written
+                position += len(line)
+                log_info = parse_log_line(line.decode("utf-8", errors="replace"), timestamp_parser)
+                if log_info is not None:
+                    chunk_min = log_info[0] if chunk_min is None else min(chunk_min, log_info[0])
+                    chunk_max = log_info[0] if chunk_max is None else max(chunk_max, log_info[0])
+                    chunk_hosts.add(log_info[1])
+                if position - chunk_offset >= self.CHUNK_SIZE:
+                    self.chunks.append([chunk_offset, chunk_min, chunk_max, sorted(chunk_hosts)])
+                    self.indexed_size = chunk_offset = position
+                    chunk_min = chunk_max = None
+                    chunk_hosts = set()
+            if self.compressed and position > chunk_offset:
+                self.chunks.append([chunk_offset, chunk_min, chunk_max, sorted(chunk_hosts)])
+                self.indexed_size = position
+            elif not self.compressed:
+                # The tail is too small to become a chunk, it is parsed again during the next update
+                self.tail_hosts = chunk_hosts
+        self.file_size = log_stat.st_size
+        if len(self.chunks) > chunk_number or self.compressed or self.tail_hosts != tail_hosts:
+            self._save()
+
+    @property
+    def hosts(self):
+        """
+        Set of all hostnames mentioned in the log file
+        """
+        hosts = set(self.tail_hosts)
+        for chunk in self.chunks:
+            hosts.update(chunk[3])
+        return hosts
+
+    def get_ranges(self, start=None, end=None, merge=True):
+        """
+        Returns all regions of the log file that may contain log lines within a given time range
+
+        :param start: the minimum log time or None if no lower bound is given
+        :param end: the maximum log time or None if no upper bound is given
+        :param merge: True to merge adjacent chunks into a single region, False to return each chunk as a separate
+            region
+        :return: list of tuples (range_start, range_end) where range_start is offset of the first byte of the region
+            and range_end is offset of the first byte after the region or None if the region is up to the end of file
+        """
+        ranges = []
+        boundaries = [chunk[0] for chunk in self.chunks[1:]] + [self.indexed_size]
+        for (chunk_offset, chunk_min, chunk_max, chunk_hosts), chunk_end in zip(self.chunks, boundaries):
+            if chunk_min is not None and (
+                    (start is not None and chunk_max < start) or (end is not None and chunk_min > end)):
+                continue
+            if merge and len(ranges) > 0 and ranges[-1][1] == chunk_offset:
+                ranges[-1][1] = chunk_end
+            else:
+                ranges.append([chunk_offset, chunk_end])
+        # The non-indexed tail of the log file shall always be read. Compressed files have no such a tail.
+        if not self.compressed:
+            if merge and len(ranges) > 0 and ranges[-1][1] == self.indexed_size:
+                ranges[-1][1] = None
+            else:
+                ranges.append([self.indexed_size, None])
+        return [tuple(log_range) for log_range in ranges]
+
+    def _load(self):
+        """
+        Loads the index from the index file. If the index file doesn't exist or damaged or the index directory
+        can't be trusted, the index remains empty.
+
+        :return: nothing
+        """
+        try:
+            self.check_index_directory()
+            with open(self.index_path, "r") as index_file:
+                index_data = json.load(index_file)
+            if index_data["version"] != self.INDEX_VERSION or \
+                    (not self.compressed and index_data["log_path"] != self.log_path):
+                return
+            chunks = [
+                [offset, self._time_from_json(chunk_min), self._time_from_json(chunk_max), chunk_hosts]
+                for offset, chunk_min, chunk_max, chunk_hosts in index_data["chunks"]
+            ]
+            self.device = index_data["device"]
+            self.inode = index_data["inode"]
+            self.file_size = index_data["file_size"]
+            self.indexed_size = index_data["indexed_size"]
+            self.tail_hosts = set(index_data["tail_hosts"])
+            self.chunks = chunks
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save(self):
+        """
+        Saves the index to the index file. The index file is replaced atomically, so concurrent processes will
+        read either previous or new version of the index.
+
+        :return: nothing
+        """
+        index_data = {
+            "version": self.INDEX_VERSION,
+            "log_path": self.log_path,
+            "device": self.device,
+            "inode": self.inode,
+            "file_size": self.file_size,
+            "indexed_size": self.indexed_size,
+            "tail_hosts": sorted(self.tail_hosts),
+            "chunks": [
+                [offset, self._time_to_json(chunk_min), self._time_to_json(chunk_max), chunk_hosts]
+                for offset, chunk_min, chunk_max, chunk_hosts in self.chunks
+            ],
+        }
+        try:
+            index_directory = self.get_index_directory()
+            os.makedirs(index_directory, mode=self.INDEX_DIRECTORY_MODE, exist_ok=True)
+            self.check_index_directory()
+            descriptor, temporary_path = tempfile.mkstemp(dir=index_directory, suffix=".tmp")
+            with os.fdopen(descriptor, "w") as index_file:
+                json.dump(index_data, index_file)
+            os.replace(temporary_path, self.index_path)
+        except OSError as error:
+            # The index will be rebuilt during the next request
+            self.__logger.warning("Unable to save the index for the log file %s: %s" % (self.log_path, error))
+
+    @staticmethod
+    def _time_to_json(time):
+        return time.isoformat() if time is not None else None
+
+    @staticmethod
+    def _time_from_json(value):
+        return datetime.fromisoformat(value) if value is not None else None
@@ -0,0 +1,57 @@
+from dateutil import parser
+from django.utils.timezone import is_aware, make_naive
+
+from .timestamp_parser import TimestampParser
+
+
+def parse_log_line(line, timestamp_parser=None):
+    """
+    Parses a single line of the rsyslog file
+
+    :param line: the line to parse
+    :param timestamp_parser: the TimestampParser instance. Create a single instance and pass it here when you need to
+        parse many lines, otherwise the parser will be created for each line.
+    :return: a tuple (time, hostname, message) where time is naive datetime in the local timezone, or None if the line
+        doesn't contain the timestamp and the hostname
+    """
+    if timestamp_parser is None:
+        timestamp_parser = TimestampParser()
+    timestamp_info = timestamp_parser.parse(line)
+    if timestamp_info is None:
+        return parse_log_line_slowly(line)
+    time, position = timestamp_info
+    log_info = line[position:].strip().split(maxsplit=1)
+    if len(log_info) == 0:
+        return None
+    return time, log_info[0], log_info[1] if len(log_info) > 1 else ''
+
+
+def parse_log_line_slowly(line):
+    """
+    Parses a single line of the rsyslog file with unknown timestamp format. The longest sequence of words at the
+    beginning of the line that can be parsed by the dateutil is treated as the timestamp.
+
+    :param line: the line to parse
+    :return: a tuple (time, hostname, message) where time is naive datetime in the local timezone, or None if the line
+        doesn't contain the timestamp and the hostname
+    """
+    log_info = line.strip().split()
+    if len(log_info) == 0:
+        return None
+    if log_info[0].find('<') != -1 and log_info[0].find('>') != -1:
+        log_info = log_info[1:]
+    time = None
+    hostname_index = 1
+    while hostname_index < len(log_info):
+        timestamp = ' '.join(log_info[:hostname_index])
+        try:
+            time = parser.parse(timestamp)
+        except (parser.ParserError, OverflowError):
+            hostname_index -= 1
+            break
+        hostname_index += 1
+    if time is None or hostname_index > len(log_info) - 1:
+        return None
+    if is_aware(time):
+        time = make_naive(time)
+    return time, log_info[hostname_index], ' '.join(log_info[hostname_index+1:])
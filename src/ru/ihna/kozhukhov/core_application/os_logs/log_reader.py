@@ -0,0 +1,181 @@
+import heapq
+import os
+from operator import itemgetter
+
+from .log_file import get_rotated_files, open_log_file
+from .log_index import LogIndex
+from .log_line import parse_log_line
+from .timestamp_parser import TimestampParser
+
+
+class LogReader:
+    """
+    Lazily reads a single log file in the time order.
+
+    The log file is assumed to be written by the rsyslog which means that all log lines are ordered by time.
+    Hence, the log lines are not sorted but just read from the beginning to the end (in the ascending mode)
+    or from the end to the beginning (in the descending mode). The sparse time index is used to skip regions
+    of the log file that are out of the requested time range. Log files compressed by the logrotate are
+    decompressed on the fly; the whole file is skipped when it is out of the requested time range.
+
+    Iteration over the reader gives (time, hostname, message) tuples.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+    """ Size of a single block that is read when the log file is read backwards, in bytes """
+
+    def __init__(self, log_path, start=None, end=None, reverse=False, timestamp_parser=None):
+        """
+        Initializes the reader. The log file is not read until the iteration starts.
+
+        :param log_path: full path to the log file
+        :param start: the minimum log time or None if no lower bound is given
+        :param end: the maximum log time or None if no upper bound is given
+        :param reverse: False to read log lines in ascending order, True to read them in descending order
+        :param timestamp_parser: the TimestampParser instance that may be shared among several readers
+        """
+        self.log_path = log_path
+        self.start = start
+        self.end = end
+        self.reverse = reverse
+        self.timestamp_parser = timestamp_parser if timestamp_parser is not None else TimestampParser()
+        self.log_index = LogIndex(log_path)
+        self.hosts = self.log_index.hosts
+
+    def __iter__(self):
+        """
+        Reads the log lines within the time range. All hostnames mentioned in the read lines are added to
+        the hosts set.
+
+        :return: generator of (time, hostname, message) tuples
+        """
+        # Compressed files can't be read backwards efficiently, so each chunk is decompressed forward and reversed
+        # in memory. Adjacent chunks are not merged in this case, so no more than a single chunk is kept in memory.
+        reverse_compressed = self.reverse and self.log_index.compressed
+        ranges = self.log_index.get_ranges(self.start, self.end, merge=not reverse_compressed)
+        if len(ranges) == 0:
+            return
+        with open_log_file(self.log_path) as log_file:
+            if reverse_compressed:
+                lines = (line
+                         for range_start, range_end in reversed(ranges)
+                         for line in reversed(list(self._read_forward(log_file, range_start, range_end))))
+            elif self.reverse:
+                file_size = os.fstat(log_file.fileno()).st_size
+                lines = (line
+                         for range_start, range_end in reversed(ranges)
+                         for line in self._read_backward(log_file, range_start, range_end or file_size))
+            else:
+                lines = (line
+                         for range_start, range_end in ranges
+                         for line in self._read_forward(log_file, range_start, range_end))
+            for line in lines:
+                log_info = parse_log_line(line.decode('utf-8', errors='replace'), self.timestamp_parser)
+                if log_info is None:
+                    continue
+                time = log_info[0]
+                # Log lines are ordered by time, so no further line is within the time range
+                if not self.reverse and self.end is not None and time > self.end:
+                    break
+                if self.reverse and self.start is not None and time < self.start:
+                    break
+                if (self.start is not None and time < self.start) or (self.end is not None and time > self.end):
+                    continue
+                self.hosts.add(log_info[1])
+                yield log_info
+
+    @staticmethod
+    def _read_forward(log_file, range_start, range_end):
+        """
+        Reads the region of the log file from its beginning to its end
+
+        :param log_file: the log file opened in binary mode
+        :param range_start: offset of the first byte of the region
+        :param range_end: offset of the first byte after the region or None if the region is up to the end of file
+        :return: generator of log lines
+        """
+        log_file.seek(range_start)
+        position = range_start
+        for line in log_file:
+            if range_end is not None and position >= range_end:
+                break
+            position += len(line)
+            yield line
+
+    def _read_backward(self, log_file, range_start, range_end):
+        """
+        Reads the region of the log file from its end to its beginning
+
+        :param log_file: the log file opened in binary mode
+        :param range_start: offset of the first byte of the region
+        :param range_end: offset of the first byte after the region
+        :return: generator of log lines
+        """
+        position = range_end
+        remainder = b""
+        while position > range_start:
+            block_size = min(self.BLOCK_SIZE, position - range_start)
+            position -= block_size
+            log_file.seek(position)
+            lines = (log_file.read(block_size) + remainder).split(b"\n")
+            remainder = lines[0]  # this line may continue in the previous block
+            yield from reversed(lines[1:])
+        yield remainder
+
+
+class LogSeriesReader:
+    """
+    Lazily reads the rotated series of log files (e.g., 'syslog.2.gz', 'syslog.1', 'syslog') as a single
+    time-ordered stream.
+
+    Iteration over the reader gives (time, hostname, message) tuples.
+    """
+
+    def __init__(self, log_path, start=None, end=None, reverse=False, timestamp_parser=None):
+        """
+        Initializes the reader. The log files are not read until the iteration starts.
+
+        :param log_path: full path to the current log file of the series
+        :param start: the minimum log time or None if no lower bound is given
+        :param end: the maximum log time or None if no upper bound is given
+        :param reverse: False to read log lines in ascending order, True to read them in descending order
+        :param timestamp_parser: the TimestampParser instance that may be shared among several readers
+        """
+        if timestamp_parser is None:
+            timestamp_parser = TimestampParser()
+        self.readers = [LogReader(rotated_path, start, end, reverse, timestamp_parser)
+                        for rotated_path in get_rotated_files(log_path)]
+        if reverse:
+            self.readers.reverse()
+
+    @property
+    def hosts(self):
+        """
+        Set of all hostnames mentioned in the series
+        """
+        hosts = set()
+        for reader in self.readers:
+            hosts.update(reader.hosts)
+        return hosts
+
+    def __iter__(self):
+        """
+        Reads the log lines within the time range from all files of the series
+
+        :return: generator of (time, hostname, message) tuples
+        """
+        for reader in self.readers:
+            yield from reader
+
+
+def merge_logs(readers, reverse=False):
+    """
+    Merges several log readers into a single time-ordered stream using the heap-based k-way merge.
+    Only the current line of each reader is kept in memory, so the stream may be interrupted at any moment
+    without reading the rest of the log files.
+
+    :param readers: list of LogReader or LogSeriesReader instances. All readers must have the same reading direction
+    :param reverse: False for ascending order, True for descending order
+    :return: generator of (time, hostname, message) tuples
+    """
+    return heapq.merge(*readers, key=itemgetter(0), reverse=reverse)
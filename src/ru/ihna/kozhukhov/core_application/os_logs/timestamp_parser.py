@@ -0,0 +1,108 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+from django.utils.timezone import get_current_timezone, now
+
+
+class TimestampParser:
+    """
+    Recognizes the timestamp at the beginning of the syslog line in one pass.
+
+    The following formats are supported:
+        - RFC 3164 (traditional rsyslog format): 'Mar  1 10:00:00'. The year is not given in such a format and is
+          assumed to be the current one (or the previous one when the timestamp turns out to be in the future).
+        - RFC 3339 timestamps used by RFC 5424 and by the high-precision rsyslog format:
+          '2024-03-01T10:00:00.123456+03:00'. The fractional part and the timezone offset are optional.
+
+    The optional priority ('<34>') and the RFC 5424 protocol version ('<34>1 ') are skipped.
+    All aware timestamps are transformed to naive timestamps in the current timezone.
+    """
+
+    PREFIX = re.compile(r'\s*(?:<\d{1,3}>(?:\d{1,2} )?\s*)?')
+    """ Leading spaces, the syslog priority and the protocol version """
+
+    RFC3164_TIMESTAMP = re.compile(
+        r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) +(\d{1,2}) (\d\d):(\d\d):(\d\d)(?=\s)'
+    )
+
+    RFC3339_TIMESTAMP = re.compile(
+        r'(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d)(?:[.,](\d{1,9}))?(Z|[+-]\d\d:?\d\d)?(?=\s)'
+    )
+
+    MONTHS = {name: number for number, name in
+              enumerate(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
+
+    FUTURE_TOLERANCE = timedelta(days=1)
+    """ RFC 3164 timestamps that are later than now plus this value are referred to the previous year """
+
+    def __init__(self):
+        """
+        Initializes the parser. The parser shall be re-created when the current timezone is changed
+        """
+        self._local_timezone = get_current_timezone()
+        self._offsets = {"Z": timezone.utc}
+        local_now = now().astimezone(self._local_timezone).replace(tzinfo=None)
+        self._current_year = local_now.year
+        self._future_limit = local_now + self.FUTURE_TOLERANCE
+
+    def parse(self, line):
+        """
+        Recognizes the timestamp at the beginning of the line
+
+        :param line: the syslog line
+        :return: a tuple (time, position) where time is the naive datetime in the current timezone and position is
+            index of the first character after the timestamp, or None if the timestamp format is unknown
+        """
+        position = self.PREFIX.match(line).end()
+        try:
+            match = self.RFC3339_TIMESTAMP.match(line, position)
+            if match is not None:
+                return self._rfc3339_time(match), match.end()
+            match = self.RFC3164_TIMESTAMP.match(line, position)
+            if match is not None:
+                return self._rfc3164_time(match), match.end()
+        except ValueError:
+            pass  # The timestamp looks like a known one but contains invalid values (e.g., 'Feb 30')
+        return None
+
+    def _rfc3339_time(self, match):
+        """
+        Transforms the recognized RFC 3339 timestamp to the datetime
+
+        :param match: the regular expression match
+        :return: naive datetime in the current timezone
+        """
+        year, month, day, hour, minute, second, fraction, offset = match.groups()
+        microsecond = int(fraction[:6].ljust(6, "0")) if fraction is not None else 0
+        time = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second), microsecond)
+        if offset is not None:
+            time = time.replace(tzinfo=self._get_timezone(offset))\
+                .astimezone(self._local_timezone)\
+                .replace(tzinfo=None)
+        return time
+
+    def _rfc3164_time(self, match):
+        """
+        Transforms the recognized RFC 3164 timestamp to the datetime
+
+        :param match: the regular expression match
+        :return: naive datetime in the current timezone
+        """
+        month, day, hour, minute, second = match.groups()
+        time = datetime(self._current_year, self.MONTHS[month], int(day), int(hour), int(minute), int(second))
+        if time > self._future_limit:
+            time = time.replace(year=self._current_year - 1)
+        return time
+
+    def _get_timezone(self, offset):
+        """
+        Returns the timezone for a given UTC offset
+
+        :param offset: the UTC offset in the form '+03:00', '+0300' or 'Z'
+        :return: the timezone object
+        """
+        if offset not in self._offsets:
+            sign = -1 if offset[0] == "-" else 1
+            digits = offset[1:].replace(":", "")
+            self._offsets[offset] = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+        return self._offsets[offset]
@@ -0,0 +1,18 @@
+from .sensor_reader import SensorReader
+from .hwmon_sensor_reader import HwmonSensorReader
+from .lm_sensors_reader import LmSensorsReader
+from .process_tracker import ProcessTracker
+from .process_snapshot import ProcessSnapshot
+
+
+def get_sensor_reader(hwmon_directory=None):
+    """
+    Chooses the fastest reader that can read the temperature sensors on this machine
+
+    :param hwmon_directory: the sysfs directory containing all hwmon devices or None for the default one
+    :return: the HwmonSensorReader if the hwmon interface provides any temperature sensor, the LmSensorsReader otherwise
+    """
+    reader = HwmonSensorReader(hwmon_directory)
+    if reader.is_available():
+        return reader
+    return LmSensorsReader()
@@ -0,0 +1,149 @@
+import os
+import re
+
+from .sensor_reader import SensorReader
+
+
+class HwmonSensorReader(SensorReader):
+    """
+    Reads the temperature sensors directly from the Linux hwmon sysfs interface.
+
+    The sensor layout (chip names, sensor labels and thresholds) is revealed once, during the first reading.
+    After that, only one small file is read for each sensor. The layout is revealed again when some sensor disappears.
+    """
+
+    HWMON_DIRECTORY = "/sys/class/hwmon"
+
+    TEMPERATURE_INPUT = re.compile(r'^temp(\d+)_input$')
+
+    THRESHOLDS = ["max", "crit"]
+    """ These thresholds will be read together with the temperature values """
+
+    MILLIDEGREES = 1000.0
+    """ The hwmon interface gives all temperatures in millidegrees Celsius """
+
+    def __init__(self, hwmon_directory=None):
+        """
+        Initializes the reader
+
+        :param hwmon_directory: the sysfs directory containing all hwmon devices or None for the default one
+        """
+        self.hwmon_directory = hwmon_directory if hwmon_directory is not None else self.HWMON_DIRECTORY
+        self._sensors = None
+
+    def is_available(self):
+        """
+        Checks whether the hwmon interface provides at least one temperature sensor
+
+        :return: True if the sensors can be read by this reader, False otherwise
+        """
+        if self._sensors is None:
+            self._sensors = self._find_sensors()
+        return len(self._sensors) > 0
+
+    def read(self):
+        """
+        Reads all temperature sensors
+
+        :return: dictionary chip name => sensor label => {'tempN_input': value, 'tempN_max': value, ...}
+        """
+        if self._sensors is None:
+            self._sensors = self._find_sensors()
+        try:
+            return self._read_sensors()
+        except OSError:
+            self._sensors = self._find_sensors()
+            return self._read_sensors(skip_unreadable=True)
+
+    def _read_sensors(self, skip_unreadable=False):
+        """
+        Reads all temperature sensors revealed before. Sensors with malformed values are skipped
+
+        :param skip_unreadable: True to skip sensors that can't be read, False to raise OSError for them
+        :return: dictionary chip name => sensor label => {'tempN_input': value, 'tempN_max': value, ...}
+        """
+        sensor_info = dict()
+        for chip_name, sensor_label, input_name, input_path, thresholds in self._sensors:
+            try:
+                sensor_values = {input_name: self._read_temperature(input_path)}
+            except ValueError:
+                continue
+            except OSError:
+                if skip_unreadable:
+                    continue
+                raise
+            sensor_values.update(thresholds)
+            sensor_info.setdefault(chip_name, dict())[sensor_label] = sensor_values
+        return sensor_info
+
+    def _find_sensors(self):
+        """
+        Reveals all temperature sensors provided by the hwmon interface
+
+        :return: list of (chip_name, sensor_label, input_name, input_path, thresholds) tuples
+        """
+        sensors = list()
+        try:
+            device_names = sorted(os.listdir(self.hwmon_directory))
+        except OSError:
+            return sensors
+        for device_name in device_names:
+            device_path = os.path.join(self.hwmon_directory, device_name)
+            chip_name = self._read_string(os.path.join(device_path, "name"))
+            if chip_name is None:
+                continue
+            chip_name = "%s-%s" % (chip_name, device_name)
+            # Old kernels put the sensor attributes to the 'device' subdirectory
+            for attribute_path in (device_path, os.path.join(device_path, "device")):
+                try:
+                    attribute_names = sorted(os.listdir(attribute_path))
+                except OSError:
+                    continue
+                for attribute_name in attribute_names:
+                    match = self.TEMPERATURE_INPUT.match(attribute_name)
+                    if match is None:
+                        continue
+                    prefix = "temp%s" % match.group(1)
+                    sensor_label = self._read_string(os.path.join(attribute_path, prefix + "_label")) or prefix
+                    thresholds = dict()
+                    for threshold in self.THRESHOLDS:
+                        threshold_name = "%s_%s" % (prefix, threshold)
+                        try:
+                            thresholds[threshold_name] = \
+                                self._read_temperature(os.path.join(attribute_path, threshold_name))
+                        except (OSError, ValueError):
+                            pass
+                    input_path = os.path.join(attribute_path, attribute_name)
+                    try:
+                        self._read_temperature(input_path)
+                    except (OSError, ValueError):
+                        continue  # the sensor is present but doesn't work
+                    sensors.append((chip_name, sensor_label, attribute_name, input_path, thresholds))
+                if len(sensors) > 0 and sensors[-1][0] == chip_name:
+                    break
+        return sensors
+
+    @classmethod
+    def _read_temperature(cls, path):
+        """
+        Reads a single temperature value
+
+        :param path: full path to the sysfs attribute
+        :return: the temperature in degrees Celsius
+        """
+        with open(path, "r") as attribute_file:
+            return int(attribute_file.read().strip()) / cls.MILLIDEGREES
+
+    @staticmethod
+    def _read_string(path):
+        """
+        Reads a single string attribute
+
+        :param path: full path to the sysfs attribute
+        :return: the attribute value or None if the attribute doesn't exist
+        """
+        try:
+            with open(path, "r") as attribute_file:
+                return attribute_file.read().strip()
+        except OSError:
+            return None
@@ -0,0 +1,35 @@
+import json
+import shutil
+import subprocess
+
+from .sensor_reader import SensorReader
+
+
+class LmSensorsReader(SensorReader):
+    """
+    Reads the temperature sensors using the 'sensors' command from the lm-sensors package.
+
+    This reader is used when the hwmon sysfs interface is not available.
+    """
+
+    SENSORS_COMMAND = ('sensors', '-j')
+
+    def is_available(self):
+        """
+        Checks whether the lm-sensors package is installed
+
+        :return: True if the 'sensors' command exists, False otherwise
+        """
+        return shutil.which(self.SENSORS_COMMAND[0]) is not None
+
+    def read(self):
+        """
+        Reads all temperature sensors
+
+        :return: the parsed output of the 'sensors -j' command or an empty dictionary if the command fails
+        """
+        try:
+            sensors_info = subprocess.run(self.SENSORS_COMMAND, stderr=subprocess.DEVNULL, stdout=subprocess.PIPE)
+            return json.loads(sensors_info.stdout)
+        except (OSError, ValueError):
+            return dict()
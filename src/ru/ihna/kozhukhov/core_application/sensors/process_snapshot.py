@@ -0,0 +1,167 @@
+import os
+import threading
+from datetime import datetime
+from time import monotonic, time
+
+import psutil
+
+
+class ProcessSnapshot:
+    """
+    Provides the list of all processes running on the server in the same format as the 'ps aux' command does.
+
+    The process list is built using the psutil library rather than forking the 'ps' command. The list is cached
+    for a short time and the cache is shared among all threads of the process, so several administrators polling the
+    process list at the same time cause the process list to be built only once. Also, only one thread builds the list
+    while other threads wait for the result.
+    """
+
+    TTL = 2.0
+    """ The process list will be rebuilt when it is older than this number of seconds """
+
+    PROCESS_ATTRIBUTES = ["pid", "username", "memory_percent", "memory_info", "terminal", "status", "nice",
+                          "num_threads", "create_time", "cpu_times", "cmdline", "name"]
+
+    FIELDS = ['USER', 'PID', '%CPU', '%MEM', 'VSZ', 'RSS', 'TTY', 'STAT', 'START', 'TIME', 'COMMAND']
+    """ All fields of the 'ps aux' output in the same order as the 'ps aux' command gives them """
+
+    STATUS_CODES = {
+        psutil.STATUS_RUNNING: "R",
+        psutil.STATUS_SLEEPING: "S",
+        psutil.STATUS_DISK_SLEEP: "D",
+        psutil.STATUS_STOPPED: "T",
+        psutil.STATUS_TRACING_STOP: "t",
+        psutil.STATUS_ZOMBIE: "Z",
+        psutil.STATUS_DEAD: "X",
+        psutil.STATUS_WAKING: "W",
+        psutil.STATUS_IDLE: "I",
+        psutil.STATUS_LOCKED: "L",
+        psutil.STATUS_WAITING: "W",
+        psutil.STATUS_PARKED: "P",
+    }
+    """ Transforms the psutil process status to the process state code given by the 'ps' command """
+
+    _lock = threading.Lock()
+    _processes = None
+    _snapshot_time = None
+
+    @classmethod
+    def get_processes(cls, ttl=None):
+        """
+        Returns the cached process list or builds a new one when the cache is outdated
+
+        :param ttl: maximum age of the cached list in seconds or None to use the default value
+        :return: list of dictionaries with the same keys as the columns of the 'ps aux' output. The list shall not
+            be modified because it is shared among all requests
+        """
+        if ttl is None:
+            ttl = cls.TTL
+        with cls._lock:
+            if cls._processes is None or monotonic() - cls._snapshot_time >= ttl:
+                cls._processes = cls.build_processes()
+                cls._snapshot_time = monotonic()
+            return cls._processes
+
+    @classmethod
+    def clear(cls):
+        """
+        Removes the process list from the cache
+        """
+        with cls._lock:
+            cls._processes = None
+            cls._snapshot_time = None
+
+    @classmethod
+    def build_processes(cls):
+        """
+        Builds the process list without using the cache
+
+        :return: list of dictionaries with the same keys as the columns of the 'ps aux' output
+        """
+        current_time = time()
+        current_date = datetime.fromtimestamp(current_time)
+        processes = list()
+        for process in psutil.process_iter(cls.PROCESS_ATTRIBUTES, ad_value=None):
+            process_info = cls._get_process_info(process.info, current_time, current_date)
+            if process_info is not None:
+                processes.append(process_info)
+        return processes
+
+    @classmethod
+    def _get_process_info(cls, info, current_time, current_date):
+        """
+        Transforms the information given by psutil to the 'ps aux' format
+
+        :param info: the dictionary of the process attributes given by psutil
+        :param current_time: the current UNIX timestamp
+        :param current_date: the current local date and time
+        :return: a dictionary which keys are 'ps aux' columns or None if the process has gone
+        """
+        if info['pid'] is None:
+            return None
+        cpu_time = 0.0
+        if info['cpu_times'] is not None:
+            cpu_time = info['cpu_times'].user + info['cpu_times'].system
+        create_time = info['create_time'] or current_time
+        # Like the 'ps' command, %CPU is the CPU time divided by the process lifetime
+        lifetime = current_time - create_time
+        cpu_percent = 100.0 * cpu_time / lifetime if lifetime > 0 else 0.0
+        memory_info = info['memory_info']
+        terminal = info['terminal']
+        if info['cmdline']:
+            command = " ".join(info['cmdline'])
+        else:
+            command = "[%s]" % (info['name'] or "")
+        return {
+            'USER': info['username'] or "?",
+            'PID': info['pid'],
+            '%CPU': round(cpu_percent, 1),
+            '%MEM': round(info['memory_percent'] or 0.0, 1),
+            'VSZ': memory_info.vms // 1024 if memory_info is not None else 0,
+            'RSS': memory_info.rss // 1024 if memory_info is not None else 0,
+            'TTY': terminal[len("/dev/"):] if terminal and terminal.startswith("/dev/") else terminal or "?",
+            'STAT': cls._get_process_state(info),
+            'START': cls._get_start_time(create_time, current_date),
+            'TIME': "%d:%02d" % divmod(int(cpu_time), 60),
+            'COMMAND': command,
+        }
+
+    @classmethod
+    def _get_process_state(cls, info):
+        """
+        Reveals the process state code in the same way as the 'ps' command does
+
+        :param info: the dictionary of the process attributes given by psutil
+        :return: the process state code
+        """
+        state = cls.STATUS_CODES.get(info['status'], "?")
+        nice = info['nice']
+        if nice is not None and nice < 0:
+            state += "<"
+        elif nice is not None and nice > 0:
+            state += "N"
+        try:
+            if os.getsid(info['pid']) == info['pid']:
+                state += "s"
+        except OSError:
+            pass
+        if info['num_threads'] is not None and info['num_threads'] > 1:
+            state += "l"
+        return state
+
+    @staticmethod
+    def _get_start_time(create_time, current_date):
+        """
+        Reveals the process start time in the same way as the 'ps' command does
+
+        :param create_time: the UNIX timestamp of the process start
+        :param current_date: the current local date and time
+        :return: the start time for processes started today, the start date for processes started this year,
+            the start year for all other processes
+        """
+        start_date = datetime.fromtimestamp(create_time)
+        if start_date.date() == current_date.date():
+            return start_date.strftime("%H:%M")
+        if start_date.year == current_date.year:
+            return start_date.strftime("%b%d")
+        return start_date.strftime("%Y")
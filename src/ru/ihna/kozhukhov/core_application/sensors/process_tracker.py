@@ -0,0 +1,116 @@
+import os
+
+import psutil
+
+
+class ProcessTracker:
+    """
+    Measures resources used by the corefacility processes.
+
+    The processes are discovered using the PID files: each PID file refers to the root process of some process group
+    (the corefacility daemon, the gunicorn master process etc.). All descendants of the root process are included
+    into the same group. Descendants are split by their role: children started by the 'corefacility <command>'
+    are referred to as '<group>/<command>' while all other children are referred to as '<group>/worker'. The current
+    process is always measured, even when it doesn't belong to any group.
+
+    All processes with the same role are summarized together, so the number of channels doesn't depend on the number
+    of workers and doesn't change when some worker is restarted.
+    """
+
+    PROCESS_ATTRIBUTES = ["cmdline", "memory_info", "cpu_times", "num_fds", "num_threads"]
+
+    CURRENT_PROCESS_NAME = "health_check"
+    """ Name of the group for the current process when it doesn't belong to any group given by the PID files """
+
+    MANAGEMENT_SCRIPT = "corefacility"
+
+    def __init__(self, pid_files):
+        """
+        Initializes the tracker
+
+        :param pid_files: a dictionary group name => path to the PID file of the group root process
+        """
+        self.pid_files = dict(pid_files)
+
+    def read(self):
+        """
+        Measures resources of all tracked processes
+
+        :return: a dictionary process role => {'pids': number of processes, 'rss': resident memory in bytes,
+            'cpu_time': user and system CPU time in seconds, 'fds': number of open file descriptors,
+            'threads': number of threads}
+        """
+        resources = dict()
+        processed_pids = set()
+        for group, pid_file in self.pid_files.items():
+            root_process = self._read_pid_file(pid_file)
+            if root_process is None:
+                continue
+            try:
+                children = root_process.children(recursive=True)
+            except psutil.Error:
+                continue
+            self._add_process(resources, processed_pids, group, root_process)
+            for child_process in children:
+                self._add_process(resources, processed_pids, None, child_process, group)
+        if os.getpid() not in processed_pids:
+            self._add_process(resources, processed_pids, self.CURRENT_PROCESS_NAME, psutil.Process())
+        return resources
+
+    def _add_process(self, resources, processed_pids, role, process, group=None):
+        """
+        Adds resources of a single process to the resources of its role
+
+        :param resources: the resource dictionary to fill
+        :param processed_pids: PIDs of all processes which resources were added before
+        :param role: the process role or None if the role shall be revealed from the process command line
+        :param process: the psutil.Process instance
+        :param group: the process group. Required when role is None
+        """
+        if process.pid in processed_pids:
+            return
+        try:
+            info = process.as_dict(attrs=self.PROCESS_ATTRIBUTES, ad_value=None)
+        except psutil.NoSuchProcess:
+            return
+        processed_pids.add(process.pid)
+        if role is None:
+            role = "%s/%s" % (group, self.get_process_role(info['cmdline']))
+        role_resources = resources.setdefault(role, {'pids': 0, 'rss': 0, 'cpu_time': 0.0, 'fds': 0, 'threads': 0})
+        role_resources['pids'] += 1
+        if info['memory_info'] is not None:
+            role_resources['rss'] += info['memory_info'].rss
+        if info['cpu_times'] is not None:
+            role_resources['cpu_time'] += info['cpu_times'].user + info['cpu_times'].system
+        if info['num_fds'] is not None:
+            role_resources['fds'] += info['num_fds']
+        if info['num_threads'] is not None:
+            role_resources['threads'] += info['num_threads']
+
+    @classmethod
+    def get_process_role(cls, cmdline):
+        """
+        Reveals role of the child process from its command line
+
+        :param cmdline: the command line arguments
+        :return: the management command for the 'corefacility <command>' processes, 'worker' for any other process
+        """
+        cmdline = cmdline or []
+        for index, argument in enumerate(cmdline[:-1]):
+            if os.path.basename(argument) == cls.MANAGEMENT_SCRIPT:
+                return cmdline[index + 1]
+        return "worker"
+
+    @staticmethod
+    def _read_pid_file(pid_file):
+        """
+        Finds the process which PID is written to the PID file
+
+        :param pid_file: path to the PID file
+        :return: the psutil.Process instance or None if the PID file or the process doesn't exist
+        """
+        try:
+            with open(pid_file, "r") as pid_file_object:
+                return psutil.Process(int(pid_file_object.read().strip()))
+        except (OSError, ValueError, psutil.Error):
+            return None
@@ -0,0 +1,23 @@
+class SensorReader:
+    """
+    The base class for all readers of the hardware temperature sensors.
+
+    The output of each reader has the same structure as the output of the 'sensors -j' command: a dictionary
+    chip name => sensor label => {'tempN_input': value, 'tempN_crit': value, ...}
+    """
+
+    def is_available(self):
+        """
+        Checks whether the sensors can be read by this reader
+
+        :return: True if the sensors can be read, False otherwise
+        """
+        raise NotImplementedError("SensorReader.is_available")
+
+    def read(self):
+        """
+        Reads all temperature sensors
+
+        :return: dictionary chip name => sensor label => {'tempN_input': value, 'tempN_crit': value, ...}
+        """
+        raise NotImplementedError("SensorReader.read")
@@ -18,6 +18,10 @@ class LogListSerializer(EntitySerializer):
     ip_address = serializers.IPAddressField(protocol="both", read_only=True, help_text="User's IP address")
     geolocation = serializers.ReadOnlyField(help_text="User's geolocation")
     response_status = serializers.ReadOnlyField(help_text="Response status code")
+    response_time = serializers.ReadOnlyField(help_text="Request processing time, in seconds")
+    query_count = serializers.ReadOnlyField(help_text="Number of database queries made during the request processing")
+    query_time = serializers.ReadOnlyField(help_text="Total time of all database queries, in seconds")
+    sampling_rate = serializers.ReadOnlyField(help_text="Fraction of similar requests that were logged")
 
     @staticmethod
     def get_request_date(log):
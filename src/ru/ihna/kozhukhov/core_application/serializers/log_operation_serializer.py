@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+
+class LogOperationSerializer(serializers.Serializer):
+    """
+    Serializes the request processing statistics for a single operation
+    """
+
+    operation_description = serializers.ReadOnlyField(help_text="Human-readable operation description")
+    request_method = serializers.ReadOnlyField(help_text="The method that was used for the request")
+    request_count = serializers.ReadOnlyField(help_text="Estimated total number of requests")
+    mean_response_time = serializers.ReadOnlyField(help_text="Mean request processing time, in seconds")
+    max_response_time = serializers.ReadOnlyField(help_text="Maximum request processing time, in seconds")
+    mean_query_count = serializers.ReadOnlyField(help_text="Mean number of database queries per request")
+    mean_query_time = serializers.ReadOnlyField(help_text="Mean total time of database queries, in seconds")
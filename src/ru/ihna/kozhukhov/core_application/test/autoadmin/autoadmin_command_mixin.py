@@ -0,0 +1,83 @@
+import signal
+
+from django.test import override_settings
+from django.utils import timezone
+
+from ...management.commands.autoadmin import Command
+from ...models import Log, PosixRequest, User
+from ...models.enums import PosixRequestStatus
+
+
+AUTOADMIN_PACKAGE = "ru.ihna.kozhukhov.core_application.management.commands.autoadmin"
+POSIX_CONNECTOR = AUTOADMIN_PACKAGE + ".posix_connector.PosixConnector"
+POSIX_USER = AUTOADMIN_PACKAGE + ".posix_user.PosixUser"
+POSIX_GROUP = AUTOADMIN_PACKAGE + ".posix_group.PosixGroup"
+
+
+def entity_arguments(entity_set, entity_id):
+    """
+    Serialized constructor arguments of the AutoAdminObject attached to some entity
+
+    :param entity_set: name of the entity set class
+    :param entity_id: ID of the entity
+    :return: the serialized arguments
+    """
+    entity_class = "ru.ihna.kozhukhov.core_application.entity.entity_sets.%s" % entity_set
+    return {"args": [{"entity_class": entity_class, "entity_id": entity_id}], "kwargs": {}}
+
+
+class AutoadminCommandMixin:
+    """
+    Creates the autoadmin command and provides methods to fill the POSIX request queue
+    """
+
+    AUTOADMIN_SETTINGS = {
+        'CORE_UNIX_ADMINISTRATION': True,
+        'CORE_SUGGEST_ADMINISTRATION': False,
+    }
+
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(**self.AUTOADMIN_SETTINGS)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # The command sets its own signal handlers. They shall not affect other tests
+        for signal_number in (signal.SIGINT, signal.SIGHUP, signal.SIGTERM, signal.SIGQUIT):
+            self.addCleanup(signal.signal, signal_number, signal.getsignal(signal_number))
+        self.command = Command()
+
+    def create_log(self, login="request_author", ip_address="127.0.0.1"):
+        """
+        Creates the log for the POSIX request
+
+        :param login: login of the user that made the request or None for the anonymous request
+        :param ip_address: IP address the request was made from
+        :return: the Log model instance
+        """
+        user = None
+        if login is not None:
+            user, _ = User.objects.get_or_create(login=login)
+        return Log.objects.create(request_date=timezone.now(), log_address="/api/v1/users/", request_method="POST",
+                                  user=user, ip_address=ip_address)
+
+    def create_posix_request(self, action_class="", action_arguments=None, method_name="", method_arguments=None,
+                             status=PosixRequestStatus.INITIALIZED, log=None):
+        """
+        Adds the POSIX request to the queue
+
+        :param action_class: full name of the AutoAdminObject subclass
+        :param action_arguments: serialized arguments of the class constructor
+        :param method_name: name of the method to call
+        :param method_arguments: serialized arguments of the method
+        :param status: the request status
+        :param log: the log attached to the request or None to create a new log
+        :return: the PosixRequest model instance
+        """
+        return PosixRequest.objects.create(
+            action_class=action_class,
+            action_arguments=action_arguments or {"args": [], "kwargs": {}},
+            method_name=method_name,
+            method_arguments=method_arguments or {"args": [], "kwargs": {}},
+            log=log or self.create_log(),
+            status=status,
+        )
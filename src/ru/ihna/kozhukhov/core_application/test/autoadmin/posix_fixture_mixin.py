@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+from ...management.commands.autoadmin.posix_database import PosixDatabase
+from ...management.commands.autoadmin.posix_group import PosixGroup
+from ...management.commands.autoadmin.posix_user import PosixUser
+
+
+class PosixFixtureMixin:
+    """
+    Copies the fixture POSIX database files to the temporary directory and makes the autoadmin objects use them
+    """
+
+    FIXTURE_DIRECTORY = os.path.join(os.path.dirname(__file__), "fixtures")
+
+    FIXTURE_FILES = ["passwd", "group", "shadow"]
+
+    POSIX_SETTINGS = {
+        'CORE_UNIX_ADMINISTRATION': True,
+        'CORE_SUGGEST_ADMINISTRATION': False,
+        'CORE_MANAGE_UNIX_USERS': True,
+        'CORE_MANAGE_UNIX_GROUPS': True,
+    }
+
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(**self.POSIX_SETTINGS)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.fixture_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.fixture_directory)
+        for filename in self.FIXTURE_FILES:
+            shutil.copy(os.path.join(self.FIXTURE_DIRECTORY, filename), self.get_fixture_path(filename))
+        self.patch_class_attribute(PosixUser, "POSIX_USER_FILE", self.get_fixture_path("passwd"))
+        self.patch_class_attribute(PosixUser, "POSIX_SHADOW_FILE", self.get_fixture_path("shadow"))
+        self.patch_class_attribute(PosixGroup, "POSIX_GROUP_FILE", self.get_fixture_path("group"))
+        for posix_class in (PosixUser, PosixGroup):
+            self.patch_class_attribute(posix_class, "_static_objects", None)
+            self.patch_class_attribute(posix_class, "_static_objects_source", None)
+        PosixDatabase.clear_instances()
+        self.addCleanup(PosixDatabase.clear_instances)
+
+    def patch_class_attribute(self, cls, name, value):
+        """
+        Sets the class attribute until the end of the test
+
+        :param cls: the class to patch
+        :param name: the attribute name
+        :param value: the attribute value
+        """
+        old_value = cls.__dict__.get(name)
+        setattr(cls, name, value)
+        self.addCleanup(setattr, cls, name, old_value)
+
+    def get_fixture_path(self, filename):
+        """
+        Returns the full path to the copy of the fixture file
+
+        :param filename: the fixture file name
+        :return: the full path
+        """
+        return os.path.join(self.fixture_directory, filename)
+
+    def replace_fixture(self, filename, lines):
+        """
+        Replaces the fixture file by a new one in the same way as the shadow utilities do
+
+        :param filename: the fixture file name
+        :param lines: lines to append to the original file
+        """
+        path = self.get_fixture_path(filename)
+        new_path = path + "+"
+        with open(path, "r") as original_file, open(new_path, "w") as new_file:
+            new_file.write(original_file.read())
+            for line in lines:
+                new_file.write(line + "\n")
+        os.replace(new_path, path)
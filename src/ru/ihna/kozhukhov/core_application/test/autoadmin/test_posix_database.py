@@ -0,0 +1,178 @@
+import os
+import threading
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from ...management.commands.autoadmin.posix_database import PasswdDatabase, GroupDatabase
+from ...management.commands.autoadmin.posix_group import PosixGroup
+from ...management.commands.autoadmin.posix_user import PosixUser
+from .posix_fixture_mixin import PosixFixtureMixin
+
+
+class TestPosixDatabase(PosixFixtureMixin, SimpleTestCase):
+    """
+    Tests the indexed snapshots of the /etc/passwd and /etc/group files
+    """
+
+    def test_passwd_indices(self):
+        """
+        Checks that the /etc/passwd entries are indexed by login, UID and primary GID
+        """
+        database = PasswdDatabase.get_instance(self.get_fixture_path("passwd"))
+        self.assertEquals([entry.login for entry in database.entries],
+                          ["root", "daemon", "www-data", "alice", "alice1", "bob", "toor"],
+                          "Comments and malformed lines shall be skipped")
+        self.assertEquals(database.by_login["alice"].home_dir, "/home/corefacility/u-alice", "Unexpected home dir")
+        self.assertEquals(database.by_uid[1003].login, "bob", "Unexpected user found by UID")
+        self.assertEquals(database.by_uid[0].login, "root", "The first user with a given UID shall be found")
+        self.assertEquals([entry.login for entry in database.by_gid[0]], ["root", "toor"],
+                          "Unexpected users found by primary GID")
+        self.assertNotIn("carol", database.by_login, "The user with invalid UID shall be skipped")
+
+    def test_group_indices(self):
+        """
+        Checks that the /etc/group entries are indexed by name, GID and member
+        """
+        database = GroupDatabase.get_instance(self.get_fixture_path("group"))
+        self.assertNotIn("broken", database.by_name, "Malformed lines shall be skipped")
+        self.assertEquals(database.by_name["proj1"].gid, 2001, "Unexpected GID")
+        self.assertEquals(database.by_gid[2002].name, "proj2", "Unexpected group found by GID")
+        self.assertEquals(database.by_name["proj3"].members, [], "Unexpected members of the empty group")
+        self.assertEquals(database.by_member["bob"], {"proj1", "proj2"}, "Unexpected groups of the member")
+        self.assertEquals(database.by_member["alice"], {"proj1"}, "Unexpected groups of the member")
+        self.assertNotIn("alice1", database.by_member, "The user without supplementary groups is not a member")
+
+    def test_shared_snapshot(self):
+        """
+        Checks that the snapshot is shared and reloaded only when the file has been changed
+        """
+        path = self.get_fixture_path("passwd")
+        database = PasswdDatabase.get_instance(path)
+        self.assertIs(PasswdDatabase.get_instance(path), database, "The snapshot shall be shared")
+        self.assertIsNot(GroupDatabase.get_instance(self.get_fixture_path("group")), database,
+                         "Different files shall have different snapshots")
+        version = database.version
+        self.assertFalse(database.refresh(), "The unchanged file shall not be reloaded")
+        self.assertEquals(database.version, version, "The unchanged file shall not be reloaded")
+        self.replace_fixture("passwd", ["dave:x:1005:1005::/home/dave:/bin/bash"])
+        self.assertIs(PasswdDatabase.get_instance(path), database, "The snapshot shall be shared")
+        self.assertEquals(database.version, version + 1, "The replaced file shall be reloaded")
+        self.assertIn("dave", database.by_login, "The new user shall be found")
+
+    def test_in_place_change(self):
+        """
+        Checks that the file changed in place is also reloaded
+        """
+        path = self.get_fixture_path("group")
+        database = GroupDatabase.get_instance(path)
+        with open(path, "a") as group_file:
+            group_file.write("proj4:x:2005:alice\n")
+        self.assertTrue(database.refresh(), "The changed file shall be reloaded")
+        self.assertEquals(database.by_member["alice"], {"proj1", "proj4"}, "Unexpected groups of the member")
+
+    def test_missing_file(self):
+        """
+        Checks that the missing file gives the empty snapshot
+        """
+        database = PasswdDatabase.get_instance(self.get_fixture_path("missing"))
+        self.assertFalse(database.available, "The missing file shall not be available")
+        self.assertEquals(database.entries, [], "The missing file has no entries")
+        self.assertEquals(database.by_login, {}, "The missing file has no entries")
+
+    @parameterized.expand([
+        ("alice", "1001"),
+        ("www-data", "33"),
+        ("eve", None),
+    ])
+    def test_check_user_for_update(self, login, expected_gid):
+        """
+        Checks that the POSIX user is found by login
+
+        :param login: the user login
+        :param expected_gid: primary GID of the user or None if the user doesn't exist
+        """
+        posix_user = PosixUser(None, login=login, home_dir="/home/" + login).check_user_for_update()
+        if expected_gid is None:
+            self.assertIsNone(posix_user, "The user shall not be found")
+        else:
+            self.assertEquals(posix_user.login, login, "Unexpected login")
+            self.assertEquals(posix_user.gid, expected_gid, "Unexpected primary GID")
+
+    @parameterized.expand([
+        ("alice", "alice2"),
+        ("bob", "bob1"),
+        ("eve", "eve"),
+    ])
+    def test_shorten_user_login(self, login, expected_login):
+        """
+        Checks that the new login doesn't coincide with logins of existent users
+
+        :param login: the desired login
+        :param expected_login: the expected login
+        """
+        posix_user = PosixUser(None, login=login, home_dir="/home/" + login)
+        self.assertEquals(posix_user._shorten_user_login(login), expected_login, "Unexpected login")
+
+    @parameterized.expand([
+        ("proj2", "2002", ["bob", "www-data"]),
+        ("proj3", "2003", []),
+        ("proj9", None, None),
+    ])
+    def test_check_group_for_update(self, name, expected_gid, expected_users):
+        """
+        Checks that the POSIX group is found by name
+
+        :param name: the group name
+        :param expected_gid: the group GID or None if the group doesn't exist
+        :param expected_users: the expected group members
+        """
+        posix_group = PosixGroup(name=name)
+        posix_group.project_dir = os.path.join(self.fixture_directory, name)
+        found_group = posix_group.check_group_for_update()
+        if expected_gid is None:
+            self.assertIsNone(found_group, "The group shall not be found")
+        else:
+            self.assertEquals(found_group.gid, expected_gid, "Unexpected GID")
+            self.assertEquals(found_group.user_list, expected_users, "Unexpected group members")
+
+    def test_static_objects(self):
+        """
+        Checks that the POSIX user and group lists are rebuilt only when the files have been changed
+        """
+        posix_users = PosixUser.get_posix_users()
+        posix_groups = PosixGroup.get_posix_groups()
+        self.assertEquals(len(posix_users), 7, "Unexpected number of users")
+        self.assertIs(PosixUser.get_posix_users(), posix_users, "The user list shall be cached")
+        self.assertIs(PosixGroup.get_posix_groups(), posix_groups, "The group list shall be cached")
+        self.replace_fixture("group", ["proj4:x:2005:"])
+        self.assertIs(PosixUser.get_posix_users(), posix_users, "The user list shall be cached")
+        self.assertEquals(len(PosixGroup.get_posix_groups()), len(posix_groups) + 1, "The group list is not rebuilt")
+
+    def test_concurrent_refresh(self):
+        """
+        Checks that the thread looking for the user never misses it while another thread reloads the file
+        """
+        path = self.get_fixture_path("passwd")
+        lines = ["user%d:x:%d:%d::/home/user%d:/bin/bash" % (uid, uid, uid, uid) for uid in range(3000, 6000)]
+        self.replace_fixture("passwd", lines)
+        database = PasswdDatabase.get_instance(path)
+        is_finished = threading.Event()
+        misses = list()
+
+        def look_for_user():
+            while not is_finished.is_set():
+                if "user5999" not in database.by_login or 5999 not in database.by_uid:
+                    misses.append(True)
+
+        reader = threading.Thread(target=look_for_user)
+        reader.start()
+        try:
+            for index in range(30):
+                # The file is changed each time, so each refresh reloads the whole file
+                self.replace_fixture("passwd", ["extra%d:x:%d:%d::/home/extra:/bin/bash" % (index, index, index)])
+                self.assertTrue(database.refresh(), "The changed file shall be reloaded")
+        finally:
+            is_finished.set()
+            reader.join()
+        self.assertEquals(len(misses), 0, "The existent user shall never be missed")
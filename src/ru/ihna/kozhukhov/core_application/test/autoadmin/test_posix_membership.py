@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from ...management.commands.autoadmin.posix_connector import PosixConnector
+from ...management.commands.autoadmin.posix_database import GroupDatabase
+from ...management.commands.autoadmin.posix_user import PosixUser
+from .posix_fixture_mixin import PosixFixtureMixin
+
+
+USER_GROUPS = {
+    1: ("alice", {"proj1", "proj2"}),
+    2: ("bob", {"proj1", "proj2"}),
+    3: ("alice1", {"proj2"}),
+    4: ("www-data", {"proj1", "proj2"}),
+}
+""" corefacility user ID => (login, POSIX groups the user shall belong to) """
+
+
+def get_supplementary_groups(posix_user, exclude=None):
+    """
+    Replaces the PosixUser.get_supplementary_groups method
+
+    :param posix_user: the POSIX user
+    :param exclude: the group to exclude
+    :return: a dictionary POSIX group name => project
+    """
+    _, groups = USER_GROUPS[posix_user.entity.id]
+    return {group: SimpleNamespace(unix_group=group) for group in sorted(groups) if group != exclude}
+
+
+class TestPosixMembership(PosixFixtureMixin, SimpleTestCase):
+    """
+    Tests how supplementary groups of POSIX users are brought to the desired state
+    """
+
+    @parameterized.expand([
+        ({"alice": {"proj1"}}, []),
+        ({"alice": {"proj1", "proj2"}}, [("gpasswd", "-a", "alice", "proj2")]),
+        ({"bob": {"proj1"}}, [("gpasswd", "-d", "bob", "proj2")]),
+        ({"alice": {"proj2", "proj3"}}, [("usermod", "-G", "proj2,proj3", "alice")]),
+        ({"alice": {"proj1", "proj3"}, "bob": {"proj1", "proj2", "proj3"}, "eve": {"proj3"}},
+         [("gpasswd", "-M", "alice,bob,eve", "proj3")]),
+        ({"alice": set(), "bob": set()},
+         [("gpasswd", "-M", "www-data", "proj1"), ("gpasswd", "-d", "bob", "proj2")]),
+        ({"bob": {"proj1"}, "alice1": {"proj1"}},
+         [("gpasswd", "-a", "alice1", "proj1"), ("gpasswd", "-d", "bob", "proj2")]),
+    ])
+    def test_membership_commands(self, desired_groups, expected_commands):
+        """
+        Checks that the minimum set of commands is emitted
+
+        :param desired_groups: login => groups the user shall belong to
+        :param expected_commands: the expected commands
+        """
+        database = GroupDatabase.get_instance(self.get_fixture_path("group"))
+        self.assertEquals(database.get_membership_commands(desired_groups), expected_commands,
+                          "Unexpected commands")
+
+    def test_update_supplementary_groups(self):
+        """
+        Checks that the usermod command is not emitted when the user is already in the desired groups
+        """
+        posix_user = self.create_posix_user(2)
+        with patch.object(PosixUser, "get_supplementary_groups", get_supplementary_groups):
+            posix_user.update_supplementary_groups()
+            self.assertEquals(posix_user.flush_command_buffer(), "", "No commands shall be emitted")
+            posix_user.update_supplementary_groups(exclude="proj2")
+            self.assertEquals(posix_user.flush_command_buffer(), "gpasswd -d bob proj2", "Unexpected commands")
+
+    def test_update_connections(self):
+        """
+        Checks that the connector emits commands for all users at once
+        """
+        with patch("ru.ihna.kozhukhov.core_application.management.commands.autoadmin.posix_connector.PosixUser",
+                   self.create_posix_user), \
+                patch.object(PosixUser, "get_supplementary_groups", get_supplementary_groups):
+            connector = PosixConnector()
+            connector.update_connections([1, 2, 3, 4])
+        self.assertEquals(connector.flush_command_buffer(), "gpasswd -M bob,www-data,alice,alice1 proj2",
+                          "Unexpected commands")
+
+    def test_update_connections_no_changes(self):
+        """
+        Checks that the connector emits nothing when all users are already in the desired groups
+        """
+        with patch("ru.ihna.kozhukhov.core_application.management.commands.autoadmin.posix_connector.PosixUser",
+                   self.create_posix_user), \
+                patch.object(PosixUser, "get_supplementary_groups", get_supplementary_groups):
+            connector = PosixConnector()
+            connector.update_connections([2, 4])
+        self.assertEquals(connector.flush_command_buffer(), "", "No commands shall be emitted")
+
+    def create_posix_user(self, entity_id):
+        """
+        Creates the POSIX user without the database access
+
+        :param entity_id: ID of the corefacility user
+        :return: the PosixUser instance
+        """
+        login, _ = USER_GROUPS[entity_id]
+        posix_user = PosixUser(None, login=login, home_dir="")
+        posix_user.entity = SimpleNamespace(id=entity_id, login=login)
+        return posix_user
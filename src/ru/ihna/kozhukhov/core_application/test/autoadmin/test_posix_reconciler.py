@@ -0,0 +1,176 @@
+import os
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ...exceptions.entity_exceptions import PosixCommandFailedException
+from ...management.commands.autoadmin.posix_reconciler import PosixReconciler, ReconcilePlan
+from ...models import User, Group, GroupUser, Project, AccessLevel, Permission
+from .posix_fixture_mixin import PosixFixtureMixin
+
+
+class TestPosixReconciler(PosixFixtureMixin, TestCase):
+    """
+    Tests how POSIX users and groups are reconciled with corefacility users and projects
+    """
+
+    POSIX_SETTINGS = dict(PosixFixtureMixin.POSIX_SETTINGS, CORE_WORKER_PROCESS_USER="www-data")
+
+    def setUp(self):
+        super().setUp()
+        self.alice = self.create_user("alice", is_locked=True)
+        self.bob = self.create_user("bob")
+        self.alice1 = self.create_user("alice1", create_home_dir=False)
+        self.dave = self.create_user("dave", unix_group=None)
+        self.create_user("another-support", unix_group=None, is_support=True)
+        self.proj1 = self.create_project("proj1", [self.alice, self.bob])
+        self.proj2 = self.create_project("proj2", [self.bob], create_project_dir=False)
+        self.proj3 = self.create_project("proj3", [self.dave])
+        full_access = AccessLevel.objects.create(alias="full", name="Full access")
+        view_access = AccessLevel.objects.create(alias="data_view", name="View only")
+        Permission.objects.create(project=self.proj3, group=self.proj2.root_group, access_level=full_access)
+        Permission.objects.create(project=self.proj3, group=self.proj1.root_group, access_level=view_access)
+        os.symlink(self.proj1.project_dir, os.path.join(self.alice.home_dir, "proj1"))
+        os.symlink("/nonexistent", os.path.join(self.alice.home_dir, "stale"))
+        self.reconciler = PosixReconciler()
+
+    def test_desired_state(self):
+        """
+        Checks that the desired state is loaded by a few queries
+        """
+        with self.assertNumQueries(4):
+            desired_state = self.reconciler.load_desired_state()
+        self.assertEquals([user.id for user in desired_state.users],
+                          [self.alice.id, self.bob.id, self.alice1.id, self.dave.id], "Unexpected user list")
+        self.assertEquals(desired_state.memberships, {
+            self.alice.id: {self.proj1.id},
+            self.bob.id: {self.proj1.id, self.proj2.id, self.proj3.id},
+            self.alice1.id: set(),
+            self.dave.id: {self.proj3.id},
+        }, "Unexpected memberships")
+
+    def test_plan(self):
+        """
+        Checks that the plan contains only the commands that change anything
+        """
+        plan = self.reconciler.get_plan()
+        self.assertEquals([(step.phase, step.target) for step in plan], [
+            ("users", "alice1"),
+            ("users", "user %d" % self.dave.id),
+            ("locks", "alice"),
+            ("groups", "proj2"),
+            ("links", "alice"),
+            ("links", "bob"),
+            ("memberships", "proj3"),
+        ], "Unexpected plan steps")
+        steps = list(plan)
+        self.assertEquals(steps[0].commands, [
+            ("userdel", "-rf", "alice1"),
+            ("useradd", "-d", self.alice1.home_dir, "-m", "-U", "-c", "corefacility user %d" % self.alice1.id,
+             "alice1"),
+        ], "The user with lost home directory shall be created again")
+        self.assertEquals(steps[1].commands[0][0], "useradd", "The absent user shall be created")
+        self.assertEquals(steps[2].commands, [("passwd", "-l", "alice")], "The user shall be locked")
+        self.assertEquals(steps[3].commands[:2], [("groupdel", "proj2"), ("groupadd", "proj2")],
+                          "The group with lost project directory shall be created again")
+        self.assertEquals(steps[4].commands, [("rm", os.path.join(self.alice.home_dir, "stale"))],
+                          "Wrong links shall be removed")
+        self.assertEquals(steps[5].commands, [
+            ("ln", "-s", project.project_dir, os.path.join(self.bob.home_dir, project.unix_group))
+            for project in (self.proj1, self.proj2, self.proj3)
+        ], "Missing links shall be created")
+        self.assertEquals(steps[6].commands, [("gpasswd", "-a", "bob", "proj3")],
+                          "Recreated groups shall not be touched by membership commands")
+        self.assertTrue(plan.requires_next_pass, "New users shall be set up during the next pass")
+
+    def test_plan_no_changes(self):
+        """
+        Checks that only supplementary groups are changed when the rest is already in the desired state
+        """
+        User.objects.filter(id__in=[self.alice1.id, self.dave.id]).delete()
+        Project.objects.filter(id__in=[self.proj2.id, self.proj3.id]).delete()
+        User.objects.filter(id=self.alice.id).update(is_locked=False)
+        os.unlink(os.path.join(self.alice.home_dir, "stale"))
+        os.symlink(self.proj1.project_dir, os.path.join(self.bob.home_dir, "proj1"))
+        self.replace_fixture("group", ["proj4:x:2005:bob"])
+        plan = self.reconciler.get_plan()
+        self.assertEquals([(step.phase, step.commands) for step in plan],
+                          [("memberships", [("usermod", "-G", "proj1", "bob")])],
+                          "Only groups the user has no access to shall be left")
+        self.assertFalse(plan.requires_next_pass, "The next pass is not required")
+
+    def test_dry_run(self):
+        """
+        Checks that the dry run prints the plan and its size
+        """
+        expected_plan = self.reconciler.get_plan()
+        output = StringIO()
+        with patch("ru.ihna.kozhukhov.core_application.management.commands.autoadmin.posix_reconciler."
+                   "PosixReconciler.apply") as apply:
+            call_command("posix_synchronize", "--dry-run", stdout=output)
+        apply.assert_not_called()
+        lines = output.getvalue().splitlines()
+        self.assertIn("[locks] alice: passwd -l alice", lines, "The plan shall be printed")
+        self.assertIn("The plan contains %d command(s) in %d step(s)" % (expected_plan.size, len(expected_plan)),
+                      lines, "The plan size shall be printed")
+
+    def test_apply_failure(self):
+        """
+        Checks that a failed step doesn't prevent other steps from being applied
+        """
+        plan = ReconcilePlan()
+        plan.add("locks", "alice", [("passwd", "-l", "alice"), ("true",)])
+        plan.add("locks", "bob", [("passwd", "-l", "bob")])
+        executed_commands = list()
+
+        def run(command):
+            executed_commands.append(command)
+            if command[-1] == "alice":
+                raise PosixCommandFailedException(" ".join(command), "")
+
+        self.reconciler.log = MagicMock()
+        with patch.object(self.reconciler, "run", run):
+            self.assertEquals(self.reconciler.apply(plan), 1, "One step shall fail")
+        self.assertEquals(executed_commands, [("passwd", "-l", "alice"), ("passwd", "-l", "bob")],
+                          "The rest of the failed step shall be skipped")
+
+    def create_user(self, login, unix_group="", is_locked=False, is_support=False, create_home_dir=True):
+        """
+        Creates the corefacility user
+
+        :param login: the user login
+        :param unix_group: the POSIX login or None if the POSIX user was not created. Equals to the login by default
+        :param is_locked: whether the user is locked
+        :param is_support: whether the user is the support user
+        :param create_home_dir: whether the home directory shall be created
+        :return: the User model instance
+        """
+        if unix_group == "":
+            unix_group = login
+        home_dir = None
+        if unix_group is not None:
+            home_dir = os.path.join(self.fixture_directory, "u-" + unix_group)
+            if create_home_dir:
+                os.mkdir(home_dir)
+        return User.objects.create(login=login, is_locked=is_locked, is_support=is_support,
+                                   unix_group=unix_group, home_dir=home_dir)
+
+    def create_project(self, unix_group, users, create_project_dir=True):
+        """
+        Creates the corefacility project
+
+        :param unix_group: the POSIX group name
+        :param users: users of the project root group. The first one is the project governor
+        :param create_project_dir: whether the project directory shall be created
+        :return: the Project model instance
+        """
+        root_group = Group.objects.create(name="Group for " + unix_group)
+        for index, user in enumerate(users):
+            GroupUser.objects.create(group=root_group, user=user, is_governor=index == 0)
+        project_dir = os.path.join(self.fixture_directory, unix_group)
+        if create_project_dir:
+            os.mkdir(project_dir)
+        return Project.objects.create(alias=unix_group, name="Project " + unix_group, root_group=root_group,
+                                      unix_group=unix_group, project_dir=project_dir)
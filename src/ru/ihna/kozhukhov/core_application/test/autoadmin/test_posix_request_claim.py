@@ -0,0 +1,135 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from parameterized import parameterized
+
+from ...models import PosixRequest
+from ...models.enums import PosixRequestStatus
+from .autoadmin_command_mixin import AutoadminCommandMixin
+
+
+class TestPosixRequestClaim(AutoadminCommandMixin, TestCase):
+    """
+    Tests how the autoadmin daemon claims POSIX requests for processing
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.requests = [
+            self.create_posix_request(status=status)
+            for status in (PosixRequestStatus.CONFIRMED, PosixRequestStatus.INITIALIZED,
+                           PosixRequestStatus.ANALYZED, PosixRequestStatus.INITIALIZED)
+        ]
+        for age, request_model in enumerate(reversed(self.requests)):
+            PosixRequest.objects.filter(pk=request_model.pk)\
+                .update(initialization_date=timezone.now() - timedelta(minutes=age))
+
+    def test_claim(self):
+        """
+        Checks that requests with a given status are claimed in order of their initialization
+        """
+        claimed_requests = self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED)
+        self.assertEquals([request_model.pk for request_model in claimed_requests],
+                          [self.requests[1].pk, self.requests[3].pk], "Unexpected claimed requests")
+        self.assertEquals(len({request_model.claim_token for request_model in claimed_requests}), 1,
+                          "All requests shall be claimed by the same token")
+        self.assertEquals(self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED), [],
+                          "Requests shall not be claimed twice")
+
+    def test_filters(self):
+        """
+        Checks that additional filters are applied
+        """
+        claimed_requests = self.command._claim_posix_requests(
+            PosixRequestStatus.INITIALIZED,
+            initialization_date__lt=timezone.now() - timedelta(minutes=1),
+        )
+        self.assertEquals([request_model.pk for request_model in claimed_requests], [self.requests[1].pk],
+                          "Unexpected claimed requests")
+
+    def test_release(self):
+        """
+        Checks that released requests can be claimed again
+        """
+        claimed_requests = self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED)
+        self.assertFalse(self.command._release_posix_requests(claimed_requests, PosixRequestStatus.INITIALIZED),
+                         "The batch is not full")
+        self.assertEquals(PosixRequest.objects.filter(claim_token__isnull=False).count(), 0,
+                          "All requests shall be released")
+        self.assertEquals(len(self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED)), 2,
+                          "Released requests shall be claimed again")
+
+    @parameterized.expand([
+        (3599, 0),
+        (3601, 2),
+    ])
+    def test_claim_timeout(self, claim_age, expected_request_number):
+        """
+        Checks that requests left by the killed daemon are claimed after the timeout
+
+        :param claim_age: number of seconds since the previous claim
+        :param expected_request_number: number of requests that shall be claimed again
+        """
+        self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED)
+        PosixRequest.objects.filter(claim_token__isnull=False)\
+            .update(claim_date=timezone.now() - timedelta(seconds=claim_age))
+        with override_settings(CORE_AUTOADMIN_CLAIM_TIMEOUT=3600):
+            claimed_requests = self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED)
+        self.assertEquals(len(claimed_requests), expected_request_number, "Unexpected number of claimed requests")
+
+    @parameterized.expand([
+        (0, False),
+        (1, True),
+    ])
+    def test_backlog(self, processed_request_number, expected_backlog):
+        """
+        Checks that the next batch is claimed immediately only when the full batch was at least partially processed
+
+        :param processed_request_number: number of claimed requests that were processed
+        :param expected_backlog: whether the next batch shall be claimed immediately
+        """
+        self.command.claim_batch_size = 2
+        claimed_requests = self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED)
+        self.assertEquals(len(claimed_requests), 2, "Unexpected number of claimed requests")
+        for request_model in claimed_requests[:processed_request_number]:
+            request_model.status = PosixRequestStatus.CONFIRMED
+            request_model.save()
+        self.assertEquals(self.command._release_posix_requests(claimed_requests, PosixRequestStatus.INITIALIZED),
+                          expected_backlog, "Unexpected backlog status")
+
+    def test_batch_size(self):
+        """
+        Checks that the number of requests claimed at once is bounded
+        """
+        self.command.claim_batch_size = 1
+        claimed_requests = self.command._claim_posix_requests(PosixRequestStatus.INITIALIZED)
+        self.assertEquals([request_model.pk for request_model in claimed_requests], [self.requests[1].pk],
+                          "Unexpected claimed requests")
+
+    def test_skip_locked(self):
+        """
+        Checks the claim on databases supporting SELECT ... FOR UPDATE SKIP LOCKED
+        """
+        if not connection.features.has_select_for_update:
+            with patch.object(type(connection.features), "has_select_for_update_skip_locked", True):
+                claimed_requests = self.command._claim_posix_requests(PosixRequestStatus.CONFIRMED)
+        else:
+            claimed_requests = self.command._claim_posix_requests(PosixRequestStatus.CONFIRMED)
+        self.assertEquals([request_model.pk for request_model in claimed_requests], [self.requests[0].pk],
+                          "Unexpected claimed requests")
+
+    def test_query_plan(self):
+        """
+        Checks that requests are looked for using the composite index on status and initialization date
+        """
+        if connection.vendor != "sqlite":
+            self.skipTest("The query plan test is designed for SQLite only")
+        plan = PosixRequest.objects\
+            .filter(status=PosixRequestStatus.CONFIRMED, initialization_date__lt=timezone.now())\
+            .order_by('initialization_date')\
+            .explain()
+        self.assertIn("posix_request_status_date_idx", plan, "The composite index shall be used")
+        self.assertNotIn("TEMP B-TREE", plan, "The requests shall be sorted using the index")
@@ -0,0 +1,147 @@
+from django.test import TestCase
+from parameterized import parameterized
+
+from ...models import PosixRequest, LogRecord
+from ...models.enums import PosixRequestStatus
+from .autoadmin_command_mixin import AutoadminCommandMixin, POSIX_USER, POSIX_GROUP, POSIX_CONNECTOR, \
+    entity_arguments
+
+
+class TestPosixRequestCoalescing(AutoadminCommandMixin, TestCase):
+    """
+    Tests how redundant POSIX requests are merged
+    """
+
+    def test_update_connections(self):
+        """
+        Checks that all update_connections requests are merged into the earliest one and their user IDs are combined
+        """
+        requests = [
+            self.create_posix_request(POSIX_CONNECTOR, {"args": [1], "kwargs": {}}, "update_connections",
+                                      {"args": [[1, 2]], "kwargs": {}}),
+            self.create_posix_request(POSIX_CONNECTOR, {"args": [2], "kwargs": {}}, "update_connections",
+                                      {"args": [[2, 3, 3]], "kwargs": {}}),
+            self.create_posix_request(POSIX_CONNECTOR, {"args": [3], "kwargs": {}}, "update_connections",
+                                      {"args": [], "kwargs": {"ids": [4, 1]}}),
+        ]
+        remaining_requests = self.command._coalesce_posix_requests(requests)
+        self.assertEquals(remaining_requests, requests[:1], "Only the earliest request shall remain")
+        remaining_request = PosixRequest.objects.get()
+        self.assertEquals(remaining_request.method_arguments, {"args": [[1, 2, 3, 4]], "kwargs": {}},
+                          "User IDs shall be combined")
+        self.assertEquals(set(remaining_request.coalesced_logs.values_list('id', flat=True)),
+                          {requests[1].log_id, requests[2].log_id}, "Logs of merged requests shall be kept")
+        for merged_request in requests[1:]:
+            self.assertEquals(LogRecord.objects.filter(log_id=merged_request.log_id).count(), 1,
+                              "The merged request shall be provided by the log record")
+
+    def test_transitive_audit_trail(self):
+        """
+        Checks that logs of requests merged before are passed to the remaining request
+        """
+        requests = [
+            self.create_posix_request(POSIX_USER, entity_arguments("UserSet", 1), "update_lock")
+            for _ in range(3)
+        ]
+        self.command._coalesce_posix_requests(requests[1:])
+        self.command._coalesce_posix_requests([requests[0], PosixRequest.objects.get(pk=requests[1].pk)])
+        remaining_request = PosixRequest.objects.get()
+        self.assertEquals(remaining_request.pk, requests[0].pk, "The earliest request shall remain")
+        self.assertEquals(set(remaining_request.coalesced_logs.values_list('id', flat=True)),
+                          {requests[1].log_id, requests[2].log_id}, "Logs of all merged requests shall be kept")
+
+    @parameterized.expand([
+        (POSIX_USER, entity_arguments("UserSet", 1), "update_lock", None,
+         POSIX_USER, entity_arguments("UserSet", 1), "update_lock", None, True),
+        (POSIX_USER, entity_arguments("UserSet", 1), "update_lock", None,
+         POSIX_USER, entity_arguments("UserSet", 2), "update_lock", None, False),
+        (POSIX_USER, entity_arguments("UserSet", 1), "update_lock", None,
+         POSIX_USER, entity_arguments("UserSet", 1), "update_login", None, False),
+        (POSIX_USER, entity_arguments("UserSet", 1), "create", None,
+         POSIX_USER, entity_arguments("UserSet", 1), "create", None, False),
+        (POSIX_USER, entity_arguments("UserSet", 1), "set_password", {"args": ["a"], "kwargs": {}},
+         POSIX_USER, entity_arguments("UserSet", 1), "set_password", {"args": ["a"], "kwargs": {}}, False),
+        (POSIX_USER, entity_arguments("UserSet", 1), "update_supplementary_groups", {"args": ["g1"], "kwargs": {}},
+         POSIX_USER, entity_arguments("UserSet", 1), "update_supplementary_groups", {"args": ["g2"], "kwargs": {}},
+         False),
+        (POSIX_GROUP, entity_arguments("ProjectSet", 1), "update_alias", None,
+         POSIX_GROUP, entity_arguments("ProjectSet", 1), "update_alias", None, True),
+        (POSIX_GROUP, entity_arguments("ProjectSet", 1), "update_root_group", {"args": [1], "kwargs": {}},
+         POSIX_GROUP, entity_arguments("ProjectSet", 1), "update_root_group", {"args": [1], "kwargs": {}}, False),
+        (POSIX_GROUP, entity_arguments("ProjectSet", 1), "update_alias", None,
+         POSIX_USER, entity_arguments("ProjectSet", 1), "update_alias", None, False),
+        ("unknown.module.Action", None, "update_alias", None,
+         "unknown.module.Action", None, "update_alias", None, False),
+    ])
+    def test_coalescing_key(self, first_class, first_arguments, first_method, first_method_arguments,
+                            second_class, second_arguments, second_method, second_method_arguments, is_merged):
+        """
+        Checks what requests can be merged
+
+        :param first_class: action class of the first request
+        :param first_arguments: constructor arguments of the first request
+        :param first_method: method of the first request
+        :param first_method_arguments: method arguments of the first request
+        :param second_class: action class of the second request
+        :param second_arguments: constructor arguments of the second request
+        :param second_method: method of the second request
+        :param second_method_arguments: method arguments of the second request
+        :param is_merged: True if the requests shall be merged
+        """
+        requests = [
+            self.create_posix_request(first_class, first_arguments, first_method, first_method_arguments),
+            self.create_posix_request(second_class, second_arguments, second_method, second_method_arguments),
+        ]
+        remaining_requests = self.command._coalesce_posix_requests(requests)
+        expected_requests = requests[:1] if is_merged else requests
+        self.assertEquals(remaining_requests, expected_requests, "Unexpected remaining requests")
+        self.assertEquals(PosixRequest.objects.count(), len(expected_requests), "Unexpected number of requests")
+
+    @parameterized.expand([
+        (("alice", "127.0.0.1"), ("alice", "127.0.0.1"), True),
+        (("alice", "127.0.0.1"), ("bob", "127.0.0.1"), False),
+        (("alice", "127.0.0.1"), ("alice", "10.0.0.1"), False),
+        ((None, "127.0.0.1"), (None, "127.0.0.1"), False),
+    ])
+    def test_request_author(self, first_author, second_author, is_merged):
+        """
+        Checks that only requests made by the same user from the same IP address are merged, so the security check of
+        the remaining request is valid for all merged requests
+
+        :param first_author: login and IP address for the first request. The login is None for anonymous requests
+        :param second_author: login and IP address for the second request
+        :param is_merged: True if the requests shall be merged
+        """
+        requests = [
+            self.create_posix_request(POSIX_CONNECTOR, {"args": [], "kwargs": {}}, "update_connections",
+                                      {"args": [[1]], "kwargs": {}}, log=self.create_log(*author))
+            for author in (first_author, second_author)
+        ]
+        remaining_requests = self.command._coalesce_posix_requests(requests)
+        self.assertEquals(remaining_requests, requests[:1] if is_merged else requests, "Unexpected remaining requests")
+
+    def test_order(self):
+        """
+        Checks that the remaining requests keep their order
+        """
+        requests = [
+            self.create_posix_request(POSIX_USER, entity_arguments("UserSet", 1), "create"),
+            self.create_posix_request(POSIX_GROUP, entity_arguments("ProjectSet", 1), "update_alias"),
+            self.create_posix_request(POSIX_USER, entity_arguments("UserSet", 1), "update_lock"),
+            self.create_posix_request(POSIX_GROUP, entity_arguments("ProjectSet", 1), "update_alias"),
+            self.create_posix_request(POSIX_USER, entity_arguments("UserSet", 1), "update_lock"),
+        ]
+        remaining_requests = self.command._coalesce_posix_requests(requests)
+        self.assertEquals(remaining_requests, requests[:3], "Unexpected remaining requests")
+
+    def test_status(self):
+        """
+        Checks that the coalescing doesn't change the request status
+        """
+        requests = [
+            self.create_posix_request(POSIX_USER, entity_arguments("UserSet", 1), "update_lock",
+                                      status=PosixRequestStatus.CONFIRMED)
+            for _ in range(2)
+        ]
+        self.command._coalesce_posix_requests(requests)
+        self.assertEquals(PosixRequest.objects.get().status, PosixRequestStatus.CONFIRMED, "Unexpected status")
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from ...management.commands.autoadmin.posix_database import ShadowDatabase
+from ...management.commands.autoadmin.posix_user import PosixUser
+from .posix_fixture_mixin import PosixFixtureMixin
+
+
+class TestPosixUserLock(PosixFixtureMixin, SimpleTestCase):
+    """
+    Tests how the POSIX user lock status is revealed from the /etc/shadow snapshot
+    """
+
+    def setUp(self):
+        super().setUp()
+        subprocess_patcher = patch("subprocess.run")
+        self.subprocess_run = subprocess_patcher.start()
+        self.addCleanup(subprocess_patcher.stop)
+        self.subprocess_run.return_value = SimpleNamespace(stdout=b"eve P 01/01/2024 0 99999 7 -1\n")
+
+    @parameterized.expand([
+        ("root", "P"),
+        ("alice", "P"),
+        ("alice1", "L"),
+        ("bob", "NP"),
+        ("eve", None),
+    ])
+    def test_shadow_lock_status(self, login, expected_status):
+        """
+        Checks that the lock status is revealed in the same way as the 'passwd -S' command does
+
+        :param login: the user login
+        :param expected_status: the expected status
+        """
+        database = ShadowDatabase.get_instance(self.get_fixture_path("shadow"))
+        self.assertTrue(database.available, "The shadow file shall be available")
+        self.assertNotIn("broken", database.by_login, "Malformed lines shall be skipped")
+        self.assertEquals(database.get_lock_status(login), expected_status, "Unexpected lock status")
+
+    def test_unreadable_shadow(self):
+        """
+        Checks that the shadow file which can't be read is marked as unavailable
+        """
+        database = ShadowDatabase.get_instance(self.fixture_directory)
+        self.assertFalse(database.available, "The unreadable file shall not be available")
+        self.assertEquals(database.by_login, {}, "The unreadable file has no entries")
+
+    @parameterized.expand([
+        ("alice", "P"),
+        ("alice1", "L"),
+        ("bob", "NP"),
+    ])
+    def test_get_lock_status(self, login, expected_status):
+        """
+        Checks that no subprocess is run when the user is listed in the shadow file
+
+        :param login: the user login
+        :param expected_status: the expected status
+        """
+        posix_user = PosixUser(None, login=login, home_dir="/home/" + login)
+        self.assertEquals(posix_user.get_lock_status(), expected_status, "Unexpected lock status")
+        self.subprocess_run.assert_not_called()
+
+    def test_get_lock_status_fallback(self):
+        """
+        Checks that the 'passwd -S' command is used when the user is not listed in the shadow file
+        """
+        posix_user = PosixUser(None, login="eve", home_dir="/home/eve")
+        self.assertEquals(posix_user.get_lock_status(), "P", "Unexpected lock status")
+        self.subprocess_run.assert_called_once()
+        self.assertEquals(self.subprocess_run.call_args.args[0], ("passwd", "-S", "eve"), "Unexpected command")
+
+    def test_get_lock_status_unavailable(self):
+        """
+        Checks that the 'passwd -S' command is used when the shadow file can't be read
+        """
+        self.patch_class_attribute(PosixUser, "POSIX_SHADOW_FILE", self.fixture_directory)
+        posix_user = PosixUser(None, login="alice1", home_dir="/home/alice1")
+        self.assertEquals(posix_user.get_lock_status(), "P", "Unexpected lock status")
+        self.subprocess_run.assert_called_once()
+
+    @parameterized.expand([
+        ("alice", True, "passwd -l alice"),
+        ("alice", False, ""),
+        ("alice1", False, "passwd -u alice1"),
+        ("alice1", True, ""),
+        ("bob", True, ""),
+    ])
+    def test_update_lock(self, login, is_locked, expected_commands):
+        """
+        Checks that the user is locked or unlocked only when the lock status differs from the desired one
+
+        :param login: the user login
+        :param is_locked: the desired lock status
+        :param expected_commands: commands that shall be run
+        """
+        posix_user = PosixUser(None, login=login, home_dir="/home/" + login)
+        posix_user.entity = SimpleNamespace(id=1, is_locked=is_locked)
+        posix_user.update_lock()
+        self.assertEquals(posix_user.flush_command_buffer(), expected_commands, "Unexpected commands")
+        self.subprocess_run.assert_not_called()
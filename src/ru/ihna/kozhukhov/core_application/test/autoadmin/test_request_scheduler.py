@@ -0,0 +1,216 @@
+import logging
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from parameterized import parameterized
+
+from ...management.commands.autoadmin import Command
+from ...management.commands.autoadmin.request_scheduler import RequestScheduler
+from ...models import AccessLevel, Group, GroupUser, Permission, Project, User
+from .autoadmin_command_mixin import AutoadminCommandMixin, POSIX_USER, POSIX_GROUP, POSIX_CONNECTOR, \
+    entity_arguments
+
+
+class TestRequestScheduler(SimpleTestCase):
+    """
+    Tests the dependency-aware execution of POSIX requests
+    """
+
+    @parameterized.expand([
+        ([{"user:1"}, {"user:2"}, {"user:1"}], [set(), set(), {0}]),
+        ([{"user:1"}, {"user:2"}, {"user:*"}, {"user:3"}], [set(), set(), {0, 1}, {2}]),
+        ([{"user:1", "group:*"}, {"group:1"}, {"user:2"}], [set(), {0}, set()]),
+        ([{"user:1"}, None, {"user:2"}, {"group:1"}], [set(), {0}, {1}, {1}]),
+        ([None, None], [set(), {0}]),
+        ([{"group:1", "user:*"}, {"user:1"}, {"group:2", "user:*"}], [set(), {0}, {0, 1}]),
+        ([{"user:1"}, {"group:1"}, {"user:2", "group:1"}], [set(), set(), {1}]),
+    ])
+    def test_dependencies(self, resource_list, expected_dependencies):
+        """
+        Checks that requests touching the same POSIX objects depend on each other
+
+        :param resource_list: resources for each request
+        :param expected_dependencies: the expected dependencies
+        """
+        self.assertEquals(RequestScheduler.get_dependencies(resource_list), expected_dependencies,
+                          "Unexpected dependencies")
+
+    def test_concurrent_execution(self):
+        """
+        Checks that independent requests are executed at the same time
+        """
+        barrier = threading.Barrier(3, timeout=5.0)
+
+        def execute(request):
+            barrier.wait()  # Raises BrokenBarrierError unless all three requests are executed at the same time
+            return request * 10
+
+        results = RequestScheduler(3).run([1, 2, 3], [{"user:1"}, {"user:2"}, {"group:1"}], execute)
+        self.assertEquals(results, [10, 20, 30], "Results shall be given in order of requests")
+
+    def test_serialized_execution(self):
+        """
+        Checks that dependent requests are executed in order of their appearance and the number of workers is bounded
+        """
+        events = list()
+        running = set()
+        max_running = [0]
+        lock = threading.Lock()
+
+        def execute(request):
+            with lock:
+                running.add(request)
+                max_running[0] = max(max_running[0], len(running))
+                events.append(("start", request))
+            time.sleep(0.01 * (5 - request))
+            with lock:
+                running.discard(request)
+                events.append(("finish", request))
+            return request
+
+        resource_list = [{"user:1"}, {"user:2"}, {"user:1"}, {"user:3"}, {"user:1"}]
+        results = RequestScheduler(2).run(list(range(5)), resource_list, execute)
+        self.assertEquals(results, list(range(5)), "Unexpected results")
+        self.assertLessEqual(max_running[0], 2, "The number of workers shall be bounded")
+        for previous_request, next_request in [(0, 2), (2, 4)]:
+            self.assertLess(events.index(("finish", previous_request)), events.index(("start", next_request)),
+                            "Dependent requests shall not overlap")
+
+    def test_termination(self):
+        """
+        Checks that no requests are started after the termination
+        """
+        executed_requests = list()
+
+        def execute(request):
+            executed_requests.append(request)
+            return request
+
+        results = RequestScheduler(2).run([1, 2, 3], [{"user:1"}, {"user:1"}, {"user:1"}], execute,
+                                          lambda: len(executed_requests) > 0)
+        self.assertEquals(results, [1, None, None], "No requests shall be executed after the termination")
+
+
+class TestConcurrentRequestExecution(AutoadminCommandMixin, SimpleTestCase):
+    """
+    Tests how the autoadmin daemon executes confirmed requests
+    """
+
+    @parameterized.expand([
+        (POSIX_USER, entity_arguments("UserSet", 1), "update_lock", None, {"user:1"}),
+        (POSIX_USER, entity_arguments("UserSet", 1), "update_supplementary_groups", None, {"user:1", "group:*"}),
+        (POSIX_USER, {"args": [None], "kwargs": {"login": "alice", "home_dir": "/home/alice"}}, "delete", None,
+         None),
+        (POSIX_GROUP, entity_arguments("ProjectSet", 2), "check_group_for_update", None, {"group:2", "user:*"}),
+        (POSIX_CONNECTOR, {"args": [1], "kwargs": {}}, "update_connections", {"args": [[1, 2]], "kwargs": {}},
+         {"user:1", "user:2", "group:*"}),
+        ("unknown.module.Action", None, "update_alias", None, None),
+    ])
+    def test_request_resources(self, action_class, action_arguments, method_name, method_arguments,
+                               expected_resources):
+        """
+        Checks what POSIX objects are touched by the request
+
+        :param action_class: the action class
+        :param action_arguments: constructor arguments
+        :param method_name: the method name
+        :param method_arguments: the method arguments
+        :param expected_resources: the expected resources
+        """
+        request_model = SimpleNamespace(
+            action_class=action_class,
+            action_arguments=action_arguments,
+            method_name=method_name,
+            method_arguments=method_arguments or {"args": [], "kwargs": {}},
+        )
+        self.assertEquals(self.command._get_request_resources(request_model), expected_resources,
+                          "Unexpected resources")
+
+    @parameterized.expand([(1,), (4,)])
+    def test_message_order(self, workers):
+        """
+        Checks that messages are written in order of request initialization whatever order requests are finished
+
+        :param workers: maximum number of requests executed at the same time
+        """
+        request_models = [
+            SimpleNamespace(id=index, action_class=POSIX_USER, action_arguments=entity_arguments("UserSet", index),
+                            method_name="update_lock", method_arguments={"args": [], "kwargs": {}})
+            for index in range(4)
+        ]
+
+        def execute(command, request_model):
+            time.sleep(0.01 * (4 - request_model.id))
+            command._write_message(logging.INFO, "request %d" % request_model.id)
+
+        with override_settings(CORE_AUTOADMIN_WORKERS=workers), \
+                patch.object(Command, "_execute_posix_request", execute), \
+                self.assertLogs("django.corefacility.log", logging.INFO) as logs:
+            self.command._execute_posix_requests(request_models)
+        self.assertEquals([record.getMessage() for record in logs.records],
+                          ["request %d" % index for index in range(4)], "Unexpected message order")
+
+
+class TestPosixGroupResources(AutoadminCommandMixin, TestCase):
+    """
+    Tests what POSIX users are touched by the POSIX group requests
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.users = [User.objects.create(login="user%d" % index) for index in range(5)]
+        root_group = self.create_group("root", [0, 1], governor=0)
+        self.old_root_group = self.create_group("old_root", [1, 2])
+        self.project = Project.objects.create(alias="project", name="Project", root_group=root_group)
+        access_level = AccessLevel.objects.create(alias="data_view", name="Data view")
+        Permission.objects.create(group=self.create_group("guests", [3]), access_level=access_level,
+                                  project=self.project)
+        self.create_group("others", [4])
+
+    @parameterized.expand([
+        ("create", None, [0, 1]),
+        ("update_alias", None, [0, 1, 3]),
+        ("exclude_all_users", None, [0, 1, 3]),
+        ("delete", None, [0, 1, 3]),
+        ("update_root_group", "old_root", [0, 1, 2]),
+        ("check_group_for_update", None, None),
+    ])
+    def test_group_resources(self, method_name, old_root_group, expected_users):
+        """
+        Checks that the POSIX group request declares only users it touches
+
+        :param method_name: the method name
+        :param old_root_group: 'old_root' to pass the old root group ID to the method or None for no arguments
+        :param expected_users: indices of the touched users or None if the request may touch all users
+        """
+        method_args = [self.old_root_group.id] if old_root_group is not None else []
+        request_model = SimpleNamespace(
+            action_class=POSIX_GROUP,
+            action_arguments=entity_arguments("ProjectSet", self.project.id),
+            method_name=method_name,
+            method_arguments={"args": method_args, "kwargs": {}},
+        )
+        if expected_users is None:
+            expected_resources = {"user:*"}
+        else:
+            expected_resources = {"user:%d" % self.users[index].id for index in expected_users}
+        expected_resources.add("group:%d" % self.project.id)
+        self.assertEquals(self.command._get_request_resources(request_model), expected_resources,
+                          "Unexpected resources")
+
+    def create_group(self, name, user_indices, governor=None):
+        """
+        Creates the group with given users
+
+        :param name: the group name
+        :param user_indices: indices of the group users
+        :param governor: index of the group governor or None if the group has no governor
+        :return: the Group model instance
+        """
+        group = Group.objects.create(name=name)
+        for index in user_indices:
+            GroupUser.objects.create(group=group, user=self.users[index], is_governor=index == governor)
+        return group
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from time import monotonic
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from parameterized import parameterized
+
+from ...management.commands.autoadmin.wakeup_channel import WakeupChannel, SocketWakeupChannel, get_wakeup_channel
+from ...models import PosixRequest
+from ...models.enums import PosixRequestStatus
+from .autoadmin_command_mixin import AutoadminCommandMixin
+
+
+class TestSocketWakeupChannel(SimpleTestCase):
+    """
+    Tests the UNIX socket used to wake the autoadmin daemon up
+    """
+
+    def setUp(self):
+        super().setUp()
+        socket_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, socket_directory)
+        self.socket_path = os.path.join(socket_directory, "autoadmin.sock")
+        self.channel = SocketWakeupChannel(self.socket_path)
+        self.channel.open()
+        self.addCleanup(self.channel.close)
+
+    def test_timeout(self):
+        """
+        Checks that the daemon sleeps until the timeout when nobody notifies it
+        """
+        start_time = monotonic()
+        self.assertFalse(self.channel.wait(0.1), "The channel shall not be notified")
+        self.assertGreaterEqual(monotonic() - start_time, 0.1, "The channel shall wait until the timeout")
+
+    def test_notify(self):
+        """
+        Checks that the notification wakes the daemon up immediately and all pending notifications are consumed
+        """
+        for _ in range(3):
+            SocketWakeupChannel(self.socket_path).notify()
+        start_time = monotonic()
+        self.assertTrue(self.channel.wait(10.0), "The channel shall be notified")
+        self.assertLess(monotonic() - start_time, 1.0, "The notification shall wake the daemon up immediately")
+        self.assertFalse(self.channel.wait(0.0), "All notifications shall be consumed")
+
+    def test_close(self):
+        """
+        Checks that the socket file is removed when the channel is closed and notifications are ignored
+        """
+        self.channel.close()
+        self.assertFalse(os.path.exists(self.socket_path), "The socket file shall be removed")
+        SocketWakeupChannel(self.socket_path).notify()
+
+    def test_get_wakeup_channel(self):
+        """
+        Checks that the socket channel is used only when the socket is configured
+        """
+        with override_settings(CORE_AUTOADMIN_WAKEUP_SOCKET=self.socket_path):
+            self.assertIsInstance(get_wakeup_channel(), SocketWakeupChannel, "The socket channel shall be used")
+        with override_settings(CORE_AUTOADMIN_WAKEUP_SOCKET=""):
+            self.assertIs(type(get_wakeup_channel()), WakeupChannel, "The database shall be polled")
+
+
+class TestAutoadminSleepTime(AutoadminCommandMixin, TestCase):
+    """
+    Tests how long the autoadmin daemon sleeps between two consecutive iterations
+    """
+
+    @parameterized.expand([
+        ([], 60.0),
+        ([(PosixRequestStatus.CONFIRMED, 9.5)], 30.0),
+        ([(PosixRequestStatus.CONFIRMED, 9.9)], 6.0),
+        ([(PosixRequestStatus.CONFIRMED, 5.0), (PosixRequestStatus.CONFIRMED, 9.9)], 6.0),
+        ([(PosixRequestStatus.CONFIRMED, 1.0)], 60.0),
+        ([(PosixRequestStatus.CONFIRMED, 11.0)], 60.0),
+        ([(PosixRequestStatus.INITIALIZED, 9.9)], 60.0),
+    ])
+    def test_sleep_time(self, requests, expected_sleep_time):
+        """
+        Checks that the daemon sleeps until the earliest confirmed request becomes ready for execution
+
+        :param requests: list of (status, time since the request initialization in minutes)
+        :param expected_sleep_time: the expected sleep time in seconds
+        """
+        for status, age in requests:
+            posix_request = self.create_posix_request(status=status)
+            PosixRequest.objects.filter(pk=posix_request.pk)\
+                .update(initialization_date=timezone.now() - timedelta(minutes=age))
+        self.assertAlmostEqual(self.command._get_sleep_time(), expected_sleep_time, delta=1.0,
+                               msg="Unexpected sleep time")
@@ -56,6 +56,31 @@ class LogSetObject(EntitySetObject):
     def filter_by_user(self, user):
         self._entities = list(filter(lambda log: log.user is not None and log.user.id == user.id, self._entities))
 
+    def filter_by_response_time_from(self, value):
+        self._entities = list(filter(lambda log: log.response_time >= value, self._entities))
+
+    def filter_by_query_count_from(self, value):
+        self._entities = list(filter(lambda log: log.query_count >= value, self._entities))
+
+    def filter_by_query_time_from(self, value):
+        self._entities = list(filter(lambda log: log.query_time >= value, self._entities))
+
+    def order_by(self, order_by):
+        """
+        Sorts all entities in the same way as the 'order_by' filter does it
+
+        :param order_by: the order_by filter value
+        :return: nothing
+        """
+        self.sort()
+        column = order_by.lstrip("-")
+        if column == "request_date":
+            self._entities = list(sorted(self._entities, key=lambda log: log.request_date.get(),
+                                         reverse=order_by.startswith("-")))
+        else:
+            self._entities = list(sorted(self._entities, key=lambda log: getattr(log, column),
+                                         reverse=order_by.startswith("-")))
+
     def _new_entity(self, **entity_fields):
         """
         Creates new entity with given initial parameters
@@ -112,6 +137,10 @@ None, POST, 127.0.0.1, 4
             if user_index != 'None':
                 user = self._user_set_object[int(user_index)]
                 sample_item['user'] = user
+            log_index = len(sample_data)
+            sample_item['response_time'] = 0.01 * ((log_index * log_index) % 29)
+            sample_item['query_count'] = (log_index * 5) % 11
+            sample_item['query_time'] = 0.01 * ((log_index * 3) % 17)
             sample_data.append(sample_item)
 
         return sample_data
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from ...models import HealthCheck
+
+
+class HealthCheckSampleMixin:
+    """
+    Provides sample health check timestamps for the health check tests
+    """
+
+    SAMPLE_INTERVAL = timedelta(minutes=1)
+
+    BYTES_SENT_RATE = 1000
+    """ Number of bytes sent per sample interval """
+
+    BYTES_RECEIVED_RATE = 500
+    """ Number of bytes received per sample interval """
+
+    MOUNT_POINT = "/"
+
+    SENSOR_NAME = "Package id 0"
+
+    PROCESS_GROUPS = ["corefacility/autoadmin", "gunicorn/worker"]
+
+    @classmethod
+    def create_health_checks(cls, start, sample_number):
+        """
+        Creates the health check timestamps
+
+        :param start: date of the first timestamp
+        :param sample_number: total number of timestamps
+        :return: list of created health checks
+        """
+        return HealthCheck.objects.bulk_create([cls.get_health_check(start, index) for index in range(sample_number)])
+
+    @classmethod
+    def get_health_check(cls, start, index):
+        """
+        Creates a single health check timestamp without saving it
+
+        :param start: date of the first timestamp
+        :param index: index of the timestamp
+        :return: the HealthCheck instance
+        """
+        return HealthCheck(
+            date=start + index * cls.SAMPLE_INTERVAL,
+            cpu_load=[float(index % 10), float(index % 7 * 10)],
+            ram_free=1000 + index,
+            swap_free=500 + index % 3,
+            hdd_free={cls.MOUNT_POINT: 1000000 - index},
+            bytes_sent=cls.BYTES_SENT_RATE * index,
+            bytes_received=cls.BYTES_RECEIVED_RATE * index,
+            temperature={
+                "coretemp-isa-0000": {
+                    "Adapter": "ISA adapter",
+                    cls.SENSOR_NAME: {"temp1_input": 40.0 + index % 5, "temp1_crit": 100.0},
+                },
+            },
+            processes={
+                # The gunicorn workers are restarted every 50 timestamps
+                group: {"pids": 1 + group_index, "rss": 1000000 * (group_index + 1) + index,
+                        "cpu_time": 0.6 * index if group_index == 0 else 0.3 * (index % 50),
+                        "fds": 10 + index % 4, "threads": 2 + group_index}
+                for group_index, group in enumerate(cls.PROCESS_GROUPS)
+            },
+        )
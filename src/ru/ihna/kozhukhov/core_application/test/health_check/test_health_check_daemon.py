@@ -0,0 +1,176 @@
+import os
+import signal
+from datetime import timedelta
+from unittest.mock import patch, MagicMock
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from parameterized import parameterized
+
+from ...models import HealthCheck
+from ...management.commands.health_check import Command
+from ...views import HealthCheck as HealthCheckView
+from .health_check_sample_mixin import HealthCheckSampleMixin
+
+
+class TestHealthCheckDaemon(HealthCheckSampleMixin, TestCase):
+    """
+    Tests the sampling, batching and recycling in the health check daemon
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.start = now()
+        self.sample_index = 0
+        self.saved_numbers = []
+        self.command = Command()
+        for name, kwargs in [
+            ("read_mount_points", {"return_value": [self.MOUNT_POINT]}),
+            ("_detect_health_check", {"side_effect": self.detect_health_check}),
+            ("_detect_criticals", {"return_value": {}}),
+            ("_update_rollups", {}),
+        ]:
+            patcher = patch.object(Command, name, **kwargs)
+            setattr(self, name.lstrip("_") + "_mock", patcher.start())
+            self.addCleanup(patcher.stop)
+        patcher = patch("ru.ihna.kozhukhov.core_application.management.commands.health_check.get_sensor_reader",
+                        return_value=MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def detect_health_check(self):
+        """
+        Provides the next sample timestamp instead of the real measures
+
+        :return: the HealthCheck instance
+        """
+        health_check = self.get_health_check(self.start, self.sample_index)
+        self.sample_index += 1
+        return health_check
+
+    def run_daemon(self, iteration_number, **options):
+        """
+        Runs the daemon until a given number of iterations is completed
+
+        :param iteration_number: number of iterations after which the daemon will be interrupted
+        :param options: the command options
+        """
+        def interrupt(delay):
+            self.assertGreaterEqual(delay, 0.0, "The delay can't be negative")
+            self.saved_numbers.append(HealthCheck.objects.count())
+            if len(self.saved_numbers) >= iteration_number:
+                raise KeyboardInterrupt()
+        with patch("ru.ihna.kozhukhov.core_application.management.commands.health_check.sleep",
+                   side_effect=interrupt), \
+                patch("builtins.print"):
+            self.command.handle(**options)
+
+    @parameterized.expand([
+        (1, 5, [1, 2, 3, 4, 5], 5),
+        (3, 7, [0, 0, 3, 3, 3, 6, 6], 3),
+        (10, 4, [0, 0, 0, 0], 1),
+    ])
+    def test_batching(self, batch_size, iteration_number, expected_saved_numbers, expected_flushes):
+        """
+        Checks that the timestamps are saved by batches and the pending ones are saved upon termination
+
+        :param batch_size: number of timestamps saved at once
+        :param iteration_number: number of the daemon iterations
+        :param expected_saved_numbers: numbers of the saved timestamps at the end of each iteration
+        :param expected_flushes: expected number of the batch insertions
+        """
+        self.run_daemon(iteration_number, interval=1, batch_size=batch_size)
+        self.assertEquals(self.saved_numbers, expected_saved_numbers, "Unexpected number of saved timestamps")
+        self.assertEquals(HealthCheck.objects.count(), iteration_number, "All timestamps shall be saved upon exit")
+        self.assertEquals(self.update_rollups_mock.call_count, expected_flushes,
+                          "The rollups shall be updated after each batch insertion")
+
+    def test_termination_signal(self):
+        """
+        Checks that the pending timestamps are saved when the daemon is stopped by SIGTERM
+        """
+        def terminate(delay):
+            self.saved_numbers.append(HealthCheck.objects.count())
+            if len(self.saved_numbers) >= 3:
+                os.kill(os.getpid(), signal.SIGTERM)
+
+        def unhandled_signal(signal_number, execution_frame):
+            raise RuntimeError("SIGTERM was not handled by the daemon")
+
+        previous_handler = signal.signal(signal.SIGTERM, unhandled_signal)
+        self.addCleanup(signal.signal, signal.SIGTERM, previous_handler)
+        with patch("ru.ihna.kozhukhov.core_application.management.commands.health_check.sleep",
+                   side_effect=terminate), \
+                patch("builtins.print"):
+            self.command.handle(interval=1, batch_size=10)
+        self.assertEquals(self.saved_numbers, [0, 0, 0], "The timestamps shall be kept in memory before the signal")
+        self.assertEquals(HealthCheck.objects.count(), 3, "All timestamps shall be saved upon termination")
+        self.assertIs(signal.getsignal(signal.SIGTERM), unhandled_signal, "The signal handler shall be restored")
+
+    @parameterized.expand([
+        ("--interval", "0"),
+        ("--interval", "-5"),
+        ("--batch-size", "0"),
+        ("--batch-size", "many"),
+    ])
+    def test_bad_option(self, option_name, option_value):
+        """
+        Checks that the daemon doesn't start when the interval or the batch size is not a positive integer
+
+        :param option_name: the command line option
+        :param option_value: the option value
+        """
+        with patch.object(Command, "handle") as handle_mock, self.assertRaises(CommandError):
+            call_command("health_check", option_name, option_value)
+        handle_mock.assert_not_called()
+
+    @override_settings(CORE_HEALTH_CHECK_BATCH_SIZE=2)
+    def test_batch_size_setting(self):
+        """
+        Checks that the batch size is taken from the settings when the command option is omitted
+        """
+        self.run_daemon(3, interval=1)
+        self.assertEquals(self.saved_numbers, [0, 2, 2], "Unexpected number of saved timestamps")
+
+    @parameterized.expand([
+        (250, 100, 5.0, 250),
+        (250, 100, 0.0, 100),
+        (50, 100, 0.0, 50),
+    ])
+    def test_recycle(self, dead_number, chunk_size, recycle_time, expected_removed):
+        """
+        Checks that the dead timestamps are removed by chunks within the given time
+
+        :param dead_number: number of the dead timestamps
+        :param chunk_size: maximum number of timestamps removed by a single query
+        :param recycle_time: maximum duration of the recycling
+        :param expected_removed: expected number of the removed timestamps
+        """
+        alive_number = 10
+        self.create_health_checks(self.start - Command.VIEW_INTERVAL - dead_number * self.SAMPLE_INTERVAL,
+                                  dead_number)
+        self.create_health_checks(self.start, alive_number)
+        with self.settings(CORE_HEALTH_CHECK_RECYCLE_CHUNK=chunk_size, CORE_HEALTH_CHECK_RECYCLE_TIME=recycle_time):
+            removed_number = Command()._recycle_old_timestamps()
+        self.assertEquals(removed_number, expected_removed, "Unexpected number of removed timestamps")
+        self.assertEquals(HealthCheck.objects.count(), dead_number + alive_number - expected_removed,
+                          "Unexpected number of remaining timestamps")
+        self.assertEquals(HealthCheck.objects.filter(date__gte=self.start).count(), alive_number,
+                          "Alive timestamps shall not be removed")
+
+    @parameterized.expand([
+        (10, 600),
+        (60, 600),
+        (600, None),
+    ])
+    def test_resolution(self, monitoring_interval, expected_resolution):
+        """
+        Checks that the rollups finer than the sampling interval are never chosen
+
+        :param monitoring_interval: the sampling interval in seconds
+        :param expected_resolution: the expected resolution
+        """
+        with self.settings(CORE_HEALTH_CHECK_INTERVAL=monitoring_interval):
+            resolution = HealthCheckView().get_resolution(self.start - timedelta(days=3), self.start, 300)
+        self.assertEquals(resolution, expected_resolution, "Unexpected resolution")
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import TestCase
+from django.utils.timezone import now
+from parameterized import parameterized
+from rest_framework import status
+
+from ...models import HealthCheck, HealthCheckRollup
+from ..views.base_view_test import BaseViewTest
+from .health_check_sample_mixin import HealthCheckSampleMixin
+
+
+def rollup_snapshot():
+    """
+    Reveals all health check rollups
+    :return: a dictionary (resolution, date) => (sample_count, channels)
+    """
+    return {
+        (rollup.resolution, rollup.date): (rollup.sample_count, rollup.channels)
+        for rollup in HealthCheckRollup.objects.all()
+    }
+
+
+class TestHealthCheckRollup(HealthCheckSampleMixin, TestCase):
+    """
+    Tests the multi-resolution health check rollups
+    """
+
+    START = datetime(2024, 3, 1, 0, 0, 5, tzinfo=timezone.utc)
+
+    SAMPLE_NUMBER = 180
+
+    def setUp(self):
+        super().setUp()
+        self.health_checks = self.create_health_checks(self.START, self.SAMPLE_NUMBER)
+
+    def test_update(self):
+        """
+        Checks that the rollups are calculated for all resolutions
+        """
+        rollup_number = HealthCheckRollup.update(self.START + timedelta(hours=3))
+        self.assertEquals(rollup_number, 180 + 18 + 3, "Unexpected number of rollups")
+        for resolution in HealthCheckRollup.RESOLUTIONS:
+            rollups = HealthCheckRollup.objects.filter(resolution=resolution)
+            for rollup in rollups:
+                self.assertEquals(rollup.date.timestamp() % resolution, 0, "The rollup is not aligned")
+                self.assertEquals(rollup.sample_count, resolution // 60, "Unexpected number of samples")
+        hourly_rollup = HealthCheckRollup.objects.get(resolution=3600, date=self.START.replace(second=0))
+        cpu_load = [health_check.cpu_load[1] for health_check in self.health_checks[:60]]
+        self.assertEquals(hourly_rollup.channels['cpu']['1'][0], min(cpu_load), "Unexpected minimum value")
+        self.assertAlmostEquals(hourly_rollup.channels['cpu']['1'][1], sum(cpu_load) / len(cpu_load),
+                                msg="Unexpected mean value")
+        self.assertEquals(hourly_rollup.channels['cpu']['1'][2], max(cpu_load), "Unexpected maximum value")
+        self.assertEquals(hourly_rollup.channels['disk'][self.MOUNT_POINT],
+                          [1000000 - 59, 1000000 - 29.5, 1000000], "Unexpected disk channel")
+        self.assertEquals(hourly_rollup.channels['temperature'][self.SENSOR_NAME], [40.0, 42.0, 44.0],
+                          "Unexpected temperature channel")
+        for value in HealthCheckRollup.objects.get(resolution=3600, date=self.START.replace(hour=1, second=0))\
+                .channels['network']['bytes_sent']:
+            self.assertAlmostEquals(value, self.BYTES_SENT_RATE / 60, msg="Unexpected network traffic")
+
+    @parameterized.expand([
+        ([30, 75, 179, 180, 400],),
+        ([10, 11, 12, 13],),
+        ([1000, 1000],),
+    ])
+    def test_incremental_update(self, minutes):
+        """
+        Checks that the rollups calculated incrementally are the same as the rollups calculated at once
+
+        :param minutes: list of minutes after the START when the rollups are updated
+        """
+        for minute in minutes:
+            HealthCheckRollup.update(self.START + timedelta(minutes=minute))
+        expected_snapshot = rollup_snapshot()
+        HealthCheckRollup.objects.all().delete()
+        HealthCheckRollup.update(self.START + timedelta(minutes=minutes[-1]))
+        self.assertEquals(rollup_snapshot(), expected_snapshot, "Incremental update gives different rollups")
+
+    def test_late_samples(self):
+        """
+        Checks that the timestamps saved after their interval was rolled up are aggregated within the late period
+        """
+        late_health_checks = [health_check for health_check in self.health_checks
+                              if health_check.date.hour == 1 and health_check.date.minute == 57]
+        HealthCheck.objects.filter(id__in=[health_check.id for health_check in late_health_checks]).delete()
+        late_period = timedelta(minutes=5)
+        HealthCheckRollup.update(self.START + timedelta(minutes=119), late_period)
+        HealthCheck.objects.bulk_create(late_health_checks)
+        HealthCheckRollup.update(self.START + timedelta(minutes=121), late_period)
+        incremental_snapshot = rollup_snapshot()
+        HealthCheckRollup.objects.all().delete()
+        HealthCheckRollup.update(self.START + timedelta(minutes=121))
+        self.assertEquals(incremental_snapshot, rollup_snapshot(), "The late timestamps were not aggregated")
+
+    def test_recycle(self):
+        """
+        Checks that the rollups are removed according to their retention periods
+        """
+        HealthCheckRollup.update(self.START + timedelta(hours=3))
+        HealthCheckRollup.recycle(self.START + timedelta(weeks=1, hours=2))
+        self.assertEquals(HealthCheckRollup.objects.filter(resolution=60).count(), 59,
+                          "Only 1-minute rollups started after 2:00 shall be kept")
+        self.assertEquals(HealthCheckRollup.objects.filter(resolution=600).count(), 18,
+                          "All 10-minute rollups shall be kept")
+        self.assertEquals(HealthCheckRollup.objects.filter(resolution=3600).count(), 3,
+                          "All 1-hour rollups shall be kept")
+
+
+class TestHealthCheckView(HealthCheckSampleMixin, BaseViewTest):
+    """
+    Tests the choice of the health check resolution
+    """
+
+    SAMPLE_NUMBER = 3 * 24 * 60
+    """ Three days of the 1-minute timestamps """
+
+    ordinary_user_required = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.current_date = now()
+        start = cls.current_date - cls.SAMPLE_NUMBER * cls.SAMPLE_INTERVAL
+        cls.create_health_checks(start, cls.SAMPLE_NUMBER)
+        HealthCheckRollup.update(cls.current_date)
+
+    @parameterized.expand([
+        ("cpu", timedelta(days=3), {}, 600, 2),
+        ("memory", timedelta(days=3), {"points": "50"}, 3600, 2),
+        ("disk", timedelta(days=3), {"points": "2000"}, None, 1),
+        ("network", timedelta(hours=2), {}, None, 2),
+        ("temperature", timedelta(days=3), {"points": "5000"}, None, 1),
+        ("processes", timedelta(days=3), {}, 600, 8),
+        ("processes", timedelta(hours=2), {}, None, 8),
+    ])
+    def test_resolution(self, category, interval, query_params, expected_resolution, expected_channels):
+        """
+        Checks that the coarsest resolution that gives the requested number of timestamps is chosen
+
+        :param category: the health check category
+        :param interval: duration of the requested time interval
+        :param query_params: additional query parameters
+        :param expected_resolution: the expected resolution or None if the timestamps shall be shown
+        :param expected_channels: the expected number of channels
+        """
+        date_from = self.current_date - interval
+        response = self.client.get("/api/%s/health-check/%s/" % (self.API_VERSION, category),
+                                   {"from": date_from.isoformat(), "to": self.current_date.isoformat(),
+                                    **query_params},
+                                   **self.get_authorization_headers("ordinary_user"))
+        self.assertEquals(response.status_code, status.HTTP_200_OK, "Unexpected response status")
+        data = response.data
+        self.assertEquals(data['resolution'], expected_resolution or 60, "Unexpected resolution")
+        expected_points = interval.total_seconds() / data['resolution']
+        self.assertLessEqual(abs(len(data['timestamps']) - expected_points), 2, "Unexpected number of timestamps")
+        self.assertEquals(len(data['labels']), expected_channels, "Unexpected number of channels")
+        self.assertEquals(len(data['values']), expected_channels, "Unexpected number of channels")
+        for channel_values in data['values']:
+            self.assertEquals(len(channel_values), len(data['timestamps']), "Unexpected channel length")
+        if expected_resolution is None:
+            self.assertIsNone(data['minimums'], "The timestamps have no minimum values")
+        else:
+            for minimums, values, maximums in zip(data['minimums'], data['values'], data['maximums']):
+                for minimum, value, maximum in zip(minimums, values, maximums):
+                    if value is not None:
+                        self.assertLessEqual(minimum, value, "The mean value shall not be less than minimum")
+                        self.assertLessEqual(value, maximum, "The mean value shall not be greater than maximum")
+
+    @parameterized.expand([
+        ({"points": "0"},),
+        ({"points": "abc"},),
+        ({"from": "not a date"},),
+    ])
+    def test_bad_query(self, query_params):
+        """
+        Checks that bad query parameters are rejected
+
+        :param query_params: the query parameters
+        """
+        response = self.client.get("/api/%s/health-check/cpu/" % self.API_VERSION, query_params,
+                                   **self.get_authorization_headers("ordinary_user"))
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST, "Bad query shall be rejected")
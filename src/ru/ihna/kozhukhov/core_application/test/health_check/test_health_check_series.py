@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+from django.test import TestCase
+from parameterized import parameterized
+
+from ...models import HealthCheck
+from ...views import HealthCheck as HealthCheckView
+from .health_check_sample_mixin import HealthCheckSampleMixin
+
+
+def get_reference_series(category, date_from, date_to):
+    """
+    Reveals the health check channels in the straightforward way: all health check timestamps are loaded entirely
+    and processed one by one
+
+    :param category: the health check category
+    :param date_from: beginning of the time interval
+    :param date_to: end of the time interval
+    :return: a tuple (timestamps, values)
+    """
+    timestamps = []
+    rows = []
+    previous = None
+    for health_check in HealthCheck.objects.filter(date__gte=date_from, date__lte=date_to).order_by("date"):
+        timestamps.append(health_check.date)
+        channel_values = health_check.get_channel_values(previous)[category]
+        if category == 'network' and previous is None:
+            channel_values = {'bytes_sent': 0.0, 'bytes_received': 0.0}
+        rows.append(channel_values)
+        previous = health_check
+    if len(rows) == 0:
+        return timestamps, None
+    if category == 'processes':
+        # The CPU usage is not revealed for the first timestamp and the timestamps when the process was restarted
+        keys = list(rows[1].keys()) if len(rows) > 1 else list(rows[0].keys())
+        return timestamps, [[row.get(key) for row in rows] for key in keys]
+    values = [list(channel) for channel in zip(*[list(row.values()) for row in rows])]
+    return timestamps, values
+
+
+class TestHealthCheckSeries(HealthCheckSampleMixin, TestCase):
+    """
+    Tests extraction of the health check channels from the health check timestamps
+    """
+
+    START = datetime(2024, 3, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+    SAMPLE_NUMBER = 200
+
+    BENCHMARK_SAMPLE_NUMBER = 30 * 24 * 60
+    """ A month of the 1-minute timestamps """
+
+    @parameterized.expand([(category,) for category in HealthCheckView.CATEGORIES])
+    def test_series(self, category):
+        """
+        Checks that the channels are the same as the channels revealed in the straightforward way
+
+        :param category: the health check category
+        """
+        self.create_health_checks(self.START, self.SAMPLE_NUMBER)
+        date_from = self.START + timedelta(minutes=10)
+        date_to = self.START + timedelta(minutes=150)
+        data = HealthCheckView().get_timestamp_data(category, date_from, date_to)
+        expected_timestamps, expected_values = get_reference_series(category, date_from, date_to)
+        self.assertEquals(data['timestamps'], expected_timestamps, "Unexpected timestamps")
+        self.assertEquals(len(data['labels']), len(expected_values), "Unexpected number of labels")
+        self.assertEquals(len(data['values']), len(expected_values), "Unexpected number of channels")
+        for actual_channel, expected_channel in zip(data['values'], expected_values):
+            self.assertEquals(len(actual_channel), len(expected_channel), "Unexpected channel length")
+            for actual_value, expected_value in zip(actual_channel, expected_channel):
+                if expected_value is None:
+                    self.assertIsNone(actual_value, "Unexpected channel value")
+                else:
+                    self.assertAlmostEquals(actual_value, expected_value, msg="Unexpected channel value")
+
+    @parameterized.expand([(category,) for category in HealthCheckView.CATEGORIES])
+    def test_empty_series(self, category):
+        """
+        Checks the response when there are no health check timestamps within the time interval
+
+        :param category: the health check category
+        """
+        data = HealthCheckView().get_timestamp_data(category, self.START, self.START + timedelta(hours=1))
+        self.assertEquals(data['timestamps'], [], "No timestamps are expected")
+        self.assertIsNone(data['values'], "No channels are expected")
+
+    def test_cpu_number_change(self):
+        """
+        Checks that the CPU channels are revealed correctly when the number of CPUs has been changed
+        """
+        health_checks = [self.get_health_check(self.START, index) for index in range(3)]
+        health_checks[1].cpu_load = [1.0]
+        health_checks[2].cpu_load = [1.0, 2.0, 3.0]
+        HealthCheck.objects.bulk_create(health_checks)
+        data = HealthCheckView().get_timestamp_data('cpu', self.START, self.START + timedelta(hours=1))
+        self.assertEquals(data['values'], [[0.0, 1.0, 1.0], [0.0, None, 2.0]], "Unexpected CPU channels")
+
+    def test_benchmark(self):
+        """
+        Compares time required to reveal the channels for a month of the 1-minute timestamps with time required to
+        reveal them in the straightforward way
+        """
+        self.create_health_checks(self.START, self.BENCHMARK_SAMPLE_NUMBER)
+        date_from = self.START
+        date_to = self.START + self.BENCHMARK_SAMPLE_NUMBER * self.SAMPLE_INTERVAL
+        view = HealthCheckView()
+        actual_time = 0.0
+        reference_time = 0.0
+        for category in HealthCheckView.CATEGORIES:
+            start_time = perf_counter()
+            data = view.get_timestamp_data(category, date_from, date_to)
+            actual_time += perf_counter() - start_time
+            start_time = perf_counter()
+            get_reference_series(category, date_from, date_to)
+            reference_time += perf_counter() - start_time
+            self.assertEquals(len(data['timestamps']), self.BENCHMARK_SAMPLE_NUMBER, "Unexpected timestamp number")
+        self.assertLess(actual_time, reference_time,
+                        "The channels were revealed in %1.3f s while the straightforward way takes %1.3f s" %
+                        (actual_time, reference_time))
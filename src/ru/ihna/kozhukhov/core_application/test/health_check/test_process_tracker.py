@@ -0,0 +1,135 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from ...models import HealthCheck
+from ...sensors import ProcessTracker
+
+
+class TestProcessTracker(SimpleTestCase):
+    """
+    Tests the resource tracking for the corefacility processes
+    """
+
+    GROUP_NAME = "test"
+
+    SLEEP_COMMAND = [sys.executable, "-c", "import time; time.sleep(60)"]
+
+    def setUp(self):
+        super().setUp()
+        self.pid_file = tempfile.NamedTemporaryFile("w", suffix=".pid", delete=False)
+        self.pid_file.close()
+        self.addCleanup(os.remove, self.pid_file.name)
+        self.children = []
+
+    def tearDown(self):
+        for child in self.children:
+            child.kill()
+            child.wait()
+        super().tearDown()
+
+    def write_pid_file(self, content):
+        """
+        Writes the PID file
+
+        :param content: the PID file content
+        """
+        with open(self.pid_file.name, "w") as pid_file:
+            pid_file.write(content)
+
+    def start_child(self, *arguments):
+        """
+        Starts a child process that does nothing
+
+        :param arguments: additional command line arguments
+        """
+        self.children.append(subprocess.Popen(self.SLEEP_COMMAND + list(arguments)))
+
+    def test_process_tree(self):
+        """
+        Checks that the root process and all its children are tracked and split by their roles
+        """
+        self.write_pid_file("%d\n" % os.getpid())
+        self.start_child()
+        self.start_child()
+        self.start_child("/usr/local/bin/corefacility", "autoadmin")
+        resources = ProcessTracker({self.GROUP_NAME: self.pid_file.name}).read()
+        self.assertEquals(set(resources.keys()),
+                          {self.GROUP_NAME, self.GROUP_NAME + "/worker", self.GROUP_NAME + "/autoadmin"},
+                          "Unexpected process roles")
+        self.assertEquals(resources[self.GROUP_NAME]['pids'], 1, "Unexpected number of root processes")
+        self.assertEquals(resources[self.GROUP_NAME + "/worker"]['pids'], 2, "Workers shall be summarized")
+        self.assertEquals(resources[self.GROUP_NAME + "/autoadmin"]['pids'], 1, "Unexpected number of daemons")
+        for role, role_resources in resources.items():
+            self.assertGreater(role_resources['rss'], 0, "The process %s shall occupy some memory" % role)
+            self.assertGreaterEqual(role_resources['cpu_time'], 0.0, "The CPU time can't be negative")
+            self.assertGreaterEqual(role_resources['threads'], role_resources['pids'],
+                                    "Each process has at least one thread")
+            self.assertGreater(role_resources['fds'], 0, "The process %s shall open some files" % role)
+
+    @parameterized.expand([
+        ("missing_file", None),
+        ("empty_file", ""),
+        ("bad_pid", "not a pid\n"),
+        ("dead_process", "dead"),
+    ])
+    def test_bad_pid_file(self, _, content):
+        """
+        Checks that only the current process is tracked when the PID file is not valid
+
+        :param _: the test name suffix
+        :param content: the PID file content or None if the PID file doesn't exist
+        """
+        if content == "dead":
+            self.start_child()
+            child = self.children.pop()
+            child.kill()
+            child.wait()
+            content = "%d\n" % child.pid
+        pid_file = self.pid_file.name if content is not None else self.pid_file.name + ".missing"
+        if content is not None:
+            self.write_pid_file(content)
+        resources = ProcessTracker({self.GROUP_NAME: pid_file}).read()
+        self.assertEquals(list(resources.keys()), [ProcessTracker.CURRENT_PROCESS_NAME],
+                          "Only the current process shall be tracked")
+        self.assertEquals(resources[ProcessTracker.CURRENT_PROCESS_NAME]['pids'], 1, "Unexpected process number")
+
+    @parameterized.expand([
+        (["/usr/bin/python3", "/usr/local/bin/corefacility", "health_check"], "health_check"),
+        (["corefacility", "autoadmin", "--verbose"], "autoadmin"),
+        (["gunicorn: worker [ru.ihna.kozhukhov.corefacility.wsgi:application]"], "worker"),
+        (["corefacility"], "worker"),
+        ([], "worker"),
+        (None, "worker"),
+    ])
+    def test_process_role(self, cmdline, expected_role):
+        """
+        Checks that the process role is revealed from the command line
+
+        :param cmdline: the process command line
+        :param expected_role: the expected process role
+        """
+        self.assertEquals(ProcessTracker.get_process_role(cmdline), expected_role, "Unexpected process role")
+
+    @parameterized.expand([
+        ("no_previous", None, None, {"g:rss": 100, "g:fds": 3, "g:threads": 2}),
+        ("usage", {"g": {"cpu_time": 1.0}}, 60.0, {"g:rss": 100, "g:cpu": 5.0, "g:fds": 3, "g:threads": 2}),
+        ("restart", {"g": {"cpu_time": 10.0}}, 60.0, {"g:rss": 100, "g:fds": 3, "g:threads": 2}),
+        ("new_group", {"h": {"cpu_time": 1.0}}, 60.0, {"g:rss": 100, "g:fds": 3, "g:threads": 2}),
+    ])
+    def test_process_values(self, _, previous_processes, time_period, expected_values):
+        """
+        Checks that the process channels are revealed from the stored process resources
+
+        :param _: the test name suffix
+        :param previous_processes: resources stored in the previous health check
+        :param time_period: time elapsed since the previous health check
+        :param expected_values: the expected channel values
+        """
+        processes = {"g": {"pids": 1, "rss": 100, "cpu_time": 4.0, "fds": 3, "threads": 2}}
+        process_values = HealthCheck.get_process_values(processes, previous_processes, time_period)
+        self.assertEquals(process_values, expected_values, "Unexpected process channels")
@@ -0,0 +1,182 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext as _
+from parameterized import parameterized
+
+from ...models import HealthCheck
+from ...sensors import HwmonSensorReader, LmSensorsReader, get_sensor_reader
+from ...management.commands.health_check import Command
+
+
+class TestSensors(SimpleTestCase):
+    """
+    Tests the hardware sensor readers against a fake sysfs tree
+    """
+
+    SYSFS_TREE = {
+        "hwmon0/name": "coretemp\n",
+        "hwmon0/temp1_input": "45000\n",
+        "hwmon0/temp1_label": "Package id 0\n",
+        "hwmon0/temp1_crit": "100000\n",
+        "hwmon0/temp1_max": "80000\n",
+        "hwmon0/temp2_input": "43500\n",
+        "hwmon0/temp2_label": "Core 0\n",
+        "hwmon0/temp2_crit": "60000\n",
+        "hwmon1/name": "nvme\n",
+        "hwmon1/temp1_input": "38850\n",
+        "hwmon2/name": "acpitz\n",
+        "hwmon2/device/temp1_input": "27800\n",
+        "hwmon3/name": "fan_controller\n",
+        "hwmon3/fan1_input": "1200\n",
+        "hwmon4/name": "broken\n",
+        "hwmon4/temp1_input": "not a number\n",
+    }
+
+    EXPECTED_SENSORS = {
+        "coretemp-hwmon0": {
+            "Package id 0": {"temp1_input": 45.0, "temp1_crit": 100.0, "temp1_max": 80.0},
+            "Core 0": {"temp2_input": 43.5, "temp2_crit": 60.0},
+        },
+        "nvme-hwmon1": {
+            "temp1": {"temp1_input": 38.85},
+        },
+        "acpitz-hwmon2": {
+            "temp1": {"temp1_input": 27.8},
+        },
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.hwmon_directory = tempfile.mkdtemp()
+        for relative_path, content in self.SYSFS_TREE.items():
+            self.write_attribute(relative_path, content)
+
+    def tearDown(self):
+        shutil.rmtree(self.hwmon_directory)
+        super().tearDown()
+
+    def write_attribute(self, relative_path, content):
+        """
+        Writes a single attribute to the fake sysfs tree
+
+        :param relative_path: path to the attribute relatively to the hwmon directory
+        :param content: the attribute content
+        """
+        path = os.path.join(self.hwmon_directory, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as attribute_file:
+            attribute_file.write(content)
+
+    def test_read(self):
+        """
+        Checks that all temperature sensors are read together with their labels and thresholds
+        """
+        reader = HwmonSensorReader(self.hwmon_directory)
+        self.assertTrue(reader.is_available(), "The fake sysfs tree contains the temperature sensors")
+        self.assertEquals(reader.read(), self.EXPECTED_SENSORS, "Unexpected sensor values")
+
+    def test_parse_temperature(self):
+        """
+        Checks that the reader output is understood by the HealthCheck model in the same way as the lm-sensors output
+        """
+        temperature = HealthCheck.parse_temperature(HwmonSensorReader(self.hwmon_directory).read())
+        self.assertEquals(temperature, {"Package id 0": 45.0, "Core 0": 43.5, "temp1": 38.85},
+                          "Unexpected temperature values")
+
+    def test_repeated_read(self):
+        """
+        Checks that the sensor values are re-read while the sensor layout is revealed once
+        """
+        reader = HwmonSensorReader(self.hwmon_directory)
+        reader.read()
+        self.write_attribute("hwmon0/temp1_input", "51000\n")
+        self.write_attribute("hwmon0/temp1_label", "Renamed\n")
+        sensors = reader.read()
+        self.assertEquals(sensors["coretemp-hwmon0"]["Package id 0"]["temp1_input"], 51.0,
+                          "The sensor value was not re-read")
+
+    def test_sensor_removed(self):
+        """
+        Checks that the sensor layout is revealed again when some sensor disappears
+        """
+        reader = HwmonSensorReader(self.hwmon_directory)
+        reader.read()
+        shutil.rmtree(os.path.join(self.hwmon_directory, "hwmon1"))
+        sensors = reader.read()
+        self.assertNotIn("nvme-hwmon1", sensors, "The removed sensor shall not be read")
+        self.assertIn("coretemp-hwmon0", sensors, "The remaining sensors shall be read")
+
+    def test_malformed_value(self):
+        """
+        Checks that the sensor with malformed value is skipped while other sensors are still read
+        """
+        reader = HwmonSensorReader(self.hwmon_directory)
+        reader.read()
+        self.write_attribute("hwmon1/temp1_input", "garbage\n")
+        sensors = reader.read()
+        self.assertNotIn("nvme-hwmon1", sensors, "The malformed sensor shall be skipped")
+        self.assertIn("coretemp-hwmon0", sensors, "The remaining sensors shall be read")
+
+    @parameterized.expand([
+        ("empty", True),
+        ("missing", False),
+    ])
+    def test_fallback(self, _, directory_exists):
+        """
+        Checks that the lm-sensors output is used when the hwmon interface provides no temperature sensors
+
+        :param _: the test name suffix
+        :param directory_exists: whether the hwmon directory exists
+        """
+        hwmon_directory = tempfile.mkdtemp()
+        if not directory_exists:
+            os.rmdir(hwmon_directory)
+        try:
+            reader = get_sensor_reader(hwmon_directory)
+        finally:
+            shutil.rmtree(hwmon_directory, ignore_errors=True)
+        self.assertIsInstance(reader, LmSensorsReader, "The lm-sensors shall be used as the fallback")
+        with patch("subprocess.run", return_value=MagicMock(stdout=b'{"chip": {"CPU": {"temp1_input": 42.0}}}')):
+            self.assertEquals(reader.read(), {"chip": {"CPU": {"temp1_input": 42.0}}}, "Unexpected sensor values")
+
+    def test_hwmon_preferred(self):
+        """
+        Checks that the hwmon interface is preferred to the lm-sensors
+        """
+        self.assertIsInstance(get_sensor_reader(self.hwmon_directory), HwmonSensorReader,
+                              "The hwmon interface shall be preferred")
+
+    @parameterized.expand([
+        (FileNotFoundError("sensors"), None),
+        (None, b"No sensors found!"),
+    ])
+    def test_lm_sensors_failure(self, error, stdout):
+        """
+        Checks that no sensor values are returned when the 'sensors' command fails
+
+        :param error: exception raised by the command or None
+        :param stdout: the command output
+        """
+        with patch("subprocess.run", side_effect=error, return_value=MagicMock(stdout=stdout)):
+            self.assertEquals(LmSensorsReader().read(), {}, "No sensor values are expected")
+
+    def test_critical_threshold(self):
+        """
+        Checks that the sensor's own critical threshold is used when it is lower than the default one
+        """
+        command = Command()
+        command._Command__total_swap = 0
+        command._Command__engaged_swap = 0
+        health_check = HealthCheck(cpu_load=[], ram_free=10 ** 12, swap_free=0, hdd_free={},
+                                   temperature=HwmonSensorReader(self.hwmon_directory).read())
+        criticals = command._detect_criticals(health_check)
+        package_criticals = criticals["%s %s" % (_("Temperature for"), "Package id 0")]
+        self.assertFalse(package_criticals['is_critical'], "45 °C is not critical")
+        self.assertEquals(package_criticals['critical_value'], "%1.1f °C" % Command.CRITICAL_VALUES['temperature'])
+        core_criticals = criticals["%s %s" % (_("Temperature for"), "Core 0")]
+        self.assertEquals(core_criticals['critical_value'], "60.0 °C", "The sensor threshold shall be used")
+        self.assertFalse(core_criticals['is_critical'], "43.5 °C is not critical")
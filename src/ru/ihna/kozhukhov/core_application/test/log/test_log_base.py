@@ -77,6 +77,9 @@ class TestLogBase(SampleLogMixin, TestCase):
                                   "The IP address must be 127.0.0.1")
                 self.assertEquals(log.response_status, response.status_code,
                                   "The response status must be written correctly")
+                self.assertGreaterEqual(log.response_time, 0.0, "The request processing time must be written")
+                self.assertGreaterEqual(log.query_count, 0, "The number of database queries must be written")
+                self.assertGreaterEqual(log.query_time, 0.0, "The database query time must be written")
 
     def test_no_log_record(self):
         self.__client.get("/__test__/logger/")
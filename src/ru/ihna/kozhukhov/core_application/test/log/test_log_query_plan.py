@@ -0,0 +1,118 @@
+import re
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils.timezone import make_aware
+from parameterized import parameterized
+
+from ...entity.readers.log_reader import LogReader
+from ...entity.readers.log_record_reader import LogRecordReader
+from ...entity.readers.model_emulators import ModelEmulator
+
+
+def log_filter_provider():
+    """
+    Provides all filter combinations that can be applied by the LogReader during the log list retrieval
+    :return: list of tuples (test_name, filter_kwargs)
+    """
+    date_to = make_aware(datetime(2024, 1, 31))
+    date_from = date_to - timedelta(days=7)
+    user = ModelEmulator(id=1)
+    return [
+        ("no_filter", {}),
+        ("date_range", {"request_date_from": date_from, "request_date_to": date_to}),
+        ("ip_address", {"ip_address": "127.0.0.1"}),
+        ("ip_address_and_date", {"ip_address": "127.0.0.1", "request_date_from": date_from}),
+        ("user", {"user": user}),
+        ("user_and_date", {"user": user, "request_date_from": date_from, "request_date_to": date_to}),
+        ("anonymous", {"is_anonymous": True}),
+        ("success", {"is_success": True}),
+        ("fail", {"is_fail": True}),
+        ("fail_and_date", {"is_fail": True, "request_date_from": date_from}),
+    ]
+
+
+class TestLogQueryPlan(TestCase):
+    """
+    Checks that the log list and the log record list are retrieved using database indices rather than
+    full table scans. The test is valid for SQLite and PostgreSQL only and is skipped for other database engines.
+    """
+
+    SQLITE_FULL_SCAN = re.compile(r"^SCAN (TABLE )?(?P<table>\w+)$")
+    """ SQLite prints such a plan row when the table is scanned without any index """
+
+    POSTGRESQL_FULL_SCAN = re.compile(r"Seq Scan on (?P<table>\w+)")
+    """ PostgreSQL prints such a plan row when the table is scanned sequentially """
+
+    PAGE_SIZE = 20
+    """ Number of logs on a single page of the log list """
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest("The query plan test is not designed for the '%s' database engine" % connection.vendor)
+
+    @parameterized.expand(log_filter_provider())
+    def test_log_list(self, test_name, filter_kwargs):
+        """
+        Checks that a single page of the log list doesn't require the full scan of the log table
+
+        :param test_name: useless
+        :param filter_kwargs: the filters to apply
+        """
+        reader = LogReader(**filter_kwargs)
+        reader.items_builder.limit(0, self.PAGE_SIZE)
+        self.assert_no_full_scan(reader.items_builder.build(), "core_application_log")
+
+    @parameterized.expand([(name, kwargs) for name, kwargs in log_filter_provider() if name != "no_filter"])
+    def test_log_count(self, test_name, filter_kwargs):
+        """
+        Checks that counting filtered logs doesn't require the full scan of the log table
+
+        :param test_name: useless
+        :param filter_kwargs: the filters to apply
+        """
+        reader = LogReader(**filter_kwargs)
+        self.assert_no_full_scan(reader.count_builder.build(), "core_application_log")
+
+    def test_log_record_list(self):
+        """
+        Checks that log records related to a given log are retrieved without the full scan
+        """
+        reader = LogRecordReader(log=ModelEmulator(id=1))
+        self.assert_no_full_scan(reader.items_builder.build(), "core_application_logrecord")
+        self.assert_no_full_scan(reader.count_builder.build(), "core_application_logrecord")
+
+    def assert_no_full_scan(self, query, table_name):
+        """
+        Asserts that the query plan doesn't contain full scan of a given table
+
+        :param query: the query in the same format as returned by the QueryBuilder.build method
+        :param table_name: the table that must not be scanned fully
+        """
+        plan = self.get_query_plan(query)
+        full_scan = self.SQLITE_FULL_SCAN if connection.vendor == "sqlite" else self.POSTGRESQL_FULL_SCAN
+        for plan_row in plan:
+            match = full_scan.search(plan_row.strip())
+            self.assertFalse(match is not None and match.group("table") == table_name,
+                             "The query plan contains full scan of the '%s' table.\nQuery: %s\nPlan:\n%s"
+                             % (table_name, query[0], "\n".join(plan)))
+
+    def get_query_plan(self, query):
+        """
+        Asks the database engine how the query will be executed
+
+        :param query: the query in the same format as returned by the QueryBuilder.build method
+        :return: list of strings, each string is a single row of the query plan
+        """
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("EXPLAIN QUERY PLAN " + query[0], query[1:])
+                return [row[-1] for row in cursor.fetchall()]
+            else:
+                # The test table is too small to make the planner prefer the index over the sequential scan. Hence,
+                # we make sequential scans too expensive: the planner will use them if and only if no index is suitable
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + query[0], query[1:])
+                return [row[0] for row in cursor.fetchall()]
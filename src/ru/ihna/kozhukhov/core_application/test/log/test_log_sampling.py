@@ -0,0 +1,163 @@
+import logging
+from time import sleep
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test import client
+from django.utils.timezone import now
+from parameterized import parameterized
+
+from ...entity.entity_sets.log_set import LogSet
+from ...middleware.log_middleware import LogMiddleware
+from ...models import LogRecord
+from ...test.sample_log_mixin import SampleLogMixin
+
+
+def sampling_provider():
+    """
+    Provides data for the test_sampling test function
+    :return: list of tuples with the following data
+        - debug mode (True, False)
+        - value of the CORE_LOG_SAFE_REQUESTS setting
+        - value of the CORE_LOG_SAMPLING_RATES setting
+        - the request method
+        - the response status
+        - the random number generated by the log middleware
+        - expected sampling rate of the log or None if the request shall not be logged
+    """
+    rates = {"GET": 0.5, "GET /__test__/api/": 0.1, "HEAD /__test__/": 0.0}
+    return [
+        # debug     safe    rates   method      status  random  expected_rate
+        (False,     False,  rates,  "get",      200,    0.0,    None),
+        (False,     False,  rates,  "get",      500,    0.0,    None),
+        (False,     False,  rates,  "post",     200,    0.99,   1.0),
+        (True,      False,  {},     "get",      200,    0.99,   1.0),
+        (True,      False,  rates,  "get",      200,    0.05,   0.1),
+        (True,      False,  rates,  "get",      200,    0.2,    None),
+        (False,     True,   rates,  "get",      200,    0.05,   0.1),
+        (False,     True,   rates,  "get",      200,    0.2,    None),
+        (False,     True,   rates,  "get",      404,    0.05,   1.0),
+        (False,     True,   rates,  "get",      404,    0.2,    1.0),
+        (False,     True,   rates,  "head",     200,    0.0,    None),
+        (False,     True,   rates,  "head",     500,    0.0,    1.0),
+        (False,     True,   rates,  "post",     200,    0.99,   1.0),
+        (True,      False,  rates,  "delete",   200,    0.99,   1.0),
+    ]
+
+
+class TestLogSampling(SampleLogMixin, TestCase):
+    """
+    Tests the selective logging of safe requests
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client = client.Client(raise_request_exception=False)
+        logger = logging.getLogger("django.request")
+        self.previous_level = logger.getEffectiveLevel()
+        logger.setLevel(logging.CRITICAL)
+
+    def tearDown(self):
+        logger = logging.getLogger("django.request")
+        logger.setLevel(self.previous_level)
+        super().tearDown()
+
+    @parameterized.expand(sampling_provider())
+    def test_sampling(self, debug_mode, log_safe_requests, sampling_rates, method, response_status, random_number,
+                      expected_rate):
+        """
+        Checks whether the request is logged and what sampling rate is written to the log
+
+        :param debug_mode: the debug mode
+        :param log_safe_requests: value of the CORE_LOG_SAFE_REQUESTS setting
+        :param sampling_rates: value of the CORE_LOG_SAMPLING_RATES setting
+        :param method: the request method
+        :param response_status: the response status
+        :param random_number: the random number generated by the log middleware
+        :param expected_rate: expected sampling rate of the log or None if the request shall not be logged
+        """
+        with self.settings(DEBUG=debug_mode, CORE_LOG_SAFE_REQUESTS=log_safe_requests,
+                           CORE_LOG_SAMPLING_RATES=sampling_rates), \
+                patch("ru.ihna.kozhukhov.core_application.middleware.log_middleware.random",
+                      return_value=random_number):
+            response = self.make_test_request(self.client, "api", method, 0, response_status)
+        self.assertEquals(response.status_code, response_status, "Unexpected response status")
+        log_set = LogSet()
+        if expected_rate is None:
+            self.assertEquals(len(log_set), 0, "The request must not be logged")
+        else:
+            self.assertEquals(len(log_set), 1, "The request must be logged")
+            log = log_set[0]
+            self.assertAlmostEqual(log.sampling_rate, expected_rate, msg="Unexpected sampling rate")
+            self.assertEquals(log.response_status, response_status, "The response status must be logged")
+
+    @parameterized.expand([(200, False), (500, True)])
+    def test_postponed_log(self, response_status, is_logged):
+        """
+        Checks that the log of the request that has not been sampled keeps the request time and log records
+        when the request fails and is not saved when the request succeeds
+
+        :param response_status: the response status
+        :param is_logged: True if the request shall be logged, False otherwise
+        """
+        view_times = []
+
+        def get_response(request):
+            sleep(0.01)
+            view_times.append(now())
+            logging.getLogger("django.corefacility.test").error("This is an error test message",
+                                                                extra={"request": request})
+            return HttpResponse(status=response_status)
+
+        request = client.RequestFactory().get("/__test__/api/3/")
+        with self.settings(DEBUG=True, CORE_LOG_SAMPLING_RATES={"GET": 0.1}), \
+                patch("ru.ihna.kozhukhov.core_application.middleware.log_middleware.random", return_value=0.5):
+            LogMiddleware(get_response)(request)
+        log_set = LogSet()
+        if not is_logged:
+            self.assertEquals(len(log_set), 0, "The succeeded request that has not been sampled must not be logged")
+            self.assertEquals(LogRecord.objects.count(), 0, "No log records shall be saved")
+            return
+        self.assertEquals(len(log_set), 1, "The failed request must be logged")
+        log = log_set[0]
+        self.assertLess(log.request_date.get(), view_times[0], "The request time must be written to the log")
+        self.assertEquals(LogRecord.objects.filter(log_id=log.id).count(), 1,
+                          "The log record emitted by the view must be attached to the log")
+
+    @parameterized.expand([
+        ("GET", "/api/v1/logs/", 0.2),
+        ("GET", "/api/v1/users/", 0.5),
+        ("GET", "/core/", 1.0),
+        ("OPTIONS", "/api/v1/logs/", 1.0),
+    ])
+    def test_sampling_rate_lookup(self, method, path, expected_rate):
+        """
+        Checks that the longest matching key of the CORE_LOG_SAMPLING_RATES setting is used
+
+        :param method: the request method
+        :param path: the request path
+        :param expected_rate: the sampling rate that shall be found
+        """
+        request = client.RequestFactory().generic(method, path)
+        rates = {"GET /api/": 0.5, "GET /api/v1/logs/": 0.2, "GET /api/v1/logs/1/": 0.1}
+        with self.settings(DEBUG=True, CORE_LOG_SAMPLING_RATES=rates):
+            self.assertEquals(LogMiddleware(None).get_sampling_rate(request), expected_rate)
+
+    @parameterized.expand([
+        ("GET", "half"),
+        ("GET /api/", -0.1),
+        ("HEAD", 1.5),
+        ("GET", None),
+    ])
+    def test_bad_sampling_rate(self, sampling_key, rate):
+        """
+        Checks that the bad value of the CORE_LOG_SAMPLING_RATES setting is revealed when the middleware starts
+
+        :param sampling_key: key of the CORE_LOG_SAMPLING_RATES setting
+        :param rate: the bad sampling rate
+        """
+        with self.settings(CORE_LOG_SAMPLING_RATES={sampling_key: rate}):
+            with self.assertRaises(ImproperlyConfigured):
+                LogMiddleware(None)
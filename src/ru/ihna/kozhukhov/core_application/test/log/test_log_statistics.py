@@ -0,0 +1,176 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from django.utils.timezone import localtime, now
+from parameterized import parameterized
+from rest_framework import status
+
+from ...models import Log, LogStatistics
+from ...test.sample_log_mixin import SampleLogMixin
+from ..views.base_view_test import BaseViewTest
+
+
+def statistics_snapshot():
+    """
+    Reveals all request statistics
+    :return: a dictionary which keys are statistics keys and values are tuples of statistics values
+    """
+    return {
+        (item.hour, item.path_template, item.request_method, item.status_class): (
+            round(item.request_count, 6), round(item.timed_request_count, 6), round(item.total_response_time, 6),
+            item.max_response_time,
+        )
+        for item in LogStatistics.objects.all()
+    }
+
+
+class TestLogStatistics(SampleLogMixin, TestCase):
+    """
+    Tests the hourly request statistics
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.fill_sample_logs()
+
+    def test_incremental_update(self):
+        """
+        Checks that the statistics is updated while the logs are written
+        """
+        expected_counts = dict()
+        for log in Log.objects.all():
+            key = (log.log_address.replace("/3/", "/{n}/").replace("/10/", "/{n}/"), log.request_method,
+                   log.response_status // 100)
+            expected_counts[key] = expected_counts.get(key, 0) + 1
+        actual_counts = dict()
+        for item in LogStatistics.objects.all():
+            self.assertEquals(item.hour, LogStatistics.get_hour(now()), "Unexpected statistics hour")
+            key = (item.path_template, item.request_method, item.status_class)
+            actual_counts[key] = actual_counts.get(key, 0) + item.request_count
+        self.assertGreater(len(expected_counts), 0, "The sample logs must be written")
+        self.assertEquals(actual_counts, expected_counts, "The statistics is not consistent with the logs")
+
+    def test_rebuild(self):
+        """
+        Checks that the statistics rebuilt from the logs is the same as the statistics updated incrementally
+        """
+        self.move_to_previous_hour()
+        expected_statistics = statistics_snapshot()
+        LogStatistics.objects.all().delete()
+        row_number = LogStatistics.rebuild(now() - timedelta(hours=1), now())
+        self.assertEquals(row_number, len(expected_statistics), "Unexpected number of the rebuilt rows")
+        self.assertEquals(statistics_snapshot(), expected_statistics, "The rebuilt statistics is not the same")
+
+    def test_rebuild_command(self):
+        """
+        Checks that the 'log_statistics' command rebuilds the statistics for the last hours
+        """
+        self.move_to_previous_hour()
+        expected_statistics = statistics_snapshot()
+        LogStatistics.objects.all().delete()
+        call_command("log_statistics", hours=1, stdout=StringIO())
+        self.assertEquals(statistics_snapshot(), expected_statistics, "The rebuilt statistics is not the same")
+
+    def test_rebuild_current_hour(self):
+        """
+        Checks that the statistics for the current hour is not rebuilt while the log middleware still updates it
+        """
+        expected_statistics = statistics_snapshot()
+        with self.assertNumQueries(0):
+            row_number = LogStatistics.rebuild(now() - timedelta(minutes=1), now())
+        self.assertEquals(row_number, 0, "The current hour shall not be rebuilt")
+        self.assertEquals(statistics_snapshot(), expected_statistics, "The statistics shall not be changed")
+
+    def test_rebuild_outside_range(self):
+        """
+        Checks that rebuilding the statistics doesn't affect the hours outside the given range
+        """
+        expected_statistics = statistics_snapshot()
+        LogStatistics.rebuild(now() - timedelta(days=2), now() - timedelta(days=1))
+        self.assertEquals(statistics_snapshot(), expected_statistics, "The statistics shall not be changed")
+
+    @parameterized.expand([
+        ("/__test__/api/10/", "/__test__/api/{n}/"),
+        ("/api/v1/users/12/", "/api/v1/users/{lookup}/"),
+        ("/api/v1/users/", "/api/v1/users/"),
+        ("/api/v1/logs/12/records/3/", "/api/v1/logs/{log_id}/records/{lookup}/"),
+        ("/api/v1/logs/3/records/3/", "/api/v1/logs/{log_id}/records/{lookup}/"),
+        ("/api/v1/users/users/", "/api/v1/users/{lookup}/"),
+        ("/api/v1/projects/1/groups/1/", "/api/v1/projects/1/groups/1/"),
+    ])
+    def test_path_template(self, path, expected_template):
+        """
+        Checks the path template calculation
+
+        :param path: the request path
+        :param expected_template: the path template that shall be calculated
+        """
+        self.assertEquals(LogStatistics.get_path_template(path), expected_template)
+
+    def move_to_previous_hour(self):
+        """
+        Moves all sample logs and their statistics to the previous hour, so they can be rebuilt
+        """
+        Log.objects.update(request_date=F("request_date") - timedelta(hours=1))
+        LogStatistics.objects.update(hour=F("hour") - timedelta(hours=1))
+
+
+class TestLogStatisticsView(SampleLogMixin, BaseViewTest):
+    """
+    Tests the request statistics view
+    """
+
+    STATISTICS_PATH = "/api/{version}/log-statistics/"
+
+    ordinary_user_required = True
+
+    def setUp(self):
+        super().setUp()
+        self.fill_sample_logs()
+
+    def test_statistics(self):
+        """
+        Checks that the view returns the same request numbers as given in the statistics
+        """
+        response = self.client.get(self.STATISTICS_PATH.format(version=self.API_VERSION),
+                                   HTTP_AUTHORIZATION="Token " + self.superuser_token)
+        self.assertEquals(response.status_code, status.HTTP_200_OK, "Unexpected response status")
+        total_count = round(sum(item.request_count for item in LogStatistics.objects.all()))
+        error_count = round(sum(item.request_count for item in LogStatistics.objects.filter(status_class__gte=4)))
+        self.assertEquals(len(response.data['timeline']), 1, "All sample requests were made during the same hour")
+        timeline_item = response.data['timeline'][0]
+        self.assertEquals(localtime(timeline_item['hour']), LogStatistics.get_hour(now()), "Unexpected hour")
+        self.assertEquals(timeline_item['request_count'], total_count, "Unexpected request number")
+        self.assertEquals(timeline_item['error_count'], error_count, "Unexpected error number")
+        self.assertEquals(sum(response.data['status_classes'].values()), total_count,
+                          "Unexpected status class distribution")
+        endpoint_counts = [endpoint['request_count'] for endpoint in response.data['endpoints']]
+        self.assertEquals(sum(endpoint_counts), total_count, "Unexpected endpoint request numbers")
+        self.assertEquals(endpoint_counts, sorted(endpoint_counts, reverse=True),
+                          "The endpoints shall be sorted by the request number")
+
+    @parameterized.expand([
+        ({"limit": "0"},),
+        ({"limit": "abc"},),
+        ({"from": "not-a-date"},),
+    ])
+    def test_bad_query(self, query_params):
+        """
+        Checks that bad query parameters are rejected
+
+        :param query_params: the query parameters to send
+        """
+        response = self.client.get(self.STATISTICS_PATH.format(version=self.API_VERSION), data=query_params,
+                                   HTTP_AUTHORIZATION="Token " + self.superuser_token)
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST, "Unexpected response status")
+
+    def test_ordinary_user(self):
+        """
+        Checks that the statistics is not available for ordinary users
+        """
+        response = self.client.get(self.STATISTICS_PATH.format(version=self.API_VERSION),
+                                   HTTP_AUTHORIZATION="Token " + self.ordinary_user_token)
+        self.assertEquals(response.status_code, status.HTTP_403_FORBIDDEN, "Unexpected response status")
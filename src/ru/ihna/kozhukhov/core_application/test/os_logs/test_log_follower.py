@@ -0,0 +1,174 @@
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from time import monotonic
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from ...os_logs import LogFollower
+
+
+class TestLogFollower(SimpleTestCase):
+    """
+    Tests the live following of the operating system logs
+    """
+
+    FIRST_TIME = datetime(2024, 3, 1, 10, 0, 0)
+
+    WAIT_TIMEOUT = 5.0
+
+    WRITE_DELAY = 0.2
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.directory, "syslog")
+        self.auth_path = os.path.join(self.directory, "auth.log")
+        self.write_lines(self.log_path, 0, 10)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    def test_initial_position(self):
+        """
+        Checks that the log file is followed from its current end
+        """
+        follower = LogFollower([self.log_path])
+        self.assertEquals(follower.read(), [], "Old log lines shall not be read")
+        self.write_lines(self.log_path, 10, 15)
+        self.assertEquals(self.get_indices(follower.read()), list(range(10, 15)), "New log lines were not read")
+        self.assertEquals(follower.read(), [], "Log lines shall not be read twice")
+
+    def test_remembered_position(self):
+        """
+        Checks that the position may be passed to another follower
+        """
+        follower = LogFollower([self.log_path])
+        self.write_lines(self.log_path, 10, 12)
+        follower.read()
+        self.write_lines(self.log_path, 12, 15)
+        follower = LogFollower([self.log_path], follower.positions)
+        self.assertTrue(follower.is_changed(), "The new follower shall detect lines written after the position")
+        self.assertEquals(self.get_indices(follower.read()), list(range(12, 15)), "Unexpected log lines")
+
+    def test_incomplete_line(self):
+        """
+        Checks that the log line is not read until it is written completely
+        """
+        follower = LogFollower([self.log_path])
+        with open(self.log_path, "a") as log_file:
+            log_file.write(self.format_line(10)[:20])
+        self.assertEquals(follower.read(), [], "The incomplete line shall not be read")
+        with open(self.log_path, "a") as log_file:
+            log_file.write(self.format_line(10)[20:])
+        self.assertEquals(self.get_indices(follower.read()), [10], "The completed line shall be read")
+
+    def test_truncation(self):
+        """
+        Checks that the truncated log file is read from the beginning
+        """
+        follower = LogFollower([self.log_path])
+        with open(self.log_path, "w"):
+            pass
+        self.write_lines(self.log_path, 100, 103)
+        self.assertEquals(self.get_indices(follower.read()), list(range(100, 103)), "Unexpected log lines")
+
+    def test_rotation(self):
+        """
+        Checks that the rest of the rotated log file is read before the new log file
+        """
+        follower = LogFollower([self.log_path])
+        self.write_lines(self.log_path, 10, 13)
+        os.rename(self.log_path, self.log_path + ".1")
+        self.write_lines(self.log_path, 13, 16)
+        self.assertEquals(self.get_indices(follower.read()), list(range(10, 16)), "Some log lines were lost")
+        self.write_lines(self.log_path, 16, 17)
+        self.assertEquals(self.get_indices(follower.read()), [16], "The new log file shall be followed")
+
+    def test_merge(self):
+        """
+        Checks that new lines from several log files are ordered by time
+        """
+        follower = LogFollower([self.log_path, self.auth_path])
+        for index in range(20, 30):
+            self.write_lines(self.log_path if index % 3 == 0 else self.auth_path, index, index + 1)
+        self.assertEquals(self.get_indices(follower.read()), list(range(20, 30)), "Unexpected log lines")
+
+    def test_read_size(self):
+        """
+        Checks that the follower reads no more than MAX_READ_SIZE bytes per call
+        """
+        follower = LogFollower([self.log_path])
+        self.write_lines(self.log_path, 10, 30)
+        with patch.object(LogFollower, "MAX_READ_SIZE", 5 * len(self.format_line(10))):
+            first_indices = self.get_indices(follower.read())
+            self.assertTrue(follower.is_changed(), "The rest of the log file shall be treated as new")
+            second_indices = self.get_indices(follower.read())
+        self.assertEquals(first_indices, list(range(10, 15)), "Unexpected log lines")
+        self.assertEquals(second_indices, list(range(15, 20)), "Unexpected log lines")
+
+    @parameterized.expand([("inotify", False), ("polling", True)])
+    def test_wait(self, name, polling):
+        """
+        Checks that the follower wakes up when the log file is changed
+
+        :param name: name of the test case
+        :param polling: True to disable the inotify, False otherwise
+        """
+        follower = LogFollower([self.log_path])
+        writer = threading.Timer(self.WRITE_DELAY, self.write_lines, (self.log_path, 10, 11))
+        with patch.object(LogFollower, "POLL_INTERVAL", 0.05):
+            with patch.object(LogFollower, "create_watcher", return_value=None) if polling else nullcontext():
+                writer.start()
+                start_time = monotonic()
+                changed = follower.wait(self.WAIT_TIMEOUT)
+                waiting_time = monotonic() - start_time
+        writer.join()
+        self.assertTrue(changed, "The follower shall detect changes")
+        self.assertLess(waiting_time, self.WAIT_TIMEOUT / 2, "The follower shall wake up as soon as possible")
+        self.assertEquals(self.get_indices(follower.read()), [10], "Unexpected log lines")
+
+    def test_wait_timeout(self):
+        """
+        Checks that the follower gives up waiting when the timeout expires
+        """
+        follower = LogFollower([self.log_path])
+        self.assertFalse(follower.wait(self.WRITE_DELAY), "Nothing shall be detected in the unchanged log file")
+
+    def write_lines(self, log_path, first_index, last_index):
+        """
+        Appends log lines to the log file
+
+        :param log_path: full path to the log file
+        :param first_index: index of the first log line
+        :param last_index: index of the line after the last log line
+        """
+        with open(log_path, "a") as log_file:
+            for index in range(first_index, last_index):
+                log_file.write(self.format_line(index))
+
+    def format_line(self, index):
+        """
+        Formats a single log line
+
+        :param index: index of the log line
+        :return: the log line terminated by the newline character
+        """
+        time = self.FIRST_TIME + timedelta(seconds=index)
+        return "%s host process[%d]: test message number %d\n" % (time.isoformat(timespec="microseconds"), index, index)
+
+    @staticmethod
+    def get_indices(log_lines):
+        """
+        Reveals indices of the parsed log lines
+
+        :param log_lines: list of (time, hostname, message) tuples
+        :return: list of indices
+        """
+        return [int(message.split()[-1]) for time, hostname, message in log_lines]
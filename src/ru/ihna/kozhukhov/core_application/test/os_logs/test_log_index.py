@@ -0,0 +1,211 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from ...os_logs import LogIndex, parse_log_line
+
+
+class TestLogIndex(SimpleTestCase):
+    """
+    Tests the sparse time index of the operating system logs
+    """
+
+    CHUNK_SIZE = 1024
+    """ Small chunks make the index informative even for small test files """
+
+    LINE_NUMBER = 500
+
+    FIRST_TIME = datetime(2024, 3, 1, 10, 0, 0)
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.directory, "syslog")
+        self.settings_override = self.settings(CORE_OS_LOG_INDEX_DIR=os.path.join(self.directory, "index"))
+        self.settings_override.enable()
+        self.chunk_size_patch = patch.object(LogIndex, "CHUNK_SIZE", self.CHUNK_SIZE)
+        self.chunk_size_patch.start()
+        self.write_lines(0, self.LINE_NUMBER)
+
+    def tearDown(self):
+        self.chunk_size_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    @parameterized.expand([
+        (None, None),
+        (100, None),
+        (None, 100),
+        (200, 250),
+        (0, 0),
+        (499, 600),
+        (-10, -1),
+    ])
+    def test_ranges(self, start_index, end_index):
+        """
+        Checks that the log regions returned by the index contain all lines within a given time range
+
+        :param start_index: index of the line which time is the minimum time or None for no lower bound
+        :param end_index: index of the line which time is the maximum time or None for no upper bound
+        """
+        start = self.get_time(start_index) if start_index is not None else None
+        end = self.get_time(end_index) if end_index is not None else None
+        log_index = LogIndex(self.log_path)
+        self.assertGreater(len(log_index.chunks), 1, "The index shall contain many chunks")
+        expected_lines = [line for line in self.read_lines([(0, None)]) if
+                          (start is None or line[0] >= start) and (end is None or line[0] <= end)]
+        ranges = log_index.get_ranges(start, end)
+        actual_lines = [line for line in self.read_lines(ranges) if
+                        (start is None or line[0] >= start) and (end is None or line[0] <= end)]
+        self.assertEquals(actual_lines, expected_lines, "Some log lines were lost")
+        region_size = sum((range_end or os.path.getsize(self.log_path)) - range_start
+                          for range_start, range_end in ranges)
+        expected_size = sum(len(self.format_line(line[0], int(line[2].split()[-1]))) for line in expected_lines)
+        # Besides the requested lines, the regions may contain the remainders of the boundary chunks and
+        # the unindexed tail of the log file
+        self.assertLessEqual(region_size, expected_size + 3 * self.CHUNK_SIZE,
+                             "The index shall allow to skip chunks outside the requested time range")
+
+    def test_incremental_update(self):
+        """
+        Checks that only new lines are parsed when the log file grows
+        """
+        log_index = LogIndex(self.log_path)
+        chunks = list(log_index.chunks)
+        self.write_lines(self.LINE_NUMBER, self.LINE_NUMBER + 100)
+        with patch("ru.ihna.kozhukhov.core_application.os_logs.log_index.parse_log_line",
+                   side_effect=parse_log_line) as parse_mock:
+            log_index = LogIndex(self.log_path)
+        self.assertLess(parse_mock.call_count, 200, "Only new lines shall be parsed")
+        self.assertEquals(log_index.chunks[:len(chunks)], chunks, "The old part of the index shall not be changed")
+        self.assertGreater(len(log_index.chunks), len(chunks), "The new part of the log shall be indexed")
+
+    def test_persistence(self):
+        """
+        Checks that the index is not rebuilt when the log file has not been changed
+        """
+        chunks = LogIndex(self.log_path).chunks
+        with patch("ru.ihna.kozhukhov.core_application.os_logs.log_index.parse_log_line",
+                   side_effect=parse_log_line) as parse_mock:
+            log_index = LogIndex(self.log_path)
+        self.assertEquals(parse_mock.call_count, 0, "The index shall be loaded from the index file")
+        self.assertEquals(log_index.chunks, chunks, "The loaded index is not the same as the saved one")
+        self.assertEquals(log_index.hosts, {"host0", "host1", "host2"}, "Unexpected host list")
+
+    def test_tail_hosts(self):
+        """
+        Checks that hosts mentioned in the unindexed tail of the log file are also known to the index
+        """
+        LogIndex(self.log_path)
+        with open(self.log_path, "a") as log_file:
+            log_file.write("%s tailhost process[1]: the last message\n" % self.get_time(600).isoformat())
+        log_index = LogIndex(self.log_path)
+        self.assertIn("tailhost", log_index.hosts, "The host from the unindexed tail shall be known")
+        with patch("ru.ihna.kozhukhov.core_application.os_logs.log_index.parse_log_line",
+                   side_effect=parse_log_line) as parse_mock:
+            log_index = LogIndex(self.log_path)
+        self.assertEquals(parse_mock.call_count, 0, "The unchanged log file shall not be parsed again")
+        self.assertIn("tailhost", log_index.hosts, "The tail hosts shall be saved to the index file")
+
+    def test_untrusted_directory(self):
+        """
+        Checks that the index directory accessible to other users is not used
+        """
+        chunks = LogIndex(self.log_path).chunks
+        index_directory = LogIndex.get_index_directory()
+        os.chmod(index_directory, 0o777)
+        with patch("ru.ihna.kozhukhov.core_application.os_logs.log_index.parse_log_line",
+                   side_effect=parse_log_line) as parse_mock:
+            log_index = LogIndex(self.log_path)
+        self.assertGreater(parse_mock.call_count, 0, "The index shall not be loaded from the untrusted directory")
+        self.assertEquals(log_index.chunks, chunks, "The index shall be rebuilt")
+
+    def test_default_directory(self):
+        """
+        Checks that the index is not saved to the shared temporary directory by default
+        """
+        with self.settings(CORE_OS_LOG_INDEX_DIR=""):
+            index_directory = LogIndex.get_index_directory()
+        self.assertTrue(index_directory.startswith(os.path.expanduser("~") + os.sep),
+                        "The index directory shall be inside the home directory of the application user")
+
+    def test_rotation(self):
+        """
+        Checks that the index is discarded when the log file is rotated
+        """
+        LogIndex(self.log_path)
+        os.rename(self.log_path, self.log_path + ".1")
+        self.write_lines(1000, 1100)
+        log_index = LogIndex(self.log_path)
+        self.assertEquals(log_index.inode, os.stat(self.log_path).st_ino, "The index shall refer to the new file")
+        start = self.get_time(1050)
+        actual_lines = [line for line in self.read_lines(log_index.get_ranges(start)) if line[0] >= start]
+        self.assertEquals(actual_lines, self.read_lines([(0, None)])[50:], "The index shall be rebuilt after rotation")
+
+    def test_truncation(self):
+        """
+        Checks that the index is discarded when the log file is truncated
+        """
+        LogIndex(self.log_path)
+        with open(self.log_path, "w"):
+            pass
+        self.write_lines(2000, 2010)
+        log_index = LogIndex(self.log_path)
+        self.assertEquals(log_index.chunks, [], "The index shall be discarded")
+        self.assertEquals(log_index.get_ranges(), [(0, None)], "The whole file shall be read")
+
+    def get_time(self, line_index):
+        """
+        Returns the time of a given log line
+
+        :param line_index: index of the log line
+        :return: naive datetime
+        """
+        return self.FIRST_TIME + timedelta(seconds=line_index)
+
+    def write_lines(self, first_index, last_index):
+        """
+        Appends log lines to the log file
+
+        :param first_index: index of the first log line
+        :param last_index: index of the line after the last log line
+        """
+        with open(self.log_path, "a") as log_file:
+            for index in range(first_index, last_index):
+                log_file.write(self.format_line(self.get_time(index), index))
+
+    def format_line(self, time, index):
+        """
+        Formats a single log line
+
+        :param time: the log time
+        :param index: index of the log line
+        :return: the log line terminated by the newline character
+        """
+        return "%s host%d process[%d]: test message number %d\n" % (
+            time.isoformat(timespec="microseconds"), index % 3, index, index
+        )
+
+    def read_lines(self, ranges):
+        """
+        Reads all log lines from given regions of the log file
+
+        :param ranges: list of (range_start, range_end) tuples
+        :return: list of parsed log lines
+        """
+        lines = []
+        with open(self.log_path, "rb") as log_file:
+            for range_start, range_end in ranges:
+                log_file.seek(range_start)
+                content = log_file.read() if range_end is None else log_file.read(range_end - range_start)
+                for line in content.decode("utf-8").splitlines():
+                    log_info = parse_log_line(line)
+                    if log_info is not None:
+                        lines.append(log_info)
+        return lines
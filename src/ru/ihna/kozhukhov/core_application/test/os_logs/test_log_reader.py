@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from itertools import islice
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from ...os_logs import LogIndex, LogReader, merge_logs, parse_log_line
+
+
+class TestLogReader(SimpleTestCase):
+    """
+    Tests lazy reading and merging of the operating system logs
+    """
+
+    CHUNK_SIZE = 1024
+    """ Small chunks make the index informative even for small test files """
+
+    BLOCK_SIZE = 100
+    """ Small blocks make sure that log lines are split between blocks when the file is read backwards """
+
+    LOG_FILES = ["syslog", "auth.log", "kern.log"]
+
+    LINE_NUMBER = 900
+
+    FIRST_TIME = datetime(2024, 3, 1, 10, 0, 0)
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.settings_override = self.settings(CORE_OS_LOG_INDEX_DIR=os.path.join(self.directory, "index"))
+        self.settings_override.enable()
+        self.chunk_size_patch = patch.object(LogIndex, "CHUNK_SIZE", self.CHUNK_SIZE)
+        self.chunk_size_patch.start()
+        self.block_size_patch = patch.object(LogReader, "BLOCK_SIZE", self.BLOCK_SIZE)
+        self.block_size_patch.start()
+        self.expected_lines = []
+        for index in range(self.LINE_NUMBER):
+            # Lines are distributed among the files unevenly, so all files are interleaved in time
+            log_file = self.LOG_FILES[(index * index + index // 5) % len(self.LOG_FILES)]
+            time = self.FIRST_TIME + timedelta(seconds=index)
+            line = "%s host%d process[%d]: test message number %d" % (
+                time.isoformat(timespec="microseconds"), index % 4, index, index
+            )
+            with open(self.get_log_path(log_file), "a") as log:
+                log.write(line + "\n")
+            self.expected_lines.append(parse_log_line(line))
+
+    def tearDown(self):
+        self.block_size_patch.stop()
+        self.chunk_size_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    @parameterized.expand([
+        (None, None, False),
+        (None, None, True),
+        (100, 300, False),
+        (100, 300, True),
+        (850, None, True),
+        (None, 0, False),
+    ])
+    def test_read(self, start_index, end_index, reverse):
+        """
+        Checks that a single log file is read in a proper order
+
+        :param start_index: index of the line which time is the minimum time or None for no lower bound
+        :param end_index: index of the line which time is the maximum time or None for no upper bound
+        :param reverse: True to read the file backwards, False otherwise
+        """
+        start, end = self.get_time_range(start_index, end_index)
+        log_path = self.get_log_path("syslog")
+        with open(log_path) as log_file:
+            expected_lines = [parse_log_line(line) for line in log_file]
+        expected_lines = self.filter_lines(expected_lines, start, end, reverse)
+        actual_lines = list(LogReader(log_path, start, end, reverse))
+        self.assertEquals(actual_lines, expected_lines, "The log file was read incorrectly")
+
+    @parameterized.expand([
+        (None, None, False),
+        (None, None, True),
+        (200, 700, False),
+        (200, 700, True),
+        (2000, None, False),
+    ])
+    def test_merge(self, start_index, end_index, reverse):
+        """
+        Checks that several log files are merged into a single time-ordered stream
+
+        :param start_index: index of the line which time is the minimum time or None for no lower bound
+        :param end_index: index of the line which time is the maximum time or None for no upper bound
+        :param reverse: True to merge the files in descending order, False otherwise
+        """
+        start, end = self.get_time_range(start_index, end_index)
+        readers = [LogReader(self.get_log_path(log_file), start, end, reverse) for log_file in self.LOG_FILES]
+        actual_lines = list(merge_logs(readers, reverse))
+        expected_lines = self.filter_lines(self.expected_lines, start, end, reverse)
+        self.assertEquals(actual_lines, expected_lines, "The log files were merged incorrectly")
+        self.assertEquals(set().union(*(reader.hosts for reader in readers)),
+                          {"host0", "host1", "host2", "host3"}, "Unexpected host list")
+
+    @parameterized.expand([(False,), (True,)])
+    def test_lazy_merge(self, reverse):
+        """
+        Checks that the log files are not read further than necessary to produce the requested page
+
+        :param reverse: True to merge the files in descending order, False otherwise
+        """
+        page_size = 10
+        for log_file in self.LOG_FILES:
+            LogIndex(self.get_log_path(log_file))  # The log files will be indexed at this stage
+        with patch("ru.ihna.kozhukhov.core_application.os_logs.log_reader.parse_log_line",
+                   side_effect=parse_log_line) as parse_mock:
+            readers = [LogReader(self.get_log_path(log_file), reverse=reverse) for log_file in self.LOG_FILES]
+            actual_lines = list(islice(merge_logs(readers, reverse), page_size))
+        expected_lines = self.filter_lines(self.expected_lines, None, None, reverse)[:page_size]
+        self.assertEquals(actual_lines, expected_lines, "Unexpected page content")
+        self.assertLess(parse_mock.call_count, self.LINE_NUMBER // 2, "The log files shall not be read entirely")
+
+    @parameterized.expand([
+        (None, 200, False),
+        (700, None, True),
+    ])
+    def test_bounded_read(self, start_index, end_index, reverse):
+        """
+        Checks that the log file is not read beyond the time range even when the index can't skip anything
+
+        :param start_index: index of the line which time is the minimum time or None for no lower bound
+        :param end_index: index of the line which time is the maximum time or None for no upper bound
+        :param reverse: True to read the file backwards, False otherwise
+        """
+        start, end = self.get_time_range(start_index, end_index)
+        log_path = self.get_log_path("syslog")
+        with open(log_path) as log_file:
+            expected_lines = [parse_log_line(line) for line in log_file]
+        line_number = len(expected_lines)
+        expected_lines = self.filter_lines(expected_lines, start, end, reverse)
+        with patch.object(LogIndex, "CHUNK_SIZE", 10 ** 9), \
+                patch("ru.ihna.kozhukhov.core_application.os_logs.log_reader.parse_log_line",
+                      side_effect=parse_log_line) as parse_mock:
+            actual_lines = list(LogReader(log_path, start, end, reverse))
+        self.assertEquals(actual_lines, expected_lines, "Unexpected log lines")
+        self.assertLess(parse_mock.call_count, line_number // 2, "The log file shall not be read to its end")
+
+    def get_log_path(self, log_file):
+        """
+        Returns full path to the log file
+
+        :param log_file: name of the log file
+        :return: full path to the log file
+        """
+        return os.path.join(self.directory, log_file)
+
+    def get_time_range(self, start_index, end_index):
+        """
+        Transforms line indices to the time range
+
+        :param start_index: index of the line which time is the minimum time or None for no lower bound
+        :param end_index: index of the line which time is the maximum time or None for no upper bound
+        :return: a tuple (start, end)
+        """
+        start = self.FIRST_TIME + timedelta(seconds=start_index) if start_index is not None else None
+        end = self.FIRST_TIME + timedelta(seconds=end_index) if end_index is not None else None
+        return start, end
+
+    @staticmethod
+    def filter_lines(lines, start, end, reverse):
+        """
+        Leaves the log lines within the time range and puts them in the requested order
+
+        :param lines: list of parsed log lines in ascending order
+        :param start: the minimum log time or None if no lower bound is given
+        :param end: the maximum log time or None if no upper bound is given
+        :param reverse: True for descending order, False for ascending order
+        :return: list of parsed log lines
+        """
+        lines = [line for line in lines if (start is None or line[0] >= start) and (end is None or line[0] <= end)]
+        if reverse:
+            lines.reverse()
+        return lines
@@ -0,0 +1,180 @@
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from itertools import islice
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ...os_logs import LogIndex, LogReader, LogSeriesReader, get_rotated_files, open_log_file, parse_log_line
+from ...views import OperatingSystemLogs
+
+
+class TestLogSeries(SimpleTestCase):
+    """
+    Tests reading of the rotated and compressed log files
+    """
+
+    CHUNK_SIZE = 1024
+    """ Small chunks make the index informative even for small test files """
+
+    LINES_PER_FILE = 200
+
+    ROTATED_FILES = ["syslog.4.gz", "syslog.3.gz", "syslog.2.gz", "syslog.1", "syslog"]
+    """ Rotated files starting from the oldest one """
+
+    FIRST_TIME = datetime(2024, 3, 1, 10, 0, 0)
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.settings_override = self.settings(CORE_OS_LOG_INDEX_DIR=os.path.join(self.directory, "index"))
+        self.settings_override.enable()
+        self.chunk_size_patch = patch.object(LogIndex, "CHUNK_SIZE", self.CHUNK_SIZE)
+        self.chunk_size_patch.start()
+        self.expected_lines = []
+        for file_index, log_file in enumerate(self.ROTATED_FILES):
+            content = ""
+            for line_index in range(file_index * self.LINES_PER_FILE, (file_index + 1) * self.LINES_PER_FILE):
+                line = "%s host%d process[%d]: test message number %d" % (
+                    self.get_time(line_index).isoformat(timespec="microseconds"), file_index, line_index, line_index
+                )
+                content += line + "\n"
+                self.expected_lines.append(parse_log_line(line))
+            log_path = self.get_log_path(log_file)
+            with (gzip.open(log_path, "wt") if log_file.endswith(".gz") else open(log_path, "w")) as log:
+                log.write(content)
+        with open(self.get_log_path("syslog.bak"), "w") as log:
+            log.write("This file doesn't belong to the series\n")
+
+    def tearDown(self):
+        self.chunk_size_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    def test_rotated_files(self):
+        """
+        Checks that all files of the rotated series are found in the proper order
+        """
+        self.assertEquals(get_rotated_files(self.get_log_path("syslog")),
+                          [self.get_log_path(log_file) for log_file in self.ROTATED_FILES],
+                          "Unexpected list of rotated files")
+        self.assertEquals(get_rotated_files(self.get_log_path("auth.log")), [],
+                          "No rotated files shall be found for the non-existent log")
+
+    @parameterized.expand([
+        (None, None, False),
+        (None, None, True),
+        (250, 450, False),
+        (250, 450, True),
+        (900, None, True),
+        (None, 150, False),
+    ])
+    def test_read(self, start_index, end_index, reverse):
+        """
+        Checks that the rotated series is read as a single time-ordered stream
+
+        :param start_index: index of the line which time is the minimum time or None for no lower bound
+        :param end_index: index of the line which time is the maximum time or None for no upper bound
+        :param reverse: True to read the series in descending order, False otherwise
+        """
+        start = self.get_time(start_index) if start_index is not None else None
+        end = self.get_time(end_index) if end_index is not None else None
+        reader = LogSeriesReader(self.get_log_path("syslog"), start, end, reverse)
+        expected_lines = [line for line in self.expected_lines
+                          if (start is None or line[0] >= start) and (end is None or line[0] <= end)]
+        if reverse:
+            expected_lines.reverse()
+        self.assertEquals(list(reader), expected_lines, "The rotated series was read incorrectly")
+        self.assertEquals(reader.hosts, {"host0", "host1", "host2", "host3", "host4"}, "Unexpected host list")
+
+    def test_skip_archives(self):
+        """
+        Checks that compressed files out of the requested time range are not decompressed at all
+        """
+        LogSeriesReader(self.get_log_path("syslog"))  # All files are indexed at this stage
+        start = self.get_time(3 * self.LINES_PER_FILE + 10)
+        with patch("ru.ihna.kozhukhov.core_application.os_logs.log_reader.open_log_file",
+                   side_effect=open_log_file) as open_mock:
+            lines = list(LogSeriesReader(self.get_log_path("syslog"), start, None, False))
+        self.assertEquals(lines, [line for line in self.expected_lines if line[0] >= start],
+                          "Unexpected log lines")
+        self.assertEquals(sorted(call.args[0] for call in open_mock.call_args_list),
+                          [self.get_log_path("syslog"), self.get_log_path("syslog.1")],
+                          "Only the files within the time range shall be opened")
+
+    def test_reverse_compressed(self):
+        """
+        Checks that the compressed file is reversed chunk by chunk rather than entirely when it is read backwards
+        """
+        LogSeriesReader(self.get_log_path("syslog"))  # All files are indexed at this stage
+        page_size = 10
+        end = self.get_time(3 * self.LINES_PER_FILE - 1)
+        read_lines = []
+        read_forward = LogReader._read_forward
+
+        def read_forward_mock(log_file, range_start, range_end):
+            for line in read_forward(log_file, range_start, range_end):
+                read_lines.append(line)
+                yield line
+
+        with patch.object(LogReader, "_read_forward", staticmethod(read_forward_mock)):
+            lines = list(islice(LogSeriesReader(self.get_log_path("syslog"), None, end, True), page_size))
+        self.assertEquals(lines, [line for line in reversed(self.expected_lines) if line[0] <= end][:page_size],
+                          "Unexpected log lines")
+        self.assertLess(len(read_lines), self.LINES_PER_FILE // 2,
+                        "The compressed file shall not be decompressed entirely to produce a single page")
+
+    def test_compressed_index(self):
+        """
+        Checks that the index of the compressed file is built once and survives further rotations
+        """
+        chunks = LogIndex(self.get_log_path("syslog.4.gz")).chunks
+        self.assertGreater(len(chunks), 1, "The compressed file shall be indexed")
+        os.rename(self.get_log_path("syslog.4.gz"), self.get_log_path("syslog.5.gz"))
+        with patch("ru.ihna.kozhukhov.core_application.os_logs.log_index.parse_log_line",
+                   side_effect=parse_log_line) as parse_mock:
+            log_index = LogIndex(self.get_log_path("syslog.5.gz"))
+        self.assertEquals(parse_mock.call_count, 0, "The index shall not be rebuilt after rotation")
+        self.assertEquals(log_index.chunks, chunks, "The loaded index is not the same as the saved one")
+
+    def get_time(self, line_index):
+        """
+        Returns the time of a given log line
+
+        :param line_index: index of the log line within the whole series
+        :return: naive datetime
+        """
+        return self.FIRST_TIME + timedelta(seconds=line_index)
+
+    @parameterized.expand([
+        ("message number 1.*", status.HTTP_200_OK),
+        ("message number (1", status.HTTP_400_BAD_REQUEST),
+    ])
+    def test_search_template(self, template, expected_status):
+        """
+        Checks that the invalid search template is reported to the client
+
+        :param template: value of the 'q' query parameter
+        :param expected_status: the expected response status
+        """
+        request = APIRequestFactory().get("/api/v1/os-logs/", {"files": "syslog", "q": template})
+        force_authenticate(request, user=Mock(is_authenticated=True))
+        with patch.object(OperatingSystemLogs, "LOG_FOLDER", self.directory):
+            response = OperatingSystemLogs.as_view()(request)
+        self.assertEquals(response.status_code, expected_status, "Unexpected response status")
+
+    def get_log_path(self, log_file):
+        """
+        Returns full path to the log file
+
+        :param log_file: name of the log file
+        :return: full path to the log file
+        """
+        return os.path.join(self.directory, log_file)
@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+from time import perf_counter
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from parameterized import parameterized
+
+from ...os_logs import TimestampParser, parse_log_line, parse_log_line_slowly
+
+
+NOW = datetime(2024, 6, 15, 12, 0, 0, tzinfo=timezone.utc)
+""" All RFC 3164 timestamps are parsed relatively to this date """
+
+
+def log_line_provider():
+    """
+    Provides the corpus of real-world syslog lines
+    :return: list of tuples (line, expected_result) where expected_result is either a tuple (time, hostname, message)
+        or None if the line is not a valid log line
+    """
+    return [
+        # RFC 3164, as written by the traditional rsyslog template
+        ("Mar  1 10:00:00 server sshd[1234]: Accepted publickey for user from 10.0.0.1 port 52344 ssh2",
+         (datetime(2024, 3, 1, 10, 0, 0), "server",
+          "sshd[1234]: Accepted publickey for user from 10.0.0.1 port 52344 ssh2")),
+        ("Jun 15 11:59:59 server kernel: [12345.678901] e1000e: eth0 NIC Link is Up 1000 Mbps Full Duplex",
+         (datetime(2024, 6, 15, 11, 59, 59), "server",
+          "kernel: [12345.678901] e1000e: eth0 NIC Link is Up 1000 Mbps Full Duplex")),
+        ("Dec 31 23:59:59 server CRON[999]: (root) CMD (run-parts /etc/cron.hourly)",
+         (datetime(2023, 12, 31, 23, 59, 59), "server", "CRON[999]: (root) CMD (run-parts /etc/cron.hourly)")),
+        # RFC 3164 examples
+        ("<34>Oct 11 22:14:15 mymachine su: 'su root' failed for lonvick on /dev/pts/8",
+         (datetime(2023, 10, 11, 22, 14, 15), "mymachine", "su: 'su root' failed for lonvick on /dev/pts/8")),
+        ("<13>Feb  5 17:32:18 10.0.0.99 Use the BFG!",
+         (datetime(2024, 2, 5, 17, 32, 18), "10.0.0.99", "Use the BFG!")),
+        # rsyslog high-precision template
+        ("2024-03-01T10:00:00.123456+03:00 server systemd[1]: Started Session 1 of user root.",
+         (datetime(2024, 3, 1, 7, 0, 0, 123456), "server", "systemd[1]: Started Session 1 of user root.")),
+        ("2024-03-01T07:00:00.5Z server sudo:     root : TTY=pts/0 ; PWD=/root ; USER=root ; COMMAND=/bin/ls",
+         (datetime(2024, 3, 1, 7, 0, 0, 500000), "server",
+          "sudo:     root : TTY=pts/0 ; PWD=/root ; USER=root ; COMMAND=/bin/ls")),
+        ("2024-03-01T10:00:00+0300 server corefacility: no colon within the offset",
+         (datetime(2024, 3, 1, 7, 0, 0), "server", "corefacility: no colon within the offset")),
+        ("2024-03-01T10:00:00 server corefacility: no offset at all",
+         (datetime(2024, 3, 1, 10, 0, 0), "server", "corefacility: no offset at all")),
+        # RFC 5424 examples
+        ("<34>1 2003-10-11T22:14:15.003Z mymachine.example.com su - ID47 - 'su root' failed for lonvick",
+         (datetime(2003, 10, 11, 22, 14, 15, 3000), "mymachine.example.com",
+          "su - ID47 - 'su root' failed for lonvick")),
+        ("<165>1 2003-08-24T05:14:15.000003-07:00 192.0.2.1 myproc 8710 - - %% It's time to make the do-nuts.",
+         (datetime(2003, 8, 24, 12, 14, 15, 3), "192.0.2.1", "myproc 8710 - - %% It's time to make the do-nuts.")),
+        ("<165>1 2003-10-11T22:14:15.003000123Z host evntslog - ID47 [exampleSDID@32473 iut=\"3\"] An application",
+         (datetime(2003, 10, 11, 22, 14, 15, 3000), "host",
+          "evntslog - ID47 [exampleSDID@32473 iut=\"3\"] An application")),
+        # Unknown timestamp formats are parsed by the dateutil
+        ("01/03/2024 10:00:00 server corefacility: unusual timestamp",
+         (datetime(2024, 1, 3, 10, 0, 0), "server", "corefacility: unusual timestamp")),
+        # Invalid lines
+        ("", None),
+        ("   ", None),
+        ("Mar  1 10:00:00", None),
+        ("this is not a log line", None),
+    ]
+
+
+@override_settings(TIME_ZONE="UTC")
+class TestTimestampParser(SimpleTestCase):
+    """
+    Tests the syslog timestamp parser
+    """
+
+    BENCHMARK_LINE_NUMBER = 2000
+
+    MIN_SPEEDUP = 10
+    """ The fast parser shall be at least this times faster than the dateutil-based parser """
+
+    def setUp(self):
+        super().setUp()
+        self.now_patch = patch("ru.ihna.kozhukhov.core_application.os_logs.timestamp_parser.now", return_value=NOW)
+        self.now_patch.start()
+
+    def tearDown(self):
+        self.now_patch.stop()
+        super().tearDown()
+
+    @parameterized.expand(log_line_provider())
+    def test_corpus(self, line, expected_result):
+        """
+        Checks that the log lines are parsed correctly
+
+        :param line: the log line to parse
+        :param expected_result: the expected parsing result
+        """
+        self.assertEquals(parse_log_line(line), expected_result, "The log line was parsed incorrectly")
+
+    @parameterized.expand([
+        ("Feb 30 10:00:00 server kernel: invalid date",),
+        ("2024-13-01T10:00:00 server kernel: invalid month",),
+        ("Mar  1 1:00:00 server kernel: one-digit hour",),
+        ("Hello world",),
+    ])
+    def test_unknown_format(self, line):
+        """
+        Checks that the parser doesn't recognize invalid or unusual timestamps
+
+        :param line: the log line
+        """
+        self.assertIsNone(TimestampParser().parse(line), "The timestamp shall be passed to the dateutil")
+
+    def test_same_as_dateutil(self):
+        """
+        Checks that the fast parser gives the same results as the dateutil for the timestamps containing the year
+        """
+        timestamp_parser = TimestampParser()
+        for line, expected_result in log_line_provider():
+            if not line.startswith("20"):
+                continue
+            fast_result = parse_log_line(line, timestamp_parser)
+            slow_result = parse_log_line_slowly(line)
+            self.assertEquals(fast_result[:2], slow_result[:2], "Unexpected result for the line: " + line)
+
+    def test_throughput(self):
+        """
+        Compares throughput of the fast parser and the dateutil-based parser
+        """
+        lines = [
+            "Mar %2d %02d:%02d:%02d server sshd[%d]: Accepted publickey for user from 10.0.0.1 port 52344 ssh2" %
+            (index % 28 + 1, index % 24, index % 60, index % 60, index)
+            if index % 2 == 0 else
+            "2024-03-%02dT%02d:%02d:%02d.%06d+03:00 server systemd[1]: Started Session %d of user root." %
+            (index % 28 + 1, index % 24, index % 60, index % 60, index, index)
+            for index in range(self.BENCHMARK_LINE_NUMBER)
+        ]
+        timestamp_parser = TimestampParser()
+        start_time = perf_counter()
+        for line in lines:
+            parse_log_line(line, timestamp_parser)
+        fast_time = perf_counter() - start_time
+        start_time = perf_counter()
+        for line in lines:
+            parse_log_line_slowly(line)
+        slow_time = perf_counter() - start_time
+        self.assertGreater(slow_time / fast_time, self.MIN_SPEEDUP,
+                           "The fast parser processes %d lines per second while the dateutil-based parser processes "
+                           "%d lines per second" % (len(lines) / fast_time, len(lines) / slow_time))
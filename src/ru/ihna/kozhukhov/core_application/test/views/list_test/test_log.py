@@ -1,11 +1,17 @@
+import csv
+import json
 import platform
 from datetime import timedelta
+from io import StringIO
 
+from django.core.management import call_command
 from django.utils.timezone import make_naive
 from rest_framework import status
 from parameterized import parameterized
 
 from ....entity.log import LogSet
+from ....entity.log_record import LogRecord
+from ....models import Log as LogModel
 from ...entity_set.entity_set_objects.log_set_object import LogSetObject
 from ...entity_set.entity_set_objects.user_set_object import UserSetObject
 
@@ -69,6 +75,40 @@ def user_filter_provider():
     ]
 
 
+def request_metrics_filter_provider():
+    """
+    Provides the data for the test_request_metrics_filter test
+    :return: list of test_request_metrics_filter function arguments
+    """
+    return [
+        ("response_time_from", "0.155", 0.155, status.HTTP_200_OK),
+        ("response_time_from", "0", 0.0, status.HTTP_200_OK),
+        ("response_time_from", "100", 100.0, status.HTTP_200_OK),
+        ("response_time_from", "-1", None, status.HTTP_400_BAD_REQUEST),
+        ("response_time_from", "fast", None, status.HTTP_400_BAD_REQUEST),
+        ("query_count_from", "5", 5, status.HTTP_200_OK),
+        ("query_count_from", "0.5", None, status.HTTP_400_BAD_REQUEST),
+        ("query_time_from", "0.08", 0.08, status.HTTP_200_OK),
+    ]
+
+
+def order_by_provider():
+    """
+    Provides the data for the test_order_by test
+    :return: list of test_order_by function arguments
+    """
+    return [
+        ("request_date", status.HTTP_200_OK),
+        ("-request_date", status.HTTP_200_OK),
+        ("response_time", status.HTTP_200_OK),
+        ("-response_time", status.HTTP_200_OK),
+        ("query_count", status.HTTP_200_OK),
+        ("-query_count", status.HTTP_200_OK),
+        ("-query_time", status.HTTP_200_OK),
+        ("log_address", status.HTTP_400_BAD_REQUEST),
+    ]
+
+
 class TestLog(BaseTestClass):
     """
     Provides the testing features for the log lists
@@ -168,6 +208,173 @@ class TestLog(BaseTestClass):
             self.container.filter_by_user(self.user_set_object[user_index])
         self._test_search({"profile": "basic", "user": user_id}, "superuser", response_code)
 
+    @parameterized.expand(request_metrics_filter_provider())
+    def test_request_metrics_filter(self, query_param, query_value, filter_value, response_code):
+        """
+        Tests the response_time_from, query_count_from and query_time_from filters
+        :param query_param: name of the query parameter that is also the filter name
+        :param query_value: value of the query parameter
+        :param filter_value: the same value converted to the filter type
+        :param response_code: expected response code
+        """
+        if response_code == status.HTTP_200_OK:
+            getattr(self.container, "filter_by_" + query_param)(filter_value)
+        self._test_search({"profile": "basic", query_param: query_value}, "superuser", response_code)
+
+    @parameterized.expand(order_by_provider())
+    def test_order_by(self, order_by, response_code):
+        """
+        Tests the log ordering
+        :param order_by: value of the order_by query parameter
+        :param response_code: expected response code
+        """
+        if response_code == status.HTTP_200_OK:
+            self.container.order_by(order_by)
+        self._test_search({"profile": "basic", "order_by": order_by}, "superuser", response_code)
+
+    @parameterized.expand([
+        ("superuser", {}, status.HTTP_200_OK),
+        ("superuser", {"limit": 2}, status.HTTP_200_OK),
+        ("superuser", {"limit": 0}, status.HTTP_400_BAD_REQUEST),
+        ("superuser", {"limit": "many"}, status.HTTP_400_BAD_REQUEST),
+        ("ordinary_user", {}, status.HTTP_403_FORBIDDEN),
+        (None, {}, status.HTTP_401_UNAUTHORIZED),
+    ])
+    def test_slowest_operations(self, token_id, query_params, expected_status_code):
+        """
+        Tests the slowest operations view
+        :param token_id: the authorization token ID
+        :param query_params: query parameters to send
+        :param expected_status_code: expected response status code
+        """
+        operation_descriptions = dict()
+        for log in self.container:
+            operation_descriptions[log.id] = "Operation %d" % (log.id % 2)
+            LogModel.objects.filter(id=log.id).update(operation_description=operation_descriptions[log.id])
+        response = self.client.get(self.request_path + "slowest-operations/", data=query_params,
+                                   **self.get_authorization_headers(token_id))
+        self.assertEquals(response.status_code, expected_status_code, "Unexpected response status")
+        if response.status_code != status.HTTP_200_OK:
+            return
+        operations = dict()
+        for log in self.container:
+            operations.setdefault((operation_descriptions[log.id], log.request_method), []).append(log)
+        self.assertGreater(len({operation for operation, _ in operations}), 1, "Several operations shall be tested")
+        desired_operations = list(sorted(
+            operations.items(),
+            key=lambda item: sum(log.response_time for log in item[1]) / len(item[1]),
+            reverse=True,
+        ))[:query_params.get("limit", len(operations))]
+        self.assertEquals(len(response.data), len(desired_operations), "Unexpected number of operations")
+        for actual_operation, ((operation_description, request_method), logs) in \
+                zip(response.data, desired_operations):
+            self.assertEquals(actual_operation['operation_description'], operation_description,
+                              "Unexpected operation order")
+            # Logs without request method are saved to the database with empty request method
+            self.assertEquals(actual_operation['request_method'] or None, request_method,
+                              "Unexpected operation order")
+            self.assertEquals(actual_operation['request_count'], len(logs), "Unexpected number of requests")
+            self.assertAlmostEqual(actual_operation['mean_response_time'],
+                                   sum(log.response_time for log in logs) / len(logs),
+                                   msg="Unexpected mean response time")
+            self.assertAlmostEqual(actual_operation['max_response_time'], max(log.response_time for log in logs),
+                                   msg="Unexpected maximum response time")
+            self.assertAlmostEqual(actual_operation['mean_query_count'],
+                                   sum(log.query_count for log in logs) / len(logs),
+                                   msg="Unexpected mean query count")
+
+    @parameterized.expand([
+        ("superuser", {}, status.HTTP_200_OK),
+        ("superuser", {"file_format": "jsonl"}, status.HTTP_200_OK),
+        ("superuser", {"file_format": "csv", "records": ""}, status.HTTP_200_OK),
+        ("superuser", {"file_format": "jsonl", "records": ""}, status.HTTP_200_OK),
+        ("superuser", {"file_format": "jsonl", "ip_address": "8.8.8.8"}, status.HTTP_200_OK),
+        ("superuser", {"file_format": "xml"}, status.HTTP_400_BAD_REQUEST),
+        ("ordinary_user", {}, status.HTTP_403_FORBIDDEN),
+        (None, {}, status.HTTP_401_UNAUTHORIZED),
+    ])
+    def test_export(self, token_id, query_params, expected_status_code):
+        """
+        Tests the log export view
+        :param token_id: the authorization token ID
+        :param query_params: query parameters to send
+        :param expected_status_code: expected response status code
+        """
+        if "ip_address" in query_params:
+            self.container.filter_by_ip_address(query_params["ip_address"])
+        records = self.create_sample_records() if "records" in query_params else None
+        response = self.client.get(self.request_path + "export/", data=query_params,
+                                   **self.get_authorization_headers(token_id))
+        self.assertEquals(response.status_code, expected_status_code, "Unexpected response status")
+        if response.status_code != status.HTTP_200_OK:
+            return
+        self.assertTrue(response.streaming, "The export response shall be streamed")
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assert_export_equal(content, query_params.get("file_format", "csv"), records)
+
+    @parameterized.expand([("csv", False), ("jsonl", False), ("csv", True), ("jsonl", True)])
+    def test_export_command(self, file_format, include_records):
+        """
+        Tests the log_export command
+        :param file_format: format of the exported file
+        :param include_records: True to export the log records, False otherwise
+        """
+        records = self.create_sample_records() if include_records else None
+        output = StringIO()
+        call_command("log_export", file_format=file_format, records=include_records, stdout=output)
+        self.assert_export_equal(output.getvalue(), file_format, records)
+
+    def create_sample_records(self):
+        """
+        Attaches some log records to some logs
+        :return: a dictionary which keys are log IDs and values are lists of record messages
+        """
+        records = dict()
+        for log_index, log in enumerate(self.container):
+            records[log.id] = []
+            for record_index in range(log_index % 3):
+                message = "Record %d of the log %d" % (record_index, log.id)
+                record = LogRecord(log=log, message=message, level="INF")
+                record.record_time.mark()
+                record.create()
+                records[log.id].append(message)
+        return records
+
+    def assert_export_equal(self, content, file_format, records):
+        """
+        Checks that the exported logs are the same as the logs in the container
+        :param content: the exported file content
+        :param file_format: format of the exported file
+        :param records: the dictionary returned by create_sample_records or None if the records were not exported
+        """
+        if file_format == "csv":
+            exported_logs = list(csv.DictReader(StringIO(content)))
+        else:
+            exported_logs = [json.loads(line) for line in content.splitlines()]
+        desired_logs = list(sorted(self.container, key=lambda log: log.id))
+        self.assertEquals(len(exported_logs), len(desired_logs), "Unexpected number of the exported logs")
+        for exported_log, desired_log in zip(exported_logs, desired_logs):
+            self.assertEquals(str(exported_log['id']), str(desired_log.id), "Unexpected log order")
+            self.assertEquals(exported_log['request_date'], desired_log.request_date.get().isoformat(),
+                              "Unexpected request date")
+            if file_format == "csv":
+                # CSV writer represents None as an empty string
+                desired_status = str(desired_log.response_status) if desired_log.response_status is not None else ""
+                self.assertEquals(exported_log['response_status'], desired_status, "Unexpected response status")
+            else:
+                self.assertEquals(exported_log['response_status'], desired_log.response_status,
+                                  "Unexpected response status")
+            if desired_log.user is not None:
+                self.assertEquals(exported_log['user_login'], desired_log.user.login, "Unexpected user login")
+            if records is None:
+                self.assertNotIn("records", exported_log, "The log records shall not be exported")
+            elif file_format == "csv":
+                actual_messages = [line.split("] ", 1)[1] for line in exported_log['records'].splitlines()]
+                self.assertEquals(actual_messages, records[desired_log.id], "Unexpected log records")
+            else:
+                actual_messages = [record['message'] for record in exported_log['records']]
+                self.assertEquals(actual_messages, records[desired_log.id], "Unexpected log records")
+
     def assert_items_equal(self, actual_item, desired_item):
         """
         Compares two list item
@@ -195,6 +402,10 @@ class TestLog(BaseTestClass):
         self.assertEquals(actual_item['geolocation'], desired_item.geolocation, "Unexpected geolocation")
         self.assertEquals(actual_item['response_status'], desired_item.response_status,
                           "The log in the response body doesn't match to the expected one: unexpected response status")
+        self.assertAlmostEqual(actual_item['response_time'], desired_item.response_time,
+                               msg="Unexpected response time")
+        self.assertEquals(actual_item['query_count'], desired_item.query_count, "Unexpected query count")
+        self.assertAlmostEqual(actual_item['query_time'], desired_item.query_time, msg="Unexpected query time")
 
 
 del BaseTestClass
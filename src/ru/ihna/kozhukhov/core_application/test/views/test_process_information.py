@@ -0,0 +1,130 @@
+import getpass
+import subprocess
+import sys
+from unittest.mock import patch
+
+from parameterized import parameterized
+from rest_framework import status
+
+from ...sensors import ProcessSnapshot
+from .base_view_test import BaseViewTest
+
+
+class TestProcessInformation(BaseViewTest):
+    """
+    Tests the process list
+    """
+
+    PROCESS_MARKER = "corefacility-process-information-test"
+
+    ordinary_user_required = True
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)", cls.PROCESS_MARKER])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.child.kill()
+        cls.child.wait()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        ProcessSnapshot.clear()
+
+    def get_processes(self, query_params=None, expected_status=status.HTTP_200_OK):
+        """
+        Requests the process list
+
+        :param query_params: the query parameters
+        :param expected_status: the expected response status
+        :return: the response body
+        """
+        response = self.client.get("/api/%s/procinfo/" % self.API_VERSION, query_params or {},
+                                   **self.get_authorization_headers("ordinary_user"))
+        self.assertEquals(response.status_code, expected_status, "Unexpected response status")
+        return response.data
+
+    def test_process_list(self):
+        """
+        Checks that the process list is given in the same format as the 'ps aux' command gives it
+        """
+        processes = self.get_processes()
+        self.assertGreater(len(processes), 1, "At least the current process and its child shall be listed")
+        for process in processes:
+            self.assertEquals(list(process.keys()), ProcessSnapshot.FIELDS, "Unexpected process fields")
+        child_info = [process for process in processes if process['PID'] == self.child.pid]
+        self.assertEquals(len(child_info), 1, "The child process shall be listed")
+        self.assertIn(self.PROCESS_MARKER, child_info[0]['COMMAND'], "Unexpected command line")
+        self.assertEquals(child_info[0]['USER'], getpass.getuser(), "Unexpected process owner")
+        self.assertGreater(child_info[0]['RSS'], 0, "Unexpected resident memory")
+
+    def test_filter(self):
+        """
+        Checks that the processes are filtered by the user name and the command line
+        """
+        processes = self.get_processes({"command": self.PROCESS_MARKER.upper()})
+        self.assertIn(self.child.pid, [process['PID'] for process in processes], "The child process shall be found")
+        for process in processes:
+            self.assertIn(self.PROCESS_MARKER, process['COMMAND'], "The process doesn't match the filter")
+        user = getpass.getuser()
+        processes = self.get_processes({"user": user})
+        self.assertGreater(len(processes), 0, "The processes of the current user shall be found")
+        for process in processes:
+            self.assertEquals(process['USER'], user, "The process doesn't match the filter")
+        self.assertEquals(self.get_processes({"user": "no-such-user"}), [], "No processes are expected")
+
+    @parameterized.expand([
+        ("pid", "PID", False),
+        ("-pid", "PID", True),
+        ("-rss", "RSS", True),
+        ("command", "COMMAND", False),
+    ])
+    def test_ordering(self, ordering, field, reverse):
+        """
+        Checks that the processes are sorted on the server side
+
+        :param ordering: value of the 'ordering' query parameter
+        :param field: the process field to sort by
+        :param reverse: True for the descending order
+        """
+        values = [process[field] for process in self.get_processes({"ordering": ordering})]
+        self.assertEquals(values, sorted(values, reverse=reverse), "The processes are not sorted")
+
+    def test_bad_ordering(self):
+        """
+        Checks that the unknown ordering field is rejected
+        """
+        self.get_processes({"ordering": "STAT"}, status.HTTP_400_BAD_REQUEST)
+
+    def test_pagination(self):
+        """
+        Checks that the process list is split into pages when the client asks for it
+        """
+        ttl_patcher = patch.object(ProcessSnapshot, "TTL", 3600.0)
+        ttl_patcher.start()
+        self.addCleanup(ttl_patcher.stop)
+        all_pids = [process['PID'] for process in self.get_processes({"ordering": "pid"})]
+        pids = []
+        page = 1
+        while True:
+            data = self.get_processes({"ordering": "pid", "page_size": 2, "page": page})
+            self.assertEquals(data['count'], len(all_pids), "Unexpected total number of processes")
+            pids += [process['PID'] for process in data['results']]
+            if data['next'] is None:
+                break
+            page += 1
+        self.assertEquals(pids, all_pids, "The pages shall contain all processes")
+
+    def test_cache(self):
+        """
+        Checks that the process list is built once for all requests made within the cache lifetime
+        """
+        with patch.object(ProcessSnapshot, "build_processes", wraps=ProcessSnapshot.build_processes) as build_mock:
+            self.get_processes()
+            self.get_processes({"ordering": "-cpu"})
+            self.assertEquals(build_mock.call_count, 1, "The cached process list shall be used")
+            ProcessSnapshot.get_processes(ttl=0.0)
+            self.assertEquals(build_mock.call_count, 2, "The outdated process list shall be rebuilt")
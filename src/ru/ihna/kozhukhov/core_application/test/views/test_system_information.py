@@ -0,0 +1,129 @@
+import threading
+from time import perf_counter
+from unittest.mock import patch
+
+import psutil
+from rest_framework import status
+
+from ...management.commands.health_check import Command as HealthChecker
+from ...views import SystemInformationView
+from .base_view_test import BaseViewTest
+
+
+class TestSystemInformation(BaseViewTest):
+    """
+    Tests the system information page
+    """
+
+    HUNG_MOUNT_POINT = "/mnt/hung"
+
+    ordinary_user_required = True
+
+    def setUp(self):
+        super().setUp()
+        SystemInformationView.clear_cache()
+        self.addCleanup(SystemInformationView.clear_cache)
+
+    def get_system_information(self):
+        """
+        Requests the system information
+
+        :return: the response body
+        """
+        response = self.client.get("/api/%s/sysinfo/" % self.API_VERSION,
+                                   **self.get_authorization_headers("ordinary_user"))
+        self.assertEquals(response.status_code, status.HTTP_200_OK, "Unexpected response status")
+        return response.data
+
+    def test_system_information(self):
+        """
+        Checks that both static and dynamic information are present in the response
+        """
+        with patch.object(HealthChecker, "read_mount_points", return_value=["/"]):
+            data = self.get_system_information()
+        for key in ('datetime', 'uptime', 'cpu_info', 'memory_info', 'swap_info', 'disk_info', 'network_info',
+                    'os_info'):
+            self.assertIn(key, data, "The '%s' field is missed" % key)
+        self.assertEquals(data['cpu_info']['cores'], psutil.cpu_count(logical=True), "Unexpected number of cores")
+        self.assertEquals(len(data['cpu_info']['load_average']), 3, "Unexpected load average")
+        self.assertIsInstance(data['network_info']['hostname'], str, "Unexpected host name")
+        self.assertIn('bytes_sent', data['network_info'], "The network counters are missed")
+        self.assertEquals(data['disk_info']['/']['total'], psutil.disk_usage("/").total, "Unexpected disk size")
+        self.assertEquals(data['unavailable_mount_points'], [], "All mount points shall be available")
+
+    def test_cache(self):
+        """
+        Checks that static information is revealed once while dynamic information is revealed after the cache expires
+        """
+        with patch.object(HealthChecker, "read_mount_points", return_value=["/"]), \
+                patch.object(SystemInformationView, "get_static_information",
+                             wraps=SystemInformationView.get_static_information) as static_mock, \
+                patch.object(SystemInformationView, "get_dynamic_information",
+                             wraps=SystemInformationView.get_dynamic_information) as dynamic_mock:
+            with self.settings(CORE_SYSTEM_INFORMATION_TTL=3600.0):
+                first_data = self.get_system_information()
+                second_data = self.get_system_information()
+            self.assertEquals(static_mock.call_count, 1, "Static information shall be revealed once")
+            self.assertEquals(dynamic_mock.call_count, 1, "Dynamic information shall be cached")
+            self.assertEquals(first_data['memory_info'], second_data['memory_info'], "The cache was not used")
+            self.assertGreaterEqual(second_data['uptime'], first_data['uptime'], "The uptime shall not be cached")
+            with self.settings(CORE_SYSTEM_INFORMATION_TTL=0.0):
+                self.get_system_information()
+            self.assertEquals(static_mock.call_count, 1, "Static information shall be revealed once")
+            self.assertEquals(dynamic_mock.call_count, 2, "Outdated dynamic information shall be revealed again")
+
+    def test_hung_mount_point(self):
+        """
+        Checks that a hung mount point doesn't stall the request
+        """
+        release_event = threading.Event()
+        self.addCleanup(release_event.set)
+        disk_usage = psutil.disk_usage
+        hung_calls = []
+
+        def hung_disk_usage(mount_point):
+            if mount_point == self.HUNG_MOUNT_POINT:
+                hung_calls.append(mount_point)
+                release_event.wait()
+            return disk_usage("/")
+
+        with patch.object(HealthChecker, "read_mount_points", return_value=["/", self.HUNG_MOUNT_POINT]), \
+                patch("psutil.disk_usage", side_effect=hung_disk_usage), \
+                self.settings(CORE_SYSTEM_INFORMATION_TTL=0.0, CORE_SYSTEM_INFORMATION_MOUNT_TIMEOUT=0.2):
+            for request_number in range(2):
+                start_time = perf_counter()
+                data = self.get_system_information()
+                self.assertLess(perf_counter() - start_time, 2.0, "The hung mount point stalls the request")
+                self.assertIn("/", data['disk_info'], "The available mount point shall be shown")
+                self.assertNotIn(self.HUNG_MOUNT_POINT, data['disk_info'], "The hung mount point can't be shown")
+                self.assertEquals(data['unavailable_mount_points'], [self.HUNG_MOUNT_POINT],
+                                  "The hung mount point shall be reported")
+            self.assertEquals(len(hung_calls), 1, "The hung mount point shall not be queried again")
+            release_event.set()
+            with self.settings(CORE_SYSTEM_INFORMATION_MOUNT_TIMEOUT=5.0):
+                # The previous query has finished, so the mount point is queried again
+                data = self.get_system_information()
+            self.assertIn(self.HUNG_MOUNT_POINT, data['disk_info'], "The mount point is available again")
+
+    def test_many_hung_mount_points(self):
+        """
+        Checks that several hung mount points don't prevent other mount points from being queried
+        """
+        release_event = threading.Event()
+        self.addCleanup(release_event.set)
+        disk_usage = psutil.disk_usage
+        hung_mount_points = ["%s%d" % (self.HUNG_MOUNT_POINT, index) for index in range(8)]
+
+        def hung_disk_usage(mount_point):
+            if mount_point in hung_mount_points:
+                release_event.wait()
+            return disk_usage("/")
+
+        with patch.object(HealthChecker, "read_mount_points", return_value=hung_mount_points + ["/"]), \
+                patch("psutil.disk_usage", side_effect=hung_disk_usage), \
+                self.settings(CORE_SYSTEM_INFORMATION_TTL=0.0, CORE_SYSTEM_INFORMATION_MOUNT_TIMEOUT=0.2):
+            for request_number in range(2):
+                data = self.get_system_information()
+                self.assertIn("/", data['disk_info'], "The available mount point shall be shown")
+                self.assertEquals(data['unavailable_mount_points'], hung_mount_points,
+                                  "All hung mount points shall be reported")
@@ -20,4 +20,6 @@ from .entry_point_list import EntryPointListView
 from .authorization_method_setup import AuthorizationMethodSetupView
 from .system_information import SystemInformationView
 from .os_logs import OperatingSystemLogs
+from .os_logs_follow import OperatingSystemLogsFollow
 from .health_check import HealthCheck
+from .log_statistics import LogStatisticsView
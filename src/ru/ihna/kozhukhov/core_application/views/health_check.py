@@ -1,28 +1,32 @@
-import re
 from datetime import datetime
 from dateutil.parser import parse, ParserError
 
+import numpy
 import psutil
 from django.utils.timezone import make_aware, is_naive
 from django.utils.translation import gettext as _
-from django.db.models.manager import Manager
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ru.ihna.kozhukhov.core_application.management.commands.health_check import Command as HealthCheckDaemon
-from ru.ihna.kozhukhov.core_application.models import HealthCheck as HealthCheckModel
+from ru.ihna.kozhukhov.core_application.models import HealthCheck as HealthCheckModel, HealthCheckRollup
 
 
 class HealthCheck(APIView):
     """
-    Returns some amount of health check timestamps to the client
+    Returns some amount of health check timestamps to the client.
+
+    The time interval is given by the 'from' and 'to' query parameters. When the 'from' parameter is absent, the
+    interval starts at the 'minimum_date' (the current date minus HealthCheckDaemon.VIEW_INTERVAL, i.e., the last week);
+    when the 'to' parameter is absent, the interval ends at the current date. Older timestamps are shown only when
+    the 'from' parameter is given explicitly.
     """
 
     permission_classes = [IsAuthenticated]
 
-    CATEGORIES = ['cpu', 'network', 'disk', 'memory', 'temperature']
+    CATEGORIES = ['cpu', 'network', 'disk', 'memory', 'temperature', 'processes']
     """ The health check category are written by the client in the request path """
 
     VIRTUAL_MEMORY_INDEX = 0
@@ -49,28 +53,30 @@ class HealthCheck(APIView):
     bytes received
     """
 
-    TEMPERATURE_MATCHER = re.compile(r'^temp\d_input$')
-    """
-    Name of the field in lm-sensors output that contains actual temperature value
-    """
-
-    _previous_bytes_sent = None
-    """
-    Reflects number of bytes sent at the previous timestamp
-    """
-
-    _previous_bytes_received = None
-    """
-    Reflects number of bytes received at the previous timestamp
-    """
-
-    _previous_date = None
+    DEFAULT_POINT_NUMBER = 300
     """
-    Reflects the date related to the previous timestamp
+    The coarsest resolution that gives at least this number of timestamps for the requested time interval will be
+    chosen when the 'points' query parameter is absent
     """
 
-    _temperature_labels = None
-    """ the temperature labels that shall not be changed at least since the last boot """
+    MAX_POINT_NUMBER = 10000
+    """ Maximum value of the 'points' query parameter """
+
+    ROLLUP_CHANNEL_KEYS = {
+        'memory': ['ram_free', 'swap_free'],
+        'network': ['bytes_sent', 'bytes_received'],
+    }
+    """ Order of the rollup channels for categories with fixed channel number """
+
+    CATEGORY_COLUMNS = {
+        'cpu': ['cpu_load'],
+        'memory': ['ram_free', 'swap_free'],
+        'disk': ['hdd_free'],
+        'network': ['bytes_sent', 'bytes_received'],
+        'temperature': ['temperature'],
+        'processes': ['processes'],
+    }
+    """ Only these columns are read from the database when the health check timestamps are shown """
 
     def get(self, request, *args, category=None, **kwargs):
         """
@@ -87,130 +93,263 @@ class HealthCheck(APIView):
         current_date = make_aware(datetime.now())
         minimum_date = current_date - HealthCheckDaemon.VIEW_INTERVAL
 
-        health_check_manager = HealthCheckModel.objects
-        if 'from' in request.query_params:
-            try:
-                time = parse(request.query_params['from'])
-                if is_naive(time):
-                    time = make_aware(time)
-            except ParserError:
-                raise ValidationError({'from': "Bad date/time format."})
-            health_check_manager = health_check_manager.filter(date__gte=time)
-        if 'to' in request.query_params:
-            try:
-                time = parse(request.query_params['to'])
-                if is_naive(time):
-                    time = make_aware(time)
-            except ParserError:
-                raise ValidationError({'to': "Bad date/time format."})
-            health_check_manager = health_check_manager.filter(date__lte=time)
-        if isinstance(health_check_manager, Manager):
-            health_check_manager = health_check_manager.all()
-
-        timestamps = []
-        values = None
-        labels = None
-        get_channels = getattr(self, "get_%s_channels" % category)
-        fill_values = getattr(self, "fill_%s_values" % category)
-        get_labels = getattr(self, "get_%s_labels" % category)
-        get_constants = getattr(self, "get_%s_constants" % category)
-        for health_check in health_check_manager:
-            timestamps.append(health_check.date)
-            if labels is None:
-                labels = get_labels(health_check)
-            if values is None:
-                values = [list() for k in range(get_channels(health_check))]
-            fill_values(values, health_check)
+        date_from = self._get_date(request.query_params, 'from') or minimum_date
+        date_to = self._get_date(request.query_params, 'to') or current_date
+        resolution = self.get_resolution(date_from, date_to, self._get_point_number(request.query_params))
+        if resolution is None:
+            response_data = self.get_timestamp_data(category, date_from, date_to)
+        else:
+            response_data = self.get_rollup_data(category, resolution, date_from, date_to)
 
         return Response({
             'minimum_date': minimum_date.isoformat(timespec='minutes'),
             'current_date': current_date.isoformat(timespec='minutes'),
-            'repeat_after': HealthCheckDaemon.MONITORING_INTERVAL,
+            'repeat_after': HealthCheckDaemon.get_monitoring_interval() * HealthCheckDaemon.get_batch_size(),
+            'resolution': resolution or HealthCheckDaemon.get_monitoring_interval(),
+            **response_data,
+        })
+
+    def get_resolution(self, date_from, date_to, point_number):
+        """
+        Chooses the coarsest resolution that still gives the requested number of timestamps
+
+        :param date_from: beginning of the requested time interval
+        :param date_to: end of the requested time interval
+        :param point_number: the requested number of timestamps
+        :return: the rollup resolution in seconds or None if the health check timestamps shall be shown
+        """
+        interval = (date_to - date_from).total_seconds()
+        monitoring_interval = HealthCheckDaemon.get_monitoring_interval()
+        for resolution in reversed(HealthCheckRollup.RESOLUTIONS):
+            if resolution > monitoring_interval and interval / resolution >= point_number:
+                return resolution
+        return None
+
+    def get_timestamp_data(self, category, date_from, date_to):
+        """
+        Reveals the health check timestamps for a given category
+
+        :param category: the health check category
+        :param date_from: beginning of the requested time interval
+        :param date_to: end of the requested time interval
+        :return: a part of the response body
+        """
+        rows = HealthCheckModel.objects\
+            .filter(date__gte=date_from, date__lte=date_to)\
+            .order_by('date')\
+            .values_list('date', *self.CATEGORY_COLUMNS[category])
+        columns = list(zip(*rows))
+        if len(columns) == 0:
+            labels = None
+            values = None
+            timestamps = []
+        else:
+            timestamps = list(columns[0])
+            labels, values = getattr(self, "get_%s_series" % category)(*columns)
+        return {
             'timestamps': timestamps,
             'labels': labels,
             'values': values,
-            'constants': get_constants(labels),
-        })
+            'minimums': None,
+            'maximums': None,
+            'constants': getattr(self, "get_%s_constants" % category)(labels),
+        }
 
-    def get_cpu_channels(self, health_check):
-        return len(health_check.cpu_load)
+    def get_rollup_data(self, category, resolution, date_from, date_to):
+        """
+        Reveals the health check rollups for a given category
+
+        :param category: the health check category
+        :param resolution: the rollup resolution in seconds
+        :param date_from: beginning of the requested time interval
+        :param date_to: end of the requested time interval
+        :return: a part of the response body. The 'values' field contains mean values of the channels within each
+            rollup interval, 'minimums' and 'maximums' fields contain their minimum and maximum values
+        """
+        rollups = list(HealthCheckRollup.objects.filter(
+            resolution=resolution,
+            date__gte=HealthCheckRollup.get_interval_start(date_from, resolution),
+            date__lte=date_to,
+        ).order_by("date").values_list("date", "channels"))
+        if category in self.ROLLUP_CHANNEL_KEYS:
+            keys = self.ROLLUP_CHANNEL_KEYS[category]
+        else:
+            keys = list()
+            for date, channels in rollups:
+                for key in channels.get(category, {}):
+                    if key not in keys:
+                        keys.append(key)
+            if category == 'cpu':
+                keys.sort(key=int)
+            elif category == 'processes':
+                keys = HealthCheckModel.sort_process_keys(keys)
+        timestamps = []
+        values = [list() for key in keys]
+        minimums = [list() for key in keys]
+        maximums = [list() for key in keys]
+        for date, channels in rollups:
+            timestamps.append(date)
+            category_channels = channels.get(category, {})
+            for index, key in enumerate(keys):
+                minimum, mean, maximum = category_channels.get(key, (None, None, None))
+                values[index].append(mean)
+                minimums[index].append(minimum)
+                maximums[index].append(maximum)
+
+        if len(rollups) == 0:
+            labels = None
+        elif category == 'cpu':
+            labels = self.get_cpu_labels(len(keys))
+        elif category in self.ROLLUP_CHANNEL_KEYS:
+            labels = getattr(self, "get_%s_labels" % category)()
+        else:
+            labels = keys
+        return {
+            'timestamps': timestamps,
+            'labels': labels,
+            'values': values if len(rollups) > 0 else None,
+            'minimums': minimums if len(rollups) > 0 else None,
+            'maximums': maximums if len(rollups) > 0 else None,
+            'constants': getattr(self, "get_%s_constants" % category)(labels),
+        }
 
-    def get_memory_channels(self, health_check):
-        return 2
+    def _get_date(self, query_params, param_name):
+        """
+        Reads the time interval boundary from the query parameters
 
-    def get_disk_channels(self, health_check):
-        return len(health_check.hdd_free)
+        :param query_params: the query parameters
+        :param param_name: name of the query parameter
+        :return: the aware datetime or None if the query parameter is absent
+        """
+        if param_name not in query_params:
+            return None
+        try:
+            time = parse(query_params[param_name])
+            if is_naive(time):
+                time = make_aware(time)
+        except (ParserError, OverflowError):
+            raise ValidationError({param_name: "Bad date/time format."})
+        return time
+
+    def _get_point_number(self, query_params):
+        """
+        Reads the requested number of timestamps from the query parameters
 
-    def get_network_channels(self, health_check):
-        return 2
+        :param query_params: the query parameters
+        :return: the requested number of timestamps
+        """
+        try:
+            point_number = int(query_params.get('points', self.DEFAULT_POINT_NUMBER))
+        except ValueError:
+            raise ValidationError({'points': "must be an integer"})
+        if point_number <= 0 or point_number > self.MAX_POINT_NUMBER:
+            raise ValidationError({'points': "must be between 1 and %d" % self.MAX_POINT_NUMBER})
+        return point_number
+
+    def get_cpu_series(self, dates, cpu_loads):
+        """
+        Transforms the CPU load column to the CPU channels
 
-    def get_temperature_channels(self, health_check):
-        return len(self._temperature_labels)
+        :param dates: the health check dates
+        :param cpu_loads: the cpu_load column
+        :return: a tuple (labels, values) where values is a list of channels
+        """
+        cpu_number = len(cpu_loads[0])
+        try:
+            cpu_matrix = numpy.array(cpu_loads, dtype=float)
+        except ValueError:
+            # The CPU number has been changed
+            cpu_matrix = numpy.array([self._resize(cpu_load, cpu_number) for cpu_load in cpu_loads], dtype=float)
+        return self.get_cpu_labels(cpu_number), self._matrix_to_channels(cpu_matrix[:, :cpu_number])
+
+    def get_memory_series(self, dates, ram_free, swap_free):
+        """
+        Transforms the memory columns to the memory channels
 
-    def fill_cpu_values(self, values, health_check):
-        for cpu_index, load_value in enumerate(health_check.cpu_load):
-            values[cpu_index].append(load_value)
+        :param dates: the health check dates
+        :param ram_free: the ram_free column
+        :param swap_free: the swap_free column
+        :return: a tuple (labels, values) where values is a list of channels
+        """
+        values = [None, None]
+        values[self.VIRTUAL_MEMORY_INDEX] = list(ram_free)
+        values[self.SWAP_MEMORY_INDEX] = list(swap_free)
+        return self.get_memory_labels(), values
 
-    def fill_memory_values(self, values, health_check):
-        values[self.VIRTUAL_MEMORY_INDEX].append(health_check.ram_free)
-        values[self.SWAP_MEMORY_INDEX].append(health_check.swap_free)
+    def get_disk_series(self, dates, hdd_free):
+        """
+        Transforms the HDD usage column to the disk channels
 
-    def fill_disk_values(self, values, health_check):
-        labels = self.get_disk_labels(health_check)
-        for label, value in health_check.hdd_free.items():
-            channel_index = labels.index(label)
-            values[channel_index].append(health_check.hdd_free[label])
+        :param dates: the health check dates
+        :param hdd_free: the hdd_free column
+        :return: a tuple (labels, values) where values is a list of channels
+        """
+        # The hdd_free values are JSON dictionaries, so they can't be transformed to the numpy matrix without
+        # reading each row anyway
+        labels = list(hdd_free[0].keys())
+        return labels, [[disk_info.get(label) for disk_info in hdd_free] for label in labels]
 
-    def fill_network_values(self, values, health_check):
-        if self._previous_bytes_sent is None or self._previous_bytes_received is None or self._previous_date is None:
-            values[self.BYTES_SENT_INDEX].append(0)
-            values[self.BYTES_RECEIVED_INDEX].append(0)
-        else:
-            time_period = (health_check.date - self._previous_date).total_seconds()
-            values[self.BYTES_SENT_INDEX].append(
-                (health_check.bytes_sent - self._previous_bytes_sent) / time_period
-            )
-            values[self.BYTES_RECEIVED_INDEX].append(
-                (health_check.bytes_received - self._previous_bytes_received) / time_period
-            )
-
-        self._previous_bytes_sent = health_check.bytes_sent
-        self._previous_bytes_received = health_check.bytes_received
-        self._previous_date = health_check.date
-
-    def fill_temperature_values(self, values, health_check):
-        processed_indices = set()
-
-        def filling_function(key, value):
-            try:
-                index = self._temperature_labels.index(key)
-                if index not in processed_indices:
-                    values[index].append(value)
-                    processed_indices.add(index)
-            except ValueError:
-                pass
-
-        self._reduce_temperature_info(health_check.temperature, filling_function)
-        for unprocessed_index in set(range(self.get_temperature_channels(health_check))) - processed_indices:
-            values[unprocessed_index].append(None)
-
-    def get_cpu_labels(self, health_check):
-        return ["%s %d" % (_("CPU"), i+1) for i in range(len(health_check.cpu_load))]
-
-
-    def get_memory_labels(self, health_check):
+    def get_network_series(self, dates, bytes_sent, bytes_received):
+        """
+        Transforms the network counters to the network traffic channels
+
+        :param dates: the health check dates
+        :param bytes_sent: the bytes_sent column
+        :param bytes_received: the bytes_received column
+        :return: a tuple (labels, values) where values is a list of channels
+        """
+        time_periods = numpy.diff(numpy.fromiter((date.timestamp() for date in dates), dtype=float, count=len(dates)))
+        counters = numpy.empty((len(dates), 2), dtype=float)
+        counters[:, self.BYTES_SENT_INDEX] = bytes_sent
+        counters[:, self.BYTES_RECEIVED_INDEX] = bytes_received
+        traffic = numpy.zeros(counters.shape, dtype=float)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            traffic[1:] = numpy.diff(counters, axis=0) / time_periods[:, numpy.newaxis]
+        traffic[~numpy.isfinite(traffic)] = 0.0
+        return self.get_network_labels(), traffic.T.tolist()
+
+    def get_temperature_series(self, dates, temperatures):
+        """
+        Transforms the lm-sensors output to the temperature channels
+
+        :param dates: the health check dates
+        :param temperatures: the temperature column
+        :return: a tuple (labels, values) where values is a list of channels
+        """
+        # Each row is the nested lm-sensors output that shall be parsed separately, so this is not vectorized
+        temperature_values = [HealthCheckModel.parse_temperature(temperature) for temperature in temperatures]
+        labels = list(temperature_values[0].keys())
+        return labels, [[temperature.get(label) for temperature in temperature_values] for label in labels]
+
+    def get_processes_series(self, dates, processes):
+        """
+        Transforms the process resources to the process group channels
+
+        :param dates: the health check dates
+        :param processes: the processes column
+        :return: a tuple (labels, values) where values is a list of channels
+        """
+        process_values = []
+        previous_date = None
+        previous_processes = None
+        for date, current_processes in zip(dates, processes):
+            time_period = (date - previous_date).total_seconds() if previous_date is not None else None
+            process_values.append(
+                HealthCheckModel.get_process_values(current_processes, previous_processes, time_period))
+            previous_date = date
+            previous_processes = current_processes
+        labels = HealthCheckModel.sort_process_keys({key for values in process_values for key in values})
+        return labels, [[values.get(label) for values in process_values] for label in labels]
+
+    def get_cpu_labels(self, cpu_number):
+        return ["%s %d" % (_("CPU"), i+1) for i in range(cpu_number)]
+
+    def get_memory_labels(self):
         return [_("Free operating memory"), _("Free swap memory")]
 
-    def get_disk_labels(self, health_check):
-        return list(health_check.hdd_free.keys())
-    
-    def get_network_labels(self, health_check):
+    def get_network_labels(self):
         return [_("Network output traffic"), _("Network input traffic")]
 
-    def get_temperature_labels(self, health_check):
-        self._temperature_labels = self._reduce_temperature_info(health_check.temperature, lambda key, value: key)
-        return self._temperature_labels
-
     def get_cpu_constants(self, labels):
         return {}
 
@@ -221,33 +360,36 @@ class HealthCheck(APIView):
         }
 
     def get_disk_constants(self, labels):
-        return {label: psutil.disk_usage(label).total for label in labels}
+        return {label: psutil.disk_usage(label).total for label in labels or []}
 
     def get_network_constants(self, labels):
-        self._previous_bytes_sent = None
-        self._previous_bytes_received = None
-        self._previous_date = None
         return {}
 
     def get_temperature_constants(self, labels):
-        self._temperature_labels = None
         return {}
 
-    def _reduce_temperature_info(self, temperature, callback):
-        reduction = []
+    def get_processes_constants(self, labels):
+        return {}
 
-        if not isinstance(temperature, dict):
-            return reduction
+    @staticmethod
+    def _resize(values, size):
+        """
+        Truncates the list or pads it with NaN values
 
-        for parent_key, parent_value in temperature.items():
-            if not isinstance(parent_value, dict):
-                continue
-            for child_key, child_value in parent_value.items():
-                if self.TEMPERATURE_MATCHER.match(child_key):
-                    reduction.append(callback(parent_key, child_value))
+        :param values: the list to resize
+        :param size: the required list size
+        :return: the resized list
+        """
+        return values[:size] + [numpy.nan] * (size - len(values))
 
-        if len(reduction) == 0:
-            for key, value in temperature.items():
-                reduction = [*reduction, *self._reduce_temperature_info(value, callback)]
+    @staticmethod
+    def _matrix_to_channels(matrix):
+        """
+        Transforms the timestamp x channel matrix to the list of channels. NaN values are transformed to None
 
-        return reduction
+        :param matrix: the numpy matrix
+        :return: list of channels where each channel is a list of values
+        """
+        channels = matrix.T.astype(object)
+        channels[numpy.isnan(matrix.T)] = None
+        return channels.tolist()
@@ -1,6 +1,13 @@
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
 from ..generic_views import EntityReadOnlyViewSet
 from ..entity.log import LogSet
-from ..serializers import LogListSerializer, LogDetailSerializer
+from ..entity.readers.log_reader import LogReader
+from ..log_export import LogExporter, FORMATS as EXPORT_FORMATS
+from ..serializers import LogListSerializer, LogDetailSerializer, LogOperationSerializer
 from ..permissions import AdminOnlyPermission
 
 
@@ -14,6 +21,15 @@ class LogViewSet(EntityReadOnlyViewSet):
     detail_serializer_class = LogDetailSerializer
     permission_classes = [AdminOnlyPermission]
 
+    DEFAULT_OPERATION_NUMBER = 20
+    """ Number of operations returned by the slowest operations view when the 'limit' query parameter is absent """
+
+    MAX_OPERATION_NUMBER = 100
+    """ Maximum number of operations returned by the slowest operations view """
+
+    DEFAULT_EXPORT_FORMAT = "csv"
+    """ The log export format when the 'file_format' query parameter is absent """
+
     list_filters = {
         "request_date_from": EntityReadOnlyViewSet.date_filter_function("from"),
         "request_date_to": EntityReadOnlyViewSet.date_filter_function("to"),
@@ -21,5 +37,53 @@ class LogViewSet(EntityReadOnlyViewSet):
         "user": EntityReadOnlyViewSet.user_function("user"),
         "is_anonymous": EntityReadOnlyViewSet.boolean_filter_function("anonymous"),
         "is_success": EntityReadOnlyViewSet.boolean_filter_function("successes"),
-        "is_fail": EntityReadOnlyViewSet.boolean_filter_function("fails")
+        "is_fail": EntityReadOnlyViewSet.boolean_filter_function("fails"),
+        "response_time_from": EntityReadOnlyViewSet.number_filter_function("response_time_from", float),
+        "query_count_from": EntityReadOnlyViewSet.number_filter_function("query_count_from", int),
+        "query_time_from": EntityReadOnlyViewSet.number_filter_function("query_time_from", float),
+        "order_by": EntityReadOnlyViewSet.choice_filter_function(
+            "order_by",
+            [prefix + column for column in LogReader.ORDER_COLUMNS for prefix in ("", "-")]
+        ),
     }
+
+    @action(methods=["GET"], detail=False, url_path="slowest-operations", url_name="slowest-operations")
+    def slowest_operations(self, request, *args, **kwargs):
+        """
+        Viewing the slowest operations
+
+        :param request: the HTTP request received from the client
+        :param args: arguments revealed from parsing the request URL
+        :param kwargs: keyword arguments revealed from parsing the request URL
+        :return: the HTTP response that will be sent to the client
+        """
+        try:
+            limit = int(request.query_params.get("limit", self.DEFAULT_OPERATION_NUMBER))
+        except ValueError:
+            limit = -1
+        if limit <= 0 or limit > self.MAX_OPERATION_NUMBER:
+            raise ValidationError({"limit": "The value should be an integer from 1 to %d" % self.MAX_OPERATION_NUMBER})
+        log_set = self.filter_queryset(self.get_queryset())
+        serializer = LogOperationSerializer(log_set.slowest_operations(limit), many=True)
+        return Response(serializer.data)
+
+    @action(methods=["GET"], detail=False, url_path="export", url_name="export")
+    def export(self, request, *args, **kwargs):
+        """
+        Exporting logs
+
+        :param request: the HTTP request received from the client
+        :param args: arguments revealed from parsing the request URL
+        :param kwargs: keyword arguments revealed from parsing the request URL
+        :return: the HTTP response that will be sent to the client
+        """
+        file_format = request.query_params.get("file_format", self.DEFAULT_EXPORT_FORMAT)
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({"file_format": "The value should be one of: " + ", ".join(EXPORT_FORMATS)})
+        include_records = "records" in request.query_params
+        log_set = self.filter_queryset(self.get_queryset())
+        exporter = LogExporter.get_exporter_class(file_format)(include_records)
+        response = StreamingHttpResponse(exporter.export(log_set.export(include_records)),
+                                         content_type=exporter.content_type)
+        response["Content-Disposition"] = 'attachment; filename="logs.%s"' % exporter.file_extension
+        return response
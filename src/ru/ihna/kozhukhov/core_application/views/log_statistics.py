@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from dateutil.parser import parse, ParserError
+from django.db.models import Sum, Max, Q
+from django.utils.timezone import make_aware, is_naive
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import LogStatistics
+from ..permissions import AdminOnlyPermission
+
+
+class LogStatisticsView(APIView):
+    """
+    Shows the request volume, error rates and the most requested endpoints over time.
+
+    The view reads the hourly request statistics only and never touches the raw request logs.
+    """
+
+    permission_classes = [AdminOnlyPermission]
+
+    DEFAULT_INTERVAL = timedelta(days=7)
+    """ The statistics is given for this interval when the 'from' query parameter is absent """
+
+    DEFAULT_ENDPOINT_NUMBER = 20
+    """ Number of endpoints returned when the 'limit' query parameter is absent """
+
+    MAX_ENDPOINT_NUMBER = 100
+    """ Maximum number of endpoints that can be returned """
+
+    MIN_ERROR_STATUS_CLASS = 4
+    """ Requests with 4xx and 5xx response statuses are considered to be failed """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Viewing the request statistics
+
+        :param request: the request received from the client application
+        :param args: arguments revealed from the path
+        :param kwargs: keyword arguments revealed from the path
+        :return: the response to be sent to the client application
+        """
+        date_to = self._get_date(request, 'to', make_aware(datetime.now()))
+        date_from = self._get_date(request, 'from', date_to - self.DEFAULT_INTERVAL)
+        try:
+            limit = int(request.query_params.get('limit', self.DEFAULT_ENDPOINT_NUMBER))
+        except ValueError:
+            limit = -1
+        if limit <= 0 or limit > self.MAX_ENDPOINT_NUMBER:
+            raise ValidationError({'limit': "The value should be an integer from 1 to %d" % self.MAX_ENDPOINT_NUMBER})
+
+        statistics = LogStatistics.objects\
+            .filter(hour__gte=LogStatistics.get_hour(date_from), hour__lte=date_to)\
+            .order_by()
+        error_count = Sum('request_count', filter=Q(status_class__gte=self.MIN_ERROR_STATUS_CLASS))
+
+        timeline = statistics\
+            .values('hour')\
+            .annotate(total_count=Sum('request_count'), error_count=error_count)\
+            .order_by('hour')
+        status_classes = statistics\
+            .values('status_class')\
+            .annotate(total_count=Sum('request_count'))\
+            .order_by('status_class')
+        endpoints = statistics\
+            .values('path_template', 'request_method')\
+            .annotate(total_count=Sum('request_count'), error_count=error_count,
+                      timed_count=Sum('timed_request_count'), total_time=Sum('total_response_time'),
+                      max_response_time=Max('max_response_time'))\
+            .order_by('-total_count', 'path_template', 'request_method')[:limit]
+
+        return Response({
+            'date_from': date_from.isoformat(timespec='minutes'),
+            'date_to': date_to.isoformat(timespec='minutes'),
+            'timeline': [{
+                'hour': item['hour'],
+                'request_count': round(item['total_count']),
+                'error_count': round(item['error_count'] or 0.0),
+            } for item in timeline],
+            'status_classes': {
+                '%dxx' % item['status_class'] if item['status_class'] != LogStatistics.UNKNOWN_STATUS_CLASS
+                else 'unknown': round(item['total_count'])
+                for item in status_classes
+            },
+            'endpoints': [{
+                'path_template': item['path_template'],
+                'request_method': item['request_method'],
+                'request_count': round(item['total_count']),
+                'error_count': round(item['error_count'] or 0.0),
+                'mean_response_time': item['total_time'] / item['timed_count'] if item['timed_count'] else None,
+                'max_response_time': item['max_response_time'],
+            } for item in endpoints],
+        })
+
+    def _get_date(self, request, param_name, default_value):
+        """
+        Reads the date from the query parameter
+
+        :param request: the request received from the client application
+        :param param_name: name of the query parameter
+        :param default_value: the value to return when the query parameter is absent
+        :return: the timezone-aware datetime object
+        """
+        if param_name not in request.query_params:
+            return default_value
+        try:
+            date = parse(request.query_params[param_name])
+        except ParserError:
+            raise ValidationError({param_name: "Bad date/time format."})
+        if is_naive(date):
+            date = make_aware(date)
+        return date
@@ -1,5 +1,6 @@
 import os
 import re
+from itertools import islice
 
 from dateutil import parser
 from django.utils.timezone import is_aware, make_naive
@@ -10,6 +11,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ru.ihna.kozhukhov.core_application.exceptions.os_logs import NoLogDirectoryException
+from ru.ihna.kozhukhov.core_application.os_logs import LogSeriesReader, TimestampParser, merge_logs
 
 
 class OperatingSystemLogs(APIView):
@@ -26,6 +28,8 @@ class OperatingSystemLogs(APIView):
     __log_files = None
     __log_data = None
     __host_list = None
+    __start = None
+    __end = None
 
     def get(self, request, *args, **kwargs):
         """
@@ -45,6 +49,8 @@ class OperatingSystemLogs(APIView):
         if ordering not in ('asc', 'desc'):
             raise ValidationError({'ordering': "Only 'asc' or 'desc' values are allowed"})
         reverse = ordering == 'desc'
+        self.__start = self.__get_time(request.query_params, 'start')
+        self.__end = self.__get_time(request.query_params, 'end')
 
         if 'files' in request.query_params:
             log_files = request.query_params['files'].split(',')
@@ -52,11 +58,18 @@ class OperatingSystemLogs(APIView):
         else:
             log_files = self.DEFAULT_LOG_FILES
 
+        page_start, page_end = self.__get_page(request.query_params)
+        timestamp_parser = TimestampParser()
+        readers = []
         for log_file in log_files:
-            self.__read_log(log_file)
+            reader = self.__read_log(log_file, reverse, timestamp_parser)
+            if reader is not None:
+                readers.append(reader)
+        self.__log_data = merge_logs(readers, reverse)
         self.__filter_log(request.query_params)
-        self.__sort_log(reverse)
-        self.__limit_log(request.query_params)
+        self.__limit_log(page_start, page_end)
+        for reader in readers:
+            self.__host_list.update(reader.hosts)
 
         response = Response({
             'log_files': self.DEFAULT_LOG_FILES,
@@ -67,102 +80,71 @@ class OperatingSystemLogs(APIView):
         self.__log_files = None
         self.__host_list = None
         self.__log_data = None
+        self.__start = None
+        self.__end = None
 
         return response
 
-    def __read_log(self, log_file):
+    def __get_time(self, query_params, param_name):
         """
-        Reads the data from the log file
+        Reads the time range boundary from the query parameters
+
+        :param query_params: the query parameters
+        :param param_name: name of the query parameter
+        :return: naive datetime or None if the query parameter is absent
+        """
+        if param_name not in query_params:
+            return None
+        try:
+            time = parser.parse(query_params[param_name])
+            if is_aware(time):
+                time = make_naive(time)
+        except (parser.ParserError, OverflowError):
+            raise ValidationError({param_name: "Invalid date"})
+        return time
+
+    def __read_log(self, log_file, reverse, timestamp_parser):
+        """
+        Prepares the log file together with all its rotated copies for reading. The log files are read lazily,
+        during the merge
 
         :param log_file: the log file to process. You must point the relative path to the /var/log/corefacility folder
+        :param reverse: True to read the log file backwards, False otherwise
+        :param timestamp_parser: the timestamp parser shared among all log files
+        :return: the LogSeriesReader instance or None if neither the log file nor its rotated copies exist
         """
         log_path = os.path.join(self.LOG_FOLDER, log_file)
-        if not os.path.isfile(log_path):
-            return
+        reader = LogSeriesReader(log_path, self.__start, self.__end, reverse, timestamp_parser)
+        if len(reader.readers) == 0:
+            return None
         self.__log_files.append(log_file)
-
-        with open(log_path, 'r') as log_file:
-            for log_info in log_file:
-                log_info = log_info.strip().split()
-                if len(log_info) == 0:
-                    continue
-                if log_info[0].find('<') != -1 and log_info[0].find('>') != -1:
-                    log_info = log_info[1:]
-                hostname_index = 1
-                while hostname_index < len(log_info):
-                    timestamp = ' '.join(log_info[:hostname_index])
-                    try:
-                        time = parser.parse(timestamp)
-                    except parser.ParserError:
-                        hostname_index -= 1
-                        break
-                    hostname_index += 1
-                if hostname_index > len(log_info) - 1:
-                    continue
-                self.__log_data.append({
-                    'time': time,
-                    'hostname': log_info[hostname_index],
-                    'message': ' '.join(log_info[hostname_index+1:])
-                })
-                self.__host_list.add(log_info[hostname_index])
+        return reader
 
     def __filter_log(self, filter_criteria):
         """
-        Filters logs according to different criteria
+        Filters logs according to different criteria. The filters are applied lazily, during the merge.
+        The time range is applied by the log readers themselves.
 
         :param filter_criteria: a QueryDict object that represents different filtration criteria
         """
-        if 'start' in filter_criteria:
-            try:
-                start = parser.parse(filter_criteria['start'])
-                if is_aware(start):
-                    start = make_naive(start)
-            except parser.ParserError:
-                raise ValidationError({'start': "Invalid date"})
-            self.__log_data = filter(lambda log: log['time'] >= start, self.__log_data)
-
-        if 'end' in filter_criteria:
-            try:
-                finish = parser.parse(filter_criteria['end'])
-                if is_aware(finish):
-                    finish = make_naive(finish)
-            except parser.ParserError:
-                raise ValidationError({'end': "Invalid date"})
-            try:
-                self.__log_data = filter(lambda log: log['time'] <= finish, self.__log_data)
-            except TypeError:
-                raise ValidationError({'end': "Invalid date"})
-
         if 'hostname' in filter_criteria:
-            self.__log_data = filter(lambda log: log['hostname'] == filter_criteria['hostname'], self.__log_data)
+            self.__log_data = filter(lambda log: log[1] == filter_criteria['hostname'], self.__log_data)
 
         if 'q' in filter_criteria:
-            template = re.compile(filter_criteria['q'])
-            self.__log_data = filter(lambda log: template.search(log['message']) is not None, self.__log_data)
-
-        try:
-            self.__log_data = list(self.__log_data)
-        except TypeError as error:
-            raise ValidationError({
-                "code": "bad_query_parameters",
-                "detail": str(error),
-            })
-
-    def __sort_log(self, reverse):
-        """
-        Sorts logs in ascending or descending mode
-
-        :param reverse: True to sort in descending mode, False otherwise
-        """
-        self.__log_data.sort(reverse=reverse, key=lambda log: log['time'])
+            try:
+                template = re.compile(filter_criteria['q'])
+            except re.error as error:
+                raise ValidationError({'q': str(error)})
+            self.__log_data = filter(lambda log: template.search(log[2]) is not None, self.__log_data)
 
-    def __limit_log(self, limit_options):
+    def __get_page(self, limit_options):
         """
-        Leaves only certain amount of logs
+        Reveals which logs shall be shown
 
         :params limit_options: a QueryDict with the following keys:
             limit_start - from which element to start the output (default is 0)
             limit how many logs to output (default is all logs satisfying the filtration criteria)
+        :return: a tuple (page_start, page_end) where page_end is None if all logs after page_start shall be shown
         """
         try:
             start = int(limit_options.get('limit_start', 0))
@@ -178,6 +160,28 @@ class OperatingSystemLogs(APIView):
                 raise ValidationError({'limit': 'must be an integer'})
             if limit <= 0:
                 raise ValidationError({'limit': 'must be positive'})
-            self.__log_data = self.__log_data[start:(start + limit)]
+            return start, start + limit
         else:
-            self.__log_data = self.__log_data[start:]
+            return start, None
+
+    def __limit_log(self, page_start, page_end):
+        """
+        Leaves only certain amount of logs. The log files are read until the requested page is filled
+
+        :param page_start: index of the first log to show
+        :param page_end: index of the log after the last log to show or None to show all logs after page_start
+        """
+        try:
+            self.__log_data = [
+                {
+                    'time': time,
+                    'hostname': hostname,
+                    'message': message,
+                }
+                for time, hostname, message in islice(self.__log_data, page_start, page_end)
+            ]
+        except TypeError as error:
+            raise ValidationError({
+                "code": "bad_query_parameters",
+                "detail": str(error),
+            })
@@ -0,0 +1,138 @@
+import base64
+import binascii
+import json
+import os
+import re
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ru.ihna.kozhukhov.core_application.exceptions.os_logs import NoLogDirectoryException
+from ru.ihna.kozhukhov.core_application.os_logs import LogFollower, TimestampParser
+
+from .os_logs import OperatingSystemLogs
+
+
+class OperatingSystemLogsFollow(APIView):
+    """
+    Shows the user log lines that have been written to the rsyslog files since the previous request.
+
+    The response contains the 'cursor' field. The client application shall send its value back in the 'cursor'
+    query parameter of the next request. When the 'cursor' query parameter is absent, the log files are followed from
+    their current ends. When the 'wait' query parameter is given, the request is not finished until new log lines
+    appear or the given number of seconds (at most MAX_WAIT) expires.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_LOG_FILES = OperatingSystemLogs.DEFAULT_LOG_FILES
+    VALID_FILENAME = OperatingSystemLogs.VALID_FILENAME
+
+    MAX_WAIT = 10
+    """
+    Maximum number of seconds the request may wait for new log lines.
+
+    The waiting request occupies the whole synchronous gunicorn worker. Hence, the limit shall be kept well below
+    the worker timeout (30 seconds by default) while the client application shall repeat the request rather than
+    wait longer. Only a few workers are run, so longer waits would also stall all other requests.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Shows the user log lines written since the previous request
+
+        :param request: the request received from the client application
+        :param args: arguments revealed from the path
+        :param kwargs: keyword arguments revealed from the path
+        :return: the response to be sent to the client application
+        """
+        log_folder = OperatingSystemLogs.LOG_FOLDER
+        if not os.path.isdir(log_folder):
+            raise NoLogDirectoryException()
+        if 'files' in request.query_params:
+            log_files = request.query_params['files'].split(',')
+            log_files = [filename for filename in log_files if self.VALID_FILENAME.match(filename) is not None]
+        else:
+            log_files = self.DEFAULT_LOG_FILES
+        log_paths = {os.path.join(log_folder, log_file): log_file for log_file in log_files}
+        positions = self.__decode_cursor(request.query_params.get('cursor'), log_paths)
+        wait = self.__get_wait(request.query_params)
+
+        follower = LogFollower(list(log_paths), positions)
+        timestamp_parser = TimestampParser()
+        log_data = follower.read(timestamp_parser)
+        if len(log_data) == 0 and wait > 0 and follower.wait(wait):
+            log_data = follower.read(timestamp_parser)
+
+        if 'hostname' in request.query_params:
+            log_data = [log for log in log_data if log[1] == request.query_params['hostname']]
+        if 'q' in request.query_params:
+            try:
+                template = re.compile(request.query_params['q'])
+            except re.error as error:
+                raise ValidationError({'q': str(error)})
+            log_data = [log for log in log_data if template.search(log[2]) is not None]
+
+        return Response({
+            'cursor': self.__encode_cursor(follower.positions, log_paths),
+            'log_data': [
+                {
+                    'time': time,
+                    'hostname': hostname,
+                    'message': message,
+                }
+                for time, hostname, message in log_data
+            ],
+        })
+
+    def __get_wait(self, query_params):
+        """
+        Reveals how long the request shall wait for new log lines
+
+        :param query_params: the query parameters
+        :return: number of seconds to wait
+        """
+        try:
+            wait = float(query_params.get('wait', 0))
+        except ValueError:
+            raise ValidationError({'wait': 'must be a number'})
+        if wait < 0 or wait > self.MAX_WAIT:
+            raise ValidationError({'wait': 'must be between 0 and %d' % self.MAX_WAIT})
+        return wait
+
+    def __decode_cursor(self, cursor, log_paths):
+        """
+        Reveals positions of the log files from the cursor
+
+        :param cursor: the cursor sent by the client application or None if the client application sent no cursor
+        :param log_paths: dictionary where keys are full paths to the log files and values are their short names
+        :return: the positions that shall be passed to the LogFollower
+        """
+        if cursor is None:
+            return None
+        try:
+            cursor_data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            positions = {
+                log_path: (device, inode, int(offset))
+                for log_path, log_file in log_paths.items()
+                if log_file in cursor_data
+                for device, inode, offset in [cursor_data[log_file]]
+            }
+        except (ValueError, TypeError, binascii.Error):
+            raise ValidationError({'cursor': 'Invalid cursor'})
+        if any(offset < 0 for _, _, offset in positions.values()):
+            raise ValidationError({'cursor': 'Invalid cursor'})
+        return positions
+
+    def __encode_cursor(self, positions, log_paths):
+        """
+        Transforms the log file positions to the cursor
+
+        :param positions: the positions returned by the LogFollower
+        :param log_paths: dictionary where keys are full paths to the log files and values are their short names
+        :return: the cursor to be sent to the client application
+        """
+        cursor_data = {log_paths[log_path]: list(position) for log_path, position in positions.items()}
+        return base64.urlsafe_b64encode(json.dumps(cursor_data).encode('utf-8')).decode('ascii')
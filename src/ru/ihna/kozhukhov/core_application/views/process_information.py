@@ -1,33 +1,42 @@
-import subprocess
-
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from ru.ihna.kozhukhov.core_application.sensors import ProcessSnapshot
+
+
+class ProcessPagination(PageNumberPagination):
+    """
+    Splits the process list into pages. The pagination is applied only when the client asks for it
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
 
 class ProcessInformation(APIView):
     """
     Retrieval information about processes.
 
-    The information will be presented in an unordered way.
+    The processes are given in the same format as the 'ps aux' command gives them. The client may sort the processes
+    using the 'ordering' query parameter ('-' before the field name means descending order), filter them by
+    the user name ('user' query parameter) and a part of the command line ('command' query parameter, case
+    insensitive). The process list is split into pages when the 'page' or 'page_size' query parameter is present.
     """
 
-    COMMAND = "ps aux"
-    PROCESS_INFO_DESCRIPTION_ROW = 0
-    INT_FIELDS = ['PID', 'VSZ', 'RSS']
-    FIELD_TYPES = {
-        'USER': str,
-        'PID': int,
-        '%CPU': float,
-        '%MEM': float,
-        'USZ': int,
-        'RSS': int,
-        'TTY': str,
-        'STAT': str,
-        'START': str,
-        'TIME': str,
-        'COMMAND': str,
+    ORDERING_FIELDS = {
+        'user': 'USER',
+        'pid': 'PID',
+        'cpu': '%CPU',
+        'mem': '%MEM',
+        'vsz': 'VSZ',
+        'rss': 'RSS',
+        'command': 'COMMAND',
     }
+    """ Values of the 'ordering' query parameter => process fields """
 
     permission_classes = [IsAuthenticated]
 
@@ -40,29 +49,34 @@ class ProcessInformation(APIView):
         :param kwargs: keyword arguments revealed from parsing the request path
         :return: the response to be sent to the client
         """
-        process_table = subprocess.run(
-            self.COMMAND.split(),
-            stderr=subprocess.STDOUT,
-            stdout=subprocess.PIPE,
-            check=True
-        )   \
-            .stdout \
-            .decode('utf-8')
-        process_info_list = process_table.split('\n')
-        field_list = process_info_list[self.PROCESS_INFO_DESCRIPTION_ROW].split()
-        process_list = list()
-        for process_info_string in process_info_list[self.PROCESS_INFO_DESCRIPTION_ROW+1:]:
-            process_info = process_info_string.split()
-            process = dict()
-            for field_index, field_value in enumerate(process_info):
-                try:
-                    field_name = field_list[field_index]
-                    if field_name in self.FIELD_TYPES:
-                        process[field_name] = self.FIELD_TYPES[field_name](field_value)
-                    else:
-                        process[field_name] = field_value
-                except IndexError:
-                    process['COMMAND'] = "%s %s" % (process['COMMAND'], field_value)
-            if 'PID' in process and process['COMMAND'] != self.COMMAND:
-                process_list.append(process)
+        ordering_field, reverse = self._get_ordering(request.query_params)
+        process_list = ProcessSnapshot.get_processes()
+        if 'user' in request.query_params:
+            user = request.query_params['user']
+            process_list = [process for process in process_list if process['USER'] == user]
+        if 'command' in request.query_params:
+            command = request.query_params['command'].lower()
+            process_list = [process for process in process_list if command in process['COMMAND'].lower()]
+        if ordering_field is not None:
+            process_list = sorted(process_list, key=lambda process: process[ordering_field], reverse=reverse)
+        if 'page' in request.query_params or 'page_size' in request.query_params:
+            paginator = ProcessPagination()
+            page = paginator.paginate_queryset(process_list, request, view=self)
+            return paginator.get_paginated_response(page)
         return Response(process_list)
+
+    def _get_ordering(self, query_params):
+        """
+        Reveals how the processes shall be sorted
+
+        :param query_params: the query parameters
+        :return: a tuple (field, reverse) where field is None when the processes shall not be sorted
+        """
+        if 'ordering' not in query_params:
+            return None, False
+        ordering = query_params['ordering']
+        reverse = ordering.startswith("-")
+        ordering = ordering.lstrip("-")
+        if ordering not in self.ORDERING_FIELDS:
+            raise ValidationError({'ordering': "must be one of: %s" % ", ".join(self.ORDERING_FIELDS)})
+        return self.ORDERING_FIELDS[ordering], reverse
@@ -1,6 +1,9 @@
-import re
-import subprocess
+import os
+import socket
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
+from time import monotonic
 
 import psutil
 from django.conf import settings
@@ -15,6 +18,16 @@ from ..management.commands.health_check import Command as HealthChecker
 class SystemInformationView(APIView):
     """
     Provides general information about the system.
+
+    The information is split into three parts. Static facts (CPU model, operating system, host name) are revealed
+    once per process. Dynamic metrics (memory, disk and network usage) are cached for a short time given by the
+    CORE_SYSTEM_INFORMATION_TTL setting and shared among all requests. The current date and the uptime are calculated
+    for each request.
+
+    The disk usage is revealed in separate threads, so a hung mount point (e.g., an NFS export which server is
+    unavailable) doesn't stall the whole request. Such mount points are listed in the 'unavailable_mount_points' field.
+    Each mount point is queried by its own thread, so hung mount points can't prevent other mount points from being
+    queried. The hung mount point is not queried again until its previous query finishes.
     """
 
     CPU_INFORMATION_FILE = "/proc/cpuinfo"
@@ -30,8 +43,21 @@ class SystemInformationView(APIView):
         "AIX": psutil.AIX,
     }
 
+    DYNAMIC_INFORMATION_TTL = 5.0
+    """ Used when the CORE_SYSTEM_INFORMATION_TTL setting is absent """
+
+    MOUNT_POINT_TIMEOUT = 1.0
+    """ Used when the CORE_SYSTEM_INFORMATION_MOUNT_TIMEOUT setting is absent """
+
     permission_classes = [IsAuthenticated]
 
+    _lock = threading.Lock()
+    _static_information = None
+    _dynamic_information = None
+    _dynamic_information_time = None
+    _boot_time = None
+    _disk_usage_futures = dict()
+
     def get(self, request, *args, **kwargs):
         """
         Provides general information about the system.
@@ -40,34 +66,96 @@ class SystemInformationView(APIView):
         :param args: arguments revealed from parsing the request URI
         :param kwargs: keyword arguments revealed from parsing the request URI
         """
+        static_information, dynamic_information = self.get_cached_information()
         system_information = dict()
         self._fill_uptime(system_information)
-        self._fill_cpu_usage(system_information)
-        self._fill_memory_usage(system_information)
-        self._fill_disk_usage(system_information)
-        self._fill_network_usage(system_information)
-        self._fill_software_settings(system_information)
+        for part in (static_information, dynamic_information):
+            for key, value in part.items():
+                if isinstance(value, dict):
+                    system_information.setdefault(key, dict()).update(value)
+                else:
+                    system_information[key] = value
+        return Response(system_information)
+
+    @classmethod
+    def get_cached_information(cls):
+        """
+        Reveals both static and dynamic information using the cache
+
+        :return: a tuple (static_information, dynamic_information). The dictionaries are shared among all requests
+            and shall not be modified
+        """
+        ttl = getattr(settings, "CORE_SYSTEM_INFORMATION_TTL", cls.DYNAMIC_INFORMATION_TTL)
+        with cls._lock:
+            if cls._static_information is None:
+                cls._static_information = cls.get_static_information()
+            if cls._dynamic_information is None or monotonic() - cls._dynamic_information_time >= ttl:
+                cls._dynamic_information = cls.get_dynamic_information()
+                cls._dynamic_information_time = monotonic()
+            return cls._static_information, cls._dynamic_information
 
+    @classmethod
+    def clear_cache(cls):
+        """
+        Removes both static and dynamic information from the cache
+        """
+        with cls._lock:
+            cls._static_information = None
+            cls._dynamic_information = None
+            cls._dynamic_information_time = None
+            cls._boot_time = None
+
+    @classmethod
+    def get_static_information(cls):
+        """
+        Reveals the information that doesn't change while the process is running
+
+        :return: the system information dictionary
+        """
+        system_information = dict()
+        system_information['cpu_info'] = {
+            'cores': psutil.cpu_count(logical=True),
+        }
+        system_information['network_info'] = {
+            'hostname': socket.gethostname(),
+        }
+        cls._fill_software_settings(system_information)
         if settings.CORE_IS_POSIX:
-            self._fill_cpu_info(system_information)
+            cls._fill_cpu_info(system_information)
+        return system_information
 
-        return Response(system_information)
+    @classmethod
+    def get_dynamic_information(cls):
+        """
+        Reveals the information that changes slowly
 
-    def _fill_uptime(self, system_information):
+        :return: the system information dictionary
+        """
+        system_information = dict()
+        cls._fill_cpu_usage(system_information)
+        cls._fill_memory_usage(system_information)
+        cls._fill_disk_usage(system_information)
+        cls._fill_network_usage(system_information)
+        return system_information
+
+    @classmethod
+    def _fill_uptime(cls, system_information):
         """
         Fills the system information by the uptime data
 
         :param system_information: a dictionary that will be filled by the uptime data.
         """
+        if cls._boot_time is None:
+            cls._boot_time = datetime.fromtimestamp(psutil.boot_time())
         current_time = datetime.now()
-        boot_time = datetime.fromtimestamp(psutil.boot_time())
-        uptime = (current_time - boot_time).total_seconds()
+        uptime = (current_time - cls._boot_time).total_seconds()
         system_information.update({
             'datetime': current_time,
             'uptime': uptime,
         })
 
-    def _fill_cpu_usage(self, system_information):
+    @classmethod
+    def _fill_cpu_usage(cls, system_information):
         """
         Fills the system information by the CPU usage
 
@@ -75,10 +163,10 @@ class SystemInformationView(APIView):
         """
         system_information['cpu_info'] = {
             'load_average': psutil.getloadavg(),
-            'cores': psutil.cpu_count(logical=True),
         }
 
-    def _fill_cpu_info(self, system_information):
+    @classmethod
+    def _fill_cpu_info(cls, system_information):
         """
         Fills the system information by the CPU info.
         This is assumed that the system information has been filled by the CPU usage and the operating system is POSIX
@@ -86,24 +174,22 @@ class SystemInformationView(APIView):
 
         :param system_information: the system information dictionary to be filled
         """
-        cpu_information = list()
-        with open(self.CPU_INFORMATION_FILE, 'r') as cpu_information_file:
-            core_information = dict()
-            for cpu_information_string in cpu_information_file:
-                try:
-                    key, value = cpu_information_string.split(':', 1)
-                except ValueError:
-                    cpu_information.append(core_information)
-                    core_information = dict()
-                key, value = key.strip(), value.strip()
-                core_information[key] = value
-            if len(core_information) > 0:
-                cpu_information.append(core_information)
-
-        if len(cpu_information) > 0:
-            system_information['cpu_info']['name'] = cpu_information[0]['model name']
-
-    def _fill_memory_usage(self, system_information):
+        try:
+            with open(cls.CPU_INFORMATION_FILE, 'r') as cpu_information_file:
+                for cpu_information_string in cpu_information_file:
+                    try:
+                        key, value = cpu_information_string.split(':', 1)
+                    except ValueError:
+                        continue
+                    # All cores have the same model name, so the first one is enough
+                    if key.strip() == 'model name':
+                        system_information['cpu_info']['name'] = value.strip()
+                        break
+        except OSError:
+            pass
+
+    @classmethod
+    def _fill_memory_usage(cls, system_information):
         """
         Fills the system information dictionary by the memory usage information
 
@@ -120,7 +206,8 @@ class SystemInformationView(APIView):
             'total': swap_usage.total,
         }
 
-    def _fill_disk_usage(self, system_information):
+    @classmethod
+    def _fill_disk_usage(cls, system_information):
         """
         Fills the system information by the disk usage information
 
@@ -129,17 +216,55 @@ class SystemInformationView(APIView):
         if not settings.CORE_IS_POSIX:
             return
 
-        mount_points = dict()
+        timeout = getattr(settings, "CORE_SYSTEM_INFORMATION_MOUNT_TIMEOUT", cls.MOUNT_POINT_TIMEOUT)
+        futures = dict()
         for mount_point in HealthChecker.read_mount_points():
-            disk_usage = psutil.disk_usage(mount_point)
+            future = cls._disk_usage_futures.get(mount_point)
+            # The mount point that is still hung since the previous request is not queried again
+            if future is None or future.done():
+                future = cls._start_disk_usage_query(mount_point)
+                cls._disk_usage_futures[mount_point] = future
+            futures[mount_point] = future
+
+        mount_points = dict()
+        unavailable_mount_points = list()
+        deadline = monotonic() + timeout
+        for mount_point, future in futures.items():
+            try:
+                disk_usage = future.result(timeout=max(deadline - monotonic(), 0.0))
+            except (FutureTimeoutError, OSError):
+                unavailable_mount_points.append(mount_point)
+                continue
             mount_points[mount_point] = {
                 'available': disk_usage.free,
                 'total': disk_usage.total,
             }
 
         system_information['disk_info'] = mount_points
+        system_information['unavailable_mount_points'] = unavailable_mount_points
+
+    @staticmethod
+    def _start_disk_usage_query(mount_point):
+        """
+        Starts the disk usage query in a separate daemon thread. The thread may never finish when the mount point
+        is hung, so it doesn't prevent the process from being stopped
+
+        :param mount_point: the mount point to query
+        :return: the Future that will contain the psutil.disk_usage result
+        """
+        future = Future()
+
+        def query_disk_usage():
+            try:
+                future.set_result(psutil.disk_usage(mount_point))
+            except Exception as error:
+                future.set_exception(error)
+
+        threading.Thread(target=query_disk_usage, name="disk_usage", daemon=True).start()
+        return future
 
-    def _fill_network_usage(self, system_information):
+    @classmethod
+    def _fill_network_usage(cls, system_information):
         """
         Fills the system information by the network usage
 
@@ -147,7 +272,6 @@ class SystemInformationView(APIView):
         """
         network_usage = psutil.net_io_counters(pernic=False, nowrap=True)
         system_information['network_info'] = {
-            'hostname': subprocess.run(('hostname',), stdout=subprocess.PIPE).stdout.strip(),
             'bytes_sent': network_usage.bytes_sent,
             'bytes_received': network_usage.bytes_recv,
             'packets_sent': network_usage.packets_sent,
@@ -158,14 +282,15 @@ class SystemInformationView(APIView):
             'drops_output': network_usage.dropout,
         }
 
-    def _fill_software_settings(self, system_information):
+    @classmethod
+    def _fill_software_settings(cls, system_information):
         """
         Fills the information about the operating system
 
         :param system_information: the system information to be filled
         """
         platform = None
-        for platform_name, is_supported in self.SUPPORTED_PLATFORMS.items():
+        for platform_name, is_supported in cls.SUPPORTED_PLATFORMS.items():
             if is_supported:
                 platform = platform_name
         if platform is None:
@@ -174,8 +299,9 @@ class SystemInformationView(APIView):
 
         system_information['os_info']['posix'] = psutil.POSIX
         if psutil.POSIX:
+            uname = os.uname()
             system_information['os_info'].update({
-                'kernel_version': subprocess.run(('uname', '-r'), stdout=subprocess.PIPE).stdout.strip(),
-                'architecture': subprocess.run(('uname', '-p'), stdout=subprocess.PIPE).stdout.strip(),
-                'os_version': subprocess.run(('uname', '-v'), stdout=subprocess.PIPE).stdout.strip(),
+                'kernel_version': uname.release,
+                'architecture': uname.machine,
+                'os_version': uname.version,
             })
@@ -35,6 +35,8 @@ class CorefacilityDaemon:
 
 	MAX_SIZE = 300 * 1024 * 1024  # Maximum size for the child processes (both children shall not exceed this size)
 
+	PID_FILE = "/run/corefacility.pid"  # Allows the health check to find the daemon and all its children
+
 	is_interrupted = False
 	child_pids = None
 
@@ -92,6 +94,8 @@ class CorefacilityDaemon:
 			signal.signal(signal_number, self.terminate)
 		signal.signal(signal.SIGHUP, self.reload_configuration)
 
+		self.write_pid_file()
+
 		for child_name, child_command in self.CHILD_COMMANDS.items():
 			self.start_child(child_name, child_command)
 
@@ -124,8 +128,28 @@ class CorefacilityDaemon:
 			except ChildProcessError:  # will be thrown by the os.waitpid if no child processes were serviced
 				break
 
+		self.remove_pid_file()
 		print("The daemon has finished the job.")
 
+	def write_pid_file(self):
+		"""
+		Writes PID of the daemon process to the PID file
+		"""
+		try:
+			with open(self.PID_FILE, "w") as pid_file:
+				pid_file.write("%d\n" % os.getpid())
+		except OSError as error:
+			print("Unable to write the PID file: %s" % error, file=sys.stderr)
+
+	def remove_pid_file(self):
+		"""
+		Removes the PID file when the daemon finishes
+		"""
+		try:
+			os.remove(self.PID_FILE)
+		except OSError:
+			pass
+
 
 def main():
 	"""
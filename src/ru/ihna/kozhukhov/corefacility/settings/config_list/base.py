@@ -290,6 +290,62 @@ class CorefacilityConfiguration(Configuration):
     # URL of the application main page
     URL_BASE = values.Value("http://localhost:8000")
 
+    # Log all safe requests (GET, HEAD, OPTIONS etc.) even when the debug mode is off. State-changing requests
+    # and requests that failed are always logged
+    CORE_LOG_SAFE_REQUESTS = values.BooleanValue(False)
+
+    # Fractions of the safe requests that shall be logged when the debug mode is on or CORE_LOG_SAFE_REQUESTS is True.
+    # The keys are either request methods ('GET') or request methods followed by the request path prefix
+    # ('GET /api/v1/health-check/'). The longest matching key is used. Requests that match no key are always logged.
+    # Each rate shall be a number between 0 and 1.
+    CORE_LOG_SAMPLING_RATES = values.DictValue({})
+
+    # Directory where time indices of the operating system logs are stored. The directory shall be owned by the user
+    # running the application and have 700 mode. The ~/.cache/corefacility/os_log_index directory is used when the
+    # value is empty
+    CORE_OS_LOG_INDEX_DIR = values.Value("")
+
+    # Number of seconds between two consecutive health check timestamps
+    CORE_HEALTH_CHECK_INTERVAL = values.PositiveIntegerValue(60)
+
+    # Number of health check timestamps accumulated in memory before they are saved to the database at once
+    CORE_HEALTH_CHECK_BATCH_SIZE = values.PositiveIntegerValue(1)
+
+    # Maximum number of dead health check timestamps removed by a single DELETE query
+    CORE_HEALTH_CHECK_RECYCLE_CHUNK = values.PositiveIntegerValue(1000)
+
+    # Maximum number of seconds spent for a single recycling of dead health check timestamps. The remaining
+    # timestamps will be removed during the next recycling
+    CORE_HEALTH_CHECK_RECYCLE_TIME = values.FloatValue(5.0)
+
+    # Number of seconds during which the memory, disk and network usage shown on the system information page are
+    # cached and shared among all requests
+    CORE_SYSTEM_INFORMATION_TTL = values.FloatValue(5.0)
+
+    # Maximum number of seconds to wait for the disk usage of a single mount point. Mount points that don't respond
+    # within this time (e.g., hung NFS exports) are listed as unavailable
+    CORE_SYSTEM_INFORMATION_MOUNT_TIMEOUT = values.FloatValue(1.0)
+
+    # PID files of the corefacility processes which resource usage shall be tracked by the health check daemon.
+    # The keys are process group names, the values are paths to the PID files of the group root processes. All
+    # descendants of the root processes are tracked too
+    CORE_PROCESS_PID_FILES = values.DictValue({
+        "corefacility": "/run/corefacility.pid",
+        "gunicorn": "/run/gunicorn/gunicorn.pid",
+    })
+
+    # UNIX socket which the autoadmin daemon listens to in order to be woken up when a new POSIX request has been added.
+    # Not used for PostgreSQL which notifies the daemon by itself. The daemon polls the database when the value is empty
+    CORE_AUTOADMIN_WAKEUP_SOCKET = values.Value("")
+
+    # Maximum number of POSIX requests executed by the autoadmin daemon at the same time. Requests touching the same
+    # POSIX users or groups are always executed one by one
+    CORE_AUTOADMIN_WORKERS = values.PositiveIntegerValue(4)
+
+    # Number of seconds after which the POSIX request claimed by the autoadmin daemon may be claimed by another daemon.
+    # This allows to process requests left by the daemon that was killed during their processing
+    CORE_AUTOADMIN_CLAIM_TIMEOUT = values.PositiveIntegerValue(3600)
+
     if sys.platform.startswith("win32"):
         del LOGGING["handlers"]["syslog_handler"]
         LOGGING["loggers"]["django.corefacility"]["handlers"].remove("syslog_handler")